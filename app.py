@@ -13,9 +13,13 @@ import argparse
 from sender import send_images
 from configs.get_cfg import get_cfg, ConfigError
 
-from camera.source_factory import create_rgb_source, create_ir_source
+from camera.source_factory import attach_scene_cfg, create_rgb_source, create_ir_source
+from camera.replay_source import release_replay_sessions
 from detector.tflite import TFLiteWorker
 from core.buffer import DoubleBuffer
+from core.fusion_service import FusionService, EventRecorder, DEFAULT_EVENTS
+from core.duty_governor import DutyGovernor, DEFAULT_GOVERNOR
+from core.video_stream import stream_config
 from core.state import (
     camera_state,
     LabelScaleState,
@@ -56,6 +60,12 @@ def _apply_input_overrides(name, cfg):
     interval = os.getenv(f"{prefix}_FRAME_INTERVAL_MS")
     if interval:
         cfg['FRAME_INTERVAL_MS'] = int(interval)
+    session = os.getenv(f"{prefix}_SESSION")
+    if session:
+        cfg['SESSION'] = session
+    speed = os.getenv(f"{prefix}_SPEED")
+    if speed:
+        cfg['SPEED'] = float(speed)
 
 
 def setup_keyboard():
@@ -116,6 +126,9 @@ def print_help():
     print("    [.] Increase overlay label scale")
     print("    [0] Reset overlay label scale")
     print("-" * 55)
+    print("  Coordinate:")
+    print("    [c] Auto-calibrate IR/RGB mapping from live frames")
+    print("-" * 55)
     print("  [s] Show current status")
     print("  [h] Show this help message")
     print("  [q] Quit application")
@@ -146,6 +159,11 @@ def _normalize_coord_cfg(params):
             out['scale'] = float(out['scale'])
         except Exception:
             out['scale'] = None
+    # 선택 항목: 호모그래피/기준 해상도/IR 렌즈 왜곡 (없으면 키 자체를 생략)
+    for key in ('homography', 'ref_size', 'camera_matrix', 'dist_coeffs'):
+        val = _get(key, None)
+        if val is not None:
+            out[key] = val
     return out
 
 
@@ -164,11 +182,18 @@ class CoordState:
             self._params.update({k: v for k, v in kwargs.items() if v is not None})
             self._version += 1
 
+    def replace(self, params):
+        """None 값을 포함해 파라미터 전체 교체 (자동 캘리브레이션 결과 반영용)"""
+        with self._lock:
+            self._params = dict(params)
+            self._version += 1
+
 
 class RuntimeController:
     """
     런타임 파이프라인을 묶어 관리하는 컨트롤러.
     - 카메라 소스/탐지 워커 시작·정지
+    - IR 기반 탐지 듀티 사이클 거버너 (STATE.GOVERNOR)
     - 송신(TCP)/디스플레이 제어
     - 좌표/캡처 설정 공유
     """
@@ -194,6 +219,10 @@ class RuntimeController:
         self.ir_input_cfg = None
         self.detector_worker = None
         self.detector_cfg = {}
+        self.fusion_service = None
+        self.event_recorder = None
+        self.governor = None
+        self._sender_events = None
         self._threads = {}
 
     def _start_thread(self, name, target, args=(), kwargs=None):
@@ -214,16 +243,69 @@ class RuntimeController:
         self._threads.pop(name, None)
         return True
 
+    def start_fusion(self):
+        """공유 융합 스테이지 시작 (sender/GUI/디스플레이/이벤트 기록이 구독)"""
+        if self.fusion_service is not None and self.fusion_service.is_alive():
+            return False
+        self.fusion_service = FusionService(
+            self.buffers['rgb_det'],
+            self.buffers['ir'],
+            self.buffers['fusion'],
+            coord_state=self.coord_state,
+            label_state=self.label_state,
+            fire_state_cfg=self.get_fire_state_cfg(),
+            sync_cfg=self.sync_cfg,
+            ir16_buf=self.buffers['ir16'],
+        )
+        self.fusion_service.start()
+        events_cfg = self.get_events_cfg()
+        if events_cfg['RECORD']:
+            self.event_recorder = EventRecorder(self.fusion_service, events_cfg['PATH'])
+            self.event_recorder.start()
+            logger.info("Fire event recorder - %s", events_cfg['PATH'])
+        return True
+
+    def stop_fusion(self):
+        if self.event_recorder:
+            self.event_recorder.stop()
+            self.event_recorder.join(timeout=2.0)
+            self.event_recorder = None
+        if self.fusion_service:
+            self.fusion_service.stop()
+            self.fusion_service.join(timeout=2.0)
+            self.fusion_service = None
+
+    def start_governor(self):
+        """IR 버퍼를 보고 탐지 워커 추론 주기를 조절 (STATE.GOVERNOR.ENABLED일 때만)"""
+        cfg = self.get_governor_cfg()
+        if not cfg['ENABLED'] or (self.governor is not None and self.governor.is_alive()):
+            return False
+        # 워커가 재시작돼도 거버너가 새 워커에 다시 적용하도록 getter로 전달
+        self.governor = DutyGovernor(self.buffers['ir'], lambda: self.detector_worker, cfg)
+        self.governor.start()
+        return True
+
+    def stop_governor(self):
+        if self.governor:
+            self.governor.stop()
+            self.governor.join(timeout=2.0)
+            self.governor = None
+
     def start_sender(self):
         self.sender_stop.clear()
+        if self.sender_running():
+            return False
+        if self._sender_events is None and self.fusion_service is not None:
+            self._sender_events = self.fusion_service.subscribe_events()
         kwargs = {
             "host": self.server['IP'],
             "port": self.server['PORT'],
             "jpeg_quality": self.server.get('COMP_RATIO', 70),
-            "sync_cfg": self.sync_cfg,
+            "jpeg_backend": self.server.get('JPEG_BACKEND', 'auto'),
+            "stream_cfg": stream_config(self.server),
             "stop_event": self.sender_stop,
-            "coord_state": self.coord_state,
             "label_state": self.label_state,
+            "event_queue": self._sender_events,
         }
         return self._start_thread(
             "sender",
@@ -232,13 +314,17 @@ class RuntimeController:
                 self.buffers['rgb'],
                 self.buffers['ir'],
                 self.buffers['ir16'],
-                self.buffers['rgb_det'],
+                self.buffers['fusion'],
             ),
             kwargs=kwargs,
         )
 
     def stop_sender(self):
-        return self._stop_thread("sender", stop_event=self.sender_stop)
+        stopped = self._stop_thread("sender", stop_event=self.sender_stop)
+        if self._sender_events is not None and self.fusion_service is not None:
+            self.fusion_service.unsubscribe_events(self._sender_events)
+        self._sender_events = None
+        return stopped
 
     def sender_running(self):
         t = self._threads.get("sender")
@@ -252,7 +338,7 @@ class RuntimeController:
         return self._start_thread(
             "display",
             target=display_loop,
-            args=(self.buffers['rgb'], self.buffers['ir'], self.buffers['rgb_det']),
+            args=(self.buffers['rgb'], self.buffers['ir'], self.buffers['fusion']),
             kwargs={"window_name": window_name, "target_res": self.target_res},
         )
 
@@ -275,6 +361,9 @@ class RuntimeController:
     def set_detector(self, worker, det_cfg):
         self.detector_worker = worker
         self.detector_cfg = dict(det_cfg or {})
+        # ROI 추론이 런타임 캘리브레이션을 따르도록 좌표 상태 공유
+        if worker is not None and hasattr(worker, "coord_state"):
+            worker.coord_state = self.coord_state
 
     def stop_sources(self):
         if self.rgb_source:
@@ -294,6 +383,8 @@ class RuntimeController:
         if ir_input_cfg:
             self.ir_input_cfg = dict(ir_input_cfg)
         self.stop_sources()
+        # 재생 세션은 새 SPEED/LOOP와 새 시계로 처음부터
+        release_replay_sessions()
         self.rgb_source = create_rgb_source(self.rgb_cfg, self.rgb_input_cfg, self.buffers['rgb'])
         self.ir_source = create_ir_source(self.ir_cfg, self.ir_input_cfg, self.buffers['ir'], self.buffers['ir16'])
         self.rgb_source.start()
@@ -301,7 +392,9 @@ class RuntimeController:
         return True
 
     def restart_ir_source(self):
-        """IR 소스만 재시작 (RGB는 유지)"""
+        """IR 소스만 재시작 (RGB는 유지). 재생 입력은 RGB와 시계를 공유하므로 둘 다 재시작"""
+        if 'replay' in (_input_mode(self.rgb_input_cfg), _input_mode(self.ir_input_cfg)):
+            return self.restart_sources()
         if self.ir_source:
             try:
                 self.ir_source.stop()
@@ -321,6 +414,58 @@ class RuntimeController:
     def set_coord_cfg(self, params):
         self.coord_state.update(**params)
 
+    def auto_calibrate_coord(self, n_pairs=300, timeout_s=60.0, calib_cfg=None, workers=2):
+        """
+        라이브 RGB/IR 버퍼에서 대응점을 모아 COORD를 자동 추정하고 적용.
+
+        Returns:
+            dict or None: core.calibration.solve 결과 (실패 시 None)
+        """
+        from core import calibration
+
+        cfg = dict(calibration.DEFAULT_CALIB, **(calib_cfg or {}))
+        pairs = calibration.live_pairs(
+            self.buffers, n_pairs, timeout_s=timeout_s,
+            max_diff_ms=cfg['MAX_DIFF_MS'],
+        )
+        corr, ir_size, rgb_size, n = calibration.extract_correspondences(pairs, cfg, workers=workers)
+        result = calibration.solve(corr, ir_size, rgb_size, cfg) if n else None
+        if result is None:
+            logger.warning("Auto calibration failed: %d correspondences from %d pairs", len(corr), n)
+            return None
+        self.coord_state.replace(result['params'])
+        logger.info(
+            "Auto calibration (%s): inliers=%d/%d rmse=%.2fpx params=%s",
+            result['model'], result['inliers'], result['n'], result['rmse'], result['params'],
+        )
+        return result
+
+    def start_auto_calibration(self, n_pairs=300, timeout_s=60.0, calib_cfg=None, on_done=None):
+        """
+        auto_calibrate_coord를 백그라운드 스레드로 실행 (CLI [c] / GUI Auto Calibrate)
+
+        on_done(result)는 작업 스레드에서 호출된다 (실패 시 None).
+        Returns:
+            bool: 시작했으면 True, 이미 실행 중이면 False
+        """
+        def _run():
+            result = None
+            try:
+                result = self.auto_calibrate_coord(n_pairs=n_pairs, timeout_s=timeout_s, calib_cfg=calib_cfg)
+            except Exception as exc:
+                logger.exception("Auto calibration error: %s", exc)
+            if on_done:
+                on_done(result)
+
+        started = self._start_thread("calibrate", _run)
+        if started:
+            logger.info("Auto calibration - collecting %d frame pairs (timeout %.0fs)", n_pairs, timeout_s)
+        return started
+
+    def calibration_running(self):
+        t = self._threads.get("calibrate")
+        return t is not None and t.is_alive()
+
     def get_label_scale(self):
         return self.label_state.get() if self.label_state else DEFAULT_LABEL_SCALE
 
@@ -340,6 +485,29 @@ class RuntimeController:
     def get_capture_cfg(self):
         return dict(self.capture_cfg or {})
 
+    def get_fire_state_cfg(self):
+        state = getattr(self.cfg, 'STATE', None) or {}
+        return dict(state.get('FIRE') or {}) if isinstance(state, dict) else {}
+
+    def get_events_cfg(self):
+        state = getattr(self.cfg, 'STATE', None) or {}
+        events = dict(DEFAULT_EVENTS)
+        if isinstance(state, dict):
+            events.update(state.get('EVENTS') or {})
+        return events
+
+    def set_vis_mode(self, vis_mode):
+        """융합 주석 표시 모드 (test/temp) 변경"""
+        if self.fusion_service is not None:
+            self.fusion_service.set_vis_mode(vis_mode)
+
+    def get_governor_cfg(self):
+        state = getattr(self.cfg, 'STATE', None) or {}
+        governor = dict(DEFAULT_GOVERNOR)
+        if isinstance(state, dict):
+            governor.update(state.get('GOVERNOR') or {})
+        return governor
+
     def update_ir_fire_cfg(self, fire_enabled=None, min_temp=None, thr=None, raw_thr=None, tau=None, restart=False):
         """IR 화점 탐지 관련 설정 업데이트. 기본은 런타임 적용, 필요 시 restart=True로 재시작"""
         ir = dict(self.ir_cfg or {})
@@ -406,7 +574,13 @@ class RuntimeController:
             target_fps=self.rgb_cfg.get('FPS', 30),
             target_res=self.target_res,
             conf_thr=conf_thr,
-            name=name
+            name=name,
+            track_cfg=cfg.get('TRACK'),
+            ir_buf=self.buffers['ir'],
+            roi_cfg=cfg.get('ROI'),
+            coord_state=self.coord_state,
+            tile_cfg=cfg.get('TILE'),
+            max_age_ms=(cfg.get('DEADLINE') or {}).get('MAX_AGE_MS', 0),
         )
         new_worker.start()
         self.detector_worker = new_worker
@@ -457,6 +631,7 @@ class RuntimeController:
             "rgb_source": getattr(self.rgb_source, "thread", None) is not None and getattr(self.rgb_source.thread, "is_alive", lambda: False)(),
             "ir_source": getattr(self.ir_source, "thread", None) is not None and getattr(self.ir_source.thread, "is_alive", lambda: False)(),
             "detector": self.detector_worker is not None and self.detector_worker.is_alive(),
+            "governor": self.governor.snapshot() if self.governor else None,
         }
 
 
@@ -467,6 +642,10 @@ def _load_config():
     return cfg
 
 
+def _input_mode(mode_cfg):
+    return str((mode_cfg or {}).get('MODE', 'live') or 'live').lower()
+
+
 def _build_buffers():
     d16_ir, d_ir = DoubleBuffer(), DoubleBuffer()
     d_rgb, d_rgb_det = DoubleBuffer(), DoubleBuffer()
@@ -475,6 +654,7 @@ def _build_buffers():
         'rgb_det': d_rgb_det,
         'ir': d_ir,
         'ir16': d16_ir,
+        'fusion': DoubleBuffer(),   # FusionService 결과 (FusionResult)
     }
 
 
@@ -500,6 +680,10 @@ def _start_detector(cfg, rgb_cfg, buffers, delegate, model, label):
         'CPU_THREADS': 1,
         'CONF_THR': float(getattr(cfg, 'CONF_THR', getattr(cfg, 'CONF_THRESHOLD', 0.15))),
         'NAME': "DetRGB",
+        'TRACK': dict((getattr(cfg, 'STATE', None) or {}).get('TRACK') or {}),
+        'ROI': dict((getattr(cfg, 'STATE', None) or {}).get('ROI') or {}),
+        'TILE': dict((getattr(cfg, 'STATE', None) or {}).get('TILE') or {}),
+        'DEADLINE': dict((getattr(cfg, 'STATE', None) or {}).get('DEADLINE') or {}),
     }
     worker = TFLiteWorker(
         model_path=model,
@@ -514,6 +698,11 @@ def _start_detector(cfg, rgb_cfg, buffers, delegate, model, label):
         target_res=tuple(getattr(cfg, 'TARGET_RES', (rgb_cfg.get('RES', [0, 0])[0], rgb_cfg.get('RES', [0, 0])[1]))),
         conf_thr=rgb_det_cfg['CONF_THR'],
         name=rgb_det_cfg['NAME'],
+        track_cfg=rgb_det_cfg['TRACK'],
+        ir_buf=buffers['ir'],
+        roi_cfg=rgb_det_cfg['ROI'],
+        tile_cfg=rgb_det_cfg['TILE'],
+        max_age_ms=rgb_det_cfg['DEADLINE'].get('MAX_AGE_MS', 0),
     )
     worker.start()
     return worker, rgb_det_cfg
@@ -547,6 +736,7 @@ def _init_pipeline(gui_mode=False):
     ir_input_cfg = dict(input_cfg.get('IR', {})) if isinstance(input_cfg, dict) else {}
     _apply_input_overrides("RGB", rgb_input_cfg)
     _apply_input_overrides("IR", ir_input_cfg)
+    attach_scene_cfg(input_cfg, rgb_input_cfg, ir_input_cfg, ir_cfg['RES'], _normalize_coord_cfg(cfg.COORD))
 
     display_enabled = False
     display_window = "Vision AI Display"
@@ -587,6 +777,8 @@ def _init_pipeline(gui_mode=False):
     controller.set_sources(rgb_source, ir_source, rgb_cfg, ir_cfg, rgb_input_cfg, ir_input_cfg)
     if rgb_det:
         controller.set_detector(rgb_det, rgb_det_cfg)
+    controller.start_fusion()
+    controller.start_governor()
 
     return {
         'cfg': cfg,
@@ -668,6 +860,9 @@ def _run_cli(ctx):
                 new_scale = controller.reset_label_scale()
                 if new_scale is not None:
                     logger.info("[Overlay] Label scale reset → %.2fx", new_scale)
+            elif key == 'c':
+                if not controller.start_auto_calibration():
+                    logger.info("[Coord] Auto calibration already running")
             elif key == 's':
                 status = camera_state.get_status()
                 ir = status['ir']
@@ -694,6 +889,8 @@ def _run_cli(ctx):
     finally:
         if controller:
             controller.stop_sender()
+            controller.stop_fusion()
+            controller.stop_governor()
             controller.stop_display()
             controller.stop_detector()
             controller.stop_sources()
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+모델 zoo 벤치마크 - model/*/ 의 TFLite 모델을 같은 입력으로 비교
+
+- 추론 모드: letterbox(단일 패스) / tiled(겹치는 타일 + 타일 간 NMS)
+- 지연 시간: 프레임당 평균/p95 (ms), FPS (Detector.infer 1장씩)
+- 처리량: Detector.infer_many로 전체 프레임을 한 번에 넘겼을 때의 FPS
+  (배치 차원 모델이면 배치 invoke, 아니면 전처리/추론 파이프라인)
+- 정확도: --gt에 YOLO 형식 라벨 폴더를 주면 IoU 기준 recall/precision
+- 전송(--transport): 같은 프레임을 JPEG / H.264 / H.265로 보낼 때의 비트레이트 비교
+
+사용 예:
+    python benchmark.py --source samples/ --gt samples/labels --modes letterbox,tiled
+    python benchmark.py --models "model/8n_*/*.tflite" --source sample/fire_sample.mp4 --frames 100
+    python benchmark.py --transport --source sample/fire_sample.mp4 --frames 150 --stream-kbps 2000
+"""
+
+import os
+import csv
+import glob
+import time
+import logging
+import argparse
+
+import cv2
+import numpy as np
+
+from core.coord_mapper import bbox_iou_matrix
+from core.det_eval import load_yolo_labels
+from core.jpeg_encoder import create_jpeg_encoder
+from core.video_stream import measure_bitrate
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="TFLite model zoo benchmark (latency / recall)")
+    parser.add_argument("--models", default="model/*/*.tflite", help="모델 경로 glob (기본: model/*/*.tflite)")
+    parser.add_argument("--labels", default="model/labels.txt", help="라벨 파일")
+    parser.add_argument("--source", required=True, help="이미지 폴더 또는 영상 파일")
+    parser.add_argument("--gt", help="YOLO 라벨(.txt) 폴더 (이미지 파일명과 동일한 stem)")
+    parser.add_argument("--frames", type=int, default=50, help="최대 프레임 수")
+    parser.add_argument("--warmup", type=int, default=3, help="측정 전 워밍업 프레임 수")
+    parser.add_argument("--modes", default="letterbox,tiled", help="비교할 모드 (letterbox,tiled)")
+    parser.add_argument("--overlap", type=float, default=0.2, help="타일 겹침 비율")
+    parser.add_argument("--tiles-per-frame", type=int, default=0, help="프레임당 타일 수 (0 = 전체)")
+    parser.add_argument("--conf", type=float, default=0.15, help="신뢰도 임계값")
+    parser.add_argument("--iou", type=float, default=0.5, help="정답 매칭 IoU")
+    parser.add_argument("--classes", default="1", help="평가 클래스 ID (쉼표 구분, 빈 값이면 전체)")
+    parser.add_argument("--npu", action="store_true", help="NPU delegate 사용")
+    parser.add_argument("--delegate", default="/usr/lib/libvx_delegate.so", help="delegate 라이브러리")
+    parser.add_argument("--threads", type=int, default=1, help="CPU 스레드 수")
+    parser.add_argument("--batch", type=int, default=0, help="동적 배치 모델의 배치 크기 (0 = 모델 그대로)")
+    parser.add_argument("--csv", help="결과 CSV 저장 경로")
+    parser.add_argument("--transport", action="store_true", help="모델 대신 JPEG/H.264/H.265 전송 비트레이트 비교")
+    parser.add_argument("--jpeg-quality", type=int, default=70, help="JPEG 품질 (SERVER.COMP_RATIO)")
+    parser.add_argument("--jpeg-backend", default="auto", help="JPEG 백엔드 (SERVER.JPEG_BACKEND)")
+    parser.add_argument("--stream-fps", type=float, default=15.0, help="전송 프레임률 (SERVER.STREAM.FPS)")
+    parser.add_argument("--stream-kbps", type=int, default=2000, help="영상 목표 비트레이트 (SERVER.STREAM.BITRATE_KBPS)")
+    parser.add_argument("--stream-gop", type=int, default=30, help="키프레임 간격 (SERVER.STREAM.GOP)")
+    return parser.parse_args()
+
+
+def load_frames(source, max_frames):
+    """(name, frame) 리스트 로드. 폴더면 이미지, 파일이면 영상 프레임"""
+    frames = []
+    if os.path.isdir(source):
+        paths = sorted(p for p in glob.glob(os.path.join(source, "*")) if p.lower().endswith(IMAGE_EXTS))
+        for path in paths[:max_frames]:
+            img = cv2.imread(path)
+            if img is not None:
+                frames.append((os.path.splitext(os.path.basename(path))[0], img))
+        return frames
+
+    cap = cv2.VideoCapture(source)
+    idx = 0
+    while len(frames) < max_frames:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frames.append((f"{idx:06d}", frame))
+        idx += 1
+    cap.release()
+    return frames
+
+
+def match_count(pred_xyxy, pred_cls, gt_xyxy, gt_cls, iou_thr):
+    """같은 클래스끼리 IoU 내림차순 greedy 매칭 → TP 수"""
+    if len(pred_xyxy) == 0 or len(gt_xyxy) == 0:
+        return 0
+    to_xywh = lambda b: np.column_stack([b[:, 0], b[:, 1], b[:, 2] - b[:, 0], b[:, 3] - b[:, 1]])
+    iou = bbox_iou_matrix(to_xywh(np.asarray(pred_xyxy, np.float64)), to_xywh(gt_xyxy))
+    iou[np.asarray(pred_cls)[:, None] != np.asarray(gt_cls)[None, :]] = 0.0
+    tp = 0
+    used_p, used_g = set(), set()
+    for flat in np.argsort(-iou, axis=None, kind='stable'):
+        p, g = divmod(int(flat), iou.shape[1])
+        if iou[p, g] < iou_thr:
+            break
+        if p in used_p or g in used_g:
+            continue
+        used_p.add(p)
+        used_g.add(g)
+        tp += 1
+    return tp
+
+
+def build_detector(args, model_path, mode):
+    from detector.tflite import Detector
+
+    return Detector(
+        model_path,
+        args.labels,
+        use_npu=args.npu,
+        delegate_lib=args.delegate,
+        cpu_threads=args.threads,
+        conf_thr=args.conf,
+        batch_size=args.batch or None,
+        name=f"Bench-{mode}",
+        tile_cfg={
+            'ENABLED': mode == 'tiled',
+            'OVERLAP': args.overlap,
+            'TILES_PER_FRAME': args.tiles_per_frame,
+        },
+    )
+
+
+def run_one(args, model_path, mode, frames, classes):
+    detector = build_detector(args, model_path, mode)
+    in_w, in_h = detector.input_size
+
+    for _, frame in frames[:args.warmup]:
+        detector.infer(frame)
+
+    lat_ms = []
+    n_det = 0
+    n_gt = n_tp = n_pred_eval = 0
+    for name, frame in frames:
+        t0 = time.perf_counter()
+        scores, boxes, cls_ids = detector.infer(frame)
+        lat_ms.append((time.perf_counter() - t0) * 1000.0)
+        n_det += len(scores)
+
+        if not args.gt:
+            continue
+        gt = load_yolo_labels(args.gt, name, frame.shape, classes, missing_empty=True)
+        if classes is not None:
+            m = np.isin(cls_ids, list(classes))
+            boxes, cls_ids = boxes[m], cls_ids[m]
+        n_gt += len(gt[0])
+        n_pred_eval += len(boxes)
+        n_tp += match_count(boxes, cls_ids, gt[0], gt[1], args.iou)
+
+    t0 = time.perf_counter()
+    detector.infer_many([frame for _, frame in frames])
+    many_s = time.perf_counter() - t0
+
+    lat = np.asarray(lat_ms)
+    n_tiles = len(detector.tiles) if detector.tiles else 1
+    return {
+        'model': os.path.relpath(model_path),
+        'input': f"{in_w}x{in_h}",
+        'mode': mode,
+        'tiles': n_tiles,
+        'mean_ms': float(lat.mean()) if lat.size else 0.0,
+        'p95_ms': float(np.percentile(lat, 95)) if lat.size else 0.0,
+        'fps': 1000.0 / lat.mean() if lat.size and lat.mean() > 0 else 0.0,
+        'batch': detector.batch,
+        'many_fps': len(frames) / many_s if many_s > 0 else 0.0,
+        'det_per_frame': n_det / max(1, len(frames)),
+        'recall': (n_tp / n_gt) if n_gt else None,
+        'precision': (n_tp / n_pred_eval) if n_pred_eval else None,
+    }
+
+
+def run_transport(args, frames):
+    """rgb_det 전송 방식별 평균 비트레이트 (kbps) / 프레임당 인코딩 시간"""
+    images = [frame for _, frame in frames]
+    duration = len(images) / args.stream_fps
+    jpeg = create_jpeg_encoder(args.jpeg_backend, quality=args.jpeg_quality)
+    total = sum(len(jpeg.encode(img, args.jpeg_quality)) for img in images)
+    rows = [{
+        'transport': 'jpeg',
+        'encoder': jpeg.name,
+        'kbps': total * 8 / 1000.0 / duration,
+        'encode_ms': jpeg.avg_ms(),
+    }]
+    jpeg.close()
+    for codec in ('h264', 'h265'):
+        res = measure_bitrate(images, codec, fps=args.stream_fps, bitrate_kbps=args.stream_kbps, gop=args.stream_gop)
+        if res is None:
+            print(f"[Bench] {codec}: no encoder available (GStreamer/FFmpeg)")
+            continue
+        rows.append({'transport': codec, 'encoder': res['encoder'], 'kbps': res['kbps'], 'encode_ms': res['encode_ms']})
+    return rows
+
+
+def _fmt(v):
+    return "-" if v is None else f"{v:.3f}"
+
+
+def main():
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s | %(name)s | %(message)s")
+    args = parse_args()
+
+    frames = load_frames(args.source, args.frames)
+    if not frames:
+        raise SystemExit(f"No frames loaded from: {args.source}")
+
+    if args.transport:
+        print(f"[Bench] transport on {len(frames)} frames ({frames[0][1].shape[1]}x{frames[0][1].shape[0]}) "
+              f"@ {args.stream_fps:g}fps")
+        rows = run_transport(args, frames)
+        jpeg_kbps = rows[0]['kbps']
+        for row in rows:
+            print(f"{row['transport']:<5} {row['encoder']:<16} {row['kbps']:9.1f}kbps "
+                  f"({row['kbps'] / jpeg_kbps * 100:5.1f}% of JPEG) encode={row['encode_ms']:6.2f}ms/frame")
+        _write_csv(args.csv, rows)
+        return
+
+    models = sorted(glob.glob(args.models))
+    if not models:
+        raise SystemExit(f"No models matched: {args.models}")
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    classes = {int(c) for c in args.classes.split(",") if c.strip()} or None
+
+    print(f"[Bench] {len(models)} models × {modes} on {len(frames)} frames "
+          f"({frames[0][1].shape[1]}x{frames[0][1].shape[0]})")
+    rows = []
+    for model_path in models:
+        for mode in modes:
+            try:
+                row = run_one(args, model_path, mode, frames, classes)
+            except Exception as e:
+                print(f"[Bench] {model_path} ({mode}) failed: {e}")
+                continue
+            rows.append(row)
+            print(
+                f"{row['model']:<50} {row['input']:>8} {row['mode']:<9} tiles={row['tiles']:<3} "
+                f"mean={row['mean_ms']:7.1f}ms p95={row['p95_ms']:7.1f}ms fps={row['fps']:6.2f} "
+                f"many_fps={row['many_fps']:6.2f} (batch={row['batch']}) "
+                f"det/f={row['det_per_frame']:5.2f} recall={_fmt(row['recall'])} "
+                f"precision={_fmt(row['precision'])}"
+            )
+
+    _write_csv(args.csv, rows)
+
+
+def _write_csv(path, rows):
+    if path and rows:
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"[Bench] saved {path}")
+
+
+if __name__ == "__main__":
+    main()
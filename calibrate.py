@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+IR-RGB 자동 캘리브레이션 - capture.py 세션에서 COORD 추정
+
+단일 열원(라이터, 핫팩, 할로겐 등)을 화면 여러 위치로 옮기며 녹화한 세션을 입력으로
+IR 고온 블롭과 RGB 밝은 영역의 대응점을 모아 scale/offset 또는 호모그래피를 추정합니다.
+
+사용 예:
+    python calibrate.py capture/20250101_120000
+    python calibrate.py capture/s1 capture/s2 --model homography --workers 8 --write configs/config.yaml
+"""
+
+import time
+import logging
+import argparse
+import itertools
+
+from core import calibration
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="IR/RGB coordinate calibration from capture sessions")
+    parser.add_argument("sessions", nargs="+", help="capture 세션 폴더 (metadata.csv, rgb.mp4, ir_vis.mp4)")
+    parser.add_argument("--model", choices=("affine", "homography"), default=calibration.DEFAULT_CALIB['MODEL'],
+                        help="affine(scale+offset) 또는 homography")
+    parser.add_argument("--step", type=int, default=1, help="프레임 간격 (N프레임마다 1쌍)")
+    parser.add_argument("--max-pairs", type=int, default=0, help="세션당 최대 프레임 쌍 (0 = 전체)")
+    parser.add_argument("--max-diff-ms", type=float, default=calibration.DEFAULT_CALIB['MAX_DIFF_MS'],
+                        help="RGB-IR 타임스탬프 허용 차이 (ms)")
+    parser.add_argument("--thr", type=float, default=calibration.DEFAULT_CALIB['RANSAC_THR'],
+                        help="인라이어 재투영 오차 (RGB px)")
+    parser.add_argument("--rgb-min-value", type=int, default=calibration.DEFAULT_CALIB['RGB_MIN_VALUE'],
+                        help="RGB 블롭 최소 밝기")
+    parser.add_argument("--workers", type=int, default=4, help="특징 추출 스레드 수")
+    parser.add_argument("--write", metavar="CONFIG", help="결과를 이 설정 파일의 COORD에 기록")
+    return parser.parse_args()
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s | %(name)s | %(message)s")
+    args = parse_args()
+    cfg = {
+        'MODEL': args.model,
+        'MAX_DIFF_MS': args.max_diff_ms,
+        'RANSAC_THR': args.thr,
+        'RGB_MIN_VALUE': args.rgb_min_value,
+    }
+
+    def all_pairs():
+        for session in args.sessions:
+            pairs = calibration.session_pairs(session, step=args.step, max_diff_ms=args.max_diff_ms)
+            if args.max_pairs > 0:
+                pairs = itertools.islice(pairs, args.max_pairs)
+            yield from pairs
+
+    t0 = time.perf_counter()
+    corr, ir_size, rgb_size, n_pairs = calibration.extract_correspondences(all_pairs(), cfg, workers=args.workers)
+    dt = time.perf_counter() - t0
+    print(f"[Calib] {n_pairs} pairs → {len(corr)} correspondences in {dt:.1f}s "
+          f"({n_pairs / dt if dt > 0 else 0.0:.1f} pairs/s)")
+    if not n_pairs:
+        raise SystemExit("No frame pairs loaded")
+
+    result = calibration.solve(corr, ir_size, rgb_size, cfg)
+    if result is None:
+        raise SystemExit(f"Calibration failed: need >= {calibration.DEFAULT_CALIB['MIN_PAIRS']} "
+                         f"consistent correspondences (got {len(corr)})")
+
+    print(f"[Calib] model={result['model']} IR {ir_size[0]}x{ir_size[1]} → RGB {rgb_size[0]}x{rgb_size[1]} "
+          f"inliers={result['inliers']}/{result['n']} rmse={result['rmse']:.2f}px")
+    for key, value in result['params'].items():
+        print(f"  {key.upper()}: {value}")
+
+    if args.write:
+        calibration.write_coord(args.write, result['params'])
+        print(f"[Calib] COORD written to {args.write}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+하드웨어 색변환 RGB 캡처 (GStreamer)
+
+기존 파이프라인은 v4l2src(YUY2) → videoconvert(CPU) → BGR 이라 1080p 프레임마다
+YUY2→BGR 변환을 소프트웨어로 수행한다. 여기서는 i.MX8의 imxvideoconvert_g2d(G2D)가
+있으면 색변환/스케일을 하드웨어로 넘기고, appsink는 drop=true max-buffers=1로
+지연을 한 프레임으로 제한한다.
+
+gi(PyGObject)가 있으면 GstCapture가 tee로 두 번째 appsink 분기를 열어
+모델 입력 크기(letterbox 내부 영역)로 하드웨어 스케일된 RGB 프레임을 함께 제공한다.
+검출기는 이 프레임을 받으면 letterbox 리사이즈와 BGR→RGB 변환을 건너뛴다.
+
+변환 요소 우선순위: imxvideoconvert_g2d → videoconvert (소프트웨어)
+"""
+
+import logging
+
+import numpy as np
+
+try:
+    import gi
+    gi.require_version('Gst', '1.0')
+    from gi.repository import Gst
+except (ImportError, ValueError):
+    Gst = None
+
+logger = logging.getLogger(__name__)
+
+
+HW_CONVERTERS = ('imxvideoconvert_g2d',)
+SW_CONVERTER = 'videoconvert'
+
+# appsink 공통 옵션: 최신 프레임 1장만 유지
+APPSINK_OPTS = "drop=true max-buffers=1 sync=false"
+# 파일 디코드용 appsink: 프레임을 버리지 않고 소비 속도에 맞춰 디코더를 멈춘다
+FILE_APPSINK_OPTS = "max-buffers=2 sync=false"
+
+
+def letterbox_size(src_size, model_size):
+    """
+    원본 (w, h)를 모델 입력 (w, h)에 비율 유지로 넣었을 때의 내부 크기 (w, h)
+
+    detector.tflite.letterbox와 같은 반올림 규칙을 쓴다.
+    """
+    w0, h0 = src_size
+    nw, nh = model_size
+    r = min(nh / h0, nw / w0)
+    return int(round(w0 * r)), int(round(h0 * r))
+
+
+def converter_elements(hw_convert='auto'):
+    """
+    시도할 변환 요소 목록
+
+    hw_convert: 'auto'(하드웨어 → 소프트웨어) | True(하드웨어만) | False(소프트웨어만)
+    """
+    if hw_convert is False or str(hw_convert).lower() in ('false', 'off', 'sw'):
+        return (SW_CONVERTER,)
+    if hw_convert is True or str(hw_convert).lower() in ('true', 'on', 'hw'):
+        return HW_CONVERTERS
+    return HW_CONVERTERS + (SW_CONVERTER,)
+
+
+def source_caps(dev_path, size, fps=None):
+    w, h = size
+    rate = f",framerate={int(fps)}/1" if fps else ""
+    return (
+        f"v4l2src device={dev_path} io-mode=2 ! "
+        f"video/x-raw,format=YUY2,width={w},height={h}{rate}"
+    )
+
+
+def opencv_pipeline(dev_path, size, fps=None, converter=SW_CONVERTER):
+    """
+    cv2.VideoCapture(CAP_GSTREAMER)용 단일 appsink 파이프라인 (BGR)
+
+    G2D는 BGR(24bit)을 출력하지 못하므로 BGRx로 변환한 뒤 채널만 떼어 낸다.
+    """
+    if converter == SW_CONVERTER:
+        convert = f"{SW_CONVERTER} ! video/x-raw,format=BGR"
+    else:
+        convert = f"{converter} ! video/x-raw,format=BGRx ! videoconvert ! video/x-raw,format=BGR"
+    return f"{source_caps(dev_path, size, fps)} ! {convert} ! appsink {APPSINK_OPTS}"
+
+
+def decode_pipeline(path, converter=SW_CONVERTER):
+    """
+    영상 파일 디코드용 cv2.VideoCapture(CAP_GSTREAMER) 파이프라인 (BGR)
+
+    decodebin이 플랫폼 하드웨어 디코더(i.MX8 vpudec 등)를 고르고, 색변환은 opencv_pipeline과
+    같은 규칙으로 G2D → videoconvert를 쓴다.
+    """
+    if converter == SW_CONVERTER:
+        convert = f"{SW_CONVERTER} ! video/x-raw,format=BGR"
+    else:
+        convert = f"{converter} ! video/x-raw,format=BGRx ! videoconvert ! video/x-raw,format=BGR"
+    return f'filesrc location="{path}" ! decodebin ! {convert} ! appsink {FILE_APPSINK_OPTS}'
+
+
+def tee_pipeline(dev_path, size, fps=None, converter=SW_CONVERTER, model_size=None):
+    """
+    GstCapture용 파이프라인: 표시/전송용 BGRx 분기 + (선택) 모델 입력용 RGBx 분기
+
+    model_size=(w, h)면 letterbox 내부 크기로 스케일한 분기(appsink name=model)를 추가한다.
+    videoconvert는 크기를 바꾸지 못하므로 소프트웨어 경로에는 videoscale을 붙인다.
+    """
+    main = f"queue leaky=downstream max-size-buffers=1 ! {converter} ! video/x-raw,format=BGRx ! " \
+           f"appsink name=main {APPSINK_OPTS}"
+    desc = f"{source_caps(dev_path, size, fps)} ! tee name=t t. ! {main}"
+    if model_size:
+        mw, mh = letterbox_size(size, model_size)
+        scale = f"{converter} ! videoscale" if converter == SW_CONVERTER else converter
+        desc += (
+            f" t. ! queue leaky=downstream max-size-buffers=1 ! {scale} ! "
+            f"video/x-raw,format=RGBx,width={mw},height={mh} ! appsink name=model {APPSINK_OPTS}"
+        )
+    return desc
+
+
+def _sample_to_array(sample):
+    """RGBx/BGRx 샘플 → (h, w, 3) uint8 배열 (복사본)과 PTS"""
+    caps = sample.get_caps().get_structure(0)
+    w, h = caps.get_value('width'), caps.get_value('height')
+    buf = sample.get_buffer()
+    ok, info = buf.map(Gst.MapFlags.READ)
+    if not ok:
+        return None, None
+    try:
+        stride = len(info.data) // h
+        arr = np.frombuffer(info.data, dtype=np.uint8, count=stride * h).reshape(h, stride)
+        frame = arr[:, :w * 4].reshape(h, w, 4)[:, :, :3].copy()
+    finally:
+        buf.unmap(info)
+    return frame, buf.pts
+
+
+class GstCapture:
+    """
+    cv2.VideoCapture와 같은 인터페이스(isOpened/read/get/release)의 GStreamer 캡처
+
+    read() 후 model_frame에 같은 프레임(PTS 일치)의 모델 입력 RGB가 들어간다.
+    모델 분기가 없거나 짝이 맞지 않으면 None.
+    """
+
+    def __init__(self, dev_path, size, fps=None, converter=SW_CONVERTER, model_size=None, timeout_s=1.0):
+        if Gst is None:
+            raise RuntimeError("GStreamer Python bindings (gi) not available")
+        Gst.init(None)
+        if Gst.ElementFactory.find(converter) is None:
+            raise RuntimeError(f"GStreamer element {converter} not found")
+        self.converter = converter
+        self.size = tuple(size)
+        self.fps = fps
+        self.model_size = tuple(model_size) if model_size else None
+        self.model_frame = None
+        self.timeout_ns = int(timeout_s * Gst.SECOND)
+        self._pipeline = Gst.parse_launch(tee_pipeline(dev_path, size, fps, converter, model_size))
+        self._main = self._pipeline.get_by_name("main")
+        self._model = self._pipeline.get_by_name("model")
+        if self._pipeline.set_state(Gst.State.PLAYING) == Gst.StateChangeReturn.FAILURE:
+            self.release()
+            raise RuntimeError(f"GStreamer pipeline failed to start ({converter})")
+
+    def isOpened(self):
+        return self._pipeline is not None
+
+    def read(self):
+        self.model_frame = None
+        if self._pipeline is None:
+            return False, None
+        sample = self._main.emit("try-pull-sample", self.timeout_ns)
+        if sample is None:
+            return False, None
+        frame, pts = _sample_to_array(sample)
+        if frame is None:
+            return False, None
+        if self._model is not None:
+            # 두 분기는 같은 버퍼에서 갈라지므로 PTS가 같은 샘플만 짝으로 쓴다
+            m_sample = self._model.emit("try-pull-sample", self.timeout_ns // 10)
+            if m_sample is not None:
+                m_frame, m_pts = _sample_to_array(m_sample)
+                if m_frame is not None and m_pts == pts:
+                    self.model_frame = m_frame
+        return True, frame
+
+    def get(self, prop):
+        # cv2.CAP_PROP_FRAME_WIDTH=3, HEIGHT=4, FPS=5
+        return {3: self.size[0], 4: self.size[1], 5: float(self.fps or 0)}.get(prop, 0.0)
+
+    def release(self):
+        if self._pipeline is not None:
+            self._pipeline.set_state(Gst.State.NULL)
+        self._pipeline = None
+        self._main = None
+        self._model = None
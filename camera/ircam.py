@@ -20,8 +20,10 @@ import logging
 import threading
 
 from datetime import datetime
-from core.util import dyn_sleep
+from core.pacing import RateLimiter, SourceStats
 from core.state import camera_state
+from core.records import hotspot_records
+from core.view_transform import frame_view
 from camera.frame_source import FrameSource
 from .purethermal.thermalcamera import ThermalCamera
 
@@ -48,7 +50,7 @@ def detect_fire(data, min_val, tau=0.95, thr=20, raw_thr=5, window_size=10, delt
         tuple: (detected: bool, bboxes: list or None, hotspots: list)
                - detected: 화점 탐지 여부
                - bboxes: 탐지된 화점들의 바운딩 박스 [(x, y, w, h), ...]
-               - hotspots: 화점 좌표 및 온도 [(x, y, temp_corrected, temp_raw), ...]
+               - hotspots: 화점 좌표 및 온도 HOTSPOT_DTYPE 배열 (x, y, temp_corrected, temp_raw)
     
     알고리즘 흐름:
         1. 온도 변환: RAW16 → Kelvin → 섭씨
@@ -113,7 +115,7 @@ def detect_fire(data, min_val, tau=0.95, thr=20, raw_thr=5, window_size=10, delt
         
         # Hotspot이 없으면 종료
         if len(hotspots) == 0:
-            return False, None, []
+            return False, None, hotspot_records(None)
 
         # ===== 4단계: Hotspot 주변 영역 확장 =====
         # 각 hotspot 주변에서 비슷한 온도를 가진 픽셀을 마스크에 추가
@@ -146,13 +148,13 @@ def detect_fire(data, min_val, tau=0.95, thr=20, raw_thr=5, window_size=10, delt
                         bboxes.append((x, y, w, h))
 
         if bboxes:
-            return (True, bboxes, hotspots)
+            return (True, bboxes, hotspot_records(hotspots))
         else:
-            return (False, None, [])
+            return (False, None, hotspot_records(None))
     
     except Exception:
         # 오류 발생 시 탐지 실패로 처리
-        return False, None, []
+        return False, None, hotspot_records(None)
 
 
 def draw_bbox(frame, datas):
@@ -178,6 +180,9 @@ def draw_bbox(frame, datas):
 
 logger = logging.getLogger(__name__)
 
+# 캡처 실패 시 재시도 간격 (초) - 장치가 없거나 끊겼을 때 빈 루프 방지
+FAIL_BACKOFF = 0.05
+
 
 class IRCamera(FrameSource):
     """
@@ -207,7 +212,7 @@ class IRCamera(FrameSource):
             cfg: 설정 딕셔너리
                 - FPS: 목표 프레임레이트 (최대 9)
                 - RES: 출력 해상도 [width, height]
-                - SLEEP: 루프 슬립 시간 (초)
+                - MAX_FPS: 발행 속도 상한 (0 = 장치 속도, 기본)
                 - TAU: 대기 투과율 (기본: 0.95, 실내용)
                 - FIRE_DETECTION: 화점 탐지 활성화 (기본: True)
                 - FIRE_MIN_TEMP: 화점 최소 온도 (기본: 80도C)
@@ -225,7 +230,10 @@ class IRCamera(FrameSource):
         # 설정 로드
         self.fps = cfg['FPS']      # 목표 FPS (하드웨어 한계: 9)
         self.size = cfg['RES']     # 출력 해상도 [width, height]
-        self.sleep = cfg['SLEEP']  # 루프당 최소 슬립 시간
+        # 발행 속도 상한 (0 = 장치 속도). 루프는 cam.capture()의 프레임 도착에만 맞춰 돈다
+        self.limiter = RateLimiter(cfg.get('MAX_FPS', 0))
+        self.stats = SourceStats("IRCam")
+        self.last_frame_time = None  # 현재 프레임 획득 시각 (time.monotonic)
 
         # 출력 버퍼 참조 저장
         self.d_buffer = d_buffer      # 컬러맵 이미지 버퍼
@@ -238,7 +246,8 @@ class IRCamera(FrameSource):
         self.fire_thr = cfg.get('FIRE_THR', 20)  # 보정 온도 임계값
         self.fire_raw_thr = cfg.get('FIRE_RAW_THR', 5)  # raw 온도 임계값
         self.cur_det = False  # 현재 프레임 탐지 결과
-        self.hotspots = []    # 현재 프레임의 hotspot 리스트
+        self.hotspots = hotspot_records(None)    # 현재 프레임의 hotspot (HOTSPOT_DTYPE 배열)
+        self.last_meta = None  # 뷰 변환 메타데이터 (회전/반전 설정 시)
         
         # 최고 온도 정보 (매 프레임 업데이트)
         self.max_temp_info = None
@@ -319,7 +328,7 @@ class IRCamera(FrameSource):
         처리 순서:
             1. RAW16 데이터 캡처 (libuvc)
             2. 정규화 및 컬러맵 적용 (PLASMA)
-            3. 방향 조정 (회전/반전) - 런타임 키보드 제어
+            3. 방향 (회전/반전) - 프레임에 적용하지 않고 뷰 변환(meta)으로 전달
             4. 화점 탐지 (옵션)
             5. 탐지 결과 시각화 (박스 그리기)
             6. 출력 해상도로 리사이즈
@@ -338,9 +347,11 @@ class IRCamera(FrameSource):
         raw16 = self.cam.capture()
         if raw16 is None:
             return None, None, None, None, []
+        # 장치 소스가 도착 시각을 주면 그 값 (큐 대기 포함), 아니면 반환 시각
+        self.last_frame_time = getattr(self.cam, 'frame_time', None) or time.monotonic()
 
-        # 타임스탬프 생성 (밀리초 2자리까지)
-        ts = datetime.now().strftime("%y%m%d%H%M%S%f")[:-4]
+        # 타임스탬프 생성 (밀리초 2자리까지) - 재생 소스는 원본 프레임 ts를 그대로 쓴다
+        ts = getattr(self.cam, 'frame_ts', None) or datetime.now().strftime("%y%m%d%H%M%S%f")[:-4]
         
         # ===== 2. 정규화 및 컬러맵 적용 =====
         # RAW16 → 0~65535 범위로 정규화 (대비 향상)
@@ -350,39 +361,17 @@ class IRCamera(FrameSource):
         # 그레이스케일 → 컬러맵 (PLASMA: 보라-노랑 계열, 열화상에 적합)
         frame = cv2.applyColorMap(gray8, cv2.COLORMAP_PLASMA)
         
-        # ===== 3. 방향 조정 (키보드로 실시간 제어) =====
-        # camera_state는 싱글톤으로 app.py에서 키보드 입력으로 변경됨
-        
-        # 회전 적용 (0, 90, 180, 270도)
-        rotate = camera_state.rotate_ir
-        if rotate == 90:
-            frame = cv2.rotate(frame, cv2.ROTATE_90_CLOCKWISE)
-            raw16 = cv2.rotate(raw16, cv2.ROTATE_90_CLOCKWISE)
-        elif rotate == 180:
-            frame = cv2.rotate(frame, cv2.ROTATE_180)
-            raw16 = cv2.rotate(raw16, cv2.ROTATE_180)
-        elif rotate == 270:
-            frame = cv2.rotate(frame, cv2.ROTATE_90_COUNTERCLOCKWISE)
-            raw16 = cv2.rotate(raw16, cv2.ROTATE_90_COUNTERCLOCKWISE)
-        
-        # 좌우반전 (horizontal flip)
-        if camera_state.flip_h_ir:
-            frame = cv2.flip(frame, 1)  # 1 = 좌우반전
-            raw16 = cv2.flip(raw16, 1)
-        
-        # 상하반전 (vertical flip)
-        if camera_state.flip_v_ir:
-            frame = cv2.flip(frame, 0)  # 0 = 상하반전
-            raw16 = cv2.flip(raw16, 0)
-        
+        # ===== 3. 방향 (회전/반전) =====
+        # 프레임/RAW16은 센서 방향 그대로 두고 뷰 변환만 메타데이터로 전달
+        # (hotspot/최고 온도 좌표도 센서 좌표, 융합/표시 단계에서 뷰 변환을 합성)
+
         # ===== 4. 최고 온도 지점 추출 =====
         self.max_temp_info = self._get_max_temp_info(raw16)
         
         # ===== 5. 화점 탐지 =====
-        # 방향 조정이 완료된 raw16으로 탐지 수행
-        # (좌표가 최종 출력 이미지와 일치하도록)
+        # 센서 방향 raw16으로 탐지 (좌표는 같은 방향의 컬러맵 프레임과 일치)
         datas = None
-        self.hotspots = []
+        self.hotspots = hotspot_records(None)
         if self.fire_detection_enabled:
             self.cur_det, datas, self.hotspots = detect_fire(
                 raw16, self.fire_min_temp, 
@@ -410,8 +399,15 @@ class IRCamera(FrameSource):
         
         # ===== 7. 출력 해상도로 리사이즈 =====
         # config의 RES 설정에 맞춰 리사이즈
-        frame = cv2.resize(frame, (self.size[0], self.size[1]), interpolation=cv2.INTER_AREA)
-        
+        # 이미 표시 방향인 소스(세션 재생)는 세로 프레임이면 RES도 가로/세로를 바꾼다
+        out_size = (self.size[0], self.size[1])
+        oriented = getattr(self.cam, 'oriented', False)
+        if oriented and (raw16.shape[0] > raw16.shape[1]) != (out_size[1] > out_size[0]):
+            out_size = (out_size[1], out_size[0])
+        frame = cv2.resize(frame, out_size, interpolation=cv2.INTER_AREA)
+        view = None if oriented else frame_view(camera_state, 'ir', frame)
+        self.last_meta = {'view': view} if view is not None else None
+
         # hotspots 정보 포함하여 반환
         return raw16, frame, ts, self.max_temp_info, self.hotspots
 
@@ -426,33 +422,37 @@ class IRCamera(FrameSource):
         frame_count = 0
         while not self.stop_event.is_set():
             try:
-                s_time = time.time()  # 루프 시작 시간
+                s_time = time.monotonic()
 
-                # 프레임 캡처
+                # 프레임 캡처 (cam.capture()가 다음 프레임까지 블로킹)
                 raw16, frame, ts, max_temp_info, hotspots = self.capture()
                 
-                # 캡처 실패 시 스킵
+                # 캡처 실패 시 스킵 (즉시 실패일 때만 잠깐 쉰다)
                 if frame is None:
-                    dyn_sleep(s_time, self.sleep)
+                    remaining = FAIL_BACKOFF - (time.monotonic() - s_time)
+                    if remaining > 0:
+                        self.stop_event.wait(remaining)
                     continue
 
                 # 중복 프레임 스킵 (같은 타임스탬프면 새 프레임 아님)
                 if self.last_ts == ts:
-                    dyn_sleep(s_time, self.sleep)
+                    continue
+                if not self.limiter.admit(self.last_frame_time):
+                    self.stats.drop()
                     continue
 
-                # 버퍼에 데이터 저장 (tuple: (data, timestamp, max_temp_info, hotspots))
-                self.d16_buffer.write((raw16, ts, max_temp_info, hotspots))  # RAW16 + 최고온도 + hotspots
-                self.d_buffer.write((frame, ts, max_temp_info, hotspots))    # 컬러맵 + 최고온도 + hotspots
+                # 버퍼에 데이터 저장 (tuple: (data, timestamp, max_temp_info, hotspots[, meta]))
+                # 회전/반전이 설정되어 있으면 meta['view']로 뷰 변환 전달
+                tail = (self.last_meta,) if self.last_meta else ()
+                self.d16_buffer.write((raw16, ts, max_temp_info, hotspots) + tail, t_cap=self.last_frame_time)  # RAW16 + 최고온도 + hotspots
+                self.d_buffer.write((frame, ts, max_temp_info, hotspots) + tail, t_cap=self.last_frame_time)    # 컬러맵 + 최고온도 + hotspots
+                self.stats.record(self.last_frame_time, self.limiter.cadence)
                 self.last_ts = ts
 
                 # 프레임 카운트 및 로그
                 frame_count += 1
                 if frame_count % 100 == 0:
                     logger.info("[IRCam] Captured %d frames", frame_count)
-
-                # FPS 유지를 위한 동적 슬립
-                dyn_sleep(s_time, self.sleep)
                 
             except Exception as e:
                 import traceback
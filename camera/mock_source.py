@@ -3,27 +3,34 @@ import numpy as np
 import threading
 from datetime import datetime
 
-from core.util import dyn_sleep
+from core.pacing import RateLimiter, SourceStats
 from camera.frame_source import FrameSource
 
 
 class MockRGBCamera(FrameSource):
     """
     고정/변형 패턴을 생성하는 RGB 가짜 카메라.
-    테스트 및 데모용.
+    테스트 및 데모용. scene(SyntheticScene)이 주어지면 미리 렌더링한 합성 장면을 재생한다.
     """
 
-    def __init__(self, cfg, d_buffer, color=(0, 255, 0), frame_interval=None):
+    def __init__(self, cfg, d_buffer, color=(0, 255, 0), frame_interval=None, scene=None):
         super().__init__("MockRGBCamera")
         self.size = cfg['RES']
         self.sleep = frame_interval if frame_interval is not None else cfg['SLEEP']
+        # 마감 시각 기준 페이싱 (생성 시간이 슬립에 더해지지 않음)
+        self.limiter = RateLimiter(interval=self.sleep)
+        self.stats = SourceStats("MockRGBCamera")
         self.d_buffer = d_buffer
         self.last_ts = None
         self.color = color
         self.counter = 0
         self.stop_event = threading.Event()
+        self.scene = scene
+        self._frames = scene.render_rgb(self.size) if scene is not None else None
 
     def _gen_frame(self):
+        if self._frames is not None:
+            return self._frames[self.scene.index()]
         w, h = self.size
         frame = np.zeros((h, w, 3), dtype=np.uint8)
         frame[:] = self.color
@@ -46,14 +53,14 @@ class MockRGBCamera(FrameSource):
 
     def _loop(self):
         while not self.stop_event.is_set():
-            s_time = time.time()
+            self.limiter.wait(self.stop_event)
+            s_time = time.monotonic()
             frame, ts = self.capture()
             if self.last_ts == ts:
-                dyn_sleep(s_time, self.sleep)
                 continue
-            self.d_buffer.write((frame, ts))
+            self.d_buffer.write((frame, ts), t_cap=s_time)
+            self.stats.record(s_time)
             self.last_ts = ts
-            dyn_sleep(s_time, self.sleep)
 
     def stop(self):
         self.stop_event.set()
@@ -65,18 +72,25 @@ class MockRGBCamera(FrameSource):
 class MockThermalCamera:
     """
     ThermalCamera 인터페이스 호환 가짜 소스 (IRCamera에서 사용).
+    scene이 주어지면 합성 장면 RAW16을 재생한다 (장면 좌표가 이미 표시 방향이므로 oriented).
     """
 
-    def __init__(self, size=(160, 120), frame_interval=None):
+    def __init__(self, size=(160, 120), frame_interval=None, scene=None):
         self.width, self.height = size
         self.sleep = frame_interval
+        self.limiter = RateLimiter(interval=frame_interval)
         self.counter = 0
+        self.scene = scene
+        self.oriented = scene is not None
+        self._frames = scene.render_ir((self.width, self.height)) if scene is not None else None
+        self._pattern = np.indices((self.height, self.width)).sum(axis=0)
 
     def capture(self):
-        pattern = np.indices((self.height, self.width)).sum(axis=0)
-        pattern = (pattern + (self.counter * 50)) % 65535
-        frame = pattern.astype(np.uint16)
+        # 장치처럼 다음 프레임 시점까지 블로킹한 뒤 생성
+        self.limiter.wait()
+        if self._frames is not None:
+            frame = self._frames[self.scene.index()]
+        else:
+            frame = ((self._pattern + (self.counter * 50)) % 65535).astype(np.uint16)
         self.counter += 1
-        if self.sleep:
-            time.sleep(self.sleep)
         return frame
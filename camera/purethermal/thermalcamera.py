@@ -9,8 +9,9 @@ import fcntl
 import numpy as np
 import subprocess
 import logging
+import time
 
-from queue import Queue
+from queue import Empty, Queue
 from threading import Thread, Event
 
 # USB reset ioctl
@@ -44,6 +45,7 @@ class ThermalCamera:
         
         self.capture_thread = None
         self.stop_event = Event()
+        self.frame_time = None  # 마지막 프레임 도착 시각 (time.monotonic, 프레임 나이 측정용)
         self.proc = None
         
         self.width = 160
@@ -89,7 +91,6 @@ class ThermalCamera:
             logger.info("[ThermalCam] USB reset: %s", usb_path)
             
             # 장치 재인식 대기
-            import time
             time.sleep(2)
             return True
         except Exception as e:
@@ -153,8 +154,13 @@ class ThermalCamera:
                 
                 if len(data) == frame_size:
                     frame = np.frombuffer(data, dtype=np.uint16).reshape(self.height, self.width)
-                    if not self.q.full():
-                        self.q.put(frame.copy())
+                    # 소비가 늦으면 가장 오래된 프레임을 버려 최신 프레임이 대기하지 않게 한다
+                    if self.q.full():
+                        try:
+                            self.q.get_nowait()
+                        except Empty:
+                            pass
+                    self.q.put((frame.copy(), time.monotonic()))
                 elif len(data) == 0:
                     break
                     
@@ -182,7 +188,8 @@ class ThermalCamera:
             self.capture_thread.start()
         
         try:
-            return self.q.get(timeout=1)
+            frame, self.frame_time = self.q.get(timeout=1)
+            return frame
         except:
             return None
     
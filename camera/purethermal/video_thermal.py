@@ -1,7 +1,9 @@
 import cv2
 import numpy as np
 import logging
-import time
+
+from core.pacing import RateLimiter
+from camera.video_reader import PrefetchReader
 
 
 logger = logging.getLogger(__name__)
@@ -11,9 +13,10 @@ class VideoThermalCamera:
     """
     ThermalCamera 호환 비디오 소스.
     8/16bit 영상 파일을 불러와 RAW16 프레임으로 변환한다.
+    디코드와 RAW16 변환은 PrefetchReader 스레드에서 미리 수행한다.
     """
 
-    def __init__(self, path, loop=True, target_size=(160, 120), frame_interval=None):
+    def __init__(self, path, loop=True, target_size=(160, 120), frame_interval=None, hw_decode='auto', prefetch=4):
         if isinstance(path, str):
             paths = [path]
         elif isinstance(path, (list, tuple)):
@@ -26,54 +29,34 @@ class VideoThermalCamera:
 
         self.paths = paths
         self.loop_playlist = loop
-        self.path_idx = 0
+        self.cap = None
         self.width, self.height = target_size
         self.frame_interval = frame_interval
-        self.cap = None
-        self._open_current()
-
-    def _open_current(self):
-        if self.cap:
-            self.cap.release()
-        current = self.paths[self.path_idx]
-        self.cap = cv2.VideoCapture(current)
-        if not self.cap.isOpened():
-            raise RuntimeError(f"VideoThermalCamera - cannot open {current}")
-
-    def _advance(self):
-        self.path_idx += 1
-        if self.path_idx >= len(self.paths):
-            if self.loop_playlist:
-                self.path_idx = 0
-            else:
-                return False
-        self._open_current()
-        return True
+        self.limiter = RateLimiter(interval=frame_interval)
+        self.cap = PrefetchReader(paths, loop=loop, depth=prefetch, hw_decode=hw_decode,
+                                  transform=self._to_raw16, name="VideoThermalCamera")
 
-    def _read_frame(self):
-        ret, frame = self.cap.read()
-        if ret:
-            return frame
-        if self._advance():
-            ret, frame = self.cap.read()
-            if ret:
-                return frame
-        return None
-
-    def capture(self):
-        frame = self._read_frame()
-        if frame is None:
-            return None
+    @property
+    def path_idx(self):
+        return self.cap.path_idx if self.cap else 0
 
+    def _to_raw16(self, frame):
         if frame.ndim == 3:
             gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
         else:
             gray = frame
 
         gray = cv2.resize(gray, (self.width, self.height), interpolation=cv2.INTER_AREA)
-        raw16 = cv2.normalize(gray, None, 0, 65535, cv2.NORM_MINMAX).astype(np.uint16)
-        if self.frame_interval:
-            time.sleep(self.frame_interval)
+        return cv2.normalize(gray, None, 0, 65535, cv2.NORM_MINMAX).astype(np.uint16)
+
+    def capture(self):
+        if self.cap is None:
+            return None
+        # 장치처럼 다음 프레임 시점까지 블로킹 (읽은 뒤 슬립하지 않는다)
+        self.limiter.wait()
+        ok, raw16 = self.cap.read()
+        if not ok:
+            return None
         return raw16
 
     def stop(self):
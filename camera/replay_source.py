@@ -0,0 +1,285 @@
+"""
+capture.py 세션 재생 입력 (INPUT.MODE: replay)
+
+세션 폴더(metadata.csv + rgb.mp4 + ir16/*.npy)의 RGB 프레임과 RAW16 IR 프레임을
+원래 타임스탬프 간격과 RGB/IR 상대 시차 그대로 버퍼에 다시 넣는다.
+IR은 저장된 RAW16을 IRCamera에 그대로 넘기므로 온도/hotspot/융합을 실제 데이터로 재현한다.
+
+- SPEED: 재생 배속 (1.0 = 실시간, 0 = 대기 없이 최대 속도)
+- 두 스트림은 하나의 ReplaySession 시계를 공유하고, 배속과 무관하게 세션 시각 순서대로
+  번갈아 내보낸다 (최대 속도에서도 RGB/IR 순서가 섞이지 않는다)
+- 타임스탬프는 세션 원본 ts. LOOP 반복 시에는 세션 길이만큼 밀어 단조 증가를 유지한다
+- 세션 프레임은 capture.py가 이미 표시 방향으로 저장했으므로 뷰 변환(meta)을 붙이지 않는다
+
+버퍼는 최신 프레임만 유지하므로 소비 단계보다 빠르게 재생하면 중간 프레임은 건너뛰어진다.
+"""
+
+import os
+import time
+import logging
+import threading
+
+from core.pacing import SourceStats
+from core.util import epoch_ms_to_ts, ts_to_epoch_ms
+from camera.frame_source import FrameSource
+from utils.capture_loader import CaptureLoader
+
+logger = logging.getLogger(__name__)
+
+# 대기 중에도 정지 요청을 확인하는 최대 간격 (초)
+POLL_SEC = 0.2
+
+_SESSIONS = {}
+_SESSIONS_LOCK = threading.Lock()
+
+
+class ReplaySession:
+    """
+    세션 인덱스 + RGB/IR 공용 재생 시계
+
+    wait(stream, t_ms)는 stream의 다음 프레임(세션 시각 t_ms)을 내보내도 될 때 True.
+    다른 스트림의 대기 중인 프레임이 더 이르면 그쪽이 먼저 나가고, SPEED > 0이면
+    첫 프레임 기준 벽시계 (t_ms - t0) / SPEED 시점까지 기다린다.
+    """
+
+    def __init__(self, root_dir, speed=1.0, loop=False):
+        self.loader = CaptureLoader(root_dir)
+        self.root_dir = root_dir
+        self.speed = max(0.0, float(speed or 0.0))
+        self.loop = bool(loop)
+
+        times = [ts_to_epoch_ms(row["rgb_ts"]) for row in self.loader.meta_rows]
+        times += [ts_to_epoch_ms(ts) for ts, _ in self.loader.ir_rows()]
+        times = sorted(t for t in times if t is not None)
+        if not times:
+            raise ValueError(f"Replay session has no frames: {root_dir}")
+        self.t0 = times[0]
+        # 반복 시 다음 회차 오프셋 = 세션 길이 + 평균 프레임 간격
+        gap = (times[-1] - times[0]) / max(1, len(times) - 1) if len(times) > 1 else 100.0
+        self.span_ms = times[-1] - times[0] + max(gap, 10.0)
+
+        self._cond = threading.Condition()
+        self._pending = {}      # stream → 다음 프레임 세션 시각 (끝난 스트림은 inf)
+        self._wall0 = None
+
+    @property
+    def unthrottled(self):
+        return self.speed <= 0
+
+    def register(self, stream):
+        """스트림 등록 (첫 wait 전까지는 다른 스트림이 시작 시각을 넘어가지 않는다)"""
+        with self._cond:
+            self._pending[stream] = self.t0
+
+    def registered(self, stream):
+        with self._cond:
+            return stream in self._pending
+
+    def finish(self, stream):
+        with self._cond:
+            self._pending[stream] = float('inf')
+            self._cond.notify_all()
+
+    def wait(self, stream, t_ms, stop_event=None, timeout=POLL_SEC):
+        """
+        stream의 t_ms 프레임 차례까지 대기 (최대 timeout초)
+
+        Returns:
+            bool: 내보내도 되면 True, 시간 초과/정지 요청이면 False (같은 프레임으로 다시 호출)
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._pending[stream] = t_ms
+            self._cond.notify_all()
+            while t_ms > min(self._pending.values()):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or (stop_event is not None and stop_event.is_set()):
+                    return False
+                self._cond.wait(min(remaining, 0.05))
+            if self._wall0 is None:
+                self._wall0 = time.monotonic()
+        if self.unthrottled:
+            return True
+        delay = self._wall0 + (t_ms - self.t0) / 1000.0 / self.speed - time.monotonic()
+        if delay > 0:
+            if delay > timeout:
+                time.sleep(timeout)
+                return False
+            time.sleep(delay)
+        return True
+
+    def timestamp(self, ts, loop_idx):
+        """세션 ts → (세션 시각 ms, 출력 ts). 반복 회차만큼 세션 길이를 더한다"""
+        t = ts_to_epoch_ms(ts)
+        if t is None:
+            return None, None
+        if loop_idx:
+            t += loop_idx * self.span_ms
+            return t, epoch_ms_to_ts(t)
+        return t, ts
+
+
+def replay_session(mode_cfg, stream=None):
+    """
+    INPUT.RGB/IR 설정 → 공유 ReplaySession (같은 SESSION 경로면 같은 객체)
+
+    RGB/IR 소스가 같은 시계를 쓰도록 캐시하되, 캐시된 세션에 stream이 이미 등록되어 있거나
+    (소스 재시작) SPEED/LOOP가 다르면 새 세션(처음부터, 새 벽시계 기준)으로 교체한다.
+    """
+    root = mode_cfg.get('SESSION')
+    if not root:
+        raise ValueError("Replay input mode requires SESSION (capture.py output directory)")
+    key = os.path.abspath(root)
+    speed = mode_cfg.get('SPEED', 1.0)
+    speed = max(0.0, float(1.0 if speed is None else speed))
+    loop = bool(mode_cfg.get('LOOP', False))
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.get(key)
+        if session is not None and (session.speed != speed or session.loop != loop
+                                    or (stream is not None and session.registered(stream))):
+            session = None
+        if session is None:
+            session = ReplaySession(root, speed=speed, loop=loop)
+            _SESSIONS[key] = session
+            logger.info("[Replay] session %s (speed=%s, loop=%s, %d rows)", root,
+                        "max" if session.unthrottled else f"{session.speed:g}x", session.loop,
+                        len(session.loader.meta_rows))
+        return session
+
+
+def release_replay_sessions():
+    """캐시된 재생 세션을 모두 버린다 (다음 소스 생성 시 새 세션)"""
+    with _SESSIONS_LOCK:
+        _SESSIONS.clear()
+
+
+class _ReplayStream:
+    """세션 스트림 순회 공통부: 다음 프레임을 꺼내 두고 시계 차례가 오면 넘긴다"""
+
+    stream = None
+
+    def __init__(self, session):
+        self.session = session
+        self.loop_idx = 0
+        self._iter = None
+        self._next = None       # (t_ms, ts, frame)
+        self.done = False
+        session.register(self.stream)
+
+    def _frames(self):
+        raise NotImplementedError
+
+    def _peek(self):
+        while self._next is None and not self.done:
+            if self._iter is None:
+                self._iter = self._frames()
+            item = next(self._iter, None)
+            if item is None:
+                self._iter = None
+                if not self.session.loop:
+                    self.done = True
+                    self.session.finish(self.stream)
+                    logger.info("[Replay] %s stream finished", self.stream)
+                    return None
+                self.loop_idx += 1
+                continue
+            t, ts = self.session.timestamp(item[0], self.loop_idx)
+            if t is not None:
+                self._next = (t, ts, item[1])
+        return self._next
+
+    def next_frame(self, stop_event=None):
+        """다음 (frame, ts). 아직 차례가 아니거나 끝났으면 (None, None)"""
+        item = self._peek()
+        if item is None or not self.session.wait(self.stream, item[0], stop_event):
+            return None, None
+        self._next = None
+        return item[2], item[1]
+
+
+class ReplayRGBCamera(FrameSource):
+    """세션 rgb.mp4 재생 RGB 소스 (버퍼 항목: (frame, ts))"""
+
+    def __init__(self, session, d_buffer):
+        super().__init__("ReplayRGBCamera")
+        self.d_buffer = d_buffer
+        self.stop_event = threading.Event()
+        self.last_ts = None
+        self.count = 0
+        self.stats = SourceStats("ReplayRGBCamera")
+        self._stream = _RGBStream(session)
+
+    def capture(self):
+        return self._stream.next_frame(self.stop_event)
+
+    def start(self):
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._loop, daemon=True, name="ReplayRGB")
+        self.thread.start()
+        return self.thread
+
+    def _loop(self):
+        while not self.stop_event.is_set():
+            frame, ts = self.capture()
+            if frame is None:
+                if self._stream.done:
+                    self.stop_event.wait(POLL_SEC)
+                continue
+            s_time = time.monotonic()
+            self.d_buffer.write((frame, ts), t_cap=s_time)
+            self.stats.record(s_time)
+            self.last_ts = ts
+            self.count += 1
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=2.0)
+        self.thread = None
+        self._stream.session.finish(self._stream.stream)
+
+
+class ReplayThermalCamera:
+    """
+    ThermalCamera 호환 RAW16 재생 소스 (IRCamera cam_impl)
+
+    capture()는 차례가 된 RAW16을 반환하고 frame_ts에 그 프레임의 ts를 남긴다.
+    oriented=True: 세션 RAW16은 이미 표시 방향이므로 IRCamera가 뷰 변환을 붙이지 않는다.
+    """
+
+    oriented = True
+
+    def __init__(self, session):
+        self.frame_ts = None
+        self._stop = threading.Event()
+        self._stream = _IRStream(session)
+
+    def capture(self):
+        raw16, ts = self._stream.next_frame(self._stop)
+        if raw16 is None:
+            if self._stream.done:
+                self._stop.wait(POLL_SEC)
+            return None
+        self.frame_ts = ts
+        return raw16
+
+    def stop(self):
+        self.cleanup()
+
+    def cleanup(self):
+        self._stop.set()
+        self._stream.session.finish(self._stream.stream)
+
+
+class _RGBStream(_ReplayStream):
+    stream = 'rgb'
+
+    def _frames(self):
+        return self.session.loader.rgb_frames()
+
+
+class _IRStream(_ReplayStream):
+    stream = 'ir'
+
+    def _frames(self):
+        return self.session.loader.ir_raw_frames()
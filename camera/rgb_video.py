@@ -1,15 +1,23 @@
-import cv2
 import time
 import threading
 from datetime import datetime
 
-from core.util import dyn_sleep
+from core.pacing import RateLimiter, SourceStats
 from core.state import camera_state
+from core.view_transform import frame_view
 from camera.frame_source import FrameSource
+from camera.video_reader import PrefetchReader
 
 
 class VideoRGBCamera(FrameSource):
-    def __init__(self, cfg, d_buffer, paths, loop=True, frame_interval=None):
+    """
+    영상 파일 RGB 소스
+
+    디코드는 PrefetchReader 스레드가 앞서 수행하고 (prefetch장 큐, 다음 파일 미리 열기),
+    소스 루프는 준비된 프레임을 꺼내 버퍼에 쓰기만 한다.
+    """
+
+    def __init__(self, cfg, d_buffer, paths, loop=True, frame_interval=None, hw_decode='auto', prefetch=4):
         super().__init__("VideoRGBCamera")
         if not paths:
             raise ValueError("VideoRGBCamera requires at least one path")
@@ -18,54 +26,34 @@ class VideoRGBCamera(FrameSource):
 
         self.paths = paths
         self.loop_playlist = loop
-        self.path_idx = 0
-        self.cap = None
-        self._open_current()
+        self.cap = PrefetchReader(paths, loop=loop, depth=prefetch, hw_decode=hw_decode, name="VideoRGBCamera")
 
         self.loop_file = True
         self.last_ts = None
+        self.last_meta = None
         self.sleep = frame_interval if frame_interval is not None else cfg['SLEEP']
+        # 마감 시각 기준 페이싱: 큐에서 꺼내는 시간이 슬립에 더해지지 않는다
+        self.limiter = RateLimiter(interval=self.sleep)
+        self.stats = SourceStats("VideoRGBCamera")
         self.d_buffer = d_buffer
         self.stop_event = threading.Event()
 
-    def _open_current(self):
-        if self.cap:
-            self.cap.release()
-        current_path = self.paths[self.path_idx]
-        self.cap = cv2.VideoCapture(current_path)
-        if not self.cap.isOpened():
-            raise RuntimeError(f"VideoRGBCamera - cannot open {current_path}")
+    @staticmethod
+    def _meta(frame):
+        """회전/반전은 프레임 대신 뷰 변환으로 전달"""
+        view = frame_view(camera_state, 'rgb', frame)
+        return {'view': view} if view is not None else None
+
+    @property
+    def path_idx(self):
+        return self.cap.path_idx
 
     def capture(self):
         ret, frame = self.cap.read()
         if not ret:
-            if self.cap and self.cap.get(cv2.CAP_PROP_POS_FRAMES) > 0:
-                self.path_idx += 1
-                if self.path_idx >= len(self.paths):
-                    if self.loop_playlist:
-                        self.path_idx = 0
-                    else:
-                        return None, None
-                self._open_current()
-                ret, frame = self.cap.read()
-                if not ret:
-                    return None, None
-            else:
-                return None, None
-
-        rotate = camera_state.rotate_rgb
-        if rotate == 90:
-            frame = cv2.rotate(frame, cv2.ROTATE_90_CLOCKWISE)
-        elif rotate == 180:
-            frame = cv2.rotate(frame, cv2.ROTATE_180)
-        elif rotate == 270:
-            frame = cv2.rotate(frame, cv2.ROTATE_90_COUNTERCLOCKWISE)
-
-        if camera_state.flip_h_rgb:
-            frame = cv2.flip(frame, 1)
-        if camera_state.flip_v_rgb:
-            frame = cv2.flip(frame, 0)
+            return None, None
 
+        self.last_meta = self._meta(frame)
         ts = datetime.now().strftime("%y%m%d%H%M%S%f")[:-4]
         return frame, ts
 
@@ -77,21 +65,25 @@ class VideoRGBCamera(FrameSource):
 
     def _loop(self):
         while not self.stop_event.is_set():
-            s_time = time.time()
+            self.limiter.wait(self.stop_event)
+            s_time = time.monotonic()
             frame, ts = self.capture()
             if frame is None:
-                dyn_sleep(s_time, self.sleep)
+                if not self.cap.isOpened():
+                    # 재생 목록 끝 (loop=False)
+                    self.stop_event.wait(0.1)
                 continue
             if self.last_ts == ts:
-                dyn_sleep(s_time, self.sleep)
                 continue
 
-            self.d_buffer.write((frame, ts))
+            meta = self.last_meta
+            self.d_buffer.write((frame, ts, meta) if meta else (frame, ts), t_cap=s_time)
+            self.stats.record(s_time)
             self.last_ts = ts
-            dyn_sleep(s_time, self.sleep)
 
     def stop(self):
         self.stop_event.set()
         if self.thread and self.thread.is_alive():
             self.thread.join(timeout=2.0)
         self.thread = None
+        self.cap.release()
@@ -5,18 +5,45 @@ import subprocess
 import threading
 from datetime import datetime
 
-from core.util import dyn_sleep
+from core.pacing import RateLimiter, SourceStats
 from core.state import camera_state
+from core.view_transform import frame_view
 from camera.frame_source import FrameSource
 from camera.device_selector import CameraDeviceSelector
+from camera.gst_capture import Gst, GstCapture, converter_elements, opencv_pipeline
 
 
 def _log(msg):
     print(f"[RGBCamera] {msg}")
 
 
-def _open_capture(dev_path, size, fps):
-    """YUYV GStreamer 우선, 실패 시 V4L2(YUYV→NV12)."""
+# 읽기 실패 시 재시도 간격 (초) - 장치가 없거나 끊겼을 때 빈 루프 방지
+FAIL_BACKOFF = 0.05
+
+
+def _frame_time(cap, read_done):
+    """
+    프레임 획득 시각 (time.monotonic 기준)
+
+    V4L2 백엔드는 POS_MSEC로 드라이버 버퍼 타임스탬프(CLOCK_MONOTONIC)를 주므로
+    드라이버 큐 대기까지 포함한 나이를 잴 수 있다. 그 외에는 read() 반환 시각.
+    """
+    try:
+        if cap.getBackendName() == "V4L2":
+            age = read_done - cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+            if 0.0 <= age < 2.0:
+                return read_done - age
+    except Exception:
+        pass
+    return read_done
+
+
+def _open_capture(dev_path, size, fps, hw_convert='auto', model_size=None):
+    """
+    GStreamer 우선 (G2D 하드웨어 색변환 → videoconvert), 실패 시 V4L2(YUYV→NV12).
+
+    gi가 있으면 GstCapture로 열어 model_size 분기(모델 입력 RGB)를 함께 받는다.
+    """
     _log(f"Opening video device: {dev_path}")
     w, h = size
     dev_num = None
@@ -26,15 +53,20 @@ def _open_capture(dev_path, size, fps):
     except Exception:
         dev_num = None
 
-    # GStreamer 파이프라인(YUY2)
-    gst_pipeline = (
-        f"v4l2src device={dev_path} io-mode=2 ! "
-        f"video/x-raw,format=YUY2,width={w},height={h} ! "
-        "videoconvert ! video/x-raw,format=BGR ! appsink"
-    )
-    cap = cv2.VideoCapture(gst_pipeline, cv2.CAP_GSTREAMER)
-    if cap.isOpened():
-        return cap
+    for converter in converter_elements(hw_convert):
+        if Gst is not None:
+            try:
+                cap = GstCapture(dev_path, size, fps, converter=converter, model_size=model_size)
+                _log(f"GStreamer capture via {converter}"
+                     + (f" (+model branch {model_size[0]}x{model_size[1]})" if model_size else ""))
+                return cap
+            except Exception as e:
+                _log(f"GstCapture ({converter}) failed: {e}")
+        cap = cv2.VideoCapture(opencv_pipeline(dev_path, size, fps, converter), cv2.CAP_GSTREAMER)
+        if cap.isOpened():
+            _log(f"GStreamer capture via {converter}")
+            return cap
+        cap.release()
     _log("GStreamer failed, trying V4L2...")
 
     def _try_fourcc(fourcc):
@@ -76,8 +108,15 @@ class RGBCamera(FrameSource):
 
         self.fps = cfg['FPS']
         self.size = cfg['RES']
-        self.sleep = cfg['SLEEP']
+        # 발행 속도 상한 (0 = 장치 속도). 루프는 장치 프레임 도착에만 맞춰 돈다
+        self.limiter = RateLimiter(cfg.get('MAX_FPS', 0))
+        self.stats = SourceStats("RGBCamera", log=print)
+        self.last_frame_time = None
         self.device_override = cfg.get('DEVICE_OVERRIDE')
+        self.hw_convert = cfg.get('HW_CONVERT', 'auto')
+        model_size = cfg.get('MODEL_SIZE')
+        self.model_size = (int(model_size[0]), int(model_size[1])) if model_size else None
+        self.last_meta = None
         self._auto_selector = CameraDeviceSelector(
             target_size=cfg.get('RES', (640, 480)),
             min_width=max(320, cfg.get('RES', [0])[0]),
@@ -145,7 +184,7 @@ class RGBCamera(FrameSource):
             time.sleep(2.0)
         except Exception as e:
             _log(f"udevadm trigger failed: {e}")
-        return _open_capture(dev_path, self.size, self.fps)
+        return _open_capture(dev_path, self.size, self.fps, self.hw_convert, self.model_size)
 
     def _print_cap_info(self, device, frame):
         req_w, req_h = self.size
@@ -180,7 +219,7 @@ class RGBCamera(FrameSource):
         for candidate in candidates:
             dev_path = self._normalize_device(candidate)
             tried.append(dev_path)
-            self.cap = _open_capture(dev_path, self.size, self.fps)
+            self.cap = _open_capture(dev_path, self.size, self.fps, self.hw_convert, self.model_size)
             if not self.cap.isOpened():
                 self.cap = self._retry_with_udev(dev_path)
             if self.cap.isOpened():
@@ -202,6 +241,7 @@ class RGBCamera(FrameSource):
     
     def capture(self):
         ret, frame = self.cap.read() if self.cap else (False, None)
+        self.last_frame_time = _frame_time(self.cap, time.monotonic()) if ret else None
         if not ret or frame is None:
             if not hasattr(self, '_cap_fail_count'):
                 self._cap_fail_count = 0
@@ -219,19 +259,16 @@ class RGBCamera(FrameSource):
         elif frame.shape[2] != 3:
             return None, None
         
-        rotate = camera_state.rotate_rgb
-        if rotate == 90:
-            frame = cv2.rotate(frame, cv2.ROTATE_90_CLOCKWISE)
-        elif rotate == 180:
-            frame = cv2.rotate(frame, cv2.ROTATE_180)
-        elif rotate == 270:
-            frame = cv2.rotate(frame, cv2.ROTATE_90_COUNTERCLOCKWISE)
-        
-        if camera_state.flip_h_rgb:
-            frame = cv2.flip(frame, 1)
-        if camera_state.flip_v_rgb:
-            frame = cv2.flip(frame, 0)
-        
+        # 회전/반전은 프레임에 적용하지 않고 뷰 변환으로 전달 (검출기/표시 단계에서 합성)
+        meta = {}
+        view = frame_view(camera_state, 'rgb', frame)
+        if view is not None:
+            meta['view'] = view
+        model_rgb = getattr(self.cap, 'model_frame', None)
+        if model_rgb is not None:
+            meta['model_rgb'] = model_rgb
+        self.last_meta = meta or None
+
         ts = datetime.now().strftime("%y%m%d%H%M%S%f")[:-4]
         return frame, ts
 
@@ -244,21 +281,30 @@ class RGBCamera(FrameSource):
     def _loop(self):
         frame_count = 0
         while not self.stop_event.is_set():
-            s_time = time.time()
-
+            # cap.read()가 다음 프레임까지 블로킹하므로 별도 슬립 없이 바로 발행
+            s_time = time.monotonic()
             frame, ts = self.capture()
             if frame is None:
-                dyn_sleep(s_time, self.sleep); continue
+                # 즉시 실패(장치 없음/끊김)일 때만 잠깐 쉰다
+                remaining = FAIL_BACKOFF - (time.monotonic() - s_time)
+                if remaining > 0:
+                    self.stop_event.wait(remaining)
+                continue
             if self.last_ts == ts:
-                dyn_sleep(s_time, self.sleep); continue
+                continue
+            if not self.limiter.admit(self.last_frame_time):
+                self.stats.drop()
+                continue
 
-            self.d_buffer.write((frame, ts))
+            # 뷰 변환/모델 분기 프레임이 있으면 (frame, ts, meta)로 전달
+            meta = self.last_meta
+            self.d_buffer.write((frame, ts, meta) if meta else (frame, ts), t_cap=self.last_frame_time)
+            self.stats.record(self.last_frame_time, self.limiter.cadence)
             frame_count += 1
             if frame_count % 100 == 0:
                 _log(f"Captured {frame_count} frames")
-        
+
             self.last_ts = ts
-            dyn_sleep(s_time, self.sleep)
 
     def stop(self):
         self.stop_event.set()
@@ -4,6 +4,8 @@ from camera.ircam import IRCamera
 from camera.purethermal.video_thermal import VideoThermalCamera
 from camera.purethermal.thermalcamera import ThermalCamera
 from camera.mock_source import MockRGBCamera, MockThermalCamera
+from camera.replay_source import ReplayRGBCamera, ReplayThermalCamera, replay_session
+from camera.synthetic_scene import SyntheticScene
 from camera.device_selector import CameraDeviceSelector
 
 
@@ -27,6 +29,25 @@ def _parse_interval(mode_cfg, key='FRAME_INTERVAL_MS', default=None):
         return default
 
 
+def attach_scene_cfg(input_cfg, rgb_mode_cfg, ir_mode_cfg, ir_res, coord=None):
+    """
+    INPUT.SCENE(ENABLED)을 RGB/IR 입력 설정의 SCENE으로 복사
+
+    두 소스가 같은 장면을 만들도록 IR 해상도와 COORD 파라미터를 함께 넣는다.
+    """
+    scene_cfg = (input_cfg or {}).get('SCENE') if isinstance(input_cfg, dict) else None
+    if not scene_cfg or not scene_cfg.get('ENABLED', False):
+        return
+    scene_cfg = dict(scene_cfg, IR_RES=list(ir_res), COORD=dict(coord or {}))
+    rgb_mode_cfg['SCENE'] = scene_cfg
+    ir_mode_cfg['SCENE'] = scene_cfg
+
+
+def _mock_scene(mode_cfg):
+    scene_cfg = mode_cfg.get('SCENE')
+    return SyntheticScene.from_config(scene_cfg) if scene_cfg else None
+
+
 def create_rgb_source(rgb_cfg, mode_cfg, buffer):
     mode = str(mode_cfg.get('MODE', 'live') or 'live').lower()
     frame_interval = _parse_interval(mode_cfg, default=rgb_cfg.get('SLEEP'))
@@ -35,10 +56,13 @@ def create_rgb_source(rgb_cfg, mode_cfg, buffer):
         if not paths:
             raise ValueError("RGB video mode requires VIDEO_PATH")
         loop = mode_cfg.get('LOOP', True)
-        return VideoRGBCamera(rgb_cfg, buffer, paths, loop=loop, frame_interval=frame_interval)
+        return VideoRGBCamera(rgb_cfg, buffer, paths, loop=loop, frame_interval=frame_interval,
+                              hw_decode=mode_cfg.get('HW_DECODE', 'auto'), prefetch=mode_cfg.get('PREFETCH', 4))
     if mode == 'mock':
         color = tuple(mode_cfg.get('COLOR', (0, 255, 0)))
-        return MockRGBCamera(rgb_cfg, buffer, color=color, frame_interval=frame_interval)
+        return MockRGBCamera(rgb_cfg, buffer, color=color, frame_interval=frame_interval, scene=_mock_scene(mode_cfg))
+    if mode == 'replay':
+        return ReplayRGBCamera(replay_session(mode_cfg, 'rgb'), buffer)
     if mode != 'live':
         raise ValueError(f"Unsupported RGB input mode: {mode}")
 
@@ -58,17 +82,21 @@ def create_rgb_source(rgb_cfg, mode_cfg, buffer):
 def create_ir_source(ir_cfg, mode_cfg, ir_buffer, d16_buffer):
     mode = str(mode_cfg.get('MODE', 'live') or 'live').lower()
     cam_impl = None
-    frame_interval = _parse_interval(mode_cfg)
+    # 합성 IR 소스(video/mock)의 재생 간격. IRCamera 루프는 cam_impl 블로킹에만 맞춰 돈다
+    frame_interval = _parse_interval(mode_cfg, default=ir_cfg.get('SLEEP'))
     if mode == 'video':
         paths = _parse_paths(mode_cfg.get('VIDEO_PATH'))
         if not paths:
             raise ValueError("IR video mode requires VIDEO_PATH")
         loop = mode_cfg.get('LOOP', True)
         target_size = tuple(ir_cfg['RES'])
-        cam_impl = VideoThermalCamera(paths, loop=loop, target_size=target_size, frame_interval=frame_interval)
+        cam_impl = VideoThermalCamera(paths, loop=loop, target_size=target_size, frame_interval=frame_interval,
+                                      hw_decode=mode_cfg.get('HW_DECODE', 'auto'), prefetch=mode_cfg.get('PREFETCH', 4))
     elif mode == 'mock':
         target_size = tuple(ir_cfg['RES'])
-        cam_impl = MockThermalCamera(size=target_size, frame_interval=frame_interval)
+        cam_impl = MockThermalCamera(size=target_size, frame_interval=frame_interval, scene=_mock_scene(mode_cfg))
+    elif mode == 'replay':
+        cam_impl = ReplayThermalCamera(replay_session(mode_cfg, 'ir'))
     elif mode == 'live':
         device = mode_cfg.get('DEVICE', ir_cfg.get('DEVICE'))
         if isinstance(device, str):
@@ -0,0 +1,199 @@
+"""
+합성 화재 장면 생성기 (mock 입력 + INPUT.SCENE)
+
+하드웨어 없이 파이프라인 부하 시험/융합 검증을 하기 위해 공간적으로 일치하는
+RGB 프레임과 RAW16 IR 프레임을 만든다.
+
+- 화점(fire): RGB에는 불꽃 모양 블롭, IR에는 FIRE_TEMP 근처의 고온 가우시안
+- 고온 물체(hot): IR에만 HOT_TEMP 고온, RGB에는 회색 물체 (IR_ONLY 검증용)
+- 위치: 블롭은 IR 정규화 좌표에서 정의하고, RGB 위치/크기는 CoordMapper(IR_RES → RGB RES,
+  COORD 파라미터)로 옮긴다. 융합이 같은 매핑으로 hotspot을 RGB에 놓으므로 화점은 CONFIRMED가 된다
+- 블롭은 FRAMES 주기로 원을 그리며 움직이고 흔들리므로 시퀀스가 끊김 없이 반복된다
+- 프레임은 생성 시 한 번 메모리에 렌더링하고, 재생은 벽시계 기준 인덱스(FPS)로 꺼내기만 한다.
+  RGB/IR 소스가 각자 같은 설정(SEED)으로 만들어도 같은 시각에는 같은 장면 프레임을 낸다
+
+메모리: RGB는 FRAMES × RES (1080p 30장 ≈ 190MB).
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+from core.coord_mapper import CoordMapper
+
+
+KELVIN = 273.15
+
+# 불꽃 색 (BGR): 가장자리 → 중심
+_FLAME_EDGE = np.array([0, 60, 230], dtype=np.float32)
+_FLAME_MID = np.array([0, 160, 255], dtype=np.float32)
+_FLAME_CORE = np.array([190, 245, 255], dtype=np.float32)
+
+# 렌더링 알파 0.5 경계 (I = exp(-2 d²) = 0.25 → d = 0.83), GT bbox 크기에 사용
+_BOX_EXTENT = float(np.sqrt(np.log(4.0) / 2.0))
+
+
+class SyntheticScene:
+    """
+    화점/고온 물체 블롭 트랙과 RGB/RAW16 렌더러
+
+    fires/hot: 블롭 수, fps: 장면 프레임레이트, frames: 반복 주기 프레임 수,
+    ir_size: 블롭 좌표 기준 IR 해상도 (CoordMapper 입력 크기), coord: COORD 파라미터 dict.
+    """
+
+    def __init__(self, fires=2, hot=1, fps=60.0, frames=30, seed=0, ambient=22.0,
+                 fire_temp=450.0, hot_temp=90.0, ir_size=(160, 120), coord=None):
+        self.fps = float(fps) if fps else 60.0
+        self.n_frames = max(1, int(frames))
+        self.ambient = float(ambient)
+        self.ir_size = (int(ir_size[0]), int(ir_size[1]))
+        self.coord = {str(k).lower(): v for k, v in (coord or {}).items()}
+        self.seed = int(seed)
+
+        rng = np.random.default_rng(self.seed)
+        self.blobs = []
+        for kind, count, temp in (('fire', int(fires), float(fire_temp)), ('hot', int(hot), float(hot_temp))):
+            for _ in range(count):
+                self.blobs.append({
+                    'kind': kind,
+                    'center': (rng.uniform(0.15, 0.85), rng.uniform(0.3, 0.8)),
+                    'orbit': rng.uniform(0.01, 0.04),
+                    'phase': rng.uniform(0, 2 * np.pi),
+                    # 반지름: IR 높이 비율
+                    'radius': rng.uniform(0.04, 0.07) if kind == 'fire' else rng.uniform(0.06, 0.09),
+                    'temp': temp * rng.uniform(0.9, 1.1) if kind == 'fire' else temp,
+                })
+
+    @classmethod
+    def from_config(cls, cfg):
+        """INPUT.SCENE dict (대문자 키)로 생성"""
+        cfg = cfg or {}
+        return cls(
+            fires=cfg.get('FIRES', 2),
+            hot=cfg.get('HOT', 1),
+            fps=cfg.get('FPS', 60),
+            frames=cfg.get('FRAMES', 30),
+            seed=cfg.get('SEED', 0),
+            ambient=cfg.get('AMBIENT', 22.0),
+            fire_temp=cfg.get('FIRE_TEMP', 450.0),
+            hot_temp=cfg.get('HOT_TEMP', 90.0),
+            ir_size=tuple(cfg.get('IR_RES') or (160, 120)),
+            coord=cfg.get('COORD'),
+        )
+
+    def index(self, t=None):
+        """벽시계 t(초)의 장면 프레임 인덱스"""
+        t = time.time() if t is None else t
+        return int(t * self.fps) % self.n_frames
+
+    def states(self, i):
+        """
+        프레임 i의 블롭 상태 [(kind, (u, v), radius, temp), ...]
+
+        u, v: IR 정규화 좌표 (0~1), radius: IR 높이 비율. 불꽃은 크기/온도가 흔들린다.
+        """
+        a = 2 * np.pi * (i % self.n_frames) / self.n_frames
+        out = []
+        for b in self.blobs:
+            u = b['center'][0] + b['orbit'] * np.cos(a + b['phase'])
+            v = b['center'][1] + b['orbit'] * np.sin(a + b['phase'])
+            radius, temp = b['radius'], b['temp']
+            if b['kind'] == 'fire':
+                flicker = np.sin(2 * a + 3 * b['phase'])
+                radius *= 1.0 + 0.12 * flicker
+                temp *= 1.0 + 0.03 * flicker
+            out.append((b['kind'], (u, v), radius, temp))
+        return out
+
+    def _mapper(self, rgb_size):
+        return CoordMapper.from_params(self.ir_size, tuple(rgb_size), self.coord)
+
+    def _rgb_blobs(self, i, mapper):
+        """프레임 i의 블롭 RGB 중심/반지름 [(kind, (x, y), (rx, ry)), ...]"""
+        w, h = self.ir_size
+        out = []
+        for kind, (u, v), radius, _ in self.states(i):
+            x, y, r = u * w, v * h, radius * h
+            pts = mapper.ir_to_rgb_many([(x, y), (x - r, y), (x + r, y), (x, y - r), (x, y + r)])
+            rx = abs(pts[2, 0] - pts[1, 0]) / 2
+            ry = abs(pts[4, 1] - pts[3, 1]) / 2
+            if kind == 'fire':
+                ry *= 1.4  # 불꽃은 세로로 길게
+            out.append((kind, (float(pts[0, 0]), float(pts[0, 1])), (rx, ry)))
+        return out
+
+    def fire_boxes(self, i, rgb_size):
+        """프레임 i의 화점 정답 bbox (RGB 픽셀, xyxy)"""
+        boxes = [
+            (x - rx * _BOX_EXTENT, y - ry * _BOX_EXTENT, x + rx * _BOX_EXTENT, y + ry * _BOX_EXTENT)
+            for kind, (x, y), (rx, ry) in self._rgb_blobs(i, self._mapper(rgb_size))
+            if kind == 'fire'
+        ]
+        return np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+
+    def _texture(self, size, channels, seed_offset):
+        """부드러운 저주파 배경 무늬 (-1~1)"""
+        w, h = size
+        rng = np.random.default_rng(self.seed + seed_offset)
+        small = rng.uniform(-1, 1, (max(2, h // 40), max(2, w // 40), channels)).astype(np.float32)
+        tex = cv2.resize(small, (w, h), interpolation=cv2.INTER_CUBIC)
+        return tex.reshape(h, w, channels)
+
+    def render_rgb(self, rgb_size):
+        """RGB(BGR) 시퀀스 [n_frames × (h, w, 3) uint8]"""
+        w, h = int(rgb_size[0]), int(rgb_size[1])
+        grad = np.linspace(90, 60, h, dtype=np.float32)[:, None, None]
+        base = grad + np.array([0, 10, -5], dtype=np.float32) + 12 * self._texture((w, h), 3, 1)
+        base = np.clip(base, 0, 255).astype(np.uint8)
+        mapper = self._mapper((w, h))
+
+        frames = []
+        for i in range(self.n_frames):
+            frame = base.copy()
+            for kind, (cx, cy), (rx, ry) in self._rgb_blobs(i, mapper):
+                if kind == 'fire':
+                    self._draw_flame(frame, cx, cy, rx, ry)
+                else:
+                    p1 = (int(cx - rx), int(cy - ry))
+                    p2 = (int(cx + rx), int(cy + ry))
+                    cv2.rectangle(frame, p1, p2, (95, 95, 100), -1)
+                    cv2.rectangle(frame, p1, p2, (50, 50, 55), 2)
+            frames.append(frame)
+        return frames
+
+    @staticmethod
+    def _draw_flame(frame, cx, cy, rx, ry):
+        h, w = frame.shape[:2]
+        x0, x1 = max(0, int(cx - 2 * rx)), min(w, int(cx + 2 * rx) + 1)
+        y0, y1 = max(0, int(cy - 2 * ry)), min(h, int(cy + 2 * ry) + 1)
+        if x0 >= x1 or y0 >= y1:
+            return
+        yy, xx = np.mgrid[y0:y1, x0:x1].astype(np.float32)
+        d2 = ((xx + 0.5 - cx) / max(rx, 1e-3)) ** 2 + ((yy + 0.5 - cy) / max(ry, 1e-3)) ** 2
+        inten = np.exp(-2.0 * d2)[..., None]
+        # 가장자리 → 중간 → 중심 색 보간
+        lo = np.clip(inten * 2, 0, 1)
+        hi = np.clip(inten * 2 - 1, 0, 1)
+        color = _FLAME_EDGE + (_FLAME_MID - _FLAME_EDGE) * lo + (_FLAME_CORE - _FLAME_MID) * hi
+        alpha = np.clip(inten * 2, 0, 1)
+        patch = frame[y0:y1, x0:x1].astype(np.float32)
+        frame[y0:y1, x0:x1] = (patch * (1 - alpha) + color * alpha).astype(np.uint8)
+
+    def render_ir(self, ir_size=None):
+        """RAW16 시퀀스 [n_frames × (h, w) uint16] (0.01 K 단위)"""
+        w, h = tuple(ir_size) if ir_size is not None else self.ir_size
+        base = self.ambient + 1.5 * self._texture((w, h), 1, 2)[..., 0]
+        yy, xx = np.indices((h, w), dtype=np.float32)
+        xx += 0.5
+        yy += 0.5
+
+        frames = []
+        for i in range(self.n_frames):
+            temp = base.copy()
+            for _, (u, v), radius, peak in self.states(i):
+                sigma = radius * h / 2.0
+                d2 = (xx - u * w) ** 2 + (yy - v * h) ** 2
+                np.maximum(temp, self.ambient + (peak - self.ambient) * np.exp(-d2 / (2 * sigma ** 2)), out=temp)
+            frames.append(np.clip((temp + KELVIN) * 100.0, 0, 65535).astype(np.uint16))
+        return frames
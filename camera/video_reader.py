@@ -0,0 +1,164 @@
+"""
+선행 디코드 영상 리더 (video 입력 모드)
+
+소스 루프에서 cap.read()로 직접 디코드하면 프레임마다 디코드 시간이 루프에 들어가고,
+재생 목록의 다음 파일을 여는 동안 루프가 멈춘다. PrefetchReader는 백그라운드 스레드가
+프레임을 미리 디코드해 작은 큐(depth)에 채워 두고, 현재 파일을 읽는 동안 다음 파일을
+미리 열어 둔다. 소스 루프의 read()는 큐에서 꺼내기만 한다.
+
+- 디코더: GStreamer decodebin (하드웨어 디코더/G2D 색변환) → OpenCV 기본 백엔드(FFmpeg)
+- transform: 디코드 스레드에서 함께 처리할 프레임 변환 (예: IR RAW16 변환)
+- cv2.VideoCapture처럼 isOpened/read/release를 제공한다
+"""
+
+import queue
+import logging
+import threading
+
+import cv2
+
+from camera.gst_capture import converter_elements, decode_pipeline
+
+logger = logging.getLogger(__name__)
+
+_END = object()
+
+
+def open_video(path, hw_decode='auto'):
+    """
+    영상 파일 열기: GStreamer decodebin (converter_elements 순서) → OpenCV 기본 백엔드
+
+    hw_decode=False면 GStreamer를 건너뛴다. 열지 못하면 None.
+    """
+    if hw_decode is not False and str(hw_decode).lower() not in ('false', 'off', 'sw'):
+        for converter in converter_elements(hw_decode):
+            cap = cv2.VideoCapture(decode_pipeline(path, converter), cv2.CAP_GSTREAMER)
+            if cap.isOpened():
+                logger.info("[VideoReader] %s via GStreamer decodebin (%s)", path, converter)
+                return cap
+            cap.release()
+    cap = cv2.VideoCapture(path)
+    if cap.isOpened():
+        return cap
+    cap.release()
+    return None
+
+
+class PrefetchReader:
+    """
+    재생 목록을 백그라운드에서 디코드해 최대 depth장을 앞서 채워 두는 리더
+
+    첫 파일은 생성 시 열어 보고 실패하면 RuntimeError. 이후 열지 못한 파일은 건너뛴다.
+    loop=False면 마지막 파일 끝에서 read()가 (False, None)을 반환한다.
+    """
+
+    def __init__(self, paths, loop=True, depth=4, hw_decode='auto', transform=None, name="VideoReader"):
+        if isinstance(paths, str):
+            paths = [paths]
+        if not paths:
+            raise ValueError(f"{name} requires at least one path")
+        self.paths = list(paths)
+        self.loop = loop
+        self.hw_decode = hw_decode
+        self.transform = transform
+        self.name = name
+        self.path_idx = 0
+        self.frames = 0
+        self.ended = False
+
+        cap = open_video(self.paths[0], hw_decode)
+        if cap is None:
+            raise RuntimeError(f"{name} - cannot open {self.paths[0]}")
+        self._queue = queue.Queue(maxsize=max(1, int(depth)))
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(cap,), daemon=True, name=name)
+        self._thread.start()
+
+    def _next_index(self, idx):
+        idx += 1
+        if idx >= len(self.paths):
+            return 0 if self.loop else None
+        return idx
+
+    def _open_next(self, idx):
+        """idx 다음 재생 목록 항목을 연다 → (index, cap). 더 없으면 (None, None)"""
+        tried = 0
+        nxt = self._next_index(idx)
+        while nxt is not None and tried < len(self.paths):
+            cap = open_video(self.paths[nxt], self.hw_decode)
+            if cap is not None:
+                return nxt, cap
+            logger.warning("[%s] cannot open %s, skipping", self.name, self.paths[nxt])
+            tried += 1
+            nxt = self._next_index(nxt)
+        return None, None
+
+    def _put(self, item):
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self, cap):
+        idx = 0
+        empty = 0       # 연속으로 프레임이 없던 파일 수 (재생 목록 전체가 비면 종료)
+        got = False
+        # 현재 파일을 읽는 동안 다음 파일을 미리 열어 전환 시 대기를 없앤다
+        next_idx, next_cap = self._open_next(idx)
+        try:
+            while not self._stop.is_set():
+                ok, frame = cap.read()
+                if ok:
+                    got = True
+                    if self.transform is not None:
+                        frame = self.transform(frame)
+                    if not self._put((idx, frame)):
+                        break
+                    continue
+                cap.release()
+                cap = None
+                empty = 0 if got else empty + 1
+                got = False
+                if next_cap is None or empty >= len(self.paths):
+                    break
+                idx, cap = next_idx, next_cap
+                next_idx, next_cap = self._open_next(idx)
+        except Exception as e:
+            logger.exception("[%s] decode error: %s", self.name, e)
+        finally:
+            for c in (cap, next_cap):
+                if c is not None:
+                    c.release()
+            self._put(_END)
+
+    def isOpened(self):
+        return not self.ended
+
+    def read(self, timeout=1.0):
+        """다음 디코드 프레임 (ok, frame). 큐가 비어 timeout이 지나거나 끝나면 (False, None)"""
+        if self.ended:
+            return False, None
+        try:
+            item = self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return False, None
+        if item is _END:
+            self.ended = True
+            return False, None
+        self.path_idx, frame = item
+        self.frames += 1
+        return True, frame
+
+    @property
+    def queued(self):
+        """현재 큐에 준비된 프레임 수"""
+        return self._queue.qsize()
+
+    def release(self):
+        self._stop.set()
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2.0)
+        self.ended = True
@@ -3,8 +3,6 @@ import csv
 import time
 import logging
 import argparse
-from collections import deque
-from datetime import datetime
 import json
 
 import cv2
@@ -12,8 +10,13 @@ import numpy as np
 
 from configs.get_cfg import get_cfg
 from core.buffer import DoubleBuffer
-from camera.source_factory import create_rgb_source, create_ir_source
-from detector.tflite import TFLiteWorker
+from core.frame_sync import FrameSynchronizer, TimedRing
+from core.records import det_records, track_id_or_none
+from core.util import ts_to_epoch_ms
+from core.view_transform import IR_META, RGB_META, item_view, render_frame
+from camera.source_factory import attach_scene_cfg, create_rgb_source, create_ir_source
+from core.tracker import IoUTracker, DEFAULT_TRACK
+from detector.tflite import Detector, detections_xywh
 
 
 def setup_logging():
@@ -24,15 +27,6 @@ def setup_logging():
     )
 
 
-def ts_to_epoch_ms(ts):
-    if not ts:
-        return None
-    try:
-        return datetime.strptime(ts, "%y%m%d%H%M%S%f").timestamp() * 1000.0
-    except Exception:
-        return None
-
-
 def ensure_dir(path):
     os.makedirs(path, exist_ok=True)
     return path
@@ -94,6 +88,7 @@ def main():
     input_cfg = cfg.INPUT or {}
     rgb_input_cfg = dict(input_cfg.get('RGB', {})) if isinstance(input_cfg, dict) else {}
     ir_input_cfg = dict(input_cfg.get('IR', {})) if isinstance(input_cfg, dict) else {}
+    attach_scene_cfg(input_cfg, rgb_input_cfg, ir_input_cfg, ir_cfg['RES'], cfg.COORD)
     det_cfg = {
         'MODEL': cfg.MODEL,
         'LABEL': cfg.LABEL,
@@ -107,8 +102,6 @@ def main():
     d_rgb = DoubleBuffer()
     d_ir = DoubleBuffer()
     d16_ir = DoubleBuffer()
-    det_in_buf = DoubleBuffer() if args.save_det else None
-    d_rgb_det = DoubleBuffer() if args.save_det else None
 
     rgb_source = create_rgb_source(rgb_cfg, rgb_input_cfg, d_rgb)
     ir_source = create_ir_source(ir_cfg, ir_input_cfg, d_ir, d16_ir)
@@ -118,20 +111,23 @@ def main():
     logger.info("Starting IR source: %s", getattr(ir_source, 'name', 'IR'))
     ir_source.start()
 
-    rgb_queue = deque()
-    ir_queue = deque()
-    raw_map = {}
+    # RGB 기준 최근접 IR 매칭 (IR 프레임도 한 번만 사용), raw16은 IR ts로 찾는다
+    sync = FrameSynchronizer.from_config(
+        dict(cfg.SYNC or {}, MAX_DIFF_MS=max_diff_ms),
+        streams=('rgb', 'ir'),
+        exclusive=True,
+    )
+    raw_ring = TimedRing(200)
     meta_rows = []
     det_rows = []
-    det_worker = None
+    detector = None
+    tracker = None
 
     rgb_writer = None
     ir_writer = None
     det_json_path = ""
 
     start_time = time.time()
-    last_rgb_ts = None
-    last_ir_ts = None
     last_raw_ts = None
     saved = 0
 
@@ -148,89 +144,48 @@ def main():
                 logger.info("Frame limit reached")
                 break
 
-            rgb_item = d_rgb.read()
-            if rgb_item and rgb_item[0] is not None:
-                ts = rgb_item[1]
-                if ts != last_rgb_ts:
-                    last_rgb_ts = ts
-                    rgb_queue.append(rgb_item)
-
-            ir_item = d_ir.read()
-            if ir_item and ir_item[0] is not None:
-                ts = ir_item[1]
-                if ts != last_ir_ts:
-                    last_ir_ts = ts
-                    ir_queue.append(ir_item)
+            sync.pull({'rgb': d_rgb, 'ir': d_ir})
 
             raw_item = d16_ir.read()
-            if raw_item and raw_item[0] is not None:
-                ts = raw_item[1]
-                if ts != last_raw_ts:
-                    last_raw_ts = ts
-                    raw_map[ts] = raw_item
-                    if len(raw_map) > 200:
-                        first_key = next(iter(raw_map))
-                        raw_map.pop(first_key, None)
-
-            if not rgb_queue or not ir_queue:
+            if raw_item and raw_item[0] is not None and raw_item[1] != last_raw_ts:
+                last_raw_ts = raw_item[1]
+                t_raw = ts_to_epoch_ms(last_raw_ts)
+                if t_raw is not None:
+                    raw_ring.push(t_raw, last_raw_ts, raw_item)
+
+            pair = sync.poll()
+            if pair is None:
                 time.sleep(0.005)
                 continue
 
-            rgb_ts = rgb_queue[0][1]
-            ir_ts = ir_queue[0][1]
-            t_rgb = ts_to_epoch_ms(rgb_ts)
-            t_ir = ts_to_epoch_ms(ir_ts)
-            if t_rgb is None or t_ir is None:
-                if t_rgb is None:
-                    rgb_queue.popleft()
-                if t_ir is None:
-                    ir_queue.popleft()
-                continue
-
-            diff = t_rgb - t_ir
-            if abs(diff) > max_diff_ms:
-                if t_rgb > t_ir:
-                    ir_queue.popleft()
-                else:
-                    rgb_queue.popleft()
-                continue
-
-            rgb_frame, _ = rgb_queue.popleft()
-            ir_frame_entry = ir_queue.popleft()
-            ir_frame = ir_frame_entry[0]
+            rgb_ts, ir_ts = pair.ts['rgb'], pair.ts['ir']
+            diff = pair.diff_ms['ir']
+            # 저장은 표시 방향으로 (뷰 변환을 저장 직전에 적용, 검출은 센서 프레임 + 뷰 변환)
+            rgb_frame = render_frame(pair['rgb'][0], item_view(pair['rgb'], RGB_META))
+            ir_frame = render_frame(pair['ir'][0], item_view(pair['ir'], IR_META))
 
-            raw_entry = raw_map.pop(ir_ts, None)
-            raw16 = raw_entry[0] if raw_entry else None
+            raw_entry = raw_ring.find(ir_ts)
+            raw16 = render_frame(raw_entry[0], item_view(raw_entry, IR_META)) if raw_entry else None
 
             if args.save_det:
-                if det_worker is None:
+                if detector is None:
                     det_json_path = args.det_json or os.path.join(output_dir, "det.jsonl")
-                    det_worker = TFLiteWorker(
-                        model_path=det_cfg['MODEL'],
-                        labels_path=det_cfg['LABEL'],
-                        input_buf=det_in_buf,
-                        output_buf=d_rgb_det,
+                    detector = Detector(
+                        det_cfg['MODEL'],
+                        det_cfg['LABEL'],
                         allowed_class_ids=det_cfg['ALLOWED_CLASSES'],
                         use_npu=det_cfg['USE_NPU'],
                         delegate_lib=det_cfg['DELEGATE'],
                         cpu_threads=det_cfg['CPU_THREADS'],
-                        target_fps=rgb_cfg.get('FPS', 0),
-                        target_res=tuple(cfg.TARGET_RES or (rgb_frame.shape[1], rgb_frame.shape[0])),
                         name=det_cfg['NAME'],
                     )
-                    det_worker.start()
-                # push frame for detection
-                det_in_buf.write((rgb_frame, rgb_ts))
-                det_item = None
-                # wait briefly for matching result
-                for _ in range(10):
-                    det_item = d_rgb_det.read()
-                    if det_item and len(det_item) > 1 and det_item[1] == rgb_ts:
-                        break
-                    time.sleep(0.01)
-                dets = det_item[2] if det_item and len(det_item) > 2 else []
+                    tracker = IoUTracker(iou_thr=DEFAULT_TRACK['IOU_THR'], max_misses=DEFAULT_TRACK['MAX_MISSES'])
+                # 저장하는 RGB 프레임 그대로 동기 추론 (bbox는 표시 방향 좌표)
+                meta = pair['rgb'][RGB_META] if len(pair['rgb']) > RGB_META and pair['rgb'][RGB_META] else {}
+                result = detector.infer(pair['rgb'][0], model_rgb=meta.get('model_rgb'), view=meta.get('view'))
+                dets = tracker.update(detections_xywh(*result))
             else:
-                dets = []
+                dets = det_records(None)
 
             if save_rgb:
                 if rgb_writer is None:
@@ -260,13 +215,14 @@ def main():
                     "diff_ms": diff,
                     "detections": [
                         {
-                            "x": det[0],
-                            "y": det[1],
-                            "w": det[2],
-                            "h": det[3],
-                            "conf": det[4],
-                            "cls": det[5],
-                        } for det in dets
+                            "x": x,
+                            "y": y,
+                            "w": w,
+                            "h": h,
+                            "conf": conf,
+                            "cls": cls,
+                            "track_id": track_id_or_none(track_id),
+                        } for x, y, w, h, conf, cls, track_id in dets.tolist()
                     ],
                 })
             saved += 1
@@ -278,9 +234,6 @@ def main():
             rgb_writer.release()
         if ir_writer:
             ir_writer.release()
-        if det_worker:
-            det_worker.stop()
-            det_worker.join(timeout=2.0)
 
         try:
             rgb_source.stop()
@@ -301,7 +254,7 @@ def main():
                     f.write(json.dumps(row, ensure_ascii=True))
                     f.write("\n")
 
-        logger.info("Saved %d synchronized frames to %s", saved, output_dir)
+        logger.info("Saved %d synchronized frames to %s (sync %s)", saved, output_dir, sync.stats())
 
 
 if __name__ == "__main__":
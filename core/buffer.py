@@ -1,5 +1,7 @@
 import queue
-from typing import Any, Optional
+import threading
+import time
+from typing import Any, Optional, Tuple
 
 
 class DoubleBuffer:
@@ -7,22 +9,49 @@ class DoubleBuffer:
     최신 프레임 한 개만 보관하는 얇은 버퍼.
     - 내부적으로 maxsize=1 큐를 사용해 덮어쓰기 경합을 줄임
     - 읽을 것이 없으면 마지막으로 본 값을 돌려줘 busy-wait를 완화
+    - 쓸 때마다 순번(seq)과 캡처 시각(t_cap, time.monotonic)을 붙여 두고,
+      read_newer()로 이미 본 프레임을 건너뛰며 새 프레임 도착을 기다릴 수 있다 (비파괴)
     """
 
     def __init__(self, maxsize: int = 1):
         self.queue: queue.Queue[Any] = queue.Queue(maxsize=maxsize or 1)
         self._last: Optional[Any] = None
+        self._cond = threading.Condition()
+        self.seq = 0
+        self._stamped: Optional[Tuple[int, float, Any]] = None
 
-    def write(self, frame: Any) -> None:
+    def write(self, frame: Any, t_cap: Optional[float] = None) -> None:
         """
         최신 프레임을 기록.
         큐가 차 있으면 오래된 항목을 버리고 새 프레임으로 덮어쓴다.
+        t_cap: 프레임 캡처 시각 (time.monotonic 기준, 없으면 기록 시각)
         """
         try:
             self.queue.get_nowait()
         except queue.Empty:
             pass
         self.queue.put(frame)
+        with self._cond:
+            self.seq += 1
+            self._stamped = (self.seq, time.monotonic() if t_cap is None else t_cap, frame)
+            self._cond.notify_all()
+
+    def read_newer(self, seq: int, timeout: Optional[float] = None) -> Optional[Tuple[int, float, Any]]:
+        """
+        seq보다 새로 기록된 최신 항목 (seq, t_cap, item).
+        없으면 timeout까지 기록을 기다리고, 그래도 없으면 None. 큐/다른 소비자에 영향 없음.
+        """
+        with self._cond:
+            if self.seq <= seq and timeout:
+                self._cond.wait_for(lambda: self.seq > seq, timeout)
+            if self.seq <= seq:
+                return None
+            return self._stamped
+
+    def latest(self) -> Optional[Any]:
+        """마지막으로 기록된 항목 (비파괴, 대기 없음, 기록 전이면 None)"""
+        with self._cond:
+            return self._stamped[2] if self._stamped is not None else None
 
     def read(self, timeout: Optional[float] = None) -> Optional[Any]:
         """
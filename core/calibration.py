@@ -0,0 +1,414 @@
+"""
+IR-RGB 자동 캘리브레이션 모듈
+
+IR hotspot 블롭과 RGB 밝은/화염 영역을 프레임 쌍마다 대응점으로 추출하고,
+강건 최소제곱(RANSAC + Huber IRLS)으로 scale/offset 또는 호모그래피를 추정합니다.
+
+- 입력: CaptureLoader 세션(오프라인) 또는 라이브 버퍼(온라인)
+- 출력: CoordMapper.from_params에 바로 쓸 수 있는 COORD 파라미터 dict
+- 설정 반영: update_coord_text / write_coord (주석을 보존하는 COORD 섹션 갱신)
+
+대응점 형식: (N, 4) float64 배열 [ir_x, ir_y, rgb_x, rgb_y]
+"""
+
+import json
+import re
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from .coord_mapper import CoordMapper
+from .frame_sync import FrameSynchronizer, TimedRing
+from .util import ts_to_epoch_ms
+from .view_transform import IR_META, RGB_META, item_view, render_frame
+
+
+DEFAULT_CALIB = {
+    'MODEL': 'affine',          # 'affine'(scale + offset) | 'homography'
+    'IR_PERCENTILE': 99.5,      # IR 블롭 임계 백분위
+    'IR_MIN_CONTRAST': 8.0,     # IR 최댓값 - 중앙값 최소 차이 (raw 사용 시 raw 단위)
+    'RGB_MIN_VALUE': 200,       # RGB 블롭 최소 밝기 (0~255)
+    'RGB_MAX_WIDTH': 480,       # RGB 특징 추출 전 축소 폭 (px)
+    'MIN_AREA': 2,              # 블롭 최소 면적 (축소/IR 픽셀)
+    'DOMINANCE': 0.8,           # 2등 블롭 강도 / 1등 강도 상한 (단일 열원 판정)
+    'MAX_DIFF_MS': 50.0,        # RGB-IR 타임스탬프 허용 차이 (ms)
+    'RANSAC_THR': 8.0,          # 인라이어 판정 재투영 오차 (RGB px)
+    'RANSAC_ITERS': 256,        # scale/offset 가설 수
+    'MIN_PAIRS': 6,             # 최소 대응점 수
+}
+
+
+def _gray(frame):
+    if frame.ndim == 2:
+        return frame
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+
+def _blobs(score, mask, min_area, max_blobs):
+    """마스크 연결 요소별 (cx, cy, 평균 score, 면적) - 강도 내림차순"""
+    n, labels, stats, cents = cv2.connectedComponentsWithStats(mask.astype(np.uint8), connectivity=8)
+    if n <= 1:
+        return np.zeros((0, 4), dtype=np.float64)
+    area = stats[:, cv2.CC_STAT_AREA].astype(np.float64)
+    sums = np.bincount(labels.ravel(), weights=score.ravel().astype(np.float64), minlength=n)
+    strength = sums / np.maximum(area, 1.0)
+    keep = np.arange(1, n)
+    keep = keep[area[keep] >= min_area]
+    keep = keep[np.argsort(-strength[keep], kind='stable')][:max_blobs]
+    return np.column_stack([cents[keep, 0], cents[keep, 1], strength[keep], area[keep]])
+
+
+def ir_hot_blobs(ir_frame, ir_raw=None, percentile=99.5, min_contrast=8.0, min_area=2, max_blobs=4):
+    """
+    IR 고온 블롭 추출
+
+    ir_raw(RAW16)가 있으면 방사 측정값으로, 없으면 컬러맵 프레임 밝기로 판정한다.
+    좌표는 ir_frame 픽셀 기준.
+
+    Returns:
+        np.ndarray: (K, 4) [x, y, strength, area]
+    """
+    src = ir_raw if ir_raw is not None else _gray(ir_frame)
+    src = np.asarray(src, dtype=np.float32)
+    med = float(np.median(src))
+    if float(src.max()) - med < min_contrast:
+        return np.zeros((0, 4), dtype=np.float64)
+    thr = max(float(np.percentile(src, percentile)), med + min_contrast)
+    blobs = _blobs(src, src >= thr, min_area, max_blobs)
+    if ir_raw is not None and ir_frame is not None and ir_frame.shape[:2] != src.shape[:2]:
+        blobs[:, 0] *= ir_frame.shape[1] / src.shape[1]
+        blobs[:, 1] *= ir_frame.shape[0] / src.shape[0]
+    return blobs
+
+
+def rgb_hot_blobs(rgb_frame, max_width=480, min_value=200, min_area=2, max_blobs=4):
+    """
+    RGB 밝은/화염색 블롭 추출 (축소 후 벡터 연산)
+
+    밝기(V)가 min_value 이상이고 R >= G >= B(화염/백열 색)인 픽셀을 후보로 보고,
+    밝기 + 붉은기(R - B)를 강도로 사용한다. 좌표는 원본 프레임 픽셀 기준.
+
+    Returns:
+        np.ndarray: (K, 4) [x, y, strength, area]
+    """
+    h, w = rgb_frame.shape[:2]
+    f = min(1.0, float(max_width) / w)
+    small = rgb_frame if f >= 1.0 else cv2.resize(rgb_frame, (max(1, int(w * f)), max(1, int(h * f))), interpolation=cv2.INTER_AREA)
+    b, g, r = (small[..., i].astype(np.int16) for i in range(3))
+    v = np.maximum(np.maximum(r, g), b)
+    score = v + (r - b)
+    mask = (v >= min_value) & (r >= g) & (g >= b)
+    blobs = _blobs(score, mask, min_area, max_blobs)
+    blobs[:, :2] /= f
+    return blobs
+
+
+def _dominant(blobs, dominance):
+    """단일 열원으로 볼 수 있으면 1등 블롭, 아니면 None"""
+    if len(blobs) == 0:
+        return None
+    if len(blobs) > 1 and blobs[1, 2] > dominance * blobs[0, 2]:
+        return None
+    return blobs[0]
+
+
+def pair_correspondence(rgb_frame, ir_frame, ir_raw=None, cfg=None):
+    """
+    한 프레임 쌍에서 대응점 추출
+
+    양쪽 모두 지배적인 단일 열원이 있을 때만 (ir_x, ir_y, rgb_x, rgb_y)를 반환한다.
+    열원이 여러 개면 순서 대응이 모호하므로 버린다.
+
+    Returns:
+        tuple or None
+    """
+    c = dict(DEFAULT_CALIB, **(cfg or {}))
+    ir = _dominant(ir_hot_blobs(ir_frame, ir_raw, c['IR_PERCENTILE'], c['IR_MIN_CONTRAST'], c['MIN_AREA']), c['DOMINANCE'])
+    if ir is None:
+        return None
+    rgb = _dominant(rgb_hot_blobs(rgb_frame, c['RGB_MAX_WIDTH'], c['RGB_MIN_VALUE'], c['MIN_AREA']), c['DOMINANCE'])
+    if rgb is None:
+        return None
+    return (float(ir[0]), float(ir[1]), float(rgb[0]), float(rgb[1]))
+
+
+def extract_correspondences(pairs, cfg=None, workers=4):
+    """
+    프레임 쌍 iterable에서 대응점을 병렬 추출
+
+    OpenCV 연산은 GIL을 놓으므로 스레드 풀로 충분하다. 진행 중인 작업 수를
+    workers * 2로 제한해 긴 세션에서도 메모리가 늘지 않는다.
+
+    Args:
+        pairs: (rgb_frame, ir_frame, ir_raw) iterable
+        cfg: DEFAULT_CALIB 덮어쓰기 dict
+        workers: 스레드 수
+
+    Returns:
+        tuple: (corr (N, 4) 배열, ir_size, rgb_size, 처리한 쌍 수)
+    """
+    out = []
+    ir_size = rgb_size = None
+    n_pairs = 0
+    with ThreadPoolExecutor(max_workers=max(1, int(workers))) as pool:
+        pending = deque()
+        for rgb_frame, ir_frame, ir_raw in pairs:
+            if ir_size is None:
+                ir_size = (ir_frame.shape[1], ir_frame.shape[0])
+                rgb_size = (rgb_frame.shape[1], rgb_frame.shape[0])
+            pending.append(pool.submit(pair_correspondence, rgb_frame, ir_frame, ir_raw, cfg))
+            n_pairs += 1
+            if len(pending) >= max(1, int(workers)) * 2:
+                res = pending.popleft().result()
+                if res is not None:
+                    out.append(res)
+        for fut in pending:
+            res = fut.result()
+            if res is not None:
+                out.append(res)
+    corr = np.asarray(out, dtype=np.float64).reshape(-1, 4)
+    return corr, ir_size, rgb_size, n_pairs
+
+
+def session_pairs(session_dir, step=1, max_diff_ms=50.0):
+    """CaptureLoader 세션에서 (rgb, ir, ir_raw) 쌍을 step 간격으로 생성"""
+    from utils.capture_loader import CaptureLoader
+
+    loader = CaptureLoader(session_dir)
+    try:
+        for i, item in enumerate(loader):
+            if i % max(1, int(step)):
+                continue
+            if max_diff_ms is not None and abs(item["diff_ms"]) > max_diff_ms:
+                continue
+            yield item["rgb"], item["ir"], item["ir_raw"]
+    finally:
+        loader.release()
+
+
+def live_pairs(buffers, n_pairs, timeout_s=30.0, max_diff_ms=50.0):
+    """
+    라이브 버퍼에서 타임스탬프가 가까운 (rgb, ir, ir_raw) 쌍을 n_pairs개까지 생성
+
+    Args:
+        buffers: {'rgb', 'ir', 'ir16'(선택)} DoubleBuffer dict
+        max_diff_ms: RGB-IR 허용 시각 차이 (FrameSynchronizer 최근접 매칭, IR은 한 번만 사용)
+    """
+    sync = FrameSynchronizer(('rgb', 'ir'), max_diff_ms=max_diff_ms, exclusive=True)
+    raw_ring = TimedRing(64)
+    ir16 = buffers.get('ir16')
+    deadline = time.time() + timeout_s
+    count = 0
+    while count < n_pairs and time.time() < deadline:
+        if not sync.pull({'rgb': buffers['rgb'], 'ir': buffers['ir']}):
+            time.sleep(0.01)
+        if ir16 is not None:
+            raw_item = ir16.read()
+            if raw_item and raw_item[0] is not None and raw_item[1] != raw_ring.last_ts:
+                t_raw = ts_to_epoch_ms(raw_item[1])
+                if t_raw is not None:
+                    raw_ring.push(t_raw, raw_item[1], raw_item)
+        pair = sync.poll()
+        while pair is not None and count < n_pairs:
+            raw_entry = raw_ring.find(pair.ts['ir'])
+            count += 1
+            # 캘리브레이션은 표시 방향(뷰 좌표) 기준
+            yield (
+                render_frame(pair['rgb'][0], item_view(pair['rgb'], RGB_META)),
+                render_frame(pair['ir'][0], item_view(pair['ir'], IR_META)),
+                render_frame(raw_entry[0], item_view(raw_entry, IR_META)) if raw_entry else None,
+            )
+            pair = sync.poll()
+
+
+def _lsq_scale_offset(ir, rgb, w=None):
+    """가중 최소제곱 rgb = s * ir + t → (s, tx, ty)"""
+    n = len(ir)
+    a = np.zeros((2 * n, 3), dtype=np.float64)
+    a[0::2, 0] = ir[:, 0]
+    a[0::2, 1] = 1.0
+    a[1::2, 0] = ir[:, 1]
+    a[1::2, 2] = 1.0
+    b = rgb.reshape(-1)
+    if w is not None:
+        sw = np.repeat(np.sqrt(w), 2)
+        a = a * sw[:, None]
+        b = b * sw
+    sol, *_ = np.linalg.lstsq(a, b, rcond=None)
+    return sol
+
+
+def solve_scale_offset(ir_pts, rgb_pts, thr=8.0, iters=256, irls_iters=5, seed=0):
+    """
+    RANSAC + Huber IRLS로 scale/offset 추정
+
+    가설은 무작위 두 점으로 만들고, 모든 가설의 잔차를 (iters, N) 배열로 한 번에 평가한다.
+
+    Returns:
+        dict: {'scale', 'tx', 'ty', 'inliers' (bool 배열), 'rmse'} 또는 None
+    """
+    ir = np.asarray(ir_pts, dtype=np.float64).reshape(-1, 2)
+    rgb = np.asarray(rgb_pts, dtype=np.float64).reshape(-1, 2)
+    n = len(ir)
+    if n < 2:
+        return None
+    rng = np.random.default_rng(seed)
+    idx = rng.integers(0, n, size=(iters, 2))
+    idx = idx[idx[:, 0] != idx[:, 1]]
+    d_ir = ir[idx[:, 0]] - ir[idx[:, 1]]
+    d_rgb = rgb[idx[:, 0]] - rgb[idx[:, 1]]
+    den = np.einsum('ij,ij->i', d_ir, d_ir)
+    ok = den > 1e-9
+    if not ok.any():
+        return None
+    idx, d_ir, d_rgb, den = idx[ok], d_ir[ok], d_rgb[ok], den[ok]
+    s = np.einsum('ij,ij->i', d_rgb, d_ir) / den
+    t = (rgb[idx[:, 0]] + rgb[idx[:, 1]]) / 2 - s[:, None] * (ir[idx[:, 0]] + ir[idx[:, 1]]) / 2
+    err = np.linalg.norm(s[:, None, None] * ir[None] + t[:, None, :] - rgb[None], axis=2)
+    inl = err < thr
+    score = inl.sum(axis=1) - np.where(inl, err, thr).sum(axis=1) / (thr * n + 1e-9)
+    inliers = inl[int(np.argmax(score))]
+    if inliers.sum() < 2:
+        return None
+
+    sol = _lsq_scale_offset(ir[inliers], rgb[inliers])
+    for _ in range(irls_iters):
+        r = np.linalg.norm(sol[0] * ir + sol[1:] - rgb, axis=1)
+        inliers = r < thr
+        if inliers.sum() < 2:
+            break
+        w = np.minimum(1.0, (thr / 2) / np.maximum(r[inliers], 1e-9))
+        sol = _lsq_scale_offset(ir[inliers], rgb[inliers], w)
+    r = np.linalg.norm(sol[0] * ir + sol[1:] - rgb, axis=1)
+    inliers = r < thr
+    rmse = float(np.sqrt(np.mean(r[inliers] ** 2))) if inliers.any() else float('inf')
+    return {'scale': float(sol[0]), 'tx': float(sol[1]), 'ty': float(sol[2]), 'inliers': inliers, 'rmse': rmse}
+
+
+def solve_homography(ir_pts, rgb_pts, thr=8.0):
+    """
+    RANSAC 호모그래피 추정 (cv2.findHomography, 인라이어 최소제곱 재추정 포함)
+
+    Returns:
+        dict: {'homography' (3x3), 'inliers', 'rmse'} 또는 None
+    """
+    ir = np.asarray(ir_pts, dtype=np.float64).reshape(-1, 2)
+    rgb = np.asarray(rgb_pts, dtype=np.float64).reshape(-1, 2)
+    if len(ir) < 4:
+        return None
+    h, mask = cv2.findHomography(ir, rgb, cv2.RANSAC, thr)
+    if h is None:
+        return None
+    proj = cv2.perspectiveTransform(ir.reshape(-1, 1, 2), h).reshape(-1, 2)
+    r = np.linalg.norm(proj - rgb, axis=1)
+    inliers = r < thr
+    rmse = float(np.sqrt(np.mean(r[inliers] ** 2))) if inliers.any() else float('inf')
+    return {'homography': h / h[2, 2], 'inliers': inliers, 'rmse': rmse}
+
+
+def solve(corr, ir_size, rgb_size, cfg=None):
+    """
+    대응점으로 COORD 파라미터 추정
+
+    Returns:
+        dict: {'params' (COORD dict), 'model', 'n', 'inliers', 'rmse'} 또는 None
+    """
+    c = dict(DEFAULT_CALIB, **(cfg or {}))
+    corr = np.asarray(corr, dtype=np.float64).reshape(-1, 4)
+    if len(corr) < int(c['MIN_PAIRS']):
+        return None
+    ir, rgb = corr[:, :2], corr[:, 2:]
+    model = str(c['MODEL']).lower()
+    if model == 'homography':
+        res = solve_homography(ir, rgb, c['RANSAC_THR'])
+        if res is None:
+            return None
+        params = {
+            'offset_x': 0.0,
+            'offset_y': 0.0,
+            'scale': None,
+            'homography': np.round(res['homography'], 8).tolist(),
+        }
+    else:
+        res = solve_scale_offset(ir, rgb, c['RANSAC_THR'], int(c['RANSAC_ITERS']))
+        if res is None:
+            return None
+        # CoordMapper는 중심 정렬 기본 오프셋 위에 offset을 더하므로 그만큼 뺀다
+        base = CoordMapper(ir_size, rgb_size, scale=res['scale'])
+        params = {
+            'offset_x': round(res['tx'] - base.base_offset_x, 3),
+            'offset_y': round(res['ty'] - base.base_offset_y, 3),
+            'scale': round(res['scale'], 5),
+            'homography': None,
+        }
+        model = 'affine'
+    params['ref_size'] = [int(rgb_size[0]), int(rgb_size[1])]
+    return {
+        'params': params,
+        'model': model,
+        'n': int(len(corr)),
+        'inliers': int(res['inliers'].sum()),
+        'rmse': res['rmse'],
+    }
+
+
+def _yaml_value(value):
+    if value is None:
+        return "null"
+    if isinstance(value, (list, tuple)):
+        return json.dumps(value)
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def update_coord_text(text, params):
+    """
+    YAML 텍스트의 COORD 섹션 값만 교체 (다른 섹션/주석 보존)
+
+    Args:
+        text: 설정 파일 내용
+        params: 소문자 키 dict (offset_x, offset_y, scale, homography, ref_size ...)
+
+    Returns:
+        str: 갱신된 텍스트
+    """
+    lines = text.splitlines(keepends=True)
+    start = next((i for i, ln in enumerate(lines) if re.match(r'^COORD:\s*(#.*)?$', ln)), None)
+    if start is None:
+        block = "COORD:\n" + "".join(f"  {k.upper()}: {_yaml_value(v)}\n" for k, v in params.items())
+        sep = "" if not text or text.endswith("\n") else "\n"
+        return text + sep + block
+
+    end = start + 1
+    while end < len(lines) and (lines[end].startswith((" ", "\t")) or not lines[end].strip()):
+        end += 1
+    while end > start + 1 and not lines[end - 1].strip():
+        end -= 1
+
+    todo = {k.upper(): v for k, v in params.items()}
+    indent = "  "
+    for i in range(start + 1, end):
+        m = re.match(r'^(\s+)([A-Za-z_]+):([ \t]*)([^#\n]*?)([ \t]*#.*)?(\r?\n)?$', lines[i])
+        if not m:
+            continue
+        indent = m.group(1)
+        key = m.group(2).upper()
+        if key not in todo:
+            continue
+        comment = m.group(5) or ""
+        lines[i] = f"{m.group(1)}{m.group(2)}: {_yaml_value(todo.pop(key))}{comment}{m.group(6) or ''}"
+    extra = [f"{indent}{k}: {_yaml_value(v)}\n" for k, v in todo.items()]
+    if extra and end > 0 and not lines[end - 1].endswith("\n"):
+        lines[end - 1] += "\n"
+    lines[end:end] = extra
+    return "".join(lines)
+
+
+def write_coord(config_path, params):
+    """설정 파일의 COORD 섹션을 params로 갱신"""
+    with open(config_path, "r", encoding="utf-8") as f:
+        text = f.read()
+    with open(config_path, "w", encoding="utf-8") as f:
+        f.write(update_coord_text(text, params))
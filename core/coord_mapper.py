@@ -1,19 +1,27 @@
 """
 IR-RGB 좌표 변환 모듈
 
-IR 카메라 (160x120)와 RGB 카메라 (960x540) 간의 좌표 변환을 수행합니다.
+IR 카메라 (160x120)와 RGB 카메라 (예: 1920x1080) 간의 좌표 변환을 수행합니다.
+- 기본: 비율 유지 스케일 + 중심 정렬 + 오프셋 (affine)
+- 선택: 3x3 호모그래피 (+ IR 렌즈 왜곡 보정)
 """
 
+import cv2
+import numpy as np
+
 
 class CoordMapper:
     """
     IR-RGB 좌표 매핑 클래스
     
     비율 유지 스케일링 + 중심 정렬 방식을 사용합니다.
+    homography가 주어지면 scale/중심 정렬 대신 3x3 투영 변환을 사용하고,
+    offset은 그 결과에 추가 보정값으로 더해집니다.
     """
     
     def __init__(self, ir_size=(160, 120), rgb_size=(960, 540), 
-                 offset_x=0, offset_y=0, scale=None):
+                 offset_x=0, offset_y=0, scale=None,
+                 homography=None, camera_matrix=None, dist_coeffs=None, ir_view=None):
         """
         좌표 매퍼 초기화
         
@@ -23,7 +31,18 @@ class CoordMapper:
             offset_x: X축 오프셋 (캘리브레이션용)
             offset_y: Y축 오프셋 (캘리브레이션용)
             scale: 스케일 팩터 (None이면 자동 계산)
+            homography: IR 픽셀 → RGB 픽셀 3x3 행렬 (None이면 affine)
+            camera_matrix: IR 카메라 내부 행렬 3x3 (왜곡 보정용, 선택)
+            dist_coeffs: IR 렌즈 왜곡 계수 [k1, k2, p1, p2(, k3)] (선택)
+            ir_view: IR 뷰 변환 (ViewTransform, 선택). 주어지면 ir_size는 센서 방향 크기이고
+                     입력 IR 좌표를 먼저 뷰 방향으로 옮긴 뒤 매핑한다 (캘리브레이션 값은 뷰 기준)
         """
+        # IR 센서 방향 크기 (remap 격자/유효 영역 판정용)
+        self.src_w, self.src_h = ir_size
+        self.ir_view = None
+        if ir_view is not None and not ir_view.identity:
+            self.ir_view = ir_view.resized(ir_size)
+            ir_size = self.ir_view.out_size
         self.ir_w, self.ir_h = ir_size
         self.rgb_w, self.rgb_h = rgb_size
         
@@ -40,6 +59,94 @@ class CoordMapper:
         # 캘리브레이션 오프셋
         self.offset_x = offset_x
         self.offset_y = offset_y
+
+        # 호모그래피 / 렌즈 왜곡 (선택)
+        self.homography = None if homography is None else np.asarray(homography, dtype=np.float64).reshape(3, 3)
+        self._h_inv = None if self.homography is None else np.linalg.inv(self.homography)
+        self.camera_matrix = None
+        self.dist_coeffs = None
+        if camera_matrix is not None and dist_coeffs is not None:
+            self.camera_matrix = np.asarray(camera_matrix, dtype=np.float64).reshape(3, 3)
+            self.dist_coeffs = np.asarray(dist_coeffs, dtype=np.float64).ravel()
+
+        # 오버레이용 dense remap 격자 캐시 (파라미터 변경 시 무효화)
+        self._remap = None
+
+    @classmethod
+    def from_params(cls, ir_size, rgb_size, params=None, ir_view=None):
+        """
+        COORD 파라미터 dict로 생성
+
+        params의 ref_size([w, h])가 있으면 offset/homography는 그 RGB 해상도 기준 값으로
+        보고 rgb_size로 스케일링한다. 없으면 rgb_size 픽셀 기준으로 그대로 사용.
+        rgb_size는 RGB 뷰 방향 크기, ir_view는 센서 방향 IR 좌표용 뷰 변환.
+        """
+        params = params or {}
+        offset_x = float(params.get('offset_x', 0.0) or 0.0)
+        offset_y = float(params.get('offset_y', 0.0) or 0.0)
+        scale = params.get('scale')
+        homography = params.get('homography')
+        ref_size = params.get('ref_size')
+        if ref_size:
+            sx = rgb_size[0] / float(ref_size[0])
+            sy = rgb_size[1] / float(ref_size[1])
+            offset_x *= sx
+            offset_y *= sy
+            if scale is not None:
+                scale = float(scale) * min(sx, sy)
+            if homography is not None:
+                homography = np.diag([sx, sy, 1.0]) @ np.asarray(homography, dtype=np.float64).reshape(3, 3)
+        return cls(
+            ir_size=ir_size,
+            rgb_size=rgb_size,
+            offset_x=offset_x,
+            offset_y=offset_y,
+            scale=scale,
+            homography=homography,
+            camera_matrix=params.get('camera_matrix'),
+            dist_coeffs=params.get('dist_coeffs'),
+            ir_view=ir_view,
+        )
+
+    @property
+    def is_affine(self):
+        return self.homography is None and self.dist_coeffs is None
+
+    def matrix(self):
+        """IR 픽셀 → RGB 픽셀 3x3 행렬 (오프셋 포함, 왜곡 보정 제외)"""
+        if self.homography is not None:
+            t = np.array([[1, 0, self.offset_x], [0, 1, self.offset_y], [0, 0, 1]], dtype=np.float64)
+            return t @ self.homography
+        return np.array([
+            [self.scale, 0.0, self.base_offset_x + self.offset_x],
+            [0.0, self.scale, self.base_offset_y + self.offset_y],
+            [0.0, 0.0, 1.0],
+        ], dtype=np.float64)
+
+    def _undistort_ir(self, pts):
+        if self.dist_coeffs is None:
+            return pts
+        und = cv2.undistortPoints(pts.reshape(-1, 1, 2), self.camera_matrix, self.dist_coeffs,
+                                  P=self.camera_matrix)
+        return und.reshape(-1, 2).astype(np.float64)
+
+    def _distort_ir(self, pts):
+        if self.dist_coeffs is None:
+            return pts
+        k = self.camera_matrix
+        norm = np.empty((len(pts), 3), dtype=np.float64)
+        norm[:, 0] = (pts[:, 0] - k[0, 2]) / k[0, 0]
+        norm[:, 1] = (pts[:, 1] - k[1, 2]) / k[1, 1]
+        norm[:, 2] = 1.0
+        out, _ = cv2.projectPoints(norm, np.zeros(3), np.zeros(3), k, self.dist_coeffs)
+        return out.reshape(-1, 2).astype(np.float64)
+
+    @staticmethod
+    def _apply_h(h, pts):
+        w = pts @ h[:2, :2].T
+        w += h[:2, 2]
+        den = pts @ h[2, :2] + h[2, 2]
+        return w / den[:, None]
     
     def ir_to_rgb(self, ir_x, ir_y):
         """
@@ -52,9 +159,38 @@ class CoordMapper:
         Returns:
             tuple: (rgb_x, rgb_y)
         """
+        if not self.is_affine or self.ir_view is not None:
+            out = self.ir_to_rgb_many([(ir_x, ir_y)])[0]
+            return float(out[0]), float(out[1])
         rgb_x = ir_x * self.scale + self.base_offset_x + self.offset_x
         rgb_y = ir_y * self.scale + self.base_offset_y + self.offset_y
         return rgb_x, rgb_y
+
+    def ir_to_rgb_many(self, points, pixels=False):
+        """
+        IR 좌표 배열을 RGB 좌표 배열로 한 번에 변환 (벡터화)
+
+        Args:
+            points: (N, 2) 배열 또는 [(x, y), ...]
+            pixels: True면 IR 픽셀 인덱스(hotspot 등)로 보고 뷰 변환에 map_pixels를 쓴다
+
+        Returns:
+            np.ndarray: (N, 2) float64 RGB 좌표
+        """
+        pts = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        if self.ir_view is not None:
+            pts = self.ir_view.map_pixels(pts) if pixels else self.ir_view.map_points(pts)
+        if not self.is_affine:
+            pts = self._undistort_ir(pts)
+            h = self.homography if self.homography is not None else self.matrix()
+            out = self._apply_h(h, pts) if len(pts) else pts.copy()
+            out += (self.offset_x, self.offset_y) if self.homography is not None else (0.0, 0.0)
+            return out
+        # ir_to_rgb와 동일한 연산 순서를 유지해 경계 판정 결과가 달라지지 않도록 함
+        out = pts * self.scale
+        out += (self.base_offset_x, self.base_offset_y)
+        out += (self.offset_x, self.offset_y)
+        return out
     
     def rgb_to_ir(self, rgb_x, rgb_y):
         """
@@ -67,9 +203,99 @@ class CoordMapper:
         Returns:
             tuple: (ir_x, ir_y)
         """
+        if not self.is_affine or self.ir_view is not None:
+            out = self.rgb_to_ir_many([(rgb_x, rgb_y)])[0]
+            return float(out[0]), float(out[1])
         ir_x = (rgb_x - self.base_offset_x - self.offset_x) / self.scale
         ir_y = (rgb_y - self.base_offset_y - self.offset_y) / self.scale
         return ir_x, ir_y
+
+    def rgb_to_ir_many(self, items):
+        """
+        RGB 좌표/bbox 배열을 IR 좌표계로 한 번에 변환 (벡터화)
+
+        Args:
+            items: (N, 2) 점 배열 또는 (N, 4) bbox 배열 [(x, y, w, h), ...]
+
+        Returns:
+            np.ndarray: 점이면 (N, 2), bbox면 네 꼭짓점을 변환한 외접 bbox (N, 4)
+        """
+        arr = np.asarray(items, dtype=np.float64)
+        if arr.ndim == 2 and arr.shape[1] == 4:
+            x, y, w, h = arr.T
+            corners = np.stack([
+                np.column_stack([x, y]),
+                np.column_stack([x + w, y]),
+                np.column_stack([x, y + h]),
+                np.column_stack([x + w, y + h]),
+            ], axis=1).reshape(-1, 2)
+            ir = self.rgb_to_ir_many(corners).reshape(-1, 4, 2)
+            lo = ir.min(axis=1)
+            hi = ir.max(axis=1)
+            return np.column_stack([lo, hi - lo])
+
+        out = self._rgb_to_ir_view(arr.reshape(-1, 2))
+        if self.ir_view is not None:
+            out = self.ir_view.unmap_points(out)
+        return out
+
+    def _rgb_to_ir_view(self, pts):
+        """RGB 좌표 → IR 뷰 방향 좌표 (ir_view가 없으면 IR 좌표 그대로)"""
+        if self.is_affine:
+            out = pts - (self.base_offset_x + self.offset_x, self.base_offset_y + self.offset_y)
+            return out / self.scale
+        if self.homography is not None:
+            out = self._apply_h(self._h_inv, pts - (self.offset_x, self.offset_y)) if len(pts) else pts.copy()
+        else:
+            out = self._apply_h(np.linalg.inv(self.matrix()), pts) if len(pts) else pts.copy()
+        return self._distort_ir(out)
+
+    def remap_grid(self):
+        """
+        오버레이용 dense remap 격자 (RGB 픽셀 → IR 센서 픽셀)
+
+        Returns:
+            tuple: (map1, map2, roi, mask) - cv2.remap용 고정소수점 맵, IR이 투영되는
+                   RGB 영역 (x0, y0, x1, y1), 영역 내 유효 픽셀 마스크.
+                   투영 영역이 없으면 모두 None
+        """
+        if self._remap is not None:
+            return self._remap
+        # IR 네 꼭짓점의 RGB 외접 영역만 격자를 만든다
+        corners = self.ir_to_rgb_many([(0, 0), (self.src_w, 0), (0, self.src_h), (self.src_w, self.src_h)])
+        x0 = int(max(0, np.floor(corners[:, 0].min())))
+        y0 = int(max(0, np.floor(corners[:, 1].min())))
+        x1 = int(min(self.rgb_w, np.ceil(corners[:, 0].max())))
+        y1 = int(min(self.rgb_h, np.ceil(corners[:, 1].max())))
+        if x0 >= x1 or y0 >= y1:
+            self._remap = (None, None, None, None)
+            return self._remap
+        gx, gy = np.meshgrid(np.arange(x0, x1, dtype=np.float64), np.arange(y0, y1, dtype=np.float64))
+        ir = self._rgb_to_ir_view(np.column_stack([gx.ravel(), gy.ravel()]))
+        if self.ir_view is not None:
+            # 뷰 방향 픽셀 인덱스 → 센서 픽셀 인덱스 (센서 IR 프레임을 회전 없이 바로 샘플링)
+            ir = self.ir_view.unmap_pixels(ir)
+        map_x = ir[:, 0].reshape(gx.shape).astype(np.float32)
+        map_y = ir[:, 1].reshape(gx.shape).astype(np.float32)
+        mask = (map_x >= 0) & (map_x <= self.src_w - 1) & (map_y >= 0) & (map_y <= self.src_h - 1)
+        map1, map2 = cv2.convertMaps(map_x, map_y, cv2.CV_16SC2)
+        self._remap = (map1, map2, (x0, y0, x1, y1), mask)
+        return self._remap
+
+    def warp_ir(self, ir_frame):
+        """
+        IR 프레임(센서 방향)을 RGB 좌표계로 투영
+
+        Returns:
+            tuple: (warped, mask, roi) - roi 영역 크기의 투영 이미지와 유효 픽셀 마스크.
+                   투영 영역이 프레임 밖이면 (None, None, None)
+        """
+        grid = self.remap_grid()
+        if grid[0] is None:
+            return None, None, None
+        map1, map2, roi, mask = grid
+        warped = cv2.remap(ir_frame, map1, map2, cv2.INTER_LINEAR, borderMode=cv2.BORDER_CONSTANT)
+        return warped, mask, roi
     
     def ir_bbox_to_rgb(self, ir_bbox):
         """
@@ -82,6 +308,11 @@ class CoordMapper:
             tuple: (x, y, w, h) RGB 좌표계
         """
         x, y, w, h = ir_bbox
+        if self.ir_view is not None:
+            x1, y1, x2, y2 = self.ir_view.map_xyxy([(x, y, x + w, y + h)])[0]
+            # 뷰 방향 bbox의 좌상단에 해당하는 센서 좌표를 매핑 (크기는 뷰 방향 w/h)
+            rgb_x, rgb_y = self.ir_to_rgb_many(self.ir_view.unmap_points([(x1, y1)]))[0]
+            return (float(rgb_x), float(rgb_y), (x2 - x1) * self.scale, (y2 - y1) * self.scale)
         rgb_x, rgb_y = self.ir_to_rgb(x, y)
         rgb_w = w * self.scale
         rgb_h = h * self.scale
@@ -97,6 +328,7 @@ class CoordMapper:
         """
         self.offset_x += dx
         self.offset_y += dy
+        self._remap = None
     
     def adjust_scale(self, ds):
         """
@@ -109,6 +341,7 @@ class CoordMapper:
         # 오프셋 재계산
         self.base_offset_x = (self.rgb_w - self.ir_w * self.scale) / 2
         self.base_offset_y = (self.rgb_h - self.ir_h * self.scale) / 2
+        self._remap = None
     
     def get_params(self):
         """
@@ -117,13 +350,19 @@ class CoordMapper:
         Returns:
             dict: {offset_x, offset_y, scale}
         """
-        return {
+        params = {
             'offset_x': self.offset_x,
             'offset_y': self.offset_y,
             'scale': self.scale
         }
+        if self.homography is not None:
+            params['homography'] = self.homography.tolist()
+        return params
     
     def __repr__(self):
+        if self.homography is not None:
+            return (f"CoordMapper(homography, "
+                    f"offset=({self.offset_x:.1f}, {self.offset_y:.1f}))")
         return (f"CoordMapper(scale={self.scale:.2f}, "
                 f"offset=({self.offset_x:.1f}, {self.offset_y:.1f}))")
 
@@ -143,6 +382,28 @@ def point_in_bbox(x, y, bbox):
     return bx <= x <= bx + bw and by <= y <= by + bh
 
 
+def points_in_bboxes(points, bboxes):
+    """
+    점 배열 × bbox 배열의 포함 행렬 계산 (point_in_bbox의 벡터화 버전)
+
+    Args:
+        points: (N, 2) 배열 [(x, y), ...]
+        bboxes: (M, 4) 배열 [(bx, by, bw, bh), ...]
+
+    Returns:
+        np.ndarray: (N, M) bool 행렬, [i, j]는 점 i가 bbox j 내부(경계 포함)인지 여부
+    """
+    pts = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    boxes = np.asarray(bboxes, dtype=np.float64).reshape(-1, 4)
+    px = pts[:, 0:1]
+    py = pts[:, 1:2]
+    bx, by = boxes[:, 0], boxes[:, 1]
+    return (
+        (px >= bx) & (px <= bx + boxes[:, 2]) &
+        (py >= by) & (py <= by + boxes[:, 3])
+    )
+
+
 def bbox_iou(bbox1, bbox2):
     """
     두 bbox의 IoU (Intersection over Union) 계산
@@ -174,3 +435,28 @@ def bbox_iou(bbox1, bbox2):
     
     return intersection / union if union > 0 else 0.0
 
+
+
+def bbox_iou_matrix(bboxes1, bboxes2):
+    """
+    bbox 배열 × bbox 배열의 IoU 행렬 계산 (bbox_iou의 벡터화 버전)
+
+    Args:
+        bboxes1: (N, 4) 배열 [(x, y, w, h), ...]
+        bboxes2: (M, 4) 배열 [(x, y, w, h), ...]
+
+    Returns:
+        np.ndarray: (N, M) float64 IoU 행렬
+    """
+    a = np.asarray(bboxes1, dtype=np.float64).reshape(-1, 4)
+    b = np.asarray(bboxes2, dtype=np.float64).reshape(-1, 4)
+    ax1, ay1 = a[:, 0:1], a[:, 1:2]
+    ax2, ay2 = ax1 + a[:, 2:3], ay1 + a[:, 3:4]
+    bx1, by1 = b[:, 0], b[:, 1]
+    bx2, by2 = bx1 + b[:, 2], by1 + b[:, 3]
+
+    iw = (np.minimum(ax2, bx2) - np.maximum(ax1, bx1)).clip(min=0)
+    ih = (np.minimum(ay2, by2) - np.maximum(ay1, by1)).clip(min=0)
+    inter = iw * ih
+    union = a[:, 2:3] * a[:, 3:4] + b[:, 2] * b[:, 3] - inter
+    return np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
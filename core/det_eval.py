@@ -0,0 +1,168 @@
+"""
+오프라인 검출 평가 (precision / recall / mAP)
+
+YOLO 형식 정답 라벨(cls cx cy w h, 정규화)과 검출 결과(xyxy, score, cls)를 프레임마다
+누적하고 클래스별 AP를 계산합니다.
+- 매칭: 프레임 안에서 점수 내림차순으로, 같은 클래스의 아직 매칭되지 않은 정답 중
+  IoU가 가장 큰 것과 짝 (IoU 임계값마다 독립적으로)
+- AP: 모든 recall 지점 보간 (VOC 2010+ 방식)
+- mAP@0.5, mAP@0.5:0.95 (0.05 간격 10개 임계값 평균)
+"""
+
+import os
+
+import numpy as np
+
+from core.coord_mapper import bbox_iou_matrix
+
+
+IOU_THRESHOLDS = tuple(np.round(np.arange(0.5, 0.96, 0.05), 2))
+
+
+def load_yolo_labels(gt_dir, name, frame_shape, classes=None, missing_empty=False):
+    """
+    YOLO 라벨 (cls cx cy w h, 정규화) → (xyxy 배열, cls 배열)
+
+    파일이 없으면 None. missing_empty=True면 YOLO 관례대로 "객체 없음"으로 보고 빈 배열을 돌려준다
+    (평가에서 그 프레임의 검출이 모두 오검출로 집계됨).
+    """
+    path = os.path.join(gt_dir, f"{name}.txt")
+    if not os.path.exists(path):
+        if missing_empty:
+            return np.zeros((0, 4), dtype=np.float64), np.zeros(0, dtype=np.int32)
+        return None
+    h, w = frame_shape[:2]
+    boxes, cls_ids = [], []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) < 5:
+                continue
+            c = int(float(parts[0]))
+            if classes is not None and c not in classes:
+                continue
+            cx, cy, bw, bh = (float(v) for v in parts[1:5])
+            boxes.append(((cx - bw / 2) * w, (cy - bh / 2) * h, (cx + bw / 2) * w, (cy + bh / 2) * h))
+            cls_ids.append(c)
+    return np.asarray(boxes, dtype=np.float64).reshape(-1, 4), np.asarray(cls_ids, dtype=np.int32)
+
+
+def xyxy_iou_matrix(boxes1, boxes2):
+    """xyxy 배열 × xyxy 배열 IoU 행렬"""
+    to_xywh = lambda b: np.column_stack([b[:, 0], b[:, 1], b[:, 2] - b[:, 0], b[:, 3] - b[:, 1]])
+    a = np.asarray(boxes1, dtype=np.float64).reshape(-1, 4)
+    b = np.asarray(boxes2, dtype=np.float64).reshape(-1, 4)
+    return bbox_iou_matrix(to_xywh(a), to_xywh(b))
+
+
+def match_predictions(pred_xyxy, pred_scores, pred_cls, gt_xyxy, gt_cls, iou_thrs=IOU_THRESHOLDS):
+    """
+    한 프레임의 검출/정답 매칭
+
+    Returns:
+        np.ndarray: (N, T) bool - 검출 i가 임계값 t에서 TP인지 (입력 검출 순서)
+    """
+    n, t = len(pred_scores), len(iou_thrs)
+    tp = np.zeros((n, t), dtype=bool)
+    if n == 0 or len(gt_cls) == 0:
+        return tp
+    iou = xyxy_iou_matrix(pred_xyxy, gt_xyxy)
+    iou[np.asarray(pred_cls)[:, None] != np.asarray(gt_cls)[None, :]] = 0.0
+    order = np.argsort(-np.asarray(pred_scores), kind='stable')
+    for k, thr in enumerate(iou_thrs):
+        used = np.zeros(iou.shape[1], dtype=bool)
+        for i in order:
+            cand = np.where(used, -1.0, iou[i])
+            j = int(cand.argmax())
+            if cand[j] >= thr:
+                used[j] = True
+                tp[i, k] = True
+    return tp
+
+
+def average_precision(tp, scores, n_gt):
+    """
+    한 클래스의 AP (모든 recall 지점 보간)
+
+    tp: (N,) bool, scores: (N,) 검출 점수, n_gt: 정답 수. 정답이 없으면 None
+    """
+    if n_gt == 0:
+        return None
+    if len(tp) == 0:
+        return 0.0
+    order = np.argsort(-np.asarray(scores), kind='stable')
+    hits = np.asarray(tp, dtype=np.float64)[order]
+    ctp = np.cumsum(hits)
+    cfp = np.cumsum(1.0 - hits)
+    recall = ctp / n_gt
+    precision = ctp / (ctp + cfp)
+    mrec = np.concatenate([[0.0], recall, [1.0]])
+    mpre = np.concatenate([[0.0], precision, [0.0]])
+    mpre = np.maximum.accumulate(mpre[::-1])[::-1]
+    idx = np.where(mrec[1:] != mrec[:-1])[0]
+    return float(np.sum((mrec[idx + 1] - mrec[idx]) * mpre[idx + 1]))
+
+
+class DetectionEvaluator:
+    """
+    프레임별 검출/정답을 누적해 precision/recall/mAP 계산
+
+    classes: 평가할 클래스 ID 집합 (None이면 전체). 검출/정답 모두 이 클래스만 센다.
+    """
+
+    def __init__(self, classes=None, iou_thrs=IOU_THRESHOLDS):
+        self.classes = set(classes) if classes is not None else None
+        self.iou_thrs = tuple(iou_thrs)
+        self.frames = 0
+        self._tp = []       # 프레임별 (N, T) bool
+        self._scores = []
+        self._cls = []
+        self._n_gt = {}     # cls → 정답 수
+
+    def add(self, pred_xyxy, pred_scores, pred_cls, gt_xyxy, gt_cls):
+        """한 프레임 추가 (정답이 없는 프레임은 gt를 빈 배열로)"""
+        pred_xyxy = np.asarray(pred_xyxy, dtype=np.float64).reshape(-1, 4)
+        pred_scores = np.asarray(pred_scores, dtype=np.float64).reshape(-1)
+        pred_cls = np.asarray(pred_cls, dtype=np.int32).reshape(-1)
+        gt_xyxy = np.asarray(gt_xyxy, dtype=np.float64).reshape(-1, 4)
+        gt_cls = np.asarray(gt_cls, dtype=np.int32).reshape(-1)
+        if self.classes is not None:
+            m = np.isin(pred_cls, list(self.classes))
+            pred_xyxy, pred_scores, pred_cls = pred_xyxy[m], pred_scores[m], pred_cls[m]
+            g = np.isin(gt_cls, list(self.classes))
+            gt_xyxy, gt_cls = gt_xyxy[g], gt_cls[g]
+
+        self._tp.append(match_predictions(pred_xyxy, pred_scores, pred_cls, gt_xyxy, gt_cls, self.iou_thrs))
+        self._scores.append(pred_scores)
+        self._cls.append(pred_cls)
+        for c in gt_cls.tolist():
+            self._n_gt[c] = self._n_gt.get(c, 0) + 1
+        self.frames += 1
+
+    def summary(self):
+        """
+        Returns:
+            dict: frames, n_gt, n_pred, precision, recall (IoU 0.5 기준, 전체 검출),
+                  map50, map (0.5:0.95), ap50 {cls: AP}. 정답이 없으면 해당 값은 None
+        """
+        tp = np.concatenate(self._tp) if self._tp else np.zeros((0, len(self.iou_thrs)), bool)
+        scores = np.concatenate(self._scores) if self._scores else np.zeros((0,))
+        cls = np.concatenate(self._cls) if self._cls else np.zeros((0,), np.int32)
+        n_gt = sum(self._n_gt.values())
+
+        ap = {}
+        for c in sorted(self._n_gt):
+            m = cls == c
+            ap[c] = [average_precision(tp[m, k], scores[m], self._n_gt[c]) for k in range(len(self.iou_thrs))]
+
+        n_tp = int(tp[:, 0].sum()) if len(tp) else 0
+        return {
+            'frames': self.frames,
+            'n_gt': n_gt,
+            'n_pred': int(len(scores)),
+            'precision': (n_tp / len(scores)) if len(scores) else None,
+            'recall': (n_tp / n_gt) if n_gt else None,
+            'map50': float(np.mean([v[0] for v in ap.values()])) if ap else None,
+            'map': float(np.mean([np.mean(v) for v in ap.values()])) if ap else None,
+            'ap50': {c: v[0] for c, v in ap.items()},
+        }
@@ -0,0 +1,175 @@
+"""
+IR 기반 탐지기 듀티 사이클 거버너
+
+장면이 차가우면(IR hotspot 없음, 최고 온도 낮음) Phase 1 게이트키퍼에서 EO bbox는 어차피
+FILTERED가 되므로 RGB 탐지기를 전체 속도로 돌릴 이유가 없다. 거버너는 IR 버퍼의 새 프레임마다
+(hotspots, max_temp_info)를 보고 탐지 워커의 추론 주기를 바꾼다.
+
+- IDLE(차가움): 추론은 IDLE_FPS로만 (0이면 추론 중지), 나머지 프레임은 트래커 전파로 그대로 출력
+  → RGB 출력/송신 프레임 속도는 유지하고 NPU/CPU만 쉰다
+- ACTIVE(열원): hotspot이 있거나 최고 온도 ≥ HOT_TEMP이면 다음 IR 프레임을 기다리지 않고 즉시 전환
+  (IR 버퍼 기록에 깨어나므로 IR 프레임 1장 이내), 전환 직후 RGB 프레임은 강제 키프레임
+- 히스테리시스: ACTIVE 해제는 hotspot이 없고 최고 온도 < COOL_TEMP인 상태가 HOLD_SEC 동안
+  이어질 때만. IR 프레임이 IR_TIMEOUT_SEC 이상 끊기면 안전 측으로 ACTIVE
+"""
+
+import time
+import logging
+import threading
+
+from .records import hotspot_records
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_GOVERNOR = {
+    'ENABLED': False,       # IR 기반 탐지 듀티 사이클 사용 여부
+    'IDLE_FPS': 1.0,        # 차가운 장면 추론 FPS (0 = 추론 중지, 트래커 전파만)
+    'HOT_TEMP': 60.0,       # 최고 온도(섭씨)가 이 값 이상이면 ACTIVE
+    'COOL_TEMP': 50.0,      # ACTIVE 해제 온도 (HOT_TEMP보다 낮게: 히스테리시스)
+    'HOLD_SEC': 5.0,        # 열원이 사라진 뒤 ACTIVE 유지 시간
+    'IR_TIMEOUT_SEC': 2.0,  # IR 프레임이 이 시간 이상 없으면 ACTIVE (안전 측)
+}
+
+ACTIVE = "ACTIVE"
+IDLE = "IDLE"
+
+
+def ir_heat(ir_item):
+    """IR 버퍼 항목의 (hotspot 수, 최고 온도 섭씨 또는 None)"""
+    if not ir_item or len(ir_item) < 4:
+        return 0, None
+    info, hotspots = ir_item[2], ir_item[3]
+    max_temp = None
+    if isinstance(info, dict):
+        max_temp = info.get('temp_corrected', info.get('temp_raw'))
+    hotspots = hotspot_records(hotspots)
+    if len(hotspots):
+        peak = float(hotspots['temp'].max())
+        max_temp = peak if max_temp is None else max(max_temp, peak)
+    return len(hotspots), max_temp
+
+
+class DutyGovernor(threading.Thread):
+    """
+    IR 버퍼를 구독해 탐지 워커의 추론 듀티 사이클을 조절하는 스레드
+
+    get_worker: 현재 탐지 워커를 돌려주는 호출 (재시작으로 워커가 바뀌어도 다시 적용).
+    워커는 set_duty(idle_period)를 제공해야 한다 (None = 전체 속도).
+    observe()는 스레드 없이도 호출할 수 있어 판정만 따로 시험할 수 있다.
+    """
+
+    def __init__(self, ir_buf, get_worker, cfg=None, name="Governor"):
+        super().__init__(daemon=True, name=name)
+        self.ir_buf = ir_buf
+        self.get_worker = get_worker
+        c = dict(DEFAULT_GOVERNOR)
+        c.update(cfg or {})
+        self.cfg = c
+        idle_fps = float(c['IDLE_FPS'] or 0)
+        self.idle_period = 1.0 / idle_fps if idle_fps > 0 else float('inf')
+        self.hot_temp = float(c['HOT_TEMP'])
+        self.cool_temp = min(float(c['COOL_TEMP']), self.hot_temp)
+        self.hold = max(0.0, float(c['HOLD_SEC']))
+        self.ir_timeout = float(c['IR_TIMEOUT_SEC'] or 0)
+        self.stop_evt = threading.Event()
+
+        self.state = ACTIVE     # 시작은 전체 속도 (첫 IR 판정 전)
+        self._last_seq = 0
+        self._last_ir = None
+        self._last_hot = None
+        self._applied = (None, None)    # (워커, 상태)
+        self._lock = threading.Lock()
+        self._since = time.monotonic()
+        self._time_in = {ACTIVE: 0.0, IDLE: 0.0}
+        self.transitions = 0
+        self.last_ramp_ms = None
+
+    # ----- 판정 -----
+    def observe(self, ir_item, t_cap=None, now=None):
+        """IR 항목 하나로 상태 갱신 후 워커에 적용, 현재 상태 반환"""
+        now = time.monotonic() if now is None else now
+        self._last_ir = now
+        n_hot, max_temp = ir_heat(ir_item)
+        hot = n_hot > 0 or (max_temp is not None and max_temp >= self.hot_temp)
+        warm = n_hot > 0 or (max_temp is not None and max_temp >= self.cool_temp)
+        if warm:
+            self._last_hot = now
+
+        if hot:
+            state = ACTIVE
+        elif self.state == ACTIVE and self._last_hot is not None and now - self._last_hot < self.hold:
+            state = ACTIVE
+        else:
+            state = self.state if warm else IDLE
+        reason = f"hotspots={n_hot} max={max_temp:.1f}C" if max_temp is not None else f"hotspots={n_hot}"
+        if self._set_state(state, now, reason) and state == ACTIVE and t_cap is not None:
+            # 전환을 일으킨 IR 프레임 캡처 → 워커 적용까지
+            self.last_ramp_ms = max(0.0, (time.monotonic() - t_cap) * 1000.0)
+        return self.state
+
+    def check_timeout(self, now=None):
+        """IR 프레임이 끊겼으면 ACTIVE로 (안전 측)"""
+        now = time.monotonic() if now is None else now
+        if self.ir_timeout > 0 and self._last_ir is not None and now - self._last_ir >= self.ir_timeout:
+            self._set_state(ACTIVE, now, "IR timeout")
+        else:
+            self._apply()
+
+    def _set_state(self, state, now, reason=""):
+        """상태 변경 + 워커 적용, 전환이 일어났으면 True"""
+        changed = False
+        with self._lock:
+            if state != self.state:
+                self._time_in[self.state] += now - self._since
+                self._since = now
+                logger.info("[Governor] %s -> %s (%s)", self.state, state, reason)
+                self.state = state
+                self.transitions += 1
+                changed = True
+        self._apply()
+        return changed
+
+    def _apply(self):
+        worker = self.get_worker() if self.get_worker else None
+        if worker is None or self._applied == (worker, self.state):
+            return
+        if hasattr(worker, "set_duty"):
+            worker.set_duty(None if self.state == ACTIVE else self.idle_period)
+        self._applied = (worker, self.state)
+
+    def snapshot(self):
+        """상태/전환 수/ACTIVE 시간 비율/최근 ACTIVE 전환 지연(ms)"""
+        with self._lock:
+            now = time.monotonic()
+            time_in = dict(self._time_in)
+            time_in[self.state] += now - self._since
+            total = sum(time_in.values())
+            return {
+                'state': self.state,
+                'transitions': self.transitions,
+                'active_ratio': time_in[ACTIVE] / total if total > 0 else 1.0,
+                'ramp_ms': self.last_ramp_ms,
+            }
+
+    # ----- 스레드 -----
+    def run(self):
+        logger.info("[Governor] started (idle_fps=%s hot=%.1fC cool=%.1fC hold=%.1fs)",
+                    self.cfg['IDLE_FPS'], self.hot_temp, self.cool_temp, self.hold)
+        while not self.stop_evt.is_set():
+            entry = self.ir_buf.read_newer(self._last_seq, timeout=0.2)
+            if entry is None:
+                self.check_timeout()
+                continue
+            self._last_seq, t_cap, item = entry
+            try:
+                self.observe(item, t_cap=t_cap)
+            except Exception as e:
+                logger.exception("[Governor] observe failed: %s", e)
+        # 정지 시 워커를 전체 속도로 되돌림
+        self._applied = (None, None)
+        self._set_state(ACTIVE, time.monotonic(), "stopped")
+        logger.info("[Governor] stopped")
+
+    def stop(self):
+        self.stop_evt.set()
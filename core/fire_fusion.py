@@ -11,7 +11,11 @@ Phase 1: IR 게이트키퍼 방식
 """
 
 import logging
-from .coord_mapper import CoordMapper, point_in_bbox
+
+import numpy as np
+
+from .coord_mapper import CoordMapper, points_in_bboxes
+from .records import EO_BOX_DTYPE, det_records, eo_box_records, hotspot_records, track_id_or_none, xywh
 
 
 # 신뢰도 상수
@@ -26,6 +30,9 @@ FIRE_IR_ONLY = 'IR_ONLY'          # IR만 감지 (의심)
 FIRE_FILTERED = 'FILTERED'        # EO만 감지 (게이트키핑됨)
 NO_FIRE = 'NO_FIRE'               # 화재 아님
 
+# 탐지 모델의 화염 클래스 ID
+FIRE_CLASS_ID = 1
+
 # bbox 색상 (BGR)
 COLOR_CONFIRMED = (0, 0, 255)     # 빨강: 확정 화재
 COLOR_IR_ONLY = (0, 165, 255)     # 주황: IR만 감지
@@ -36,6 +43,35 @@ COLOR_NO_FIRE = (128, 128, 128)   # 회색: 미감지
 logger = logging.getLogger(__name__)
 
 
+def eo_fire_boxes(detections, fire_cls=FIRE_CLASS_ID):
+    """
+    TFLiteWorker detections에서 화염 클래스만 골라 fuse 입력 형식으로 변환
+
+    Args:
+        detections: DET_DTYPE 배열 또는 [(x, y, w, h, conf, cls[, track_id]), ...]
+        fire_cls: 화염 클래스 ID
+
+    Returns:
+        np.ndarray: EO_BOX_DTYPE 배열 (x, y, w, h, conf, track_id), track_id -1 = 미추적
+    """
+    dets = det_records(detections)
+    fire = dets[dets['cls'] == fire_cls]
+    boxes = np.empty(len(fire), EO_BOX_DTYPE)
+    for name in EO_BOX_DTYPE.names:
+        boxes[name] = fire[name]
+    return boxes
+
+
+def _track_suffix(track_id):
+    return f' #{track_id}' if track_id is not None else ''
+
+
+def _tag_track(entry, track_id):
+    """track_id가 있는 경우에만 결과 dict에 추가 (없으면 기존 스키마 유지)"""
+    if track_id is not None:
+        entry['track_id'] = track_id
+
+
 class FireFusion:
     """
     EO-IR 화재 감지 융합 클래스
@@ -61,14 +97,25 @@ class FireFusion:
         
         # 마지막 융합 결과
         self.last_result = None
+
+    @classmethod
+    def from_params(cls, ir_size, rgb_size, params=None, ir_view=None):
+        """
+        COORD 파라미터 dict(offset/scale/homography 등)로 생성
+
+        ir_view가 주어지면 hotspot은 센서 방향 IR 좌표로 보고 매퍼에서 뷰 변환을 합성한다.
+        """
+        fusion = cls(ir_size=ir_size, rgb_size=rgb_size)
+        fusion.coord_mapper = CoordMapper.from_params(ir_size, rgb_size, params, ir_view=ir_view)
+        return fusion
     
     def fuse(self, ir_hotspots, eo_fire_bboxes):
         """
         IR hotspot과 EO fire bbox를 융합하여 최종 화재 판정
         
         Args:
-            ir_hotspots: IR 화점 리스트 [(x, y, temp_corrected, temp_raw), ...]
-            eo_fire_bboxes: EO 화염 bbox 리스트 [(x, y, w, h, confidence), ...]
+            ir_hotspots: IR 화점 HOTSPOT_DTYPE 배열 또는 [(x, y, temp_corrected, temp_raw), ...]
+            eo_fire_bboxes: EO 화염 bbox EO_BOX_DTYPE 배열 또는 [(x, y, w, h, confidence[, track_id]), ...]
             
         Returns:
             dict: {
@@ -81,14 +128,18 @@ class FireFusion:
         """
         details = []
         eo_annotations = []  # EO 프레임에 그릴 bbox 정보
+        eo = eo_box_records(eo_fire_bboxes)
+        eo_xywh = xywh(eo)
+        # 주석/상세 dict용 파이썬 값은 화염 bbox만 (전체 검출 수와 무관)
+        eo_boxes = [tuple(b) for b in eo_xywh.tolist()]
+        eo_confs = eo['conf'].tolist()
+        eo_track_ids = [track_id_or_none(t) for t in eo['track_id']]
         
         # ===== 게이트키퍼: IR hotspot 체크 =====
-        if not ir_hotspots or len(ir_hotspots) == 0:
+        if ir_hotspots is None or len(ir_hotspots) == 0:
             # IR 감지 없음 → EO 결과 무시
-            for eo_bbox in (eo_fire_bboxes or []):
+            for bbox, eo_conf in zip(eo_boxes, eo_confs):
                 # EO bbox를 필터링된 것으로 표시 (노란색)
-                bbox = eo_bbox[:4] if len(eo_bbox) >= 4 else eo_bbox
-                eo_conf = eo_bbox[4] if len(eo_bbox) > 4 else 0.0
                 eo_annotations.append({
                     'bbox': bbox,
                     'color': COLOR_FILTERED,
@@ -101,96 +152,99 @@ class FireFusion:
                 'confidence': CONFIDENCE_NONE,
                 'status': NO_FIRE,
                 'reason': 'NO_IR_HOTSPOT',
+                'confirmed_count': 0,
+                'ir_only_count': 0,
                 'details': details,
                 'eo_annotations': eo_annotations
             }
             return self.last_result
         
         # ===== IR hotspot 있음: EO와 매칭 확인 =====
+        # 모든 hotspot을 한 번의 affine 연산으로 RGB 좌표계로 변환하고
+        # (hotspot × bbox) 포함 행렬로 매칭을 계산한다.
+        hot = hotspot_records(ir_hotspots)
+        ir_xy = list(zip(hot['x'].tolist(), hot['y'].tolist()))
+        temps = hot['temp'].tolist()
+        rgb_xy = self.coord_mapper.ir_to_rgb_many(np.column_stack([hot['x'], hot['y']]), pixels=True)
+        
+        n_eo = len(eo_boxes)
+        if n_eo:
+            inside = points_in_bboxes(rgb_xy, eo_xywh)
+            has_match = inside.any(axis=1)
+            # 각 hotspot이 매칭된 첫 번째 bbox 인덱스 (기존 루프의 break 동작과 동일)
+            first_match = np.where(has_match, inside.argmax(axis=1), -1)
+        else:
+            has_match = np.zeros(len(ir_xy), dtype=bool)
+            first_match = np.full(len(ir_xy), -1)
+        
         confirmed_fires = []
         ir_only_fires = []
-        matched_eo_indices = set()
+        # bbox별 매칭 온도 (해당 bbox에 처음 매칭된 hotspot 온도)
+        box_temp = [None] * n_eo
         
-        for hotspot in ir_hotspots:
-            ir_x, ir_y = hotspot[0], hotspot[1]
-            temp = hotspot[2] if len(hotspot) > 2 else 0
-            
-            # IR 좌표를 RGB 좌표로 변환
-            rgb_x, rgb_y = self.coord_mapper.ir_to_rgb(ir_x, ir_y)
-            
-            # EO bbox와 매칭 확인
-            matched = False
-            for i, eo_bbox in enumerate(eo_fire_bboxes or []):
-                bbox = eo_bbox[:4] if len(eo_bbox) >= 4 else eo_bbox
-                eo_conf = eo_bbox[4] if len(eo_bbox) > 4 else 0.0
-                
-                if point_in_bbox(rgb_x, rgb_y, bbox):
-                    # IR + EO 매칭 → 확정 화재
-                    confirmed_fires.append({
-                        'ir_pos': (ir_x, ir_y),
-                        'rgb_pos': (rgb_x, rgb_y),
-                        'temp': temp,
-                        'eo_bbox': bbox,
-                        'eo_conf': eo_conf,
-                        'confidence': CONFIDENCE_HIGH,
-                        'status': FIRE_CONFIRMED
-                    })
-                    matched_eo_indices.add(i)
-                    matched = True
-                    break
-            
-            if not matched:
+        for k, (ir_pos, temp) in enumerate(zip(ir_xy, temps)):
+            rgb_pos = (float(rgb_xy[k, 0]), float(rgb_xy[k, 1]))
+            if has_match[k]:
+                # IR + EO 매칭 → 확정 화재
+                i = int(first_match[k])
+                confirmed_fires.append({
+                    'ir_pos': ir_pos,
+                    'rgb_pos': rgb_pos,
+                    'temp': temp,
+                    'eo_bbox': eo_boxes[i],
+                    'eo_conf': eo_confs[i],
+                    'confidence': CONFIDENCE_HIGH,
+                    'status': FIRE_CONFIRMED
+                })
+                _tag_track(confirmed_fires[-1], eo_track_ids[i])
+                if box_temp[i] is None:
+                    box_temp[i] = temp
+            else:
                 # IR만 감지
                 ir_only_fires.append({
-                    'ir_pos': (ir_x, ir_y),
-                    'rgb_pos': (rgb_x, rgb_y),
+                    'ir_pos': ir_pos,
+                    'rgb_pos': rgb_pos,
                     'temp': temp,
                     'confidence': CONFIDENCE_MEDIUM,
                     'status': FIRE_IR_ONLY
                 })
+        matched = first_match[first_match >= 0]
+        matched_eo = np.zeros(n_eo, dtype=bool)
+        matched_eo[matched] = True
         
         # ===== Phase1 fallback: 좌표 매핑이 없어도 IR이 임계 초과하면 EO bbox 전부 확정 처리 =====
-        fallback_confirmed = False
-        if ir_hotspots and not confirmed_fires and (eo_fire_bboxes or []):
-            fallback_confirmed = True
-            # 가장 뜨거운 hotspot 사용
-            ref_hotspot = max(ir_hotspots, key=lambda h: h[2] if len(h) > 2 else 0)
-            ref_temp = ref_hotspot[2] if len(ref_hotspot) > 2 else 0
-            rgb_ref = self.coord_mapper.ir_to_rgb(ref_hotspot[0], ref_hotspot[1])
-            for i, eo_bbox in enumerate(eo_fire_bboxes):
-                bbox = eo_bbox[:4] if len(eo_bbox) >= 4 else eo_bbox
-                eo_conf = eo_bbox[4] if len(eo_bbox) > 4 else 0.0
+        if not confirmed_fires and n_eo:
+            # 가장 뜨거운 hotspot 사용 (동률이면 먼저 나온 hotspot)
+            ref = int(np.argmax(hot['temp']))
+            ref_temp = temps[ref]
+            rgb_ref = (float(rgb_xy[ref, 0]), float(rgb_xy[ref, 1]))
+            for i in range(n_eo):
                 confirmed_fires.append({
-                    'ir_pos': (ref_hotspot[0], ref_hotspot[1]),
+                    'ir_pos': ir_xy[ref],
                     'rgb_pos': rgb_ref,
                     'temp': ref_temp,
-                    'eo_bbox': bbox,
-                    'eo_conf': eo_conf,
+                    'eo_bbox': eo_boxes[i],
+                    'eo_conf': eo_confs[i],
                     'confidence': CONFIDENCE_HIGH,
                     'status': FIRE_CONFIRMED
                 })
-                matched_eo_indices.add(i)
+                _tag_track(confirmed_fires[-1], eo_track_ids[i])
+                box_temp[i] = ref_temp
+            matched_eo[:] = True
         
         # EO annotations 생성
-        for i, eo_bbox in enumerate(eo_fire_bboxes or []):
-            bbox = eo_bbox[:4] if len(eo_bbox) >= 4 else eo_bbox
-            eo_conf = eo_bbox[4] if len(eo_bbox) > 4 else 0.0
-            
-            if i in matched_eo_indices:
+        for i, (bbox, eo_conf) in enumerate(zip(eo_boxes, eo_confs)):
+            if matched_eo[i]:
                 # 확정 화재 (빨간색)
-                # 매칭된 온도 찾기
-                matched_temp = None
-                for cf in confirmed_fires:
-                    if cf['eo_bbox'] == bbox:
-                        matched_temp = cf['temp']
-                        break
+                matched_temp = box_temp[i]
                 temp_str = f'{matched_temp:.0f}C' if matched_temp is not None else '-'
                 eo_annotations.append({
                     'bbox': bbox,
                     'color': COLOR_CONFIRMED,
-                    'label': f'FIRE ({temp_str}, {eo_conf:.0%})',
+                    'label': f'FIRE{_track_suffix(eo_track_ids[i])} ({temp_str}, {eo_conf:.0%})',
                     'status': FIRE_CONFIRMED
                 })
+                _tag_track(eo_annotations[-1], eo_track_ids[i])
             else:
                 # 필터링됨 (노란색)
                 eo_annotations.append({
@@ -236,7 +290,7 @@ class FireFusion:
             'eo_annotations': eo_annotations
         }
         
-        filtered_count = max(0, len(eo_fire_bboxes or []) - len(matched_eo_indices))
+        filtered_count = int(n_eo - matched_eo.sum())
         logger.debug(
             "[FUSION] fire_detected=%s status=%s confirmed=%d ir_only=%d filtered=%d confidence=%.2f",
             "YES" if self.last_result['fire_detected'] else "NO",
@@ -0,0 +1,316 @@
+"""
+화재 상태 시간 누적 모듈
+
+FireFusion은 프레임 단위로 독립 판정하므로 화염이 깜빡일 때마다 새로운
+이벤트가 발생합니다. 이 모듈은 융합 결과를 영역(region) 단위로 추적하며
+링버퍼 통계로 디바운스하여 ACTIVE/INACTIVE 상태 전이만 이벤트로 내보냅니다.
+
+config.yaml의 STATE.FIRE 파라미터:
+- WINDOW: 영역별 링버퍼 길이 (프레임 수)
+- THRESHOLD: 윈도우 내 양성 프레임 비율 임계값 (%, 1 이하면 비율로 해석)
+- CONFIDENCE: 양성으로 인정할 최소 융합 신뢰도
+- NMS: 영역 연계/중복 제거에 사용하는 IoU 임계값
+- ACTIVE_DUR: 임계값 이상이 지속되어야 ACTIVE로 전이하는 시간 (초)
+- INACTIVE_DUR: 임계값 미만이 지속되어야 INACTIVE로 전이하는 시간 (초)
+- MIN_DUR: ACTIVE 이벤트의 최소 유지 시간 (초)
+- DET_MODE: 1 = CONFIRMED만 양성, 2 = CONFIRMED + IR_ONLY 양성
+"""
+
+import logging
+import time
+
+import numpy as np
+
+from .coord_mapper import bbox_iou
+from .fire_fusion import FIRE_CONFIRMED, FIRE_IR_ONLY
+
+
+# 상태 전이 이벤트 상수
+FIRE_EVENT_ACTIVE = 'ACTIVE'
+FIRE_EVENT_INACTIVE = 'INACTIVE'
+
+# DET_MODE 상수
+DET_MODE_CONFIRMED = 1          # CONFIRMED만 양성
+DET_MODE_CONFIRMED_IR = 2       # CONFIRMED + IR_ONLY 양성
+
+# IR_ONLY 판정 위치를 영역으로 다룰 때 사용하는 마커 크기 (RGB 픽셀)
+IR_ONLY_MARKER = 30
+
+DEFAULT_FIRE_STATE = {
+    'NMS': 0.1,
+    'WINDOW': 50,
+    'THRESHOLD': 60,
+    'CONFIDENCE': 0.01,
+    'MIN_DUR': 10.0,
+    'ACTIVE_DUR': 2.0,
+    'INACTIVE_DUR': 10.0,
+    'DET_MODE': DET_MODE_CONFIRMED,
+}
+
+
+logger = logging.getLogger(__name__)
+
+
+class RingCounter:
+    """
+    고정 길이 0/1 링버퍼.
+    push와 ratio 모두 O(1)로 동작하도록 누적합을 함께 관리한다.
+    """
+
+    def __init__(self, size):
+        self.size = max(1, int(size))
+        self._buf = np.zeros(self.size, dtype=np.uint8)
+        self._idx = 0
+        self.count = 0
+        self.total = 0
+
+    def push(self, value):
+        value = 1 if value else 0
+        if self.count == self.size:
+            self.total -= int(self._buf[self._idx])
+        else:
+            self.count += 1
+        self._buf[self._idx] = value
+        self.total += value
+        self._idx = (self._idx + 1) % self.size
+
+    def ratio(self):
+        return self.total / self.count if self.count else 0.0
+
+
+class _FireRegion:
+    """추적 중인 화재 영역 하나의 상태"""
+
+    def __init__(self, region_id, bbox, window, now):
+        self.region_id = region_id
+        self.bbox = tuple(bbox)
+        self.track_id = None
+        self.ring = RingCounter(window)
+        self.active = False
+        self.hot_since = None
+        self.cold_since = None
+        self.activated_at = None
+        self.created_at = now
+        self.status = FIRE_IR_ONLY
+        self.max_temp = None
+
+
+class FireStateTracker:
+    """
+    FireFusion 결과의 시간 누적 상태 머신
+
+    사용법:
+        tracker = FireStateTracker.from_config(cfg.STATE.get('FIRE'))
+        events = tracker.update(fusion.fuse(hotspots, bboxes))
+        # events: 상태가 바뀐 영역만 [{'event': 'ACTIVE', ...}, ...]
+    """
+
+    def __init__(self, window=50, threshold=60, confidence=0.01, iou_thr=0.1,
+                 min_dur=10.0, active_dur=2.0, inactive_dur=10.0, det_mode=DET_MODE_CONFIRMED):
+        """
+        Args:
+            window: 영역별 링버퍼 길이 (프레임)
+            threshold: 양성 비율 임계값 (%, 1 이하면 비율)
+            confidence: 양성으로 인정할 최소 융합 신뢰도
+            iou_thr: 영역 연계 IoU 임계값
+            min_dur: ACTIVE 최소 유지 시간 (초)
+            active_dur: ACTIVE 전이에 필요한 지속 시간 (초)
+            inactive_dur: INACTIVE 전이에 필요한 지속 시간 (초)
+            det_mode: 1 = CONFIRMED만, 2 = CONFIRMED + IR_ONLY
+        """
+        self.window = max(1, int(window))
+        threshold = float(threshold)
+        self.threshold = threshold / 100.0 if threshold > 1.0 else threshold
+        self.confidence = float(confidence)
+        self.iou_thr = float(iou_thr)
+        self.min_dur = float(min_dur)
+        self.active_dur = float(active_dur)
+        self.inactive_dur = float(inactive_dur)
+        self.det_mode = int(det_mode)
+
+        self._regions = []
+        self._next_id = 1
+
+    @classmethod
+    def from_config(cls, fire_cfg=None):
+        """STATE.FIRE 설정 dict로 생성 (누락된 키는 기본값 사용)"""
+        cfg = dict(DEFAULT_FIRE_STATE)
+        cfg.update(fire_cfg or {})
+        return cls(
+            window=cfg['WINDOW'],
+            threshold=cfg['THRESHOLD'],
+            confidence=cfg['CONFIDENCE'],
+            iou_thr=cfg['NMS'],
+            min_dur=cfg['MIN_DUR'],
+            active_dur=cfg['ACTIVE_DUR'],
+            inactive_dur=cfg['INACTIVE_DUR'],
+            det_mode=cfg['DET_MODE'],
+        )
+
+    def _observations(self, fusion_result):
+        """융합 결과 details를 (bbox, status, temp, track_id) 관측 리스트로 변환"""
+        if not fusion_result:
+            return []
+        statuses = (FIRE_CONFIRMED,)
+        if self.det_mode == DET_MODE_CONFIRMED_IR:
+            statuses = (FIRE_CONFIRMED, FIRE_IR_ONLY)
+
+        obs = []
+        for det in fusion_result.get('details') or []:
+            status = det.get('status')
+            if status not in statuses or det.get('confidence', 0.0) < self.confidence:
+                continue
+            if status == FIRE_CONFIRMED:
+                bbox = tuple(det['eo_bbox'][:4])
+            else:
+                rx, ry = det['rgb_pos']
+                half = IR_ONLY_MARKER / 2
+                bbox = (rx - half, ry - half, IR_ONLY_MARKER, IR_ONLY_MARKER)
+            temp = det.get('temp')
+            track_id = det.get('track_id')
+
+            # 같은 bbox에 여러 hotspot이 매칭된 경우 하나로 합침 (최고 온도 유지)
+            for o in obs:
+                if bbox_iou(o['bbox'], bbox) >= max(self.iou_thr, 1e-6):
+                    if status == FIRE_CONFIRMED:
+                        o['status'] = FIRE_CONFIRMED
+                    if temp is not None and (o['temp'] is None or temp > o['temp']):
+                        o['temp'] = temp
+                    break
+            else:
+                obs.append({'bbox': bbox, 'status': status, 'temp': temp, 'track_id': track_id})
+        return obs
+
+    def _match(self, obs):
+        """관측과 기존 영역을 연계 (track_id 우선, 이후 IoU 내림차순 greedy)"""
+        assigned = {}
+        used = set()
+        by_track = {r.track_id: r for r in self._regions if r.track_id is not None}
+        for i, o in enumerate(obs):
+            region = by_track.get(o['track_id']) if o['track_id'] is not None else None
+            if region is not None and region.region_id not in used:
+                assigned[i] = region
+                used.add(region.region_id)
+
+        pairs = []
+        for i, o in enumerate(obs):
+            if i in assigned:
+                continue
+            for region in self._regions:
+                if region.region_id in used:
+                    continue
+                iou = bbox_iou(o['bbox'], region.bbox)
+                if iou >= self.iou_thr and iou > 0:
+                    pairs.append((iou, i, region))
+        pairs.sort(key=lambda p: p[0], reverse=True)
+        for _, i, region in pairs:
+            if i in assigned or region.region_id in used:
+                continue
+            assigned[i] = region
+            used.add(region.region_id)
+        return assigned
+
+    def _event(self, kind, region, now):
+        event = {
+            'event': kind,
+            'region_id': region.region_id,
+            'status': region.status,
+            'bbox': [float(v) for v in region.bbox],
+            'temp': None if region.max_temp is None else float(region.max_temp),
+            'ratio': round(region.ring.ratio(), 3),
+            'ts': now,
+        }
+        if region.track_id is not None:
+            event['track_id'] = region.track_id
+        if kind == FIRE_EVENT_INACTIVE and region.activated_at is not None:
+            event['duration'] = round(now - region.activated_at, 3)
+        return event
+
+    def update(self, fusion_result, now=None):
+        """
+        프레임 하나의 융합 결과를 누적하고 상태 전이 이벤트를 반환
+
+        Args:
+            fusion_result: FireFusion.fuse 반환 dict (None이면 음성 프레임)
+            now: 프레임 시각 (epoch 초, None이면 현재 시각)
+
+        Returns:
+            list: 이번 프레임에서 발생한 전이 이벤트 dict 리스트
+        """
+        now = time.time() if now is None else float(now)
+        obs = self._observations(fusion_result)
+        assigned = self._match(obs)
+        observed = set()
+
+        for i, o in enumerate(obs):
+            region = assigned.get(i)
+            if region is None:
+                region = _FireRegion(self._next_id, o['bbox'], self.window, now)
+                self._next_id += 1
+                self._regions.append(region)
+            region.bbox = o['bbox']
+            if o['track_id'] is not None:
+                region.track_id = o['track_id']
+            if o['status'] == FIRE_CONFIRMED:
+                region.status = FIRE_CONFIRMED
+            if o['temp'] is not None and (region.max_temp is None or o['temp'] > region.max_temp):
+                region.max_temp = o['temp']
+            observed.add(region.region_id)
+
+        events = []
+        survivors = []
+        for region in self._regions:
+            region.ring.push(region.region_id in observed)
+            hot = region.ring.ratio() >= self.threshold
+
+            if not region.active:
+                if hot:
+                    if region.hot_since is None:
+                        region.hot_since = now
+                    if now - region.hot_since >= self.active_dur:
+                        region.active = True
+                        region.activated_at = now
+                        region.cold_since = None
+                        events.append(self._event(FIRE_EVENT_ACTIVE, region, now))
+                else:
+                    region.hot_since = None
+            else:
+                if hot:
+                    region.cold_since = None
+                else:
+                    if region.cold_since is None:
+                        region.cold_since = now
+                    if (now - region.cold_since >= self.inactive_dur and
+                            now - region.activated_at >= self.min_dur):
+                        region.active = False
+                        region.hot_since = None
+                        events.append(self._event(FIRE_EVENT_INACTIVE, region, now))
+                        region.activated_at = None
+
+            # 비활성이고 윈도우에 양성이 하나도 없으면 추적 종료
+            if region.active or region.ring.total > 0:
+                survivors.append(region)
+        self._regions = survivors
+
+        for ev in events:
+            logger.info(
+                "[FIRE_STATE] %s region=%d status=%s temp=%s ratio=%.2f",
+                ev['event'], ev['region_id'], ev['status'], ev['temp'], ev['ratio'],
+            )
+        return events
+
+    def active_regions(self):
+        """현재 ACTIVE 상태인 영역 요약 리스트"""
+        return [
+            {
+                'region_id': r.region_id,
+                'status': r.status,
+                'bbox': [float(v) for v in r.bbox],
+                'temp': None if r.max_temp is None else float(r.max_temp),
+                'since': r.activated_at,
+            }
+            for r in self._regions if r.active
+        ]
+
+    def reset(self):
+        self._regions = []
@@ -0,0 +1,299 @@
+"""
+RGB/IR 프레임 쌍 동기화
+
+스트림마다 타임스탬프 순으로 정렬된 작은 링(TimedRing)을 두고, 기준 스트림(ref)의
+프레임마다 다른 스트림에서 가장 가까운 프레임을 bisect로 찾는다.
+sender(SYNC), capture.py, 캘리브레이션 라이브 수집, GUI가 같은 규칙으로 쌍을 만든다.
+
+매칭 정책 (policy):
+- 'nearest': 기준 프레임 전후 중 가까운 쪽. 상대 스트림에 기준 시각 이후 프레임이
+  들어와 더 가까운 후보가 나올 수 없을 때 확정한다 (결정적, 최대 한 프레임 대기)
+- 'previous': 기준 시각 이전(같은 시각 포함)의 마지막 프레임. 대기 없이 즉시 확정
+- 'interpolate': 'nearest'와 같이 확정하되 전후 두 프레임과 보간 가중치를 함께 제공
+
+카운터:
+- matched: 만들어진 쌍
+- dropped: 허용 오차(max_diff_ms) 안에 상대가 없어 버린 기준 프레임, 링에서 밀려난 프레임
+- stale: 이미 매칭이 끝난 시각보다 오래된(늦게 도착한) 프레임, ts 해석 실패
+"""
+
+import bisect
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+from .util import ts_to_epoch_ms
+
+
+SYNC_POLICIES = ('nearest', 'previous', 'interpolate')
+
+DEFAULT_SYNC = {
+    'ENABLED': False,
+    'MAX_DIFF_MS': 120,
+    'POLICY': 'nearest',
+    'HISTORY': 32,
+}
+
+
+class TimedRing:
+    """epoch ms 순으로 정렬된 고정 길이 (t, ts, item) 링"""
+
+    def __init__(self, maxlen=32):
+        self.maxlen = max(1, int(maxlen))
+        self.times = []
+        self.items = []
+        self.last_ts = None
+
+    def __len__(self):
+        return len(self.times)
+
+    def push(self, t, ts, item):
+        """
+        삽입 (순서가 뒤바뀐 프레임은 정렬 위치에 끼워 넣는다)
+
+        Returns:
+            int: 가득 차서 밀려난 항목 수
+        """
+        self.last_ts = ts
+        if not self.times or t >= self.times[-1]:
+            self.times.append(t)
+            self.items.append((ts, item))
+        else:
+            i = bisect.bisect_right(self.times, t)
+            self.times.insert(i, t)
+            self.items.insert(i, (ts, item))
+        evicted = len(self.times) - self.maxlen
+        if evicted > 0:
+            self.discard(evicted)
+            return evicted
+        return 0
+
+    def discard(self, n):
+        """앞(오래된 쪽)에서 n개 제거"""
+        del self.times[:n]
+        del self.items[:n]
+
+    def index_after(self, t):
+        """t보다 나중인 첫 항목 인덱스"""
+        return bisect.bisect_right(self.times, t)
+
+    def find(self, ts):
+        """같은 ts 문자열 항목 (없으면 None)"""
+        t = ts_to_epoch_ms(ts)
+        if t is None:
+            return None
+        i = bisect.bisect_left(self.times, t)
+        while i < len(self.times) and self.times[i] == t:
+            if self.items[i][0] == ts:
+                return self.items[i][1]
+            i += 1
+        return None
+
+    def latest_time(self):
+        return self.times[-1] if self.times else None
+
+
+@dataclass
+class SyncPair:
+    """동기화된 프레임 쌍 (기준 스트림 + 나머지 스트림마다 1개)"""
+    items: Dict[str, Any]                           # 스트림 이름 → 버퍼 항목
+    ts: Dict[str, Optional[str]]                    # 스트림 이름 → ts 문자열
+    diff_ms: Dict[str, float]                       # 스트림 이름 → 기준 시각 - 상대 시각 (ms)
+    # 'interpolate' 정책: 스트림 이름 → (이전 항목, 다음 항목, 다음 항목 가중치 0~1)
+    interp: Dict[str, Tuple[Any, Any, float]] = field(default_factory=dict)
+
+    def __getitem__(self, name):
+        return self.items[name]
+
+    @property
+    def max_diff_ms(self):
+        return max((abs(d) for d in self.diff_ms.values()), default=0.0)
+
+
+class FrameSynchronizer:
+    """
+    스트림 간 최근접 타임스탬프 매칭
+
+    사용:
+        sync = FrameSynchronizer(('rgb', 'ir'), max_diff_ms=80)
+        sync.push('rgb', rgb_item); sync.push('ir', ir_item)
+        pair = sync.poll()          # 확정된 가장 오래된 쌍 (없으면 None)
+        pair = sync.poll_latest()   # 확정된 쌍 중 최신 (나머지는 건너뜀)
+
+    항목은 (frame, ts, ...) 튜플이고, 다른 형태면 push(name, item, ts=...)로 ts를 준다.
+    exclusive=True면 상대 프레임도 한 번만 쓰고(capture.py), False면 여러 기준 프레임과
+    짝지을 수 있다 (IR 9fps vs RGB 30fps 실시간 전송).
+    """
+
+    def __init__(self, streams=('rgb', 'ir'), max_diff_ms=120, policy='nearest',
+                 history=32, ref=None, exclusive=False):
+        if policy not in SYNC_POLICIES:
+            raise ValueError(f"Unknown sync policy: {policy} (expected one of {SYNC_POLICIES})")
+        if len(streams) < 2:
+            raise ValueError("FrameSynchronizer needs at least two streams")
+        self.streams = tuple(streams)
+        self.ref = ref or self.streams[0]
+        if self.ref not in self.streams:
+            raise ValueError(f"Reference stream {self.ref} not in {self.streams}")
+        self.max_diff_ms = float(max_diff_ms) if max_diff_ms is not None else float('inf')
+        self.policy = policy
+        self.exclusive = bool(exclusive)
+        self.rings = {name: TimedRing(history) for name in self.streams}
+        self._matched_t = None
+        self.counters = {'matched': 0, 'dropped': 0, 'stale': 0}
+
+    @classmethod
+    def from_config(cls, sync_cfg, streams=('rgb', 'ir'), **kwargs):
+        """config.yaml SYNC 섹션으로 생성 (없는 키는 DEFAULT_SYNC)"""
+        cfg = dict(DEFAULT_SYNC)
+        cfg.update(sync_cfg or {})
+        return cls(
+            streams,
+            max_diff_ms=cfg['MAX_DIFF_MS'],
+            policy=str(cfg['POLICY']).lower(),
+            history=cfg['HISTORY'],
+            **kwargs,
+        )
+
+    def push(self, name, item, ts=None):
+        """
+        스트림에 항목 추가. 직전과 같은 ts는 무시한다.
+
+        Returns:
+            bool: 새 항목으로 추가되었는지
+        """
+        if item is None:
+            return False
+        if ts is None:
+            ts = item[1] if len(item) > 1 else None
+        ring = self.rings[name]
+        if ts is None or ts == ring.last_ts:
+            return False
+        t = ts_to_epoch_ms(ts)
+        if t is None or (name == self.ref and self._matched_t is not None and t <= self._matched_t):
+            self.counters['stale'] += 1
+            ring.last_ts = ts
+            return False
+        self.counters['dropped'] += ring.push(t, ts, item)
+        return True
+
+    def pull(self, buffers):
+        """{스트림 이름: DoubleBuffer}에서 최신 항목을 읽어 push (새 항목 수 반환)"""
+        n = 0
+        for name, buf in buffers.items():
+            if buf is not None and name in self.rings:
+                item = buf.read()
+                if item is not None and item[0] is not None and self.push(name, item):
+                    n += 1
+        return n
+
+    def _partner(self, ring, t):
+        """
+        기준 시각 t의 상대 인덱스 결정
+
+        Returns:
+            (idx, final): idx는 후보 인덱스(None이면 후보 없음), final은 확정 여부
+        """
+        if not ring.times:
+            return None, False
+        j = ring.index_after(t)
+        before = j - 1 if j > 0 else None
+        after = j if j < len(ring.times) else None
+        if self.policy == 'previous':
+            return before, True
+        if after is None:
+            # 기준 시각 이후 프레임이 아직 없으면 더 가까운 후보가 올 수 있다
+            return before, False
+        if before is None:
+            return after, True
+        if t - ring.times[before] <= ring.times[after] - t:
+            return before, True
+        return after, True
+
+    def _resolve(self):
+        """가장 오래된 기준 프레임 하나를 처리. 쌍/'drop'/None(대기) 반환"""
+        ref_ring = self.rings[self.ref]
+        if not ref_ring.times:
+            return None
+        t = ref_ring.times[0]
+        picks = {}
+        for name in self.streams:
+            if name == self.ref:
+                continue
+            ring = self.rings[name]
+            idx, final = self._partner(ring, t)
+            if idx is not None and abs(t - ring.times[idx]) > self.max_diff_ms:
+                idx = None
+            if idx is None:
+                # 상대 스트림이 기준 시각 + 허용 오차를 넘어섰으면 앞으로도 짝이 없다
+                latest = ring.latest_time()
+                if final or (latest is not None and latest > t + self.max_diff_ms):
+                    return 'drop'
+                return None
+            if not final:
+                # 아직 허용 오차 안의 이전 프레임뿐. 이후 프레임이 오거나 오차를 벗어나면 확정
+                return None
+            picks[name] = idx
+        return t, picks
+
+    def _emit(self, t, picks):
+        ref_ring = self.rings[self.ref]
+        ref_ts, ref_item = ref_ring.items[0]
+        ref_ring.discard(1)
+        items = {self.ref: ref_item}
+        ts_map = {self.ref: ref_ts}
+        diffs = {}
+        interp = {}
+        for name, idx in picks.items():
+            ring = self.rings[name]
+            ts, item = ring.items[idx]
+            items[name] = item
+            ts_map[name] = ts
+            diffs[name] = t - ring.times[idx]
+            if self.policy == 'interpolate':
+                interp[name] = self._interp(ring, t)
+            if self.exclusive:
+                # 매칭된 프레임과 그보다 오래된(짝을 못 찾은) 프레임 제거
+                self.counters['dropped'] += idx
+                ring.discard(idx + 1)
+            else:
+                # 이후 기준 프레임(t' > t)의 후보는 t 이전 마지막 프레임부터
+                ring.discard(max(0, ring.index_after(t) - 1))
+        self._matched_t = t
+        self.counters['matched'] += 1
+        return SyncPair(items=items, ts=ts_map, diff_ms=diffs, interp=interp)
+
+    def _interp(self, ring, t):
+        j = ring.index_after(t)
+        if j == 0 or j >= len(ring.times):
+            idx = min(max(j - 1, 0), len(ring.times) - 1)
+            item = ring.items[idx][1]
+            return item, item, 0.0
+        t0, t1 = ring.times[j - 1], ring.times[j]
+        w = (t - t0) / (t1 - t0) if t1 > t0 else 0.0
+        return ring.items[j - 1][1], ring.items[j][1], w
+
+    def poll(self):
+        """확정된 가장 오래된 쌍 (없으면 None). 짝이 없는 기준 프레임은 버린다"""
+        while True:
+            res = self._resolve()
+            if res is None:
+                return None
+            if res == 'drop':
+                self.rings[self.ref].discard(1)
+                self.counters['dropped'] += 1
+                continue
+            return self._emit(*res)
+
+    def poll_latest(self):
+        """확정된 쌍 중 가장 최신 (실시간 소비자용, 앞선 쌍은 건너뛴다)"""
+        latest = None
+        while True:
+            pair = self.poll()
+            if pair is None:
+                return latest
+            latest = pair
+
+    def stats(self):
+        out = dict(self.counters)
+        out['pending'] = {name: len(ring) for name, ring in self.rings.items()}
+        return out
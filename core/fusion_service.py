@@ -0,0 +1,352 @@
+"""
+공유 화재 융합 스테이지
+
+rgb_det / ir 버퍼를 소비해 새 프레임 쌍마다 FireFusion을 한 번만 수행하고,
+주석이 그려진 프레임과 화재 상태 전이 이벤트를 담은 FusionResult를
+전용 버퍼(buffers['fusion'])에 게시합니다. sender/GUI/디스플레이는 이 버퍼를 읽고,
+상태 전이 이벤트는 구독자별 큐로 전달되어 최신값 버퍼와 달리 유실되지 않습니다.
+
+검출 프레임에 뷰 변환(회전/반전)이 붙어 있으면 주석을 그리지 않은 센서 방향 프레임을
+그대로 두고, 소비자가 FusionResult.render(out_size)로 출력 해상도에서 회전+주석을 만든다.
+
+SYNC.ENABLED면 검출 프레임(기준)마다 FrameSynchronizer로 타임스탬프가 가장 가까운 IR 프레임을
+골라 융합하고, 아니면 최신 IR을 쓴다. 어느 쪽이든 FusionResult가 융합에 쓴 IR 항목(ir_item)과
+같은 ts의 RAW16 항목(ir16_item)을 함께 싣으므로, 소비자는 IR을 다시 짝짓지 않고 이것을
+보내거나 표시한다 (IR 영상/hotspot/최고 온도가 융합 상태·주석과 같은 IR 프레임).
+"""
+
+import os
+import json
+import time
+import queue
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .fire_fusion import FireFusion, apply_vis_mode, draw_fire_annotations, eo_fire_boxes
+from .fire_state import FireStateTracker
+from .frame_sync import FrameSynchronizer, TimedRing
+from .records import det_records, hotspot_records
+from .state import DEFAULT_LABEL_SCALE
+from .util import ts_to_epoch_ms
+from .view_transform import DET_META, IR_META, item_view, render_frame, view_size
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_EVENTS = {
+    'RECORD': False,                    # 상태 전이 이벤트 JSONL 기록 여부
+    'PATH': "logs/fire_events.jsonl",   # 기록 파일 경로
+}
+
+
+@dataclass
+class FusionResult:
+    """융합 스테이지 출력 (새 검출 프레임 또는 새 IR hotspot마다 1개)"""
+    seq: int                            # 게시 순번
+    det_ts: Optional[str]               # 검출 프레임 ts
+    ir_ts: Optional[str]                # 융합에 사용한 IR 프레임 ts
+    frame: Any                          # 주석이 그려진 검출 프레임 (BGR, view가 있으면 주석 없는 센서 방향)
+    detections: np.ndarray              # 원본 검출 DET_DTYPE 배열 (x, y, w, h, conf, cls, track_id)
+    fusion: Dict[str, Any]              # FireFusion.fuse 결과 (eo_annotations는 vis_mode 적용)
+    ir_hotspots: np.ndarray = field(default_factory=lambda: hotspot_records(None))  # HOTSPOT_DTYPE (센서 좌표)
+    events: List[dict] = field(default_factory=list)    # 이 결과에서 발생한 상태 전이
+    det_updated: bool = True            # 새 검출 프레임 여부 (False면 IR만 갱신)
+    vis_mode: str = "test"
+    latency_ms: float = 0.0             # 입력 수신 → 게시까지 처리 시간
+    view: Any = None                    # 검출 프레임 뷰 변환 (ViewTransform, 없으면 None)
+    label_scale: float = DEFAULT_LABEL_SCALE
+    ir_item: Any = None                 # 융합에 사용한 IR 버퍼 항목 (frame, ts, max_temp_info, hotspots, ...)
+    ir16_item: Any = None               # ir_item과 같은 ts의 RAW16 항목 (없으면 None)
+    sync_diff_ms: Optional[float] = None    # 검출 ts - IR ts (ms)
+    sync_stats: Optional[Dict[str, Any]] = None     # SYNC 사용 시 FrameSynchronizer 카운터
+
+    @property
+    def size(self):
+        """표시 방향 프레임 크기 (width, height)"""
+        return view_size(self.frame, self.view)
+
+    def render(self, out_size=None):
+        """
+        표시/전송용 프레임 (out_size=(w, h) 표시 방향 크기로 리사이즈)
+
+        뷰 변환이 있으면 출력 해상도에서 회전한 뒤 주석을 그 크기에 맞춰 그린다.
+        """
+        if self.frame is None or self.view is None:
+            return render_frame(self.frame, None, out_size)
+        img = self.view.render(self.frame, out_size)
+        anns = self.fusion.get('eo_annotations') or []
+        if anns:
+            k = img.shape[1] / float(self.size[0])
+            if k != 1.0:
+                anns = [dict(a, bbox=tuple(v * k for v in a['bbox'])) for a in anns]
+            draw_fire_annotations(
+                img, anns,
+                font_scale=self.label_scale * k,
+                thickness_scale=(self.label_scale / DEFAULT_LABEL_SCALE if DEFAULT_LABEL_SCALE else 1.0) * k,
+            )
+        return img
+
+
+class FusionService(threading.Thread):
+    """
+    융합 스테이지 스레드
+
+    - 검출 ts/IR ts/표시 모드/좌표 버전이 바뀔 때만 융합 (같은 쌍은 다시 계산하지 않음)
+    - CoordMapper는 좌표 버전/IR 크기/검출 프레임 크기가 바뀔 때만 재생성
+    - 화재 상태 추적은 새 검출 프레임에서만 누적
+    - 주석은 label_state 크기로 여기서 한 번만 그린다
+    - 입력 버퍼는 read_newer(seq)로 비파괴 구독 (sender/GUI/검출기의 read()와 경쟁하지 않음)
+    - 표시 모드는 시작 시 한 번 정하고(vis_mode, 없으면 FUSION_VIS_MODE) set_vis_mode()로 바꾼다
+    """
+
+    def __init__(self, det_buf, ir_buf, out_buf, coord_state=None, label_state=None,
+                 fire_state_cfg=None, name="Fusion", poll_timeout=0.05, vis_mode=None,
+                 sync_cfg=None, ir16_buf=None):
+        super().__init__(daemon=True, name=name)
+        self.det_buf = det_buf
+        self.ir_buf = ir_buf
+        self.out_buf = out_buf
+        self.coord_state = coord_state
+        self.label_state = label_state
+        self.fire_state = FireStateTracker.from_config(fire_state_cfg)
+        self.poll_timeout = poll_timeout
+        self.vis_mode = (vis_mode or os.getenv("FUSION_VIS_MODE", "test")).lower()
+        self.ir16_buf = ir16_buf
+        self.sync = None
+        if sync_cfg and sync_cfg.get('ENABLED'):
+            self.sync = FrameSynchronizer.from_config(sync_cfg, streams=('det', 'ir'))
+        self._ir16_ring = TimedRing(self.sync.rings['ir'].maxlen if self.sync else 32)
+        self._ir16_seq = 0
+        self._pair = (None, None)   # 마지막으로 융합한 (검출, IR) 쌍
+        self.stop_evt = threading.Event()
+
+        self._fusion = None
+        self._fusion_key = None
+        self._last_key = (None, None, None, None)
+        self._det_seq = 0
+        self._ir_seq = 0
+        self._det_item = None
+        self._ir_item = None
+        self._seq = 0
+        self._subs = []
+        self._subs_lock = threading.Lock()
+
+    def set_vis_mode(self, vis_mode):
+        """표시 모드 변경 (다음 루프부터 적용, 같은 쌍도 다시 그림)"""
+        self.vis_mode = (vis_mode or "test").lower()
+
+    # ----- 이벤트 구독 -----
+    def subscribe_events(self, maxsize=0):
+        """상태 전이 이벤트 구독 큐 생성 (구독 이후 이벤트를 빠짐없이 전달)"""
+        q = queue.Queue(maxsize=maxsize)
+        with self._subs_lock:
+            self._subs.append(q)
+        return q
+
+    def unsubscribe_events(self, q):
+        with self._subs_lock:
+            if q in self._subs:
+                self._subs.remove(q)
+
+    def _publish_events(self, events):
+        with self._subs_lock:
+            subs = list(self._subs)
+        for q in subs:
+            for ev in events:
+                try:
+                    q.put_nowait(ev)
+                except queue.Full:
+                    logger.warning("[Fusion] event subscriber queue full; event dropped: %s", ev.get('event'))
+
+    # ----- 처리 -----
+    def _mapper_fusion(self, ir_size, det_size, ir_view=None):
+        params, version = self.coord_state.get() if self.coord_state else ({}, 0)
+        key = (version, ir_size, det_size, ir_view)
+        if key != self._fusion_key:
+            self._fusion = FireFusion.from_params(ir_size, det_size, params, ir_view=ir_view)
+            self._fusion_key = key
+        return self._fusion
+
+    def process(self, det_item, ir_item, vis_mode="test", ir16_item=None):
+        """
+        검출/IR 항목 한 쌍 처리 (같은 쌍/모드/좌표 버전이면 None)
+
+        ir16_item: ir_item과 같은 프레임의 RAW16 항목 (결과에 그대로 싣는다)
+
+        Returns:
+            FusionResult or None
+        """
+        if not det_item or det_item[0] is None:
+            return None
+        det_ts = det_item[1] if len(det_item) > 1 else None
+        ir_ts = ir_item[1] if ir_item and len(ir_item) > 1 else None
+        coord_version = self.coord_state.get()[1] if self.coord_state else 0
+        key = (det_ts, ir_ts, vis_mode, coord_version)
+        if key == self._last_key:
+            return None
+        det_updated = det_ts != self._last_key[0]
+        self._last_key = key
+
+        t0 = time.perf_counter()
+        det_frame = det_item[0]
+        detections = det_records(det_item[2] if len(det_item) > 2 else None)
+        det_view = item_view(det_item, DET_META)
+        ir_hotspots = hotspot_records(None)
+        ir_size = (160, 120)
+        ir_view = None
+        if ir_item and ir_item[0] is not None:
+            ir_size = (ir_item[0].shape[1], ir_item[0].shape[0])
+            if len(ir_item) > 3:
+                ir_hotspots = hotspot_records(ir_item[3])
+            ir_view = item_view(ir_item, IR_META)
+
+        # 검출 좌표는 뷰 방향, hotspot은 IR 센서 방향 (IR 뷰 변환은 매퍼에서 합성)
+        fusion = self._mapper_fusion(ir_size, view_size(det_frame, det_view), ir_view)
+        fusion_result = fusion.fuse(ir_hotspots, eo_fire_boxes(detections))
+
+        events = []
+        det_ms, ir_ms = ts_to_epoch_ms(det_ts), ts_to_epoch_ms(ir_ts)
+        if det_updated:
+            events = self.fire_state.update(fusion_result, now=det_ms / 1000.0 if det_ms else None)
+
+        anns = apply_vis_mode(fusion_result.get('eo_annotations', []), vis_mode)
+        fusion_result['eo_annotations'] = anns
+        frame = det_frame
+        label_scale = self.label_state.get() if self.label_state else DEFAULT_LABEL_SCALE
+        if anns and det_view is None:
+            frame = draw_fire_annotations(
+                det_frame.copy(),
+                anns,
+                font_scale=label_scale,
+                thickness_scale=label_scale / DEFAULT_LABEL_SCALE if DEFAULT_LABEL_SCALE else 1.0,
+            )
+
+        self._seq += 1
+        return FusionResult(
+            seq=self._seq,
+            det_ts=det_ts,
+            ir_ts=ir_ts,
+            frame=frame,
+            detections=detections,
+            fusion=fusion_result,
+            ir_hotspots=ir_hotspots,
+            events=events,
+            det_updated=det_updated,
+            vis_mode=vis_mode,
+            latency_ms=(time.perf_counter() - t0) * 1000.0,
+            view=det_view,
+            label_scale=label_scale,
+            ir_item=ir_item if ir_item and ir_item[0] is not None else None,
+            ir16_item=ir16_item,
+            sync_diff_ms=det_ms - ir_ms if det_ms is not None and ir_ms is not None else None,
+            sync_stats=self.sync.stats() if self.sync is not None else None,
+        )
+
+    def _poll_inputs(self):
+        """
+        새 검출 프레임을 기다리고(최대 poll_timeout) IR/RAW16은 최신 항목만 확인
+
+        SYNC를 쓰면 새 항목을 동기화기에 넣는다.
+        """
+        entry = self.det_buf.read_newer(self._det_seq, timeout=self.poll_timeout)
+        if entry is not None:
+            self._det_seq, _, self._det_item = entry
+            if self.sync is not None and self._det_item and self._det_item[0] is not None:
+                self.sync.push('det', self._det_item)
+        if self.ir16_buf is not None:
+            entry = self.ir16_buf.read_newer(self._ir16_seq)
+            if entry is not None:
+                self._ir16_seq, _, item = entry
+                t = ts_to_epoch_ms(item[1]) if item and len(item) > 1 else None
+                if t is not None and item[1] != self._ir16_ring.last_ts:
+                    self._ir16_ring.push(t, item[1], item)
+        if self.ir_buf is not None:
+            entry = self.ir_buf.read_newer(self._ir_seq)
+            if entry is not None:
+                self._ir_seq, _, self._ir_item = entry
+                if self.sync is not None and self._ir_item and self._ir_item[0] is not None:
+                    self.sync.push('ir', self._ir_item)
+
+    def _pairs(self):
+        """
+        이번에 융합할 (검출, IR) 쌍 목록
+
+        SYNC: 확정된 쌍을 순서대로 (없으면 마지막 쌍을 다시 넣어 표시 모드/좌표 변경만 반영).
+        아니면 최신 검출 + 최신 IR.
+        """
+        if self.sync is None:
+            return [(self._det_item, self._ir_item)]
+        pairs = []
+        while True:
+            pair = self.sync.poll()
+            if pair is None:
+                break
+            pairs.append((pair['det'], pair['ir']))
+        if pairs:
+            self._pair = pairs[-1]
+            return pairs
+        return [self._pair]
+
+    def _ir16_for(self, ir_item):
+        """ir_item과 같은 ts의 RAW16 항목 (IRCamera는 RAW16을 먼저 기록하므로 최신 항목도 확인)"""
+        if self.ir16_buf is None or not ir_item or len(ir_item) < 2:
+            return None
+        item = self._ir16_ring.find(ir_item[1])
+        if item is None:
+            latest = self.ir16_buf.latest()
+            if latest and len(latest) > 1 and latest[1] == ir_item[1]:
+                item = latest
+        return item
+
+    def run(self):
+        logger.info("[Fusion] service started (vis_mode=%s, sync=%s)", self.vis_mode,
+                    "on" if self.sync is not None else "off")
+        while not self.stop_evt.is_set():
+            # 표시 모드/좌표 버전 변경은 새 입력 없이도 process()의 키 비교로 다시 그린다
+            self._poll_inputs()
+            for det_item, ir_item in self._pairs():
+                try:
+                    result = self.process(det_item, ir_item, self.vis_mode, self._ir16_for(ir_item))
+                except Exception as e:
+                    logger.exception("[Fusion] process failed: %s", e)
+                    time.sleep(self.poll_timeout)
+                    continue
+                if result is None:
+                    continue
+                self.out_buf.write(result)
+                if result.events:
+                    self._publish_events(result.events)
+        logger.info("[Fusion] service stopped")
+
+    def stop(self):
+        self.stop_evt.set()
+
+
+class EventRecorder(threading.Thread):
+    """상태 전이 이벤트를 JSONL 파일로 기록하는 구독자"""
+
+    def __init__(self, service, path, name="FireEventRecorder"):
+        super().__init__(daemon=True, name=name)
+        self.service = service
+        self.path = path
+        self.queue = service.subscribe_events()
+        self.stop_evt = threading.Event()
+
+    def run(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            while not self.stop_evt.is_set() or not self.queue.empty():
+                try:
+                    ev = self.queue.get(timeout=0.2)
+                except queue.Empty:
+                    continue
+                f.write(json.dumps(ev, ensure_ascii=True, default=float) + "\n")
+                f.flush()
+        self.service.unsubscribe_events(self.queue)
+
+    def stop(self):
+        self.stop_evt.set()
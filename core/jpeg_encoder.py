@@ -0,0 +1,242 @@
+"""
+JPEG 인코더 백엔드
+
+sender의 rgb_det/rgb 프레임 JPEG 압축을 교체 가능한 백엔드로 분리합니다.
+- opencv: cv2.imencode (기본, 모든 환경)
+- turbojpeg: PyTurboJPEG (libjpeg-turbo SIMD, 설치된 경우)
+- gstreamer: appsrc ! v4l2jpegenc ! appsink (i.MX8 VPU 하드웨어 인코더가 있을 때)
+
+create_jpeg_encoder('auto')는 시작 시 사용 가능한 백엔드를 테스트 프레임으로 인코딩해 보고
+가장 빠른 것을 고릅니다. 어떤 백엔드든 실패하면 OpenCV로 되돌아갑니다.
+"""
+
+import time
+import logging
+from collections import deque
+
+import cv2
+import numpy as np
+
+try:
+    from turbojpeg import TurboJPEG
+except ImportError:
+    TurboJPEG = None
+
+try:
+    import gi
+    gi.require_version('Gst', '1.0')
+    from gi.repository import Gst
+except (ImportError, ValueError):
+    Gst = None
+
+logger = logging.getLogger(__name__)
+
+
+JPEG_BACKENDS = ('opencv', 'turbojpeg', 'gstreamer')
+
+# 자동 선택 시 측정용 테스트 프레임 크기 (sender 기본 검출 프레임)
+PROBE_SIZE = (1920, 1080)
+
+
+class JpegEncoder:
+    """JPEG 인코더 공통 인터페이스 (encode 시간 통계 포함)"""
+
+    name = "base"
+
+    def __init__(self):
+        self._times_ms = deque(maxlen=100)
+        self.count = 0
+
+    def _encode(self, frame, quality):
+        raise NotImplementedError
+
+    def encode(self, frame, quality=70):
+        """
+        BGR uint8 프레임 → JPEG bytes
+
+        Raises:
+            RuntimeError: 인코딩 실패
+        """
+        t0 = time.perf_counter()
+        data = self._encode(np.ascontiguousarray(frame), int(quality))
+        self._times_ms.append((time.perf_counter() - t0) * 1000.0)
+        self.count += 1
+        return data
+
+    def avg_ms(self):
+        """최근 인코딩 평균 시간 (ms)"""
+        return sum(self._times_ms) / len(self._times_ms) if self._times_ms else 0.0
+
+    def close(self):
+        pass
+
+
+class OpenCVJpegEncoder(JpegEncoder):
+    name = "opencv"
+
+    def _encode(self, frame, quality):
+        ok, encoded = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if not ok:
+            raise RuntimeError("cv2.imencode failed")
+        return encoded.tobytes()
+
+
+class TurboJpegEncoder(JpegEncoder):
+    name = "turbojpeg"
+
+    def __init__(self):
+        super().__init__()
+        if TurboJPEG is None:
+            raise RuntimeError("PyTurboJPEG not installed")
+        self._tj = TurboJPEG()
+
+    def _encode(self, frame, quality):
+        if frame.ndim == 2:
+            frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+        return self._tj.encode(frame, quality=quality)
+
+
+class GstJpegEncoder(JpegEncoder):
+    """
+    GStreamer appsrc → JPEG 인코더 → appsink 동기 인코딩
+
+    프레임 크기나 품질이 바뀌면 파이프라인을 다시 만든다.
+    hardware_only=True면 v4l2jpegenc(VPU)가 없을 때 생성 실패.
+    """
+
+    name = "gstreamer"
+    HW_ELEMENT = "v4l2jpegenc"
+    SW_ELEMENT = "jpegenc"
+
+    def __init__(self, hardware_only=True, timeout_s=1.0):
+        super().__init__()
+        if Gst is None:
+            raise RuntimeError("GStreamer Python bindings (gi) not available")
+        Gst.init(None)
+        if Gst.ElementFactory.find(self.HW_ELEMENT) is not None:
+            self.element = self.HW_ELEMENT
+        elif not hardware_only and Gst.ElementFactory.find(self.SW_ELEMENT) is not None:
+            self.element = self.SW_ELEMENT
+        else:
+            raise RuntimeError(f"GStreamer element {self.HW_ELEMENT} not found")
+        self.name = f"gstreamer:{self.element}"
+        self.timeout_ns = int(timeout_s * Gst.SECOND)
+        self._pipeline = None
+        self._key = None
+        self._src = None
+        self._sink = None
+
+    def _enc_desc(self, quality):
+        if self.element == self.HW_ELEMENT:
+            return f"{self.element} extra-controls=\"c,compression_quality={quality}\""
+        return f"{self.element} quality={quality}"
+
+    def _build(self, w, h, quality):
+        self.close()
+        desc = (
+            f"appsrc name=src is-live=true format=time do-timestamp=true "
+            f"caps=video/x-raw,format=BGR,width={w},height={h},framerate=0/1 ! "
+            f"videoconvert ! {self._enc_desc(quality)} ! "
+            "appsink name=sink sync=false max-buffers=2 drop=false"
+        )
+        self._pipeline = Gst.parse_launch(desc)
+        self._src = self._pipeline.get_by_name("src")
+        self._sink = self._pipeline.get_by_name("sink")
+        if self._pipeline.set_state(Gst.State.PLAYING) == Gst.StateChangeReturn.FAILURE:
+            self.close()
+            raise RuntimeError(f"GStreamer pipeline failed to start: {desc}")
+        self._key = (w, h, quality)
+
+    def _encode(self, frame, quality):
+        if frame.ndim == 2:
+            frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+        h, w = frame.shape[:2]
+        if self._key != (w, h, quality):
+            self._build(w, h, quality)
+        ret = self._src.emit("push-buffer", Gst.Buffer.new_wrapped(frame.tobytes()))
+        if ret != Gst.FlowReturn.OK:
+            raise RuntimeError(f"appsrc push failed: {ret}")
+        sample = self._sink.emit("try-pull-sample", self.timeout_ns)
+        if sample is None:
+            raise RuntimeError("GStreamer JPEG encode timeout")
+        buf = sample.get_buffer()
+        ok, info = buf.map(Gst.MapFlags.READ)
+        if not ok:
+            raise RuntimeError("GStreamer buffer map failed")
+        try:
+            return bytes(info.data)
+        finally:
+            buf.unmap(info)
+
+    def close(self):
+        if self._pipeline is not None:
+            self._src.emit("end-of-stream")
+            self._pipeline.set_state(Gst.State.NULL)
+        self._pipeline = None
+        self._src = None
+        self._sink = None
+        self._key = None
+
+
+_FACTORIES = {
+    'opencv': OpenCVJpegEncoder,
+    'turbojpeg': TurboJpegEncoder,
+    'gstreamer': GstJpegEncoder,
+}
+
+
+def _probe(encoder, frame, quality, repeat=3):
+    """테스트 프레임 인코딩 평균 시간 (ms). 올바른 JPEG가 아니면 RuntimeError"""
+    data = encoder.encode(frame, quality)
+    if not data or data[:2] != b'\xff\xd8':
+        raise RuntimeError("encoder output is not a JPEG stream")
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        encoder.encode(frame, quality)
+    return (time.perf_counter() - t0) * 1000.0 / repeat
+
+
+def create_jpeg_encoder(backend='auto', quality=70, probe_size=PROBE_SIZE):
+    """
+    JPEG 인코더 생성
+
+    Args:
+        backend: 'auto' | 'opencv' | 'turbojpeg' | 'gstreamer'
+        quality: 자동 선택 측정에 사용할 JPEG 품질
+        probe_size: 측정용 테스트 프레임 크기 (width, height)
+
+    Returns:
+        JpegEncoder: 지정한 백엔드를 쓸 수 없으면 OpenCV 인코더
+    """
+    backend = (backend or 'auto').lower()
+    if backend != 'auto' and backend not in _FACTORIES:
+        raise ValueError(f"Unknown JPEG backend: {backend} (expected auto or one of {JPEG_BACKENDS})")
+
+    frame = np.zeros((probe_size[1], probe_size[0], 3), dtype=np.uint8)
+    cv2.randn(frame, (128, 128, 128), (40, 40, 40))
+    candidates = JPEG_BACKENDS if backend == 'auto' else (backend,)
+
+    best, best_ms = None, None
+    for name in candidates:
+        try:
+            encoder = _FACTORIES[name]()
+            ms = _probe(encoder, frame, quality)
+        except Exception as e:
+            logger.info("[JPEG] backend %s unavailable: %s", name, e)
+            continue
+        logger.info("[JPEG] backend %s: %.2fms @ %dx%d", encoder.name, ms, probe_size[0], probe_size[1])
+        if best is None or ms < best_ms:
+            if best is not None:
+                best.close()
+            best, best_ms = encoder, ms
+        else:
+            encoder.close()
+
+    if best is None:
+        logger.warning("[JPEG] backend %s unavailable, falling back to OpenCV", backend)
+        best = OpenCVJpegEncoder()
+    # 측정 샘플은 실제 프레임 통계에서 제외
+    best._times_ms.clear()
+    best.count = 0
+    logger.info("[JPEG] using %s encoder", best.name)
+    return best
@@ -0,0 +1,140 @@
+"""
+소스 루프 발행 속도 제한 / 프레임 지연 통계
+
+소스 루프는 장치가 프레임을 줄 때까지 블로킹(cap.read, queue.get)하고 바로 발행한다.
+읽은 뒤 고정 시간을 자는 방식(dyn_sleep)은 최대 한 프레임 주기의 지연을 더하고,
+슬립 주기와 장치 주기가 비슷하면 맥놀이로 프레임을 건너뛴다.
+
+- RateLimiter.admit(): 장치 구동 소스용. 실제 장치 프레임 간격(cadence)을 측정해 두고
+  발행 간격 크레딧이 차면 통과 (장치보다 느린 상한일 때만 프레임을 건너뛴다)
+- RateLimiter.wait(): 합성 소스(mock/video)용. 읽기 후 슬립이 아니라 마감 시각 기준으로
+  다음 프레임 시점까지 기다린다 (처리 시간이 누적되지 않음)
+- SourceStats: 발행 시점 프레임 나이(획득 → 버퍼 쓰기), 발행 FPS, 건너뛴 수 집계/주기 로그
+"""
+
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """
+    발행 속도 상한 (interval 초, 0이면 제한 없음)
+
+    max_fps > 0이면 interval = 1 / max_fps. cadence는 admit()에 들어온 장치 프레임 간격 EMA(초).
+    """
+
+    def __init__(self, max_fps=0, interval=None, alpha=0.1):
+        if interval is None:
+            interval = 1.0 / float(max_fps) if max_fps and float(max_fps) > 0 else 0.0
+        self.interval = max(0.0, float(interval or 0.0))
+        self.alpha = alpha
+        self.cadence = None
+        self._last_arrival = None
+        self._credit = None
+        self._next = None
+
+    @property
+    def enabled(self):
+        return self.interval > 0
+
+    def admit(self, now=None):
+        """장치 프레임 도착 기록 + 발행 여부"""
+        now = time.monotonic() if now is None else now
+        if self._last_arrival is not None:
+            dt = now - self._last_arrival
+            if dt > 0:
+                self.cadence = dt if self.cadence is None else self.cadence + self.alpha * (dt - self.cadence)
+                if self._credit is not None:
+                    self._credit = min(self._credit + dt, self.interval)
+        self._last_arrival = now
+        if not self.enabled:
+            return True
+        if self._credit is None:
+            self._credit = self.interval
+        # 장치 주기의 절반까지는 일찍 와도 통과 (주기 ≈ 상한일 때 맥놀이 드롭 방지)
+        tol = 0.5 * (self.cadence or 0.0)
+        if self._credit + tol >= self.interval:
+            self._credit = max(self._credit - self.interval, -tol)
+            return True
+        return False
+
+    def wait(self, stop_event=None):
+        """다음 발행 시점까지 대기 (interval 0이면 즉시 반환). 늦어졌으면 따라잡지 않고 재정렬"""
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        if self._next is None:
+            self._next = now
+        delay = self._next - now
+        if delay > 0:
+            if stop_event is not None:
+                stop_event.wait(delay)
+            else:
+                time.sleep(delay)
+        self._next = max(self._next + self.interval, time.monotonic() - self.interval)
+
+
+class SourceStats:
+    """
+    소스 발행 통계 (스레드 안전)
+
+    record(frame_time): 발행 직전 호출, frame_time은 프레임 획득 시각 (time.monotonic 기준).
+    log_every초마다 '[name] fps/age/drop' 로그를 남기고 윈도우를 초기화한다 (0이면 로그 없음).
+    """
+
+    def __init__(self, name, log_every=10.0, log=None):
+        self.name = name
+        self.log_every = log_every
+        self._log = log or logger.info
+        self._lock = threading.Lock()
+        self.total = 0
+        self.last_age_ms = None
+        self._reset(time.monotonic())
+
+    def _reset(self, now):
+        self._win_start = now
+        self._count = 0
+        self._dropped = 0
+        self._age_sum = 0.0
+        self._age_max = 0.0
+
+    def drop(self):
+        """속도 제한으로 건너뛴 프레임"""
+        with self._lock:
+            self._dropped += 1
+
+    def record(self, frame_time, cadence=None, now=None):
+        now = time.monotonic() if now is None else now
+        age_ms = max(0.0, (now - frame_time) * 1000.0) if frame_time is not None else 0.0
+        with self._lock:
+            self.total += 1
+            self.last_age_ms = age_ms
+            self._count += 1
+            self._age_sum += age_ms
+            self._age_max = max(self._age_max, age_ms)
+            if not self.log_every or now - self._win_start < self.log_every:
+                return age_ms
+            snap = self._snapshot(now, cadence)
+            self._reset(now)
+        self._log("[%s] fps=%.1f age avg=%.1fms max=%.1fms dropped=%d%s" % (
+            self.name, snap['fps'], snap['age_avg_ms'], snap['age_max_ms'], snap['dropped'],
+            f" cadence={snap['cadence_ms']:.1f}ms" if snap['cadence_ms'] is not None else ""))
+        return age_ms
+
+    def _snapshot(self, now, cadence=None):
+        elapsed = max(1e-6, now - self._win_start)
+        return {
+            'fps': self._count / elapsed,
+            'age_avg_ms': self._age_sum / self._count if self._count else 0.0,
+            'age_max_ms': self._age_max,
+            'dropped': self._dropped,
+            'cadence_ms': cadence * 1000.0 if cadence else None,
+        }
+
+    def snapshot(self, cadence=None):
+        """현재 윈도우 통계 dict (fps, age_avg_ms, age_max_ms, dropped, cadence_ms)"""
+        with self._lock:
+            return self._snapshot(time.monotonic(), cadence)
@@ -0,0 +1,125 @@
+"""
+검출/hotspot 구조화 배열 (numpy structured array) 레코드
+
+검출기 디코딩 → 트래커 → 융합 → 송신까지 검출과 IR hotspot을 프레임마다 파이썬 튜플 리스트로
+만들지 않고 고정 dtype의 구조화 배열 하나로 전달한다 (필터/좌표 변환은 열 단위 벡터 연산).
+레코드는 튜플처럼 인덱싱/언패킹되므로 det[5], (x, y, temp, temp_raw) 형태의 기존 코드도 동작한다.
+
+- DET_DTYPE: (x, y, w, h, conf, cls, track_id), 좌표는 뷰 픽셀 xywh, track_id -1 = 미추적
+- EO_BOX_DTYPE: 융합 입력 화염 bbox (x, y, w, h, conf, track_id)
+- HOTSPOT_DTYPE: (x, y, temp, temp_raw), IR 센서 픽셀 좌표 / 섭씨
+
+dtype은 모두 little-endian으로 고정되어 있어 tobytes()가 그대로 전송 형식이 된다
+(pack_records/unpack_records: {'fields', 'count', 'data_b64'} JSON 엔트리).
+"""
+
+import base64
+
+import numpy as np
+
+
+DET_DTYPE = np.dtype([
+    ('x', '<f8'), ('y', '<f8'), ('w', '<f8'), ('h', '<f8'),
+    ('conf', '<f8'), ('cls', '<i4'), ('track_id', '<i4'),
+])
+EO_BOX_DTYPE = np.dtype([
+    ('x', '<f8'), ('y', '<f8'), ('w', '<f8'), ('h', '<f8'),
+    ('conf', '<f8'), ('track_id', '<i4'),
+])
+HOTSPOT_DTYPE = np.dtype([
+    ('x', '<f8'), ('y', '<f8'), ('temp', '<f8'), ('temp_raw', '<f8'),
+])
+
+NO_TRACK = -1
+
+
+def _records(rows, dtype, defaults):
+    """튜플 리스트(필드 일부 생략/None 가능) 또는 구조화 배열 → dtype 배열"""
+    if isinstance(rows, np.ndarray) and rows.dtype == dtype:
+        return rows
+    if rows is None:
+        return np.zeros(0, dtype)
+    if isinstance(rows, np.ndarray) and rows.dtype.names:
+        out = np.zeros(len(rows), dtype)
+        for name in dtype.names:
+            if name in rows.dtype.names:
+                out[name] = rows[name]
+            else:
+                out[name] = defaults.get(name, 0)
+        return out
+    n_fields = len(dtype.names)
+    tail = tuple(defaults.get(name, 0) for name in dtype.names)
+    out = np.zeros(len(rows), dtype)
+    for i, row in enumerate(rows):
+        row = tuple(row)[:n_fields]
+        row = row + tail[len(row):]
+        out[i] = tuple(tail[k] if v is None else v for k, v in enumerate(row))
+    return out
+
+
+def det_records(rows):
+    """[(x, y, w, h, conf, cls[, track_id]), ...] 또는 구조화 배열 → DET_DTYPE 배열"""
+    return _records(rows, DET_DTYPE, {'track_id': NO_TRACK})
+
+
+def eo_box_records(rows):
+    """[(x, y, w, h, conf[, track_id]), ...] 또는 구조화 배열 → EO_BOX_DTYPE 배열"""
+    return _records(rows, EO_BOX_DTYPE, {'track_id': NO_TRACK})
+
+
+def hotspot_records(rows):
+    """[(x, y, temp, temp_raw), ...] 또는 구조화 배열 → HOTSPOT_DTYPE 배열"""
+    return _records(rows, HOTSPOT_DTYPE, {})
+
+
+def dets_from_xyxy(scores, boxes_xyxy, classes):
+    """검출기 출력 (scores, boxes_xyxy, classes) → DET_DTYPE 배열 (track_id 없음)"""
+    boxes = np.asarray(boxes_xyxy, dtype=np.float64).reshape(-1, 4)
+    n = len(boxes)
+    out = np.empty(n, DET_DTYPE)
+    out['x'] = boxes[:, 0]
+    out['y'] = boxes[:, 1]
+    out['w'] = boxes[:, 2] - boxes[:, 0]
+    out['h'] = boxes[:, 3] - boxes[:, 1]
+    scores = np.asarray(scores, dtype=np.float64).reshape(-1)[:n]
+    classes = np.asarray(classes).reshape(-1)[:n]
+    out['conf'] = 0.0
+    out['conf'][:len(scores)] = scores
+    out['cls'] = 0
+    out['cls'][:len(classes)] = classes
+    out['track_id'] = NO_TRACK
+    return out
+
+
+def xywh(records):
+    """레코드 배열의 (N, 4) float64 [x, y, w, h]"""
+    return np.column_stack([records['x'], records['y'], records['w'], records['h']]).astype(np.float64, copy=False)
+
+
+def track_id_or_none(track_id):
+    track_id = int(track_id)
+    return None if track_id == NO_TRACK else track_id
+
+
+def pack_records(records):
+    """구조화 배열 → 전송 엔트리 {'fields': [[name, '<f8'], ...], 'count': N, 'data_b64': ...}"""
+    records = np.ascontiguousarray(records)
+    return {
+        'fields': [[name, records.dtype[name].str] for name in records.dtype.names],
+        'count': int(len(records)),
+        'data_b64': base64.b64encode(records.tobytes()).decode('ascii'),
+    }
+
+
+def unpack_records(entry):
+    """pack_records 엔트리 → 구조화 배열 (형식이 맞지 않으면 None)"""
+    if not isinstance(entry, dict) or not all(k in entry for k in ('fields', 'count', 'data_b64')):
+        return None
+    try:
+        dtype = np.dtype([(str(name), str(fmt)) for name, fmt in entry['fields']])
+        raw = base64.b64decode(entry['data_b64'])
+        if len(raw) != dtype.itemsize * int(entry['count']):
+            return None
+        return np.frombuffer(raw, dtype=dtype).copy()
+    except (TypeError, ValueError):
+        return None
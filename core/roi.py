@@ -0,0 +1,108 @@
+"""
+IR 유도 ROI(관심 영역) 추론 모듈
+
+IR hotspot 위치를 RGB 프레임 좌표로 변환하고, 그 주변을 원본 해상도로
+잘라낸 윈도우 목록을 만듭니다. 검출기는 전체 프레임을 모델 입력 크기로
+축소하는 대신 이 윈도우들을 추론하여 작은 원거리 화염의 재현율을 높입니다.
+
+윈도우 형식: (x0, y0, x1, y1) 정수 픽셀, 프레임 내부로 클리핑됨
+"""
+
+import numpy as np
+
+from .coord_mapper import CoordMapper
+from .records import hotspot_records
+
+
+DEFAULT_ROI = {
+    'ENABLED': False,       # ROI 추론 사용 여부
+    'FULL_INTERVAL': 5,     # hotspot이 있을 때 전체 프레임 추론 주기 (프레임)
+    'SIZE': None,           # ROI 윈도우 크기 [w, h] (None이면 모델 입력 크기)
+    'PAD': 64,              # hotspot이 윈도우 가장자리에서 떨어져야 하는 최소 거리 (px)
+    'MAX_ROIS': 4,          # 프레임당 최대 ROI 수
+    'MODEL': None,          # ROI 전용 소형 모델 경로 (None이면 메인 모델 사용)
+}
+
+
+def hotspots_to_frame(hotspots, ir_size, frame_size, coord_params=None, ir_view=None):
+    """
+    IR hotspot을 검출기 입력 프레임 좌표로 변환 (온도 내림차순)
+
+    sender/GUI 융합과 같은 방식으로 실제 프레임 크기 기준 CoordMapper를 사용한다.
+
+    Args:
+        hotspots: HOTSPOT_DTYPE 배열 또는 [(x, y, temp, temp_raw), ...] IR 좌표
+        ir_size: IR 프레임 크기 (width, height)
+        frame_size: RGB 프레임 크기 (width, height)
+        coord_params: COORD 파라미터 dict (None이면 기본값)
+        ir_view: IR 뷰 변환 (hotspot이 센서 방향 좌표일 때)
+
+    Returns:
+        np.ndarray: (N, 2) 프레임 좌표
+    """
+    if hotspots is None or len(hotspots) == 0:
+        return np.zeros((0, 2), dtype=np.float64)
+    hot = hotspot_records(hotspots)
+    mapper = CoordMapper.from_params(ir_size, frame_size, coord_params, ir_view=ir_view)
+    order = np.argsort(-hot['temp'], kind='stable')
+    return mapper.ir_to_rgb_many(np.column_stack([hot['x'][order], hot['y'][order]]), pixels=True)
+
+
+def _window_around(cx, cy, roi_w, roi_h, frame_w, frame_h):
+    """(cx, cy) 중심 윈도우를 프레임 안으로 이동 (크기는 유지, 프레임보다 크면 클리핑)"""
+    roi_w = min(roi_w, frame_w)
+    roi_h = min(roi_h, frame_h)
+    x0 = int(round(cx - roi_w / 2))
+    y0 = int(round(cy - roi_h / 2))
+    x0 = max(0, min(frame_w - roi_w, x0))
+    y0 = max(0, min(frame_h - roi_h, y0))
+    return (x0, y0, x0 + roi_w, y0 + roi_h)
+
+
+def hotspot_rois(points, frame_size, roi_size, pad=64, max_rois=4):
+    """
+    hotspot 좌표를 덮는 ROI 윈도우 목록 생성
+
+    앞쪽(뜨거운) 점부터 윈도우를 만들고, 이미 어떤 윈도우의 가장자리에서
+    pad 이상 안쪽에 있는 점은 새 윈도우를 만들지 않는다.
+
+    Args:
+        points: (N, 2) 프레임 좌표 (우선순위 순)
+        frame_size: (width, height)
+        roi_size: (width, height)
+        pad: 윈도우 가장자리 여유 (px)
+        max_rois: 최대 윈도우 수
+
+    Returns:
+        list: [(x0, y0, x1, y1), ...]
+    """
+    frame_w, frame_h = frame_size
+    roi_w, roi_h = roi_size
+    rois = []
+    for x, y in np.asarray(points, dtype=np.float64).reshape(-1, 2):
+        if not (0 <= x < frame_w and 0 <= y < frame_h):
+            continue
+        covered = False
+        for x0, y0, x1, y1 in rois:
+            # 프레임 경계에 붙은 변은 여유 없이도 덮인 것으로 본다
+            px0 = 0 if x0 == 0 else pad
+            py0 = 0 if y0 == 0 else pad
+            px1 = 0 if x1 == frame_w else pad
+            py1 = 0 if y1 == frame_h else pad
+            if x0 + px0 <= x <= x1 - px1 and y0 + py0 <= y <= y1 - py1:
+                covered = True
+                break
+        if covered:
+            continue
+        rois.append(_window_around(x, y, roi_w, roi_h, frame_w, frame_h))
+        if len(rois) >= max_rois:
+            break
+    return rois
+
+
+def offset_boxes(boxes_xyxy, x0, y0):
+    """ROI 좌표계 xyxy bbox를 프레임 좌표계로 이동"""
+    boxes = np.asarray(boxes_xyxy, dtype=np.float32).reshape(-1, 4).copy()
+    boxes[:, [0, 2]] += x0
+    boxes[:, [1, 3]] += y0
+    return boxes
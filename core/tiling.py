@@ -0,0 +1,80 @@
+"""
+타일(슬라이스) 추론 모듈
+
+고해상도 프레임(예: 1920x1080)을 모델 입력 크기의 겹치는 타일로 나누어
+letterbox 축소 없이 추론하기 위한 타일 격자와 타일 스케줄러를 제공합니다.
+
+타일 형식: (x0, y0, x1, y1) 정수 픽셀
+"""
+
+import math
+
+
+DEFAULT_TILE = {
+    'ENABLED': False,       # 타일 추론 사용 여부
+    'SIZE': None,           # 타일 크기 [w, h] (None이면 모델 입력 크기)
+    'OVERLAP': 0.2,         # 인접 타일 겹침 비율 (0~0.9)
+    'TILES_PER_FRAME': 0,   # 프레임당 추론 타일 수 (0 = 전체 타일)
+}
+
+
+def _axis_starts(length, tile, overlap):
+    """한 축의 타일 시작 좌표 (마지막 타일은 끝에 맞춤)"""
+    if tile >= length:
+        return [0]
+    stride = max(1, int(round(tile * (1.0 - overlap))))
+    n = int(math.ceil((length - tile) / stride)) + 1
+    starts = [min(i * stride, length - tile) for i in range(n)]
+    # 마지막 타일이 끝에 맞춰지면서 생기는 중복 제거
+    return sorted(set(starts))
+
+
+def tile_grid(frame_size, tile_size, overlap=0.2):
+    """
+    프레임을 겹치는 타일로 분할
+
+    Args:
+        frame_size: (width, height)
+        tile_size: (width, height), 프레임보다 크면 프레임 크기로 제한
+        overlap: 겹침 비율
+
+    Returns:
+        list: 행 우선 [(x0, y0, x1, y1), ...]
+    """
+    frame_w, frame_h = frame_size
+    tile_w = min(int(tile_size[0]), frame_w)
+    tile_h = min(int(tile_size[1]), frame_h)
+    overlap = min(max(float(overlap), 0.0), 0.9)
+    xs = _axis_starts(frame_w, tile_w, overlap)
+    ys = _axis_starts(frame_h, tile_h, overlap)
+    return [(x, y, x + tile_w, y + tile_h) for y in ys for x in xs]
+
+
+class TileScheduler:
+    """
+    프레임당 일부 타일만 순환 추론하여 지연 시간 상한을 두는 스케줄러
+
+    per_frame=0이면 매 프레임 전체 타일. 그 외에는 라운드로빈으로
+    per_frame개씩 선택하므로 ceil(n / per_frame) 프레임마다 전체를 한 바퀴 돈다.
+    """
+
+    def __init__(self, n_tiles, per_frame=0):
+        self.n_tiles = max(0, int(n_tiles))
+        per_frame = int(per_frame or 0)
+        self.per_frame = self.n_tiles if per_frame <= 0 else min(per_frame, self.n_tiles)
+        self._cursor = 0
+
+    @property
+    def cycle_frames(self):
+        """전체 타일을 한 번씩 추론하는 데 걸리는 프레임 수"""
+        if not self.per_frame:
+            return 0
+        return int(math.ceil(self.n_tiles / self.per_frame))
+
+    def next(self):
+        """이번 프레임에 추론할 타일 인덱스 리스트"""
+        if not self.n_tiles:
+            return []
+        idx = [(self._cursor + i) % self.n_tiles for i in range(self.per_frame)]
+        self._cursor = (self._cursor + self.per_frame) % self.n_tiles
+        return idx
@@ -0,0 +1,266 @@
+"""
+EO 화염 bbox 추적 모듈
+
+TFLiteWorker의 프레임별 detections를 IoU 기반으로 프레임 간 연계하여
+안정적인 track_id를 부여합니다. 추적 결과를 이용해 키프레임 사이에는
+전체 추론 대신 bbox를 속도 기반으로 전파(propagation)할 수 있습니다.
+
+detections 형식 (core.records.DET_DTYPE 구조화 배열):
+- 입력: (x, y, w, h, conf, cls[, track_id]) 레코드 (튜플 리스트도 허용)
+- 출력: track_id를 채운 DET_DTYPE 배열
+"""
+
+import cv2
+import numpy as np
+
+from .coord_mapper import bbox_iou_matrix
+from .records import DET_DTYPE, det_records, hotspot_records, xywh
+
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:  # scipy 미설치 시 greedy 매칭 사용
+    linear_sum_assignment = None
+
+
+DEFAULT_TRACK = {
+    'IOU_THR': 0.3,             # 트랙-검출 연계 최소 IoU
+    'MAX_MISSES': 5,            # 연속 미검출 허용 키프레임 수
+    'KEYFRAME_INTERVAL': 1,     # K프레임마다 전체 추론 (1 = 매 프레임 추론)
+    'MOTION_THR': 6.0,          # 썸네일 평균 밝기 차이 임계값 (0~255, 0이면 비활성)
+    'IR_DELTA': 5.0,            # IR 최고 온도 변화 임계값 (섭씨, 0이면 비활성)
+}
+
+# 모션 감지용 썸네일 크기 (width, height)
+MOTION_THUMB_SIZE = (64, 36)
+
+
+def assign_iou(iou, iou_thr):
+    """
+    IoU 행렬로 트랙-검출 1:1 할당
+
+    scipy가 있으면 Hungarian(linear_sum_assignment), 없으면 IoU 내림차순 greedy.
+
+    Args:
+        iou: (T, D) IoU 행렬
+        iou_thr: 최소 IoU
+
+    Returns:
+        list: [(track_idx, det_idx), ...]
+    """
+    if iou.size == 0:
+        return []
+    if linear_sum_assignment is not None:
+        rows, cols = linear_sum_assignment(-iou)
+        return [(int(r), int(c)) for r, c in zip(rows, cols) if iou[r, c] >= iou_thr]
+
+    pairs = []
+    order = np.argsort(-iou, axis=None, kind='stable')
+    used_t = set()
+    used_d = set()
+    n_det = iou.shape[1]
+    for flat in order:
+        t, d = divmod(int(flat), n_det)
+        if iou[t, d] < iou_thr:
+            break
+        if t in used_t or d in used_d:
+            continue
+        used_t.add(t)
+        used_d.add(d)
+        pairs.append((t, d))
+    return pairs
+
+
+class _Track:
+    __slots__ = ('track_id', 'bbox', 'vel', 'conf', 'cls', 'hits', 'misses', 'since_update')
+
+    def __init__(self, track_id, bbox, conf, cls):
+        self.track_id = track_id
+        self.bbox = np.array(bbox, dtype=np.float64)
+        self.vel = np.zeros(2, dtype=np.float64)
+        self.conf = float(conf)
+        self.cls = int(cls)
+        self.hits = 1
+        self.misses = 0
+        self.since_update = 0
+
+
+class IoUTracker:
+    """
+    IoU 연계 기반 경량 다중 객체 추적기
+
+    사용법:
+        tracker = IoUTracker()
+        dets = tracker.update(detections)   # 키프레임: 검출 결과 연계
+        dets = tracker.predict()            # 비키프레임: 속도 기반 bbox 전파
+    """
+
+    def __init__(self, iou_thr=0.3, max_misses=5, vel_alpha=0.5):
+        """
+        Args:
+            iou_thr: 트랙-검출 연계 최소 IoU
+            max_misses: 연속 미검출 키프레임이 이 값을 넘으면 트랙 삭제
+            vel_alpha: 속도 EMA 계수
+        """
+        self.iou_thr = float(iou_thr)
+        self.max_misses = int(max_misses)
+        self.vel_alpha = float(vel_alpha)
+        self._tracks = []
+        self._next_id = 1
+
+    def update(self, detections):
+        """
+        새 검출 결과를 기존 트랙과 연계
+
+        Args:
+            detections: DET_DTYPE 배열 또는 [(x, y, w, h, conf, cls), ...]
+
+        Returns:
+            np.ndarray: 입력 순서 그대로 track_id를 채운 DET_DTYPE 배열
+        """
+        dets = det_records(detections)
+        out = dets.copy()
+        boxes = xywh(dets)
+        tracks = self._tracks
+
+        matched = {}
+        if tracks and len(dets):
+            # 예측 위치 기준으로 연계 (같은 클래스끼리만)
+            iou = bbox_iou_matrix([t.bbox for t in tracks], boxes)
+            t_cls = np.array([t.cls for t in tracks])
+            iou[t_cls[:, None] != dets['cls'][None, :]] = 0.0
+            for t_idx, d_idx in assign_iou(iou, self.iou_thr):
+                matched[d_idx] = tracks[t_idx]
+
+        updated = set()
+        for i in range(len(dets)):
+            track = matched.get(i)
+            if track is None:
+                track = _Track(self._next_id, boxes[i], dets['conf'][i], dets['cls'][i])
+                self._next_id += 1
+                tracks.append(track)
+            else:
+                new_bbox = boxes[i]
+                # 마지막 키프레임 이후 경과 프레임 수 (전파 프레임 + 현재 프레임)
+                steps = track.since_update + 1
+                prev = track.bbox - np.concatenate([track.vel * track.since_update, (0.0, 0.0)])
+                vel = (new_bbox[:2] - prev[:2]) / steps
+                track.vel = self.vel_alpha * vel + (1.0 - self.vel_alpha) * track.vel
+                track.bbox = new_bbox.copy()
+                track.conf = float(dets['conf'][i])
+                track.hits += 1
+                track.misses = 0
+            track.since_update = 0
+            updated.add(track.track_id)
+            out['track_id'][i] = track.track_id
+
+        survivors = []
+        for track in tracks:
+            if track.track_id not in updated:
+                track.misses += 1
+                track.since_update = 0
+                track.vel[:] = 0.0
+            if track.misses <= self.max_misses:
+                survivors.append(track)
+        self._tracks = survivors
+        return out
+
+    def predict(self):
+        """
+        추론 없이 트랙 bbox를 한 프레임만큼 전파
+
+        Returns:
+            np.ndarray: 최근 키프레임에서 검출된 트랙의 DET_DTYPE 배열
+        """
+        live = [t for t in self._tracks if not t.misses]
+        out = np.empty(len(live), DET_DTYPE)
+        for i, track in enumerate(live):
+            track.bbox[:2] += track.vel
+            track.since_update += 1
+            out[i] = (*track.bbox, track.conf, track.cls, track.track_id)
+        return out
+
+    def reset(self):
+        self._tracks = []
+
+
+class KeyframeScheduler:
+    """
+    전체 추론이 필요한 프레임(키프레임)인지 판정
+
+    다음 중 하나라도 만족하면 키프레임:
+    - 마지막 키프레임 이후 interval 프레임 경과
+    - 썸네일 평균 밝기 차이가 motion_thr 이상 (장면 변화)
+    - IR hotspot 개수 변화 또는 최고 온도 변화가 ir_delta 이상
+    """
+
+    def __init__(self, interval=1, motion_thr=6.0, ir_delta=5.0):
+        self.interval = max(1, int(interval))
+        self.motion_thr = float(motion_thr or 0.0)
+        self.ir_delta = float(ir_delta or 0.0)
+        self._since_key = 0
+        self._key_thumb = None
+        self._key_ir = None
+        self.keyframes = 0
+        self.propagated = 0
+
+    @staticmethod
+    def _thumb(frame):
+        if frame.ndim == 3:
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        return cv2.resize(frame, MOTION_THUMB_SIZE, interpolation=cv2.INTER_AREA)
+
+    @staticmethod
+    def _ir_signature(hotspots):
+        if hotspots is None or len(hotspots) == 0:
+            return (0, None)
+        return (len(hotspots), float(np.max(hotspot_records(hotspots)['temp'])))
+
+    def _ir_changed(self, sig):
+        if self._key_ir is None or self.ir_delta <= 0:
+            return False
+        n0, t0 = self._key_ir
+        n1, t1 = sig
+        if n0 != n1:
+            return True
+        return t0 is not None and t1 is not None and abs(t1 - t0) >= self.ir_delta
+
+    def need_keyframe(self, frame, ir_hotspots=None):
+        """
+        Args:
+            frame: 현재 BGR 프레임
+            ir_hotspots: 최신 IR hotspot 리스트 (없으면 None)
+
+        Returns:
+            bool: 전체 추론을 수행해야 하면 True
+        """
+        if self.interval <= 1:
+            self.keyframes += 1
+            return True
+
+        thumb = self._thumb(frame) if self.motion_thr > 0 else None
+        sig = self._ir_signature(ir_hotspots)
+
+        key = (
+            self._key_thumb is None
+            or self._since_key + 1 >= self.interval
+            or self._ir_changed(sig)
+        )
+        if not key and thumb is not None:
+            key = float(cv2.absdiff(thumb, self._key_thumb).mean()) >= self.motion_thr
+
+        if key:
+            self._since_key = 0
+            self._key_thumb = thumb if thumb is not None else np.zeros(0)
+            self._key_ir = sig
+            self.keyframes += 1
+        else:
+            self._since_key += 1
+            self.propagated += 1
+        return key
+
+    def pop_counts(self):
+        """하트비트용 (키프레임 수, 전파 프레임 수) 반환 후 초기화"""
+        counts = (self.keyframes, self.propagated)
+        self.keyframes = 0
+        self.propagated = 0
+        return counts
@@ -1,6 +1,42 @@
 import time
+from datetime import datetime
+from functools import lru_cache
 
 def dyn_sleep(s_time, max_time):
     d_time = time.time() - s_time
     if d_time < max_time:
-        time.sleep(max_time-d_time)
\ No newline at end of file
+        time.sleep(max_time-d_time)
+
+
+@lru_cache(maxsize=64)
+def _hour_epoch(prefix):
+    """'yymmddHH' → 해당 시각 정각의 epoch 초 (로컬 시간, 시간 단위로 캐시)"""
+    return datetime(2000 + int(prefix[0:2]), int(prefix[2:4]), int(prefix[4:6]), int(prefix[6:8])).timestamp()
+
+
+def ts_to_epoch_ms(ts):
+    """
+    카메라 ts 문자열(%y%m%d%H%M%S + 소수부, 예: 25010112000012) → epoch ms
+
+    datetime.strptime와 같은 값이지만, 시 단위 prefix만 datetime으로 변환해 캐시하고
+    분/초/소수부는 정수 연산으로 더한다. 형식이 맞지 않으면 None.
+    """
+    if not ts or not (12 <= len(ts) <= 18) or not ts[8:].isdigit():
+        return None
+    try:
+        base = _hour_epoch(ts[:8])
+        mm, ss = int(ts[8:10]), int(ts[10:12])
+        if mm > 59 or ss > 61:
+            return None
+        sec = mm * 60 + ss
+        frac = ts[12:]
+        if frac:
+            sec += int(frac) / (10 ** len(frac))
+    except (ValueError, TypeError):
+        return None
+    return (base + sec) * 1000.0
+
+
+def epoch_ms_to_ts(ms):
+    """epoch ms → 카메라 ts 문자열 (%y%m%d%H%M%S + 1/100초, ts_to_epoch_ms의 역변환)"""
+    return datetime.fromtimestamp(round(ms / 10.0) / 100.0).strftime("%y%m%d%H%M%S%f")[:-4]
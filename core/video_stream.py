@@ -0,0 +1,379 @@
+"""
+H.264/H.265 영상 스트림 전송
+
+프레임마다 독립 JPEG을 보내는 대신, rgb_det 프레임을 GStreamer로 인코딩해
+MPEG-TS로 두 번째 TCP 소켓(SERVER.STREAM.PORT)에 흘려보냅니다.
+검출/융합 메타데이터는 기존 JSON 채널로 보내고 video_seq(인코더에 넣은 프레임 순번)로
+영상 프레임과 짝을 맞춥니다. 인코더는 프레임마다 PTS = video_seq / FPS를 붙이므로 수신 측은
+디코딩 개수가 아니라 PTS로 순번을 복원합니다 (중간 프레임이 빠져도 어긋나지 않음).
+PTS를 읽을 수 없는 디코더에서는 디코딩 순번으로 대신합니다.
+
+영상 소켓은 sender가 직접 열어 fdsink로 넘기므로 끊김을 매 프레임 확인할 수 있고,
+끊기면 스트림을 닫고 video_seq 0부터 다시 열 때까지 JPEG로 보냅니다.
+
+인코더 우선순위 (OpenCV GStreamer 백엔드로 열어 보고 처음 성공한 것):
+- H.264: vpuenc_h264 (i.MX VPU) → v4l2h264enc → x264enc (소프트웨어)
+- H.265: vpuenc_hevc → v4l2h265enc → x265enc
+"""
+
+import os
+import time
+import select
+import socket
+import logging
+import tempfile
+import threading
+from collections import deque
+
+import cv2
+
+logger = logging.getLogger(__name__)
+
+
+STREAM_MODES = ('jpeg', 'h264', 'h265')
+
+DEFAULT_STREAM = {
+    'MODE': 'jpeg',             # jpeg | h264 | h265
+    'PORT': None,               # 영상 소켓 포트 (None = SERVER.PORT + 1)
+    'BITRATE_KBPS': 2000,
+    'FPS': 15,
+    'GOP': 30,                  # 키프레임 간격 (프레임)
+    'RETRY_SEC': 5.0,           # 영상 소켓 재연결 간격
+}
+
+# 영상 소켓 연결 제한 시간 (초)
+CONNECT_TIMEOUT_SEC = 2.0
+
+_ENCODERS = {
+    'h264': (
+        ('vpuenc_h264', "vpuenc_h264 bitrate={kbps} gop-size={gop}"),
+        ('v4l2h264enc', "v4l2h264enc extra-controls=\"controls,video_bitrate={bps},video_gop_size={gop}\""),
+        ('x264enc', "x264enc tune=zerolatency speed-preset=ultrafast bitrate={kbps} key-int-max={gop}"),
+    ),
+    'h265': (
+        ('vpuenc_hevc', "vpuenc_hevc bitrate={kbps} gop-size={gop}"),
+        ('v4l2h265enc', "v4l2h265enc extra-controls=\"controls,video_bitrate={bps},video_gop_size={gop}\""),
+        ('x265enc', "x265enc tune=zerolatency speed-preset=ultrafast bitrate={kbps} key-int-max={gop}"),
+    ),
+}
+
+_PARSERS = {'h264': "h264parse", 'h265': "h265parse"}
+_DECODERS = {'h264': "avdec_h264", 'h265': "avdec_h265"}
+# GStreamer가 없을 때 벤치마크 비트레이트 측정용 FFmpeg fourcc
+_FFMPEG_FOURCC = {'h264': ('avc1', 'H264'), 'h265': ('hvc1', 'HEVC')}
+
+
+def stream_config(server_cfg):
+    """SERVER 섹션 → STREAM 설정 (기본값 채움, PORT 미지정 시 SERVER.PORT + 1)"""
+    cfg = dict(DEFAULT_STREAM)
+    cfg.update((server_cfg or {}).get('STREAM') or {})
+    cfg['MODE'] = str(cfg['MODE'] or 'jpeg').lower()
+    if cfg['MODE'] not in STREAM_MODES:
+        raise ValueError(f"Unknown stream mode: {cfg['MODE']} (expected one of {STREAM_MODES})")
+    if cfg['PORT'] is None and server_cfg and server_cfg.get('PORT') is not None:
+        cfg['PORT'] = int(server_cfg['PORT']) + 1
+    return cfg
+
+
+def encoder_pipeline(codec, enc_desc, sink):
+    """appsrc(BGR) → 인코더 → MPEG-TS → sink 파이프라인 문자열"""
+    return (
+        "appsrc ! videoconvert ! video/x-raw,format=I420 ! "
+        f"{enc_desc} ! {_PARSERS[codec]} config-interval=-1 ! mpegtsmux ! {sink}"
+    )
+
+
+def decoder_pipeline(codec, port, host="0.0.0.0"):
+    """tcpserversrc(MPEG-TS) → 디코더 → appsink(BGR) 파이프라인 문자열"""
+    return (
+        f"tcpserversrc host={host} port={port} ! tsdemux ! {_PARSERS[codec]} ! "
+        f"{_DECODERS[codec]} ! videoconvert ! video/x-raw,format=BGR ! appsink sync=false"
+    )
+
+
+def _open_writer(pipeline, fps, size):
+    writer = cv2.VideoWriter(pipeline, cv2.CAP_GSTREAMER, 0, float(fps), tuple(size), True)
+    if writer.isOpened():
+        return writer
+    writer.release()
+    return None
+
+
+def probe_encoder(codec, size, fps=15, bitrate_kbps=2000, gop=30, sink="fakesink"):
+    """
+    사용 가능한 첫 인코더로 VideoWriter 열기
+
+    Returns:
+        (writer, encoder_name) 또는 (None, None)
+    """
+    for name, desc in _ENCODERS[codec]:
+        enc = desc.format(kbps=int(bitrate_kbps), bps=int(bitrate_kbps) * 1000, gop=int(gop))
+        writer = _open_writer(encoder_pipeline(codec, enc, sink), fps, size)
+        if writer is not None:
+            return writer, name
+        logger.debug("[Stream] encoder %s unavailable", name)
+    return None, None
+
+
+def _socket_alive(sock):
+    """수신기는 영상 소켓에 쓰지 않으므로 읽을 거리가 생겼다면 EOF/오류 (끊김)"""
+    try:
+        readable, _, errored = select.select([sock], [], [sock], 0)
+        if errored:
+            return False
+        if not readable:
+            return True
+        return sock.recv(1, socket.MSG_PEEK) != b""
+    except (OSError, ValueError):
+        return False
+
+
+class VideoStreamWriter:
+    """
+    rgb_det 프레임 → H.264/H.265 MPEG-TS → 영상 소켓 (fdsink)
+
+    수신기가 영상 포트에서 대기 중이어야 열린다. 열리지 않거나 연결이 끊기면 retry_sec마다
+    다시 시도하고, 그 사이 sender는 JPEG로 보낸다. 프레임 크기가 바뀌거나 다시 연결하면
+    video_seq 0부터 시작한다.
+    """
+
+    def __init__(self, host, port, codec='h264', fps=15, bitrate_kbps=2000, gop=30, retry_sec=5.0):
+        if codec not in _ENCODERS:
+            raise ValueError(f"Unknown video codec: {codec}")
+        self.host = host
+        self.port = int(port)
+        self.codec = codec
+        self.fps = fps
+        self.bitrate_kbps = bitrate_kbps
+        self.gop = gop
+        self.retry_sec = retry_sec
+        self.encoder = None
+        self.size = None
+        self.seq = 0
+        self.reconnects = 0
+        self._writer = None
+        self._sock = None
+        self._next_try = 0.0
+
+    @property
+    def is_open(self):
+        return self._writer is not None
+
+    def open(self, size):
+        """size=(w, h)로 스트림 열기. 재시도 간격 전이거나 실패하면 False"""
+        now = time.time()
+        if now < self._next_try:
+            return False
+        self.close()
+        try:
+            self._sock = socket.create_connection((self.host, self.port), timeout=CONNECT_TIMEOUT_SEC)
+            self._sock.settimeout(None)
+        except OSError as e:
+            self._sock = None
+            self._next_try = now + self.retry_sec
+            logger.warning("[Stream] %s stream to %s:%d unavailable (%s); retry in %.0fs",
+                           self.codec, self.host, self.port, e, self.retry_sec)
+            return False
+        sink = f"fdsink fd={self._sock.fileno()} sync=false"
+        self._writer, self.encoder = probe_encoder(
+            self.codec, size, self.fps, self.bitrate_kbps, self.gop, sink=sink,
+        )
+        if self._writer is None:
+            self.close()
+            self._next_try = now + self.retry_sec
+            logger.warning("[Stream] no %s encoder for %s:%d; retry in %.0fs",
+                           self.codec, self.host, self.port, self.retry_sec)
+            return False
+        self.size = tuple(size)
+        self.seq = 0
+        logger.info("[Stream] %s via %s → %s:%d (%dx%d, %dkbps)",
+                    self.codec, self.encoder, self.host, self.port, size[0], size[1], self.bitrate_kbps)
+        return True
+
+    def check(self):
+        """열린 스트림의 소켓이 살아 있으면 True. 끊겼으면 닫고 재시도 간격 뒤 다시 연다"""
+        if self._writer is None:
+            return False
+        if _socket_alive(self._sock):
+            return True
+        logger.warning("[Stream] %s stream to %s:%d lost after seq=%d; JPEG until reconnect",
+                       self.codec, self.host, self.port, self.seq)
+        self.close()
+        self.reconnects += 1
+        self._next_try = time.time() + self.retry_sec
+        return False
+
+    def write(self, frame):
+        """
+        프레임 인코딩 (PTS = video_seq / fps)
+
+        Returns:
+            int or None: 이 프레임의 video_seq (스트림을 쓸 수 없으면 None)
+        """
+        size = (frame.shape[1], frame.shape[0])
+        if self._writer is not None and size == self.size and not self.check():
+            return None
+        if self._writer is None or size != self.size:
+            if not self.open(size):
+                return None
+        seq = self.seq
+        self._writer.write(frame)
+        self.seq += 1
+        return seq
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.release()
+        self._writer = None
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = None
+        self.size = None
+
+
+def match_frame(entries, seq, fps=None):
+    """
+    (count, pts_ms, frame) 목록에서 video_seq 프레임 찾기
+
+    pts_ms(연결 첫 프레임 기준)가 있고 fps를 알면 PTS = seq / fps에서 반 프레임 이내인 것을,
+    아니면 디코딩 순번 count가 seq인 것을 고른다. 없으면 None.
+    """
+    if fps:
+        target = seq * 1000.0 / fps
+        tol = 500.0 / fps
+        for _, pts_ms, frame in entries:
+            if pts_ms is not None and abs(pts_ms - target) < tol:
+                return frame
+        if any(pts_ms is not None for _, pts_ms, _ in entries):
+            return None
+    for count, _, frame in entries:
+        if count == seq:
+            return frame
+    return None
+
+
+class VideoStreamReader(threading.Thread):
+    """
+    수신 측 영상 디코더 (tcpserversrc에서 sender 연결을 기다림)
+
+    디코딩된 프레임을 (디코딩 순번, 연결 첫 프레임 기준 PTS ms)로 최근 max_frames개 보관한다.
+    PTS가 단조 증가하지 않으면(디코더가 위치를 주지 않음) 디코딩 순번으로만 짝을 맞춘다.
+    연결이 끊기면 보관 프레임을 비우고 다시 대기하며, 새 연결의 순번은 0부터 시작한다.
+    """
+
+    def __init__(self, port, codec='h264', host="0.0.0.0", max_frames=60, name="VideoStreamReader"):
+        super().__init__(daemon=True, name=name)
+        self.port = int(port)
+        self.codec = codec
+        self.host = host
+        self.max_frames = max_frames
+        self.available = True
+        self.use_pts = True
+        self.stop_evt = threading.Event()
+        self._frames = deque(maxlen=max_frames)
+        self._cond = threading.Condition()
+        self.decoded = 0
+
+    def run(self):
+        while not self.stop_evt.is_set():
+            cap = cv2.VideoCapture(decoder_pipeline(self.codec, self.port, self.host), cv2.CAP_GSTREAMER)
+            if not cap.isOpened():
+                cap.release()
+                self.available = False
+                with self._cond:
+                    self._cond.notify_all()
+                print(f"[Receiver] {self.codec} stream decoder unavailable (GStreamer)")
+                return
+            with self._cond:
+                self._frames.clear()
+            count = 0
+            base = last = None
+            while not self.stop_evt.is_set():
+                ok, frame = cap.read()
+                if not ok:
+                    break
+                pts_ms = None
+                if self.use_pts:
+                    pos = cap.get(cv2.CAP_PROP_POS_MSEC)
+                    if base is None:
+                        base = pos
+                    elif pos <= last:
+                        self.use_pts = False
+                        print(f"[Receiver] {self.codec} stream PTS unavailable; matching by decode order")
+                    last = pos
+                    if self.use_pts:
+                        pts_ms = pos - base
+                with self._cond:
+                    self._frames.append((count, pts_ms, frame))
+                    self._cond.notify_all()
+                count += 1
+                self.decoded += 1
+            cap.release()
+            with self._cond:
+                self._frames.clear()
+
+    def get(self, seq, fps=None, timeout=0.1):
+        """video_seq 프레임 (아직 디코딩 전이면 timeout까지 대기, 없으면 None)"""
+        deadline = time.time() + timeout
+        with self._cond:
+            while True:
+                frame = match_frame(self._frames, seq, fps if self.use_pts else None)
+                if frame is not None:
+                    return frame
+                remaining = deadline - time.time()
+                if remaining <= 0 or not self.available:
+                    return None
+                self._cond.wait(remaining)
+
+    def stop(self):
+        self.stop_evt.set()
+
+
+def measure_bitrate(frames, codec, fps=15, bitrate_kbps=2000, gop=30):
+    """
+    벤치마크용: 프레임들을 codec으로 파일에 인코딩해 평균 비트레이트 측정
+
+    GStreamer 인코더를 우선 쓰고, 없으면 OpenCV FFmpeg 백엔드로 시도한다.
+
+    Returns:
+        dict: {'encoder', 'bytes', 'kbps', 'encode_ms'} 또는 None (인코더 없음)
+    """
+    if not frames:
+        return None
+    h, w = frames[0].shape[:2]
+    fd, tmp = tempfile.mkstemp(suffix=".ts")
+    os.close(fd)
+    path = tmp
+    try:
+        writer, name = probe_encoder(codec, (w, h), fps, bitrate_kbps, gop,
+                                     sink=f"filesink location={path}")
+        if writer is None:
+            for fourcc in _FFMPEG_FOURCC[codec]:
+                writer = cv2.VideoWriter(path + ".mp4", cv2.CAP_FFMPEG, cv2.VideoWriter_fourcc(*fourcc),
+                                         float(fps), (w, h), True)
+                if writer.isOpened():
+                    name, path = f"ffmpeg:{fourcc}", path + ".mp4"
+                    break
+                writer.release()
+                writer = None
+        if writer is None:
+            return None
+        t0 = time.perf_counter()
+        for frame in frames:
+            writer.write(frame)
+        writer.release()
+        encode_ms = (time.perf_counter() - t0) * 1000.0 / len(frames)
+        size = os.path.getsize(path)
+        return {
+            'encoder': name,
+            'bytes': size,
+            'kbps': size * 8 / 1000.0 / (len(frames) / float(fps)),
+            'encode_ms': encode_ms,
+        }
+    finally:
+        for p in (tmp, tmp + ".mp4"):
+            if os.path.exists(p):
+                os.remove(p)
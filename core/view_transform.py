@@ -0,0 +1,212 @@
+"""
+카메라 방향(회전/반전) 뷰 변환
+
+소스는 프레임을 센서 방향 그대로 버퍼에 쓰고, camera_state의 회전/반전은
+ViewTransform으로 항목 메타데이터(meta['view'])에 붙인다. 전체 프레임을 매번
+cv2.rotate/flip으로 복사하지 않고 각 단계가 필요한 곳에 변환을 합친다.
+
+- 검출기: letterbox 행렬에 합쳐 warpAffine 한 번으로 입력 텐서 생성 (검출 좌표는 뷰 좌표)
+- 융합: CoordMapper(ir_view)에 합쳐 센서 좌표 IR hotspot을 바로 RGB 뷰 좌표로 매핑
+- 표시/전송/저장: render()로 출력 해상도에서만 회전된 이미지를 만든다
+
+좌표 규칙: 픽셀 경계 기준 연속 좌표 (bbox 가장자리가 그대로 대응).
+항목 형식별 meta 위치: RGB (frame, ts, meta), rgb_det (vis, ts, dets, meta),
+IR (frame, ts, max_temp_info, hotspots, meta). 방향이 기본값이면 meta를 붙이지 않는다.
+"""
+
+import cv2
+import numpy as np
+
+
+ROTATIONS = (0, 90, 180, 270)
+
+RGB_META = 2
+DET_META = 3
+IR_META = 4
+
+_CV_ROTATE = {
+    90: cv2.ROTATE_90_CLOCKWISE,
+    180: cv2.ROTATE_180,
+    270: cv2.ROTATE_90_COUNTERCLOCKWISE,
+}
+
+
+class ViewTransform:
+    """
+    센서 프레임 → 표시 방향 affine 변환 (회전 후 좌우/상하 반전)
+
+    src_size: 센서 프레임 크기 (width, height). 좌표 변환은 이 크기 기준이다.
+    """
+
+    __slots__ = ('rotate', 'flip_h', 'flip_v', 'src_size', '_m', '_m_inv')
+
+    def __init__(self, rotate=0, flip_h=False, flip_v=False, src_size=(0, 0)):
+        rotate = int(rotate or 0) % 360
+        if rotate not in ROTATIONS:
+            raise ValueError(f"Unsupported rotation: {rotate} (expected one of {ROTATIONS})")
+        self.rotate = rotate
+        self.flip_h = bool(flip_h)
+        self.flip_v = bool(flip_v)
+        self.src_size = (int(src_size[0]), int(src_size[1]))
+        self._m = None
+        self._m_inv = None
+
+    @classmethod
+    def from_state(cls, state, kind, src_size):
+        """camera_state의 kind('rgb' | 'ir') 방향으로 생성"""
+        return cls(
+            getattr(state, f"rotate_{kind}"),
+            getattr(state, f"flip_h_{kind}"),
+            getattr(state, f"flip_v_{kind}"),
+            src_size,
+        )
+
+    @property
+    def identity(self):
+        return self.rotate == 0 and not self.flip_h and not self.flip_v
+
+    @property
+    def out_size(self):
+        """표시 방향 프레임 크기 (width, height)"""
+        w, h = self.src_size
+        return (h, w) if self.rotate in (90, 270) else (w, h)
+
+    def key(self):
+        return (self.rotate, self.flip_h, self.flip_v, self.src_size)
+
+    def __eq__(self, other):
+        return isinstance(other, ViewTransform) and self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __repr__(self):
+        return (f"ViewTransform(rotate={self.rotate}, flip_h={self.flip_h}, "
+                f"flip_v={self.flip_v}, src_size={self.src_size})")
+
+    def resized(self, src_size):
+        """같은 방향, 다른 센서 해상도 (리사이즈된 프레임용)"""
+        return ViewTransform(self.rotate, self.flip_h, self.flip_v, src_size)
+
+    def matrix(self):
+        """센서 좌표 → 뷰 좌표 2x3 affine 행렬"""
+        if self._m is None:
+            w, h = self.src_size
+            if self.rotate == 90:
+                m = np.array([[0, -1, h], [1, 0, 0]], dtype=np.float64)
+            elif self.rotate == 180:
+                m = np.array([[-1, 0, w], [0, -1, h]], dtype=np.float64)
+            elif self.rotate == 270:
+                m = np.array([[0, 1, 0], [-1, 0, w]], dtype=np.float64)
+            else:
+                m = np.array([[1, 0, 0], [0, 1, 0]], dtype=np.float64)
+            ow, oh = self.out_size
+            if self.flip_h:
+                m = np.array([[-1, 0, ow], [0, 1, 0]], dtype=np.float64) @ np.vstack([m, [0, 0, 1]])
+            if self.flip_v:
+                m = np.array([[1, 0, 0], [0, -1, oh]], dtype=np.float64) @ np.vstack([m, [0, 0, 1]])
+            self._m = m
+        return self._m
+
+    def inverse_matrix(self):
+        """뷰 좌표 → 센서 좌표 2x3 affine 행렬"""
+        if self._m_inv is None:
+            self._m_inv = cv2.invertAffineTransform(self.matrix())
+        return self._m_inv
+
+    @staticmethod
+    def _apply(m, points):
+        pts = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        return pts @ m[:, :2].T + m[:, 2]
+
+    def map_points(self, points):
+        """센서 좌표 (N, 2) → 뷰 좌표"""
+        return self._apply(self.matrix(), points)
+
+    def unmap_points(self, points):
+        """뷰 좌표 (N, 2) → 센서 좌표"""
+        return self._apply(self.inverse_matrix(), points)
+
+    def map_pixels(self, points):
+        """센서 픽셀 인덱스 (N, 2) → 뷰 픽셀 인덱스 (cv2.rotate/flip 결과와 같은 위치)"""
+        return self._apply(self.letterbox_matrix(1.0, (0.0, 0.0)), points)
+
+    def unmap_pixels(self, points):
+        """뷰 픽셀 인덱스 (N, 2) → 센서 픽셀 인덱스 (remap 격자용, 픽셀 중심 기준)"""
+        return self._apply(cv2.invertAffineTransform(self.letterbox_matrix(1.0, (0.0, 0.0))), points)
+
+    def map_xyxy(self, boxes):
+        """센서 좌표 bbox (N, 4) [x1, y1, x2, y2] → 뷰 좌표 (90도 단위라 축 정렬 유지)"""
+        b = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        p1 = self.map_points(b[:, :2])
+        p2 = self.map_points(b[:, 2:])
+        return np.column_stack([np.minimum(p1, p2), np.maximum(p1, p2)])
+
+    def letterbox_matrix(self, r, pad):
+        """
+        센서 프레임 → 뷰 방향 letterbox 캔버스 (비율 r, 패딩 (pad_w, pad_h)) warpAffine 행렬
+
+        warpAffine은 픽셀 중심 인덱스 좌표를 쓰므로 연속 좌표 행렬을 그에 맞게 옮긴다
+        (cv2.resize와 같은 샘플 위치).
+        """
+        m = self.matrix() * r
+        m[:, 2] += pad
+        m[:, 2] += m[:, :2].sum(axis=1) * 0.5 - 0.5
+        return m
+
+    def render(self, img, out_size=None):
+        """
+        뷰 방향 이미지 생성 (out_size=(w, h) 뷰 크기면 회전 전에 먼저 리사이즈)
+
+        img는 센서 방향이면 해상도와 무관하게 쓸 수 있다.
+        """
+        if img is None:
+            return None
+        if out_size is not None:
+            ow, oh = int(out_size[0]), int(out_size[1])
+            pre = (oh, ow) if self.rotate in (90, 270) else (ow, oh)
+            if (img.shape[1], img.shape[0]) != pre:
+                interp = cv2.INTER_AREA if pre[0] < img.shape[1] else cv2.INTER_LINEAR
+                img = cv2.resize(img, pre, interpolation=interp)
+        if self.rotate:
+            img = cv2.rotate(img, _CV_ROTATE[self.rotate])
+        if self.flip_h and self.flip_v:
+            img = cv2.flip(img, -1)
+        elif self.flip_h:
+            img = cv2.flip(img, 1)
+        elif self.flip_v:
+            img = cv2.flip(img, 0)
+        return img
+
+
+def item_view(item, index):
+    """버퍼 항목의 meta['view'] (없으면 None)"""
+    if not item or len(item) <= index:
+        return None
+    meta = item[index]
+    return meta.get('view') if isinstance(meta, dict) else None
+
+
+def frame_view(state, kind, frame):
+    """소스용: 현재 방향이 기본값이 아니면 frame 크기 기준 ViewTransform, 아니면 None"""
+    view = ViewTransform.from_state(state, kind, (frame.shape[1], frame.shape[0]))
+    return None if view.identity else view
+
+
+def view_size(frame, view=None):
+    """프레임의 뷰 방향 크기 (width, height)"""
+    if view is not None:
+        return view.resized((frame.shape[1], frame.shape[0])).out_size
+    return frame.shape[1], frame.shape[0]
+
+
+def render_frame(frame, view=None, out_size=None):
+    """view가 없으면 (필요 시 리사이즈만 한) 원본, 있으면 뷰 방향 이미지"""
+    if frame is None:
+        return None
+    if view is not None:
+        return view.render(frame, out_size)
+    if out_size is not None and (frame.shape[1], frame.shape[0]) != tuple(out_size):
+        interp = cv2.INTER_AREA if out_size[0] < frame.shape[1] else cv2.INTER_LINEAR
+        return cv2.resize(frame, tuple(out_size), interpolation=interp)
+    return frame
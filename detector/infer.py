@@ -2,52 +2,62 @@
 # -*- coding: utf-8 -*-
 
 """
-YOLOv8 (TFLite) 배치 추론 - 폴더 이미지(visible) → 결과 저장(save)
-- CPU 추론(기본)
-- tflite_runtime 우선, 없으면 tf.lite.Interpreter 사용
-- YOLOv8 TFLite 출력 (B,N,C)/(B,C,N) 자동 감지
-- INT8/UINT8/FP 입력/출력 자동 양자화 처리
-- NMS: NumPy 구현
+YOLOv8 (TFLite) 오프라인 배치 추론 / 평가 도구
+- 입력: 이미지 폴더, 영상 파일, capture.py 세션 폴더(metadata.csv + rgb.mp4) 여러 개
+- 프로세스 풀: 워커마다 인터프리터 1개, CPU_THREADS를 워커 수로 나눠 할당
+- 입력은 CHUNK 프레임 단위 작업으로 나누고 (영상은 구간 seek) 워커가 직접 읽는다
+  워커 안에서는 읽기 스레드가 다음 프레임을 미리 디코딩하고 (prefetch),
+  Detector.infer_many로 BATCH장씩 추론, 결과 이미지는 별도 스레드에서 저장
+- 출력: 프레임별 JSONL 스트리밍 기록 (capture.py det.jsonl과 같은 x/y/w/h/conf/cls 필드),
+  선택적으로 COCO 형식 JSON, YOLO 라벨 폴더(--gt)가 있으면 precision/recall/mAP
+
+실행: 저장소 루트에서
+    python -m detector.infer --source visible/                        # 기존 동작 (결과 이미지 저장)
+    python -m detector.infer --model model/8n_416/best_int8.tflite --labels model/labels.txt \\
+        --source capture_session/ sample/fire_sample.mp4 --gt labels/ --no-vis --workers 4
 """
 
-import os, time, glob
+import os, csv, json, time, glob, queue, argparse, threading
+import multiprocessing as mp
+from concurrent.futures import ThreadPoolExecutor
+
 import cv2
-import numpy as np
 import yaml
 
-# ========= 상단 설정 =========
+from core.det_eval import DetectionEvaluator, load_yolo_labels
+
+# ========= 상단 설정 (명령행 기본값) =========
 # (1) 모델/라벨
 MODEL_PATH    = "best_int8.tflite"          # 실험할 TFLite 모델 경로
-METADATA_YAML = "./datasets/custom.yaml"    # {'names': [...]}
+METADATA_YAML = "./datasets/custom.yaml"    # {'names': [...]} 또는 한 줄당 이름 txt
 
 # (2) 가속기/스레드
 USE_NPU       = False                       # 여기서는 CPU만 사용
 DELEGATE_LIB  = "/usr/lib/libvx_delegate.so"
-CPU_THREADS   = max(1, os.cpu_count() or 4)
+CPU_THREADS   = max(1, os.cpu_count() or 4) # 전체 워커가 나눠 쓰는 스레드 수
+WORKERS       = max(1, min(4, CPU_THREADS)) # 프로세스 수 (워커당 인터프리터 1개)
 
 # (3) 입력/출력 폴더
 VISIBLE_DIR   = "visible"                   # 입력 이미지 폴더
 SAVE_DIR      = "save"                      # 결과 저장 폴더
-os.makedirs(SAVE_DIR, exist_ok=True)
 
-# (4) 후처리
+# (4) 후처리 (NMS IoU/최대 개수는 detector.tflite 공용 값)
 CONF_THRESH   = 0.25
-IOU_THRESH    = 0.45
-MAX_DETS      = 300
-
-# ========= TFLite 백엔드 선택 =========
-try:
-    import tflite_runtime.interpreter as tflite
-    TFLITE_BACKEND = "tflite_runtime"
-except Exception:
-    import tensorflow as tf
-    tflite = tf.lite
-    TFLITE_BACKEND = "tensorflow"
+
+# (5) 배치/작업 단위
+BATCH         = 8                           # infer_many 한 번에 넘기는 프레임 수 (동적 배치 모델이면 배치 크기)
+CHUNK         = 64                          # 워커 작업 단위 프레임 수
+PREFETCH      = 16                          # 워커 읽기 스레드가 미리 디코딩해 두는 프레임 수
+
+IMAGE_EXTS = ('.jpg', '.jpeg', '.png', '.bmp')
 
 # ========= 유틸 =========
-def load_names(yaml_path):
+def load_names(path):
+    if path.endswith(".txt"):
+        with open(path, "r", encoding="utf-8") as f:
+            return [ln.strip() for ln in f if ln.strip()]
     try:
-        with open(yaml_path, "r") as f:
+        with open(path, "r") as f:
             obj = yaml.safe_load(f)
         names = obj.get("names", None)
         if isinstance(names, dict):
@@ -58,175 +68,6 @@ def load_names(yaml_path):
     except Exception:
         return [f"id{i}" for i in range(1000)]
 
-def make_interpreter(model_path, use_npu, delegate_lib, cpu_threads):
-    delegates = None
-    # 여기서는 USE_NPU=False 이므로 delegate 사용 안 함
-    if use_npu and delegate_lib and os.path.exists(delegate_lib) and TFLITE_BACKEND == "tflite_runtime":
-        try:
-            delegates = [tflite.load_delegate(delegate_lib)]
-            print(f"[INFO] VX delegate enabled: {delegate_lib}")
-        except Exception as e:
-            print(f"[WARN] Delegate load failed → CPU fallback: {e}")
-            delegates = None
-    itp = tflite.Interpreter(model_path=model_path,
-                             experimental_delegates=delegates,
-                             num_threads=cpu_threads)
-    itp.allocate_tensors()
-    print(f"[TFLite] backend={TFLITE_BACKEND}, threads={cpu_threads}, NPU={'ON' if delegates else 'OFF'}")
-    return itp, bool(delegates)
-
-def letterbox(img, new_shape, color=(114,114,114)):
-    """비율 유지 리사이즈 + 패딩. 반환: (resized, (gain_w, gain_h), (pad_w, pad_h))"""
-    h0, w0 = img.shape[:2]
-    if isinstance(new_shape, int):
-        new_shape = (new_shape, new_shape)
-    nh, nw = new_shape  # (height, width)
-
-    r = min(nh / h0, nw / w0)
-    new_unpad = (int(round(w0 * r)), int(round(h0 * r)))
-    dw, dh = nw - new_unpad[0], nh - new_unpad[1]
-    dw /= 2; dh /= 2
-
-    if (w0, h0) != new_unpad:
-        img = cv2.resize(img, new_unpad, interpolation=cv2.INTER_LINEAR)
-    top, bottom = int(round(dh - 0.1)), int(round(dh + 0.1))
-    left, right = int(round(dw - 0.1)), int(round(dw + 0.1))
-    img = cv2.copyMakeBorder(img, top, bottom, left, right, cv2.BORDER_CONSTANT, value=color)
-
-    gain_w, gain_h = r, r
-    pad_w,  pad_h  = left, top
-    return img, (gain_w, gain_h), (pad_w, pad_h)
-
-def nms_numpy(boxes_xyxy, scores, iou_thr=0.45, top_k=300):
-    if boxes_xyxy.size == 0:
-        return np.empty((0,), dtype=np.int32)
-    x1 = boxes_xyxy[:,0]; y1 = boxes_xyxy[:,1]
-    x2 = boxes_xyxy[:,2]; y2 = boxes_xyxy[:,3]
-    areas = (x2 - x1).clip(min=0) * (y2 - y1).clip(min=0)
-    order = scores.argsort()[::-1]
-    keep = []
-    while order.size > 0 and len(keep) < top_k:
-        i = order[0]
-        keep.append(i)
-        xx1 = np.maximum(x1[i], x1[order[1:]])
-        yy1 = np.maximum(y1[i], y1[order[1:]])
-        xx2 = np.minimum(x2[i], x2[order[1:]])
-        yy2 = np.minimum(y2[i], y2[order[1:]])
-        w = (xx2 - xx1).clip(min=0)
-        h = (yy2 - yy1).clip(min=0)
-        inter = w * h
-        iou = inter / (areas[i] + areas[order[1:]] - inter + 1e-6)
-        inds = np.where(iou <= iou_thr)[0]
-        order = order[inds + 1]
-    return np.array(keep, dtype=np.int32)
-
-def preprocess_from_lb(lb_img, inp_dtype, inp_q):
-    """letterbox된 BGR -> RGB/정규화 -> (1,H,W,C) -> dtype/양자화"""
-    rgb = cv2.cvtColor(lb_img, cv2.COLOR_BGR2RGB).astype(np.float32) / 255.0
-    x = rgb[None, ...]
-    scale, zp = inp_q
-    if inp_dtype == np.uint8:
-        x = (x * 255.0 + 0.5).astype(np.uint8)
-    elif inp_dtype == np.int8:
-        if scale and scale > 0:
-            x = np.clip(x / scale + zp, -128, 127).astype(np.int8)
-        else:
-            x = (x * 255.0 - 128).astype(np.int8)
-    else:
-        x = x.astype(inp_dtype)
-    return x
-
-def dequant(arr, q):
-    if not np.issubdtype(arr.dtype, np.integer):
-        return arr.astype(np.float32)
-    scale, zp = q
-    if scale and scale > 0:
-        return (arr.astype(np.float32) - zp) * scale
-    return arr.astype(np.float32)
-
-def decode_yolov8_output(y, in_w, in_h, conf_thr, num_classes):
-    """
-    YOLOv8 TFLite 출력 디코드 (커스텀 클래스 수 지원)
-      - 입력: y (TFLite output, shape (1,N,C) 또는 (1,C,N))
-      - num_classes: len(names)
-      - 채널:
-        C == 4+nc  : [x,y,w,h, cls...]
-        C == 5+nc  : [x,y,w,h,obj, cls...]
-
-    반환: boxes(xyxy, 입력스케일 기준), scores, cls_ids
-    """
-    out = y
-    if out.ndim != 3:
-        raise RuntimeError(f"Unexpected output shape: {out.shape}")
-
-    # 배치 제거: (1, A, B) -> (A,B)
-    if out.shape[0] == 1:
-        out = out[0]  # now (A,B)
-
-    a, b = out.shape
-    nc = num_classes
-    c1 = 4 + nc
-    c2 = 5 + nc
-
-    # 어느 축이 채널 축인지 자동 판별
-    if a in (c1, c2) and b not in (c1, c2):
-        # (C, N) 형태 → (N, C)로 transpose
-        out = out.transpose(1, 0)
-    elif b in (c1, c2) and a not in (c1, c2):
-        # 이미 (N, C) 형태
-        pass
-    else:
-        raise RuntimeError(
-            f"Cannot determine channel dim. shape={out.shape}, "
-            f"expected one dim in {{4+nc={c1}, 5+nc={c2}}} with nc={nc}"
-        )
-
-    N, C = out.shape
-    if C not in (c1, c2):
-        raise RuntimeError(f"Unsupported channel size: C={C}, expected {c1} or {c2}")
-
-    xywh = out[:, :4].copy()
-    # 정규화된 좌표일 경우 스케일 복원
-    if xywh[:, 2:4].max() <= 2.0:
-        xywh[:, 0] *= float(in_w)
-        xywh[:, 1] *= float(in_h)
-        xywh[:, 2] *= float(in_w)
-        xywh[:, 3] *= float(in_h)
-
-    if C == c1:
-        # [x,y,w,h, cls...]
-        cls = out[:, 4:]
-        cls_score = cls.max(axis=1)
-        conf = cls_score
-        cls_id = cls.argmax(axis=1)
-    else:
-        # [x,y,w,h,obj, cls...]
-        obj = out[:, 4]
-        cls = out[:, 5:]
-        cls_score = cls.max(axis=1)
-        conf = obj * cls_score
-        cls_id = cls.argmax(axis=1)
-
-    m = conf >= conf_thr
-    xywh, conf, cls_id = xywh[m], conf[m], cls_id[m]
-
-    x, y, w, h = xywh.T
-    x0 = x - w / 2.0
-    y0 = y - h / 2.0
-    x1 = x + w / 2.0
-    y1 = y + h / 2.0
-    boxes_xyxy = np.stack([x0, y0, x1, y1], axis=1).astype(np.float32)
-    return boxes_xyxy, conf.astype(np.float32), cls_id.astype(np.int32)
-
-
-def unletterbox_xyxy(boxes_xyxy, gain, pad):
-    gw, gh = gain
-    pw, ph = pad
-    boxes = boxes_xyxy.copy()
-    boxes[:, [0, 2]] = (boxes[:, [0, 2]] - pw) / gw
-    boxes[:, [1, 3]] = (boxes[:, [1, 3]] - ph) / gh
-    return boxes
-
 def draw_dets(img, boxes_xyxy, scores, cls_ids, names):
     H, W = img.shape[:2]
     for i in range(len(scores)):
@@ -243,87 +84,297 @@ def draw_dets(img, boxes_xyxy, scores, cls_ids, names):
                     (255, 255, 255), 1, cv2.LINE_AA)
     return img
 
-# ========= 단일 이미지 추론 함수 =========
-def infer_one_image(itp, in_details, out_details, names, bgr_img):
-    inp = in_details[0]
-    out = out_details[0]
-    in_idx  = inp["index"]
-    out_idx = out["index"]
-    in_h, in_w = int(inp["shape"][1]), int(inp["shape"][2])
-    inp_dtype = inp["dtype"]
-    inp_q     = inp.get("quantization", (0.0, 0))
-    out_q     = out.get("quantization", (0.0, 0))
-
-    # letterbox
-    lb_img, (gw, gh), (pw, ph) = letterbox(bgr_img, (in_h, in_w))
-    x = preprocess_from_lb(lb_img, inp_dtype, inp_q)
-
-    # 추론
-    t0 = time.time()
-    itp.set_tensor(in_idx, x)
-    itp.invoke()
-    y = itp.get_tensor(out_idx)
-    infer_ms = (time.time() - t0) * 1000.0
-
-    # 후처리
-    y = dequant(y, out_q)
-    num_classes = len(names)
-    boxes_in, scores, cls_ids = decode_yolov8_output(
-        y, in_w, in_h, CONF_THRESH, num_classes
-    )
-    keep = nms_numpy(boxes_in, scores, IOU_THRESH, MAX_DETS)
-    boxes_in = boxes_in[keep]; scores = scores[keep]; cls_ids = cls_ids[keep]
-    boxes_xyxy = unletterbox_xyxy(boxes_in, (gw, gh), (pw, ph))
-
-    vis = draw_dets(bgr_img.copy(), boxes_xyxy, scores, cls_ids, names)
-    return vis, infer_ms, len(scores)
-
-# ========= 메인 =========
-def main():
-    if not os.path.exists(MODEL_PATH):
-        raise FileNotFoundError(f"모델 없음: {MODEL_PATH}")
-    if not os.path.exists(METADATA_YAML):
-        raise FileNotFoundError(f"라벨/메타 없음: {METADATA_YAML}")
-    if not os.path.isdir(VISIBLE_DIR):
-        raise FileNotFoundError(f"입력 폴더 없음: {VISIBLE_DIR}")
-
-    cv2.setNumThreads(1)
-
-    names = load_names(METADATA_YAML)
-    itp, npu_on = make_interpreter(MODEL_PATH, USE_NPU, DELEGATE_LIB, CPU_THREADS)
-    in_details  = itp.get_input_details()
-    out_details = itp.get_output_details()
+# ========= 입력 (작업 단위 분할 / 읽기) =========
+def is_session(path):
+    """capture.py 세션 폴더 여부 (metadata.csv + rgb.mp4)"""
+    return os.path.isfile(os.path.join(path, "metadata.csv")) and os.path.isfile(os.path.join(path, "rgb.mp4"))
 
-    # 입력 이미지 목록 (정렬된 상태로 고정)
-    exts = ("*.jpg", "*.jpeg", "*.png", "*.bmp")
-    paths = []
-    for e in exts:
-        paths.extend(glob.glob(os.path.join(VISIBLE_DIR, e)))
-    paths = sorted(paths)
+def session_frame_names(path):
+    """세션 rgb.mp4 프레임 순서대로의 이름 (rgb_ts)"""
+    with open(os.path.join(path, "metadata.csv"), newline="") as f:
+        return [row["rgb_ts"] for row in csv.DictReader(f)]
 
-    if not paths:
-        raise RuntimeError(f"입력 이미지가 없습니다: {VISIBLE_DIR}")
+def plan_units(sources, chunk):
+    """
+    입력 목록 → 워커 작업 단위 리스트와 전체 프레임 수
 
-    print(f"[INFO] 총 {len(paths)}개 이미지에 대해 추론을 수행합니다.")
-    total_time = 0.0
+    작업 단위: {'kind': 'images', 'paths': [...]}
+              {'kind': 'video', 'path', 'start', 'count', 'names'(세션) 또는 'prefix'}
+    """
+    units, total = [], 0
+    for src in sources:
+        if os.path.isdir(src) and is_session(src):
+            names = session_frame_names(src)
+            video = os.path.join(src, "rgb.mp4")
+            for s in range(0, len(names), chunk):
+                units.append({'kind': 'video', 'path': video, 'start': s, 'count': len(names[s:s + chunk]),
+                              'names': names[s:s + chunk]})
+            total += len(names)
+        elif os.path.isdir(src) or src.lower().endswith(IMAGE_EXTS):
+            paths = [src] if not os.path.isdir(src) else sorted(
+                p for p in glob.glob(os.path.join(src, "*")) if p.lower().endswith(IMAGE_EXTS))
+            for s in range(0, len(paths), chunk):
+                units.append({'kind': 'images', 'paths': paths[s:s + chunk]})
+            total += len(paths)
+        elif os.path.isfile(src):
+            cap = cv2.VideoCapture(src)
+            n = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) if cap.isOpened() else 0
+            cap.release()
+            prefix = os.path.splitext(os.path.basename(src))[0]
+            if n <= 0:
+                # 프레임 수를 알 수 없으면 구간 분할 없이 한 작업으로 끝까지 읽음
+                units.append({'kind': 'video', 'path': src, 'start': 0, 'count': None, 'prefix': prefix})
+                continue
+            for s in range(0, n, chunk):
+                units.append({'kind': 'video', 'path': src, 'start': s, 'count': min(chunk, n - s), 'prefix': prefix})
+            total += n
+        else:
+            print(f"[WARN] 입력 없음: {src}")
+    return units, total
+
+def read_unit(unit):
+    """작업 단위 프레임 읽기 → (name, source, index, frame) 생성기"""
+    if unit['kind'] == 'images':
+        for p in unit['paths']:
+            bgr = cv2.imread(p)
+            if bgr is None:
+                print(f"[WARN] 이미지 로드 실패: {p}")
+                continue
+            yield os.path.splitext(os.path.basename(p))[0], p, 0, bgr
+        return
+
+    cap = cv2.VideoCapture(unit['path'])
+    try:
+        if unit['start']:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, unit['start'])
+        k = 0
+        while unit['count'] is None or k < unit['count']:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            idx = unit['start'] + k
+            name = unit['names'][k] if 'names' in unit else f"{unit['prefix']}_{idx:06d}"
+            yield name, unit['path'], idx, frame
+            k += 1
+    finally:
+        cap.release()
+
+def prefetch(iterable, depth=PREFETCH):
+    """iterable을 별도 스레드에서 최대 depth개 미리 읽어 두는 생성기 (디코딩과 추론을 겹침)"""
+    q = queue.Queue(maxsize=max(1, depth))
+    done = object()
+
+    def _reader():
+        try:
+            for item in iterable:
+                q.put(item)
+        finally:
+            q.put(done)
+
+    threading.Thread(target=_reader, daemon=True, name="Prefetch").start()
+    while True:
+        item = q.get()
+        if item is done:
+            return
+        yield item
+
+# ========= 워커 =========
+_DETECTOR = None
+_OPTS = None
+
+def _init_worker(opts):
+    """프로세스마다 인터프리터 1개 생성 (스레드는 전체를 워커 수로 나눔)"""
+    global _DETECTOR, _OPTS
+    from detector.tflite import Detector
 
-    for i, p in enumerate(paths, start=1):
-        bgr = cv2.imread(p)
-        if bgr is None:
-            print(f"[WARN] 이미지 로드 실패: {p}")
-            continue
+    cv2.setNumThreads(1)
+    _OPTS = opts
+    _DETECTOR = Detector(
+        opts['model'], opts['names'], use_npu=opts['npu'], delegate_lib=opts['delegate'],
+        cpu_threads=opts['threads'], conf_thr=opts['conf'], batch_size=opts['batch'],
+        name=f"Infer-{os.getpid()}",
+    )
 
-        vis, infer_ms, n_det = infer_one_image(itp, in_details, out_details, names, bgr)
-        total_time += infer_ms
+def _save_vis(path, frame, scores, boxes, classes, names):
+    cv2.imwrite(path, draw_dets(frame, boxes, scores, classes, names))
+
+def _run_unit(unit):
+    """작업 단위 추론 → 프레임 순서대로 결과 dict 리스트 (이미지 자체는 돌려보내지 않음)"""
+    records = []
+    saver = ThreadPoolExecutor(max_workers=1) if _OPTS['vis_dir'] else None
+    pending = []
+
+    def _flush(items):
+        results = _DETECTOR.infer_many([it[3] for it in items])
+        for (name, src, idx, frame), (scores, boxes, classes) in zip(items, results):
+            records.append({
+                'name': name, 'source': src, 'index': idx,
+                'width': frame.shape[1], 'height': frame.shape[0],
+                'scores': scores, 'boxes': boxes, 'classes': classes,
+            })
+            if saver is not None:
+                fname = os.path.basename(src) if src.lower().endswith(IMAGE_EXTS) else f"{name}.jpg"
+                path = os.path.join(_OPTS['vis_dir'], fname)
+                pending.append(saver.submit(_save_vis, path, frame, scores, boxes, classes, _OPTS['names']))
+
+    batch = []
+    for item in prefetch(read_unit(unit), _OPTS['prefetch']):
+        batch.append(item)
+        if len(batch) >= _OPTS['batch']:
+            _flush(batch)
+            batch = []
+    if batch:
+        _flush(batch)
+    if saver is not None:
+        for f in pending:
+            f.result()
+        saver.shutdown()
+    return records
+
+# ========= 출력 =========
+class AsyncLineWriter(threading.Thread):
+    """JSONL 기록 스레드 (결과 수집 루프가 파일 I/O를 기다리지 않도록)"""
+
+    def __init__(self, path):
+        super().__init__(daemon=True, name="JsonlWriter")
+        self.path = path
+        self.q = queue.Queue(maxsize=4096)
+
+    def run(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            while True:
+                line = self.q.get()
+                if line is None:
+                    return
+                f.write(line)
+                f.write("\n")
+
+    def write(self, obj):
+        self.q.put(json.dumps(obj, ensure_ascii=True))
+
+    def close(self):
+        self.q.put(None)
+        self.join()
+
+def _record_json(rec, names):
+    dets = []
+    for s, b, c in zip(rec['scores'], rec['boxes'], rec['classes']):
+        x1, y1, x2, y2 = (float(v) for v in b)
+        c = int(c)
+        dets.append({"x": x1, "y": y1, "w": x2 - x1, "h": y2 - y1, "conf": float(s), "cls": c,
+                     "label": names[c] if 0 <= c < len(names) else f"id{c}"})
+    return {"name": rec['name'], "source": rec['source'], "index": rec['index'],
+            "width": rec['width'], "height": rec['height'], "detections": dets}
+
+def _fmt(v):
+    return "-" if v is None else f"{v:.4f}"
 
-        # 저장 파일명
-        base = os.path.basename(p)
-        save_path = os.path.join(SAVE_DIR, base)
-        cv2.imwrite(save_path, vis)
+# ========= 메인 =========
+def parse_args():
+    parser = argparse.ArgumentParser(description="Offline parallel TFLite inference / evaluation")
+    parser.add_argument("--source", nargs="+", default=[VISIBLE_DIR], help="이미지 폴더/파일, 영상, capture 세션 폴더")
+    parser.add_argument("--model", default=MODEL_PATH, help="TFLite 모델")
+    parser.add_argument("--labels", default=METADATA_YAML, help="라벨 (yaml names 또는 txt)")
+    parser.add_argument("--save-dir", default=SAVE_DIR, help="결과 폴더 (predictions.jsonl, 결과 이미지)")
+    parser.add_argument("--no-vis", action="store_true", help="결과 이미지 저장 안 함 (재평가용)")
+    parser.add_argument("--coco", help="COCO 형식 결과 JSON 경로")
+    parser.add_argument("--gt", help="YOLO 라벨(.txt) 폴더 (프레임 이름과 동일한 stem)")
+    parser.add_argument("--classes", default="", help="평가 클래스 ID (쉼표 구분, 빈 값이면 전체)")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="프로세스 수")
+    parser.add_argument("--threads", type=int, default=CPU_THREADS, help="전체 CPU 스레드 수 (워커에 분배)")
+    parser.add_argument("--batch", type=int, default=BATCH, help="infer_many 배치 크기")
+    parser.add_argument("--chunk", type=int, default=CHUNK, help="작업 단위 프레임 수")
+    parser.add_argument("--conf", type=float, default=CONF_THRESH, help="신뢰도 임계값")
+    parser.add_argument("--npu", action="store_true", default=USE_NPU, help="NPU delegate 사용 (워커 1개 권장)")
+    parser.add_argument("--delegate", default=DELEGATE_LIB, help="delegate 라이브러리")
+    return parser.parse_args()
 
-        print(f"[{i}/{len(paths)}] {base}  dets={n_det}  infer={infer_ms:.1f} ms  → {save_path}")
+def main():
+    args = parse_args()
+    if not os.path.exists(args.model):
+        raise FileNotFoundError(f"모델 없음: {args.model}")
+    if not os.path.exists(args.labels):
+        raise FileNotFoundError(f"라벨/메타 없음: {args.labels}")
+
+    units, total = plan_units(args.source, max(1, args.chunk))
+    if not units:
+        raise RuntimeError(f"입력이 없습니다: {args.source}")
+
+    os.makedirs(args.save_dir, exist_ok=True)
+    names = load_names(args.labels)
+    workers = max(1, min(args.workers, len(units)))
+    if args.npu and workers > 1:
+        print("[WARN] NPU는 장치 하나를 공유하므로 --workers 1을 권장합니다.")
+    opts = {
+        'model': args.model, 'names': names, 'npu': args.npu, 'delegate': args.delegate,
+        'threads': max(1, args.threads // workers), 'conf': args.conf, 'batch': max(1, args.batch),
+        'prefetch': max(PREFETCH, args.batch * 2),
+        'vis_dir': None if args.no_vis else args.save_dir,
+    }
+    classes = {int(c) for c in args.classes.split(",") if c.strip()} or None
+    evaluator = DetectionEvaluator(classes) if args.gt else None
+    coco = {'images': [], 'annotations': [], 'categories': [{'id': i, 'name': n} for i, n in enumerate(names)]} \
+        if args.coco else None
+
+    print(f"[INFO] {total}개 프레임 / {len(units)}개 작업, workers={workers} × threads={opts['threads']}, "
+          f"batch={opts['batch']}")
+    jsonl = AsyncLineWriter(os.path.join(args.save_dir, "predictions.jsonl"))
+    jsonl.start()
 
-    print(f"[DONE] 평균 추론 시간: {total_time/len(paths):.2f} ms/image")
+    t0 = time.time()
+    done = 0
+    pool = None
+    try:
+        if workers == 1:
+            _init_worker(opts)
+            results = map(_run_unit, units)
+        else:
+            # spawn: 부모의 OpenCV/인터프리터 스레드 상태를 물려받지 않도록
+            pool = mp.get_context("spawn").Pool(workers, initializer=_init_worker, initargs=(opts,))
+            results = pool.imap(_run_unit, units)
+
+        for records in results:
+            for rec in records:
+                jsonl.write(_record_json(rec, names))
+                if coco is not None:
+                    image_id = len(coco['images'])
+                    coco['images'].append({'id': image_id, 'file_name': rec['name'],
+                                           'width': rec['width'], 'height': rec['height']})
+                    for s, b, c in zip(rec['scores'], rec['boxes'], rec['classes']):
+                        x1, y1, x2, y2 = (float(v) for v in b)
+                        coco['annotations'].append({
+                            'id': len(coco['annotations']), 'image_id': image_id, 'category_id': int(c),
+                            'bbox': [x1, y1, x2 - x1, y2 - y1], 'area': (x2 - x1) * (y2 - y1), 'score': float(s),
+                        })
+                if evaluator is not None:
+                    # 라벨 파일이 없는 프레임 = 객체 없음 (검출은 오검출로 집계)
+                    gt = load_yolo_labels(args.gt, rec['name'], (rec['height'], rec['width']), missing_empty=True)
+                    evaluator.add(rec['boxes'], rec['scores'], rec['classes'], gt[0], gt[1])
+            done += len(records)
+            elapsed = max(1e-6, time.time() - t0)
+            print(f"[{done}/{total}] {done / elapsed:6.1f} fps")
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        jsonl.close()
+
+    elapsed = max(1e-6, time.time() - t0)
+    print(f"[DONE] {done}개 프레임, {elapsed:.1f}s ({done / elapsed:.1f} fps) → {jsonl.path}")
+
+    if coco is not None:
+        with open(args.coco, "w", encoding="utf-8") as f:
+            json.dump(coco, f)
+        print(f"[DONE] COCO → {args.coco}")
+
+    if evaluator is not None:
+        res = evaluator.summary()
+        print(f"[EVAL] frames={res['frames']} gt={res['n_gt']} pred={res['n_pred']} "
+              f"precision={_fmt(res['precision'])} recall={_fmt(res['recall'])} "
+              f"mAP50={_fmt(res['map50'])} mAP50-95={_fmt(res['map'])}")
+        for c, ap in res['ap50'].items():
+            label = names[c] if 0 <= c < len(names) else f"id{c}"
+            print(f"[EVAL]   {label:<16} AP50={_fmt(ap)}")
 
 if __name__ == "__main__":
     main()
@@ -6,8 +6,24 @@ import cv2
 import time
 import threading
 import numpy as np
-import tflite_runtime.interpreter as tflite
 import logging
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import tflite_runtime.interpreter as tflite
+    load_delegate = tflite.load_delegate
+except ImportError:
+    # 개발 PC: TensorFlow 내장 인터프리터 사용
+    import tensorflow as tf
+    tflite = tf.lite
+    load_delegate = tf.lite.experimental.load_delegate
+
+from core.pacing import RateLimiter
+from core.records import dets_from_xyxy
+from core.tracker import IoUTracker, KeyframeScheduler, DEFAULT_TRACK
+from core.roi import DEFAULT_ROI, hotspots_to_frame, hotspot_rois, offset_boxes
+from core.tiling import DEFAULT_TILE, TileScheduler, tile_grid
+from core.view_transform import IR_META, item_view
 
 # ===== 로그 유틸 =====
 LOG_EVERY_SEC = float(os.getenv("DET_LOG_EVERY", "2.0"))  # 0이면 하트비트 비활성
@@ -30,21 +46,12 @@ def letterbox(img, new_shape, color=(114, 114, 114), cached_params=None):
     cached_params: (r, new_unpad, top, bottom, left, right) - 캐시된 파라미터
     """
     h0, w0 = img.shape[:2]
-    if isinstance(new_shape, int):
-        new_shape = (new_shape, new_shape)
-    nh, nw = new_shape  # (height, width)
 
     # 캐시된 파라미터 사용 or 새로 계산
     if cached_params is not None:
         r, new_unpad, top, bottom, left, right = cached_params
     else:
-        r = min(nh / h0, nw / w0)
-        new_unpad = (int(round(w0 * r)), int(round(h0 * r)))
-        dw, dh = nw - new_unpad[0], nh - new_unpad[1]
-        dw /= 2
-        dh /= 2
-        top, bottom = int(round(dh - 0.1)), int(round(dh + 0.1))
-        left, right = int(round(dw - 0.1)), int(round(dw + 0.1))
+        r, new_unpad, top, bottom, left, right = letterbox_params((h0, w0), new_shape)
 
     if (w0, h0) != new_unpad:
         img = cv2.resize(img, new_unpad, interpolation=cv2.INTER_LINEAR)
@@ -59,6 +66,35 @@ def letterbox(img, new_shape, color=(114, 114, 114), cached_params=None):
     return img, (gain_w, gain_h), (pad_w, pad_h), cache_params
 
 
+def letterbox_params(src_hw, new_shape):
+    """letterbox 파라미터 (r, new_unpad, top, bottom, left, right) 계산"""
+    h0, w0 = src_hw
+    if isinstance(new_shape, int):
+        new_shape = (new_shape, new_shape)
+    nh, nw = new_shape  # (height, width)
+    r = min(nh / h0, nw / w0)
+    new_unpad = (int(round(w0 * r)), int(round(h0 * r)))
+    dw, dh = nw - new_unpad[0], nh - new_unpad[1]
+    dw /= 2
+    dh /= 2
+    top, bottom = int(round(dh - 0.1)), int(round(dh + 0.1))
+    left, right = int(round(dw - 0.1)), int(round(dw + 0.1))
+    return r, new_unpad, top, bottom, left, right
+
+
+def letterbox_view(img, new_shape, view, params, color=(114, 114, 114)):
+    """
+    센서 방향 프레임 → 뷰 방향 letterbox 이미지 (회전/반전 + 리사이즈 + 패딩을 warpAffine 1회로)
+
+    params는 뷰 방향 크기 기준 letterbox_params 결과.
+    """
+    nh, nw = new_shape
+    r, _, top, _, left, _ = params
+    m = view.letterbox_matrix(r, (left, top))
+    return cv2.warpAffine(img, m, (nw, nh), flags=cv2.INTER_LINEAR,
+                          borderMode=cv2.BORDER_CONSTANT, borderValue=color)
+
+
 def nms_numpy(boxes_xyxy, scores, iou_thr=0.45, top_k=300):
     if boxes_xyxy.size == 0:
         return np.empty((0,), dtype=np.int32)
@@ -85,17 +121,24 @@ def nms_numpy(boxes_xyxy, scores, iou_thr=0.45, top_k=300):
     return np.array(keep, dtype=np.int32)
 
 
-def preprocess_letterbox(lb_img, inp_dtype, inp_q, out_arr):
-    """letterbox된 BGR 이미지를 TFLite 입력 텐서(out_arr)에 채웁니다."""
+def preprocess_letterbox(lb_img, inp_dtype, inp_q, out_arr, is_rgb=False):
+    """
+    letterbox된 BGR 이미지를 TFLite 입력 텐서(out_arr)에 채웁니다.
+
+    is_rgb=True면 이미 RGB 순서(카메라 모델 분기)인 이미지로 보고 채널 변환을 생략합니다.
+    """
     scale, zp = inp_q
 
     if inp_dtype == np.int8 and abs(scale - (1.0 / 255.0)) < 1e-6 and zp == -128:
-        rgb = cv2.cvtColor(lb_img, cv2.COLOR_BGR2RGB)
+        rgb = lb_img if is_rgb else cv2.cvtColor(lb_img, cv2.COLOR_BGR2RGB)
         tmp = rgb.astype(np.int16)
         tmp -= 128
         out_arr[0, ...] = tmp.astype(np.int8)
         return out_arr
 
+    if is_rgb:
+        # 아래 경로는 기존과 같이 BGR 순서로 채운다
+        lb_img = lb_img[..., ::-1]
     img = lb_img.astype(np.float32) / 255.0
     if inp_dtype == np.uint8:
         out_arr[0, ...] = (img * 255.0 + 0.5).astype(np.uint8)
@@ -234,145 +277,258 @@ def _draw_boxes(frame_bgr, boxes_xyxy, classes, scores, labels, thr=SCORE_THRESH
     return frame_bgr
 
 
-class TFLiteWorker(threading.Thread):
+def empty_result():
+    """검출 없음 (scores, boxes_xyxy, classes)"""
+    return np.zeros((0,), np.float32), np.zeros((0, 4), np.float32), np.zeros((0,), np.int32)
+
+
+def merge_detections(parts, frame_size):
+    """부분 추론 결과들을 합치고 클래스별 NMS로 경계 중복 제거"""
+    if not parts:
+        return empty_result()
+    if len(parts) == 1:
+        return parts[0]
+    scores = np.concatenate([p[0] for p in parts]).astype(np.float32)
+    boxes = np.concatenate([np.asarray(p[1]).reshape(-1, 4) for p in parts]).astype(np.float32)
+    classes = np.concatenate([p[2] for p in parts]).astype(np.int32)
+    # 클래스별 NMS: 클래스마다 좌표를 멀리 떨어뜨려 교차 억제 방지
+    shift = (classes.astype(np.float32) * float(max(frame_size) * 2))[:, None]
+    keep = nms_numpy(boxes + shift, scores, NMS_IOU_THRESH, MAX_DETS)
+    return scores[keep], boxes[keep], classes[keep]
+
+
+def detections_xywh(scores, boxes_xyxy, classes):
+    """(scores, boxes_xyxy, classes) → DET_DTYPE 구조화 배열 (트래커 입력 형식, core.records)"""
+    return dets_from_xyxy(scores, boxes_xyxy, classes)
+
+
+def load_labels(path):
+    # 기존처럼 한 줄당 한 클래스 이름이 있는 txt 파일을 사용
+    with open(path, "r", encoding="utf-8") as f:
+        return [ln.strip() for ln in f if ln.strip()]
+
+
+class Detector:
     """
-    YOLOv8 TFLite 추론 스레드.
-    - input_buf: (frame_bgr, ts) 입력
-    - output_buf: (vis_frame_bgr, ts, detections) 출력
-    - 내부에서 전처리(letterbox)→추론→NMS→원본 좌표 복원까지 수행
+    YOLOv8 TFLite 검출기 코어 (버퍼/스레드와 무관한 동기 API)
+
+    - infer(frame): 한 프레임 → (scores, boxes_xyxy, classes), 원본(뷰) 좌표
+    - infer_many(frames): 여러 프레임 결과 리스트. 배치 차원 모델(입력 shape[0] > 1)이면
+      B장씩 묶어 invoke 1회, 아니면 다음 프레임 전처리를 현재 invoke와 겹쳐 처리
+    - infer_window(crop): ROI 윈도우 추론 (ROI 전용 모델이 있으면 그 모델)
+    - 타일 모드(tile_cfg.ENABLED): infer가 겹치는 타일로 나누어 추론하고 병합
+
+    인터프리터와 입력 텐서 버퍼는 생성 시 한 번 만들어 재사용한다.
+    TFLiteWorker, capture.py --save-det, detector/infer.py, benchmark.py가 공유한다.
     """
+
     def __init__(self,
                  model_path: str,
-                 labels_path: str,
-                 input_buf,
-                 output_buf,
-                 # allowed_class_ids: list or tuple of ints to restrict detection to those classes
-                 # e.g. allowed_class_ids=[1] will keep only class_id == 1
+                 labels,
                  allowed_class_ids: list = None,
                  use_npu: bool = True,
                  delegate_lib: str = "/usr/lib/libvx_delegate.so",
-                 cpu_threads: int = 1,                  # 기본 1로 완화
-                 target_fps: float = 0,
-                 target_res: tuple = (960, 540),
-                 name: str = "DetWorker",
-                 conf_thr: float = SCORE_THRESH):
-        super().__init__(daemon=True, name=name)
+                 cpu_threads: int = 1,
+                 conf_thr: float = SCORE_THRESH,
+                 tile_cfg: dict = None,
+                 roi_model: str = None,
+                 batch_size: int = None,
+                 name: str = "Detector"):
+        """
+        labels: 라벨 txt 경로 또는 클래스 이름 리스트
+        batch_size: 동적 배치 모델(shape_signature[0] == -1)일 때 재할당할 배치 크기
+        """
+        self.name = name
         self.model_path = model_path
-        self.labels = self._load_labels(labels_path)
-        self.input_buf  = input_buf
-        self.output_buf = output_buf
+        self.labels = load_labels(labels) if isinstance(labels, str) else list(labels)
         self.use_npu = use_npu
         self.delegate_lib = delegate_lib
         self.cpu_threads = cpu_threads
-        self.stop_evt = threading.Event()
-        self._last_beat = 0.0
-        self.target_period = 1.0/target_fps if target_fps and target_fps > 0 else 0.0
-        self._last_tick = time.perf_counter()
-        self.target_res = target_res
+        self.conf_thr = float(conf_thr)
         # 리스트/튜플 -> numpy array for fast isin checks (dtype int32)
         self.allowed_class_ids = None if allowed_class_ids is None else np.asarray(allowed_class_ids, dtype=np.int32)
-        self.conf_thr = float(conf_thr)
-        
-        cv2.setNumThreads(4)
-        
+
+        # === 타일 추론 (STATE.TILE) ===
+        tile = dict(DEFAULT_TILE)
+        tile.update(tile_cfg or {})
+        self.tile_cfg = tile
+        self.tile_enabled = bool(tile['ENABLED'])
+        self.tiles = None           # 현재 프레임 크기 기준 타일 격자
+        self._tile_key = None       # 격자를 만든 프레임 크기 (w, h)
+        self._tile_sched = None
+        self._tile_cache = {}       # 타일 인덱스 → 마지막 추론 결과 (프레임 좌표)
+
         # === 통계 지표 ===
         self._ema_alpha = 0.3
-        self._ema_total_ms = None
-        self._ema_invoke_ms = None
-        self._win_start_ts = time.time()
-        self._win_frames = 0
+        self.ema_total_ms = None
+        self.ema_invoke_ms = None
+        self._win = {'det': 0, 'raw': 0, 'tiles': 0, 'hw_pre': 0}
 
         # === Letterbox 캐싱 (카메라 해상도 고정 시) ===
         self._lb_params_cache = None  # (r, new_unpad, top, bottom, left, right, expected_shape)
-        self._lb_gain_pad_cache = None  # (gw, gh, pw, ph)
-
-        self.itp, self.inp, self.outs, self.accel = self._make_interpreter()
-        _p(self.name, f"init accel={self.accel}, threads={self.cpu_threads}, target_fps={(1.0/self.target_period) if self.target_period>0 else 0}")
-
-        # ===== [변경] 입력 버퍼를 한 번만 만들어 재사용 =====
-        in_shape = self.inp["shape"]                  # (1, H, W, C)
-        in_dtype = self.inp["dtype"]                  # 보통 np.int8
-        self._input_buf = np.empty(in_shape, dtype=in_dtype)
-
-    def _load_labels(self, path):
-        # 기존처럼 한 줄당 한 클래스 이름이 있는 txt 파일을 사용
-        with open(path, "r", encoding="utf-8") as f:
-            return [ln.strip() for ln in f if ln.strip()]
-
-    def _make_interpreter(self):
+        self._roi_lb_params_cache = None
+
+        # (itp, inp, outs, input_buf) - 입력 버퍼는 한 번만 만들어 재사용
+        itp, inp, outs, self.accel = self._make_interpreter(model_path, batch_size)
+        self._main = (itp, inp, outs, np.empty(inp["shape"], dtype=inp["dtype"]))
+        self._spare_buf = None      # 파이프라인 infer_many용 두 번째 입력 버퍼
+        self.batch = int(inp["shape"][0])
+
+        # ROI 전용 소형 모델 (없으면 메인 인터프리터 공유)
+        self._roi = None
+        if roi_model:
+            itp, inp, outs, _ = self._make_interpreter(roi_model)
+            self._roi = (itp, inp, outs, np.empty(inp["shape"], dtype=inp["dtype"]))
+            _p(self.name, f"ROI model: {roi_model} input={tuple(inp['shape'][1:3])}")
+
+    def _make_interpreter(self, model_path, batch_size=None):
         delegates = None
         accel = "CPU"
         if self.use_npu and self.delegate_lib and os.path.exists(self.delegate_lib):
             try:
-                delegates = [tflite.load_delegate(self.delegate_lib)]
+                delegates = [load_delegate(self.delegate_lib)]
                 accel = "NPU"
                 _p(self.name, f"VX delegate 로드: {self.delegate_lib}")
             except Exception as e:
                 _p(self.name, f"delegate 로드 실패 → CPU: {e}")
 
-        itp = tflite.Interpreter(model_path=self.model_path,
+        itp = tflite.Interpreter(model_path=model_path,
                                  experimental_delegates=delegates,
                                  num_threads=self.cpu_threads)
+        inp = itp.get_input_details()[0]
+        sig = inp.get("shape_signature")
+        if batch_size and int(batch_size) > 1 and sig is not None and int(sig[0]) == -1:
+            itp.resize_tensor_input(inp["index"], [int(batch_size)] + [int(v) for v in inp["shape"][1:]])
         itp.allocate_tensors()
         inp = itp.get_input_details()[0]
         outs = itp.get_output_details()
-        _p(self.name, f"TFLite accel={accel}, threads={self.cpu_threads}")
+        _p(self.name, f"TFLite accel={accel}, threads={self.cpu_threads}, batch={int(inp['shape'][0])}")
         return itp, inp, outs, accel
 
-    def _get_outputs_float(self):
-        outs = []
-        for od in self.outs:
-            arr = self.itp.get_tensor(od["index"])
-            if np.issubdtype(arr.dtype, np.integer):
-                scale, zp = od["quantization"]
-                arr = (arr.astype(np.float32) - zp) * (scale if scale != 0 else 1.0)
-            else:
-                arr = arr.astype(np.float32)
-            outs.append(arr)
-        return outs
+    @property
+    def input_size(self):
+        """메인 모델 입력 크기 (w, h)"""
+        shape = self._main[1]["shape"]
+        return int(shape[2]), int(shape[1])
+
+    @property
+    def roi_input_size(self):
+        """ROI 추론 모델 입력 크기 (w, h)"""
+        shape = (self._roi or self._main)[1]["shape"]
+        return int(shape[2]), int(shape[1])
 
-    def _infer_once(self, frame_bgr):
+    # ----- 공개 API -----
+    def infer(self, frame, model_rgb=None, view=None):
         """
-        한 프레임 처리:
-        1) letterbox + 전처리
-        2) TFLite invoke
-        3) YOLOv8 디코드 + NMS + 원본 좌표 복원
+        전체 프레임 추론 → (scores, boxes_xyxy, classes)
+
+        model_rgb: 카메라가 letterbox 내부 크기로 하드웨어 스케일한 RGB 프레임 (선택)
+        view: 센서 방향 frame의 뷰 변환. bbox는 뷰 좌표로 반환한다.
+        """
+        if not self.tile_enabled:
+            return self._infer_once(frame, model_rgb=model_rgb, view=view)
+        if view is not None:
+            # 타일은 뷰 좌표로 자르므로 뷰 방향 프레임을 한 번 만든다
+            frame = view.render(frame)
+        return self._infer_tiles(frame)
+
+    def infer_window(self, crop):
+        """ROI 윈도우 추론 (ROI 전용 모델 + 별도 letterbox 캐시)"""
+        return self._infer_once(crop, roi=True)
+
+    def infer_many(self, frames, views=None):
+        """
+        여러 프레임 추론 → [(scores, boxes_xyxy, classes), ...] (입력 순서)
+
+        타일 모드는 프레임마다 infer를 호출한다 (타일 순환 상태 유지).
+        """
+        frames = list(frames)
+        if not frames:
+            return []
+        views = list(views) if views is not None else [None] * len(frames)
+        if self.tile_enabled:
+            return [self.infer(f, view=v) for f, v in zip(frames, views)]
+        if self.batch > 1:
+            return self._infer_batched(frames, views)
+        return self._infer_pipelined(frames, views)
+
+    def pop_counts(self):
+        """heartbeat용 윈도우 집계 {'det', 'raw', 'tiles', 'hw_pre'} 반환 후 초기화"""
+        win = self._win
+        self._win = {'det': 0, 'raw': 0, 'tiles': 0, 'hw_pre': 0}
+        return win
+
+    # ----- 단계별 처리 -----
+    def _prepare(self, frame_bgr, roi=False, model_rgb=None, view=None, out_arr=None):
+        """
+        letterbox + 전처리로 out_arr (1,H,W,C)를 채운다
+
+        Returns:
+            (out_arr, ctx) - ctx: (gain, pad, pre_ms) 좌표 역변환/통계용
         """
         t0 = time.perf_counter()
+        inp = (self._roi if roi and self._roi is not None else self._main)[1]
+        cache_attr = "_roi_lb_params_cache" if roi else "_lb_params_cache"
+        lb_cache = getattr(self, cache_attr)
 
         # --- 입력 shape / quant 정보 ---
-        in_shape = self.inp["shape"]  # (1,H,W,C)
-        in_h, in_w = int(in_shape[1]), int(in_shape[2])
-        inp_dtype = self.inp["dtype"]
-        inp_q     = self.inp.get("quantization", (0.0, 0))
+        in_h, in_w = int(inp["shape"][1]), int(inp["shape"][2])
+        inp_dtype = inp["dtype"]
+        inp_q     = inp.get("quantization", (0.0, 0))
 
         # --- letterbox + 양자화 전처리 (캐싱 적용) ---
         h0, w0 = frame_bgr.shape[:2]
-        
-        # 캐시 확인: 프레임 크기가 같으면 letterbox 파라미터 재사용
-        if self._lb_params_cache and self._lb_params_cache[6] == (h0, w0):
-            # 캐시 히트: 계산 스킵
-            cached_params = self._lb_params_cache[:6]
-            lb_img, (gw, gh), (pw, ph), _ = letterbox(frame_bgr, (in_h, in_w), cached_params=cached_params)
+        if view is not None:
+            view = view.resized((w0, h0))
+            w0, h0 = view.out_size
+
+        # 캐시 확인: (뷰 방향) 프레임 크기가 같으면 letterbox 파라미터 재사용
+        if lb_cache and lb_cache[6] == (h0, w0):
+            cached_params = lb_cache[:6]
+        else:
+            cached_params = letterbox_params((h0, w0), (in_h, in_w))
+            setattr(self, cache_attr, cached_params + ((h0, w0),))
+
+        if model_rgb is not None and view is not None:
+            model_rgb = view.render(model_rgb)
+        if model_rgb is not None and model_rgb.shape[1::-1] == cached_params[1]:
+            # 카메라 모델 분기: 이미 내부 크기 → 리사이즈 없이 패딩만 (같은 gain/pad로 역변환)
+            lb_img, gain, pad, _ = letterbox(model_rgb, (in_h, in_w), cached_params=cached_params)
+            is_rgb = True
+            self._win['hw_pre'] += 1
+        elif view is not None:
+            lb_img = letterbox_view(frame_bgr, (in_h, in_w), view, cached_params)
+            gain = (cached_params[0], cached_params[0])
+            pad = (cached_params[4], cached_params[2])
+            is_rgb = False
         else:
-            # 캐시 미스: 새로 계산하고 저장
-            lb_img, (gw, gh), (pw, ph), cache_params = letterbox(frame_bgr, (in_h, in_w))
-            self._lb_params_cache = cache_params + ((h0, w0),)
-        
-        x = preprocess_letterbox(lb_img, inp_dtype, inp_q, self._input_buf)
-        t_pre = time.perf_counter()
-
-        # ---- 핵심 추론 ----
-        t_inv0 = time.perf_counter()
-        self.itp.set_tensor(self.inp["index"], x)
-        self.itp.invoke()
-        outs = self._get_outputs_float()
-        t_inv1 = time.perf_counter()
-
-        # ---- 후처리(락 밖) ----
-        # YOLOv8은 보통 출력 하나만 사용 (det)
-        y = outs[0]
-        # (B,N,C)/(B,C,N) → 박스/점수/클래스
+            lb_img, gain, pad, _ = letterbox(frame_bgr, (in_h, in_w), cached_params=cached_params)
+            is_rgb = False
+
+        x = preprocess_letterbox(lb_img, inp_dtype, inp_q, out_arr, is_rgb=is_rgb)
+        return x, (gain, pad, (time.perf_counter() - t0) * 1000.0)
+
+    def _invoke(self, model, x):
+        """TFLite invoke → (float 출력 리스트, invoke_ms)"""
+        itp, inp, out_details, _ = model
+        t0 = time.perf_counter()
+        itp.set_tensor(inp["index"], x)
+        itp.invoke()
+        outs = []
+        for od in out_details:
+            arr = itp.get_tensor(od["index"])
+            if np.issubdtype(arr.dtype, np.integer):
+                scale, zp = od["quantization"]
+                arr = (arr.astype(np.float32) - zp) * (scale if scale != 0 else 1.0)
+            else:
+                arr = arr.astype(np.float32)
+            outs.append(arr)
+        return outs, (time.perf_counter() - t0) * 1000.0
+
+    def _postprocess(self, y, in_size, gain, pad):
+        """YOLOv8 디코드 + 클래스 필터 + NMS + letterbox 역변환 (y: 배치 1장 출력)"""
+        in_w, in_h = in_size
+        # (1,N,C)/(1,C,N) → 박스/점수/클래스
         boxes_in, scores, classes = decode_yolov8_output(
             y, in_w, in_h, self.conf_thr, num_classes=len(self.labels)
         )
@@ -380,53 +536,235 @@ class TFLiteWorker(threading.Thread):
         if self.allowed_class_ids is not None and classes.size > 0:
             mask = np.isin(classes, self.allowed_class_ids)
             if not mask.any():
-                # nothing left
-                return np.zeros((0,), np.float32), np.zeros((0,4), np.float32), np.zeros((0,), np.int32)
+                return empty_result()
             boxes_in = boxes_in[mask]
             scores = scores[mask]
             classes = classes[mask]
 
         # NMS
         keep = nms_numpy(boxes_in, scores, NMS_IOU_THRESH, MAX_DETS)
-        boxes_in = boxes_in[keep]
-        scores   = scores[keep]
-        classes  = classes[keep]
         # letterbox 역변환 → 원본 프레임 좌표
-        boxes_xyxy = unletterbox_xyxy(boxes_in, (gw, gh), (pw, ph))
+        return scores[keep], unletterbox_xyxy(boxes_in[keep], gain, pad), classes[keep]
 
-        t_post = time.perf_counter()
+    def _finish(self, y, in_size, ctx, invoke_ms):
+        gain, pad, pre_ms = ctx
+        t0 = time.perf_counter()
+        result = self._postprocess(y, in_size, gain, pad)
+        post_ms = (time.perf_counter() - t0) * 1000.0
+        # 통계 업데이트 (탐지 건수 포함)
+        self._update_stats(invoke_ms, pre_ms + invoke_ms + post_ms, det_count=len(result[1]),
+                           raw_count=len(result[0]))
+        return result
 
-        # 상세 타이밍(ms)
-        invoke_ms = (t_inv1 - t_inv0) * 1000.0
-        pre_ms  = (t_pre - t0) * 1000.0
-        post_ms = (t_post - t_inv1) * 1000.0
-        total_ms= (t_post - t0) * 1000.0
+    def _infer_once(self, frame_bgr, roi=False, model_rgb=None, view=None):
+        """
+        한 프레임 처리:
+        1) letterbox + 전처리
+        2) TFLite invoke
+        3) YOLOv8 디코드 + NMS + 원본 좌표 복원
 
-        # 통계 업데이트 (탐지 건수 포함)
-        self._update_stats(invoke_ms, total_ms, det_count=len(boxes_xyxy), raw_count=len(scores))
+        roi=True이면 ROI 전용 모델(설정 시)과 별도 letterbox 캐시를 사용
+        """
+        model = self._roi if roi and self._roi is not None else self._main
+        x, ctx = self._prepare(frame_bgr, roi, model_rgb, view, model[3][:1])
+        outs, invoke_ms = self._invoke(model, model[3])
+        # YOLOv8은 보통 출력 하나만 사용 (det), 배치 모델이면 첫 장만
+        in_size = (int(model[1]["shape"][2]), int(model[1]["shape"][1]))
+        return self._finish(outs[0][:1], in_size, ctx, invoke_ms)
+
+    def _infer_batched(self, frames, views):
+        """배치 차원 모델: B장씩 입력 텐서를 채워 invoke 1회"""
+        results = []
+        buf = self._main[3]
+        for start in range(0, len(frames), self.batch):
+            chunk = range(start, min(start + self.batch, len(frames)))
+            ctxs = [self._prepare(frames[i], view=views[i], out_arr=buf[j:j + 1])[1]
+                    for j, i in enumerate(chunk)]
+            outs, invoke_ms = self._invoke(self._main, buf)
+            per_ms = invoke_ms / len(ctxs)
+            results.extend(self._finish(outs[0][j:j + 1], self.input_size, ctx, per_ms)
+                           for j, ctx in enumerate(ctxs))
+        return results
+
+    def _infer_pipelined(self, frames, views):
+        """
+        단일 배치 모델: 다음 프레임 전처리를 별도 스레드에서 현재 invoke와 겹쳐 수행
+
+        invoke는 GIL을 놓으므로 letterbox/양자화 시간이 추론 시간에 가려진다.
+        전처리 중인 버퍼와 invoke 중인 버퍼가 겹치지 않도록 입력 버퍼 2개를 번갈아 쓴다.
+        """
+        if self._spare_buf is None:
+            self._spare_buf = np.empty_like(self._main[3])
+        bufs = (self._main[3], self._spare_buf)
+        results = []
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"{self.name}-pre") as pool:
+            pending = pool.submit(self._prepare, frames[0], False, None, views[0], bufs[0])
+            for i in range(len(frames)):
+                x, ctx = pending.result()
+                if i + 1 < len(frames):
+                    pending = pool.submit(self._prepare, frames[i + 1], False, None, views[i + 1],
+                                          bufs[(i + 1) % 2])
+                outs, invoke_ms = self._invoke(self._main, x)
+                results.append(self._finish(outs[0], self.input_size, ctx, invoke_ms))
+        return results
+
+    def _infer_tiles(self, frame):
+        """타일 추론: 이번 프레임 타일만 갱신하고 나머지는 직전 결과를 재사용해 병합"""
+        h0, w0 = frame.shape[:2]
+        if self._tile_key != (w0, h0):
+            size = self.tile_cfg.get('SIZE')
+            tile_size = (int(size[0]), int(size[1])) if size else self.input_size
+            self.tiles = tile_grid((w0, h0), tile_size, self.tile_cfg['OVERLAP'])
+            self._tile_sched = TileScheduler(len(self.tiles), self.tile_cfg['TILES_PER_FRAME'])
+            self._tile_cache = {}
+            self._tile_key = (w0, h0)
+            _p(self.name, f"tiling {w0}x{h0} → {len(self.tiles)} tiles {tile_size}, "
+                          f"per_frame={self._tile_sched.per_frame}")
+
+        for i in self._tile_sched.next():
+            x0, y0, x1, y1 = self.tiles[i]
+            s, b, c = self._infer_once(frame[y0:y1, x0:x1])
+            self._tile_cache[i] = (s, offset_boxes(b, x0, y0), c)
+            self._win['tiles'] += 1
+        return merge_detections(list(self._tile_cache.values()), (w0, h0))
+
+    def _update_stats(self, invoke_ms, total_ms, det_count=0, raw_count=0):
+        # EMA 업데이트 (프레임 카운트는 출력 시점에 집계)
+        a = self._ema_alpha
+        def ema(prev, x):
+            return x if prev is None else (a * x + (1.0 - a) * prev)
+        self.ema_total_ms = ema(self.ema_total_ms, total_ms)
+        self.ema_invoke_ms = ema(self.ema_invoke_ms, invoke_ms)
+        self._win['det'] += det_count
+        self._win['raw'] += raw_count
+
+
+class TFLiteWorker(threading.Thread):
+    """
+    YOLOv8 TFLite 추론 스레드 (Detector를 버퍼 입출력에 연결).
+    - input_buf: (frame_bgr, ts[, meta]) 입력
+    - output_buf: (vis_frame_bgr, ts, detections[, meta]) 출력
+      detections: DET_DTYPE 구조화 배열 (x, y, w, h, conf, cls, track_id), core.records
+    - 전처리(letterbox)→추론→NMS→원본 좌표 복원은 self.detector가 수행
+    - 키프레임 모드: KEYFRAME_INTERVAL > 1이면 K프레임마다(또는 모션/IR 변화 시)만
+      전체 추론하고 그 사이에는 트래커로 bbox를 전파
+    - ROI 모드: IR hotspot 주변을 원본 해상도로 잘라 추론하고, 전체 프레임 추론은
+      FULL_INTERVAL 주기로만 수행 (hotspot이 없으면 매번 전체 프레임)
+    - 타일 모드: 전체 프레임 추론을 모델 입력 크기의 겹치는 타일로 나누어 수행하고
+      타일 간 NMS로 병합. TILES_PER_FRAME으로 프레임당 일부 타일만 순환 추론 가능
+    - 마감 스케줄링: 입력 버퍼 seq로 새 프레임 도착을 기다려 이미 본 프레임은 다시 추론하지
+      않고, 캡처 후 max_age_ms가 지난 프레임은 버린다 (0이면 비활성). target_fps는 도착
+      간격 기준으로 건너뛰며, 하트비트에 캡처 → 결과 지연 p50/p90/p99를 남긴다
+    - 듀티 사이클: set_duty(idle_period)로 차가운 장면에서는 idle_period마다만 추론하고
+      나머지 프레임은 트래커 전파로 출력 (core.duty_governor.DutyGovernor가 IR로 조절)
+    """
+    def __init__(self,
+                 model_path: str,
+                 labels_path: str,
+                 input_buf,
+                 output_buf,
+                 # allowed_class_ids: list or tuple of ints to restrict detection to those classes
+                 # e.g. allowed_class_ids=[1] will keep only class_id == 1
+                 allowed_class_ids: list = None,
+                 use_npu: bool = True,
+                 delegate_lib: str = "/usr/lib/libvx_delegate.so",
+                 cpu_threads: int = 1,                  # 기본 1로 완화
+                 target_fps: float = 0,
+                 target_res: tuple = (960, 540),
+                 name: str = "DetWorker",
+                 conf_thr: float = SCORE_THRESH,
+                 track_cfg: dict = None,
+                 ir_buf=None,
+                 roi_cfg: dict = None,
+                 coord_state=None,
+                 tile_cfg: dict = None,
+                 max_age_ms: float = 0):
+        super().__init__(daemon=True, name=name)
+        self.input_buf  = input_buf
+        self.output_buf = output_buf
+        self.stop_evt = threading.Event()
+        self._last_beat = 0.0
+        self.target_period = 1.0/target_fps if target_fps and target_fps > 0 else 0.0
+        self.limiter = RateLimiter(interval=self.target_period)
+        self.max_age = max(0.0, float(max_age_ms or 0)) / 1000.0
+        self._last_seq = 0
+        # 듀티 사이클 (DutyGovernor.set_duty): None이면 전체 속도, 초 단위면 그 주기로만 추론
+        self._idle_period = None
+        self._last_infer = None
+        self._force_key = False
+        self.target_res = target_res
 
-        # 디버깅이 필요하면 아래 주석 해제해서 세부 타이밍 로그 가능
-        # _p(self.name, f"pre={pre_ms:5.1f} | invoke={invoke_ms:6.1f} | "
-        #               f"post={post_ms:5.1f} | total={total_ms:6.1f} ms")
+        # === 추적/키프레임 (STATE.TRACK) ===
+        tcfg = dict(DEFAULT_TRACK)
+        tcfg.update(track_cfg or {})
+        self.tracker = IoUTracker(iou_thr=tcfg['IOU_THR'], max_misses=tcfg['MAX_MISSES'])
+        self.keyframes = KeyframeScheduler(
+            interval=tcfg['KEYFRAME_INTERVAL'],
+            motion_thr=tcfg['MOTION_THR'],
+            ir_delta=tcfg['IR_DELTA'],
+        )
+        self.ir_buf = ir_buf  # IR hotspot 변화 감지 / ROI 추론용 (선택)
 
-        return scores, boxes_xyxy, classes
+        # === IR 유도 ROI 추론 (STATE.ROI) ===
+        rcfg = dict(DEFAULT_ROI)
+        rcfg.update(roi_cfg or {})
+        self.roi_cfg = rcfg
+        self.roi_enabled = bool(rcfg['ENABLED']) and ir_buf is not None
+        self.coord_state = coord_state  # 런타임 캘리브레이션 (CoordState, 선택)
+        self._since_full = None
+        self._win_roi = 0
+
+        cv2.setNumThreads(4)
+
+        # === 통계 지표 ===
+        self._win_start_ts = time.time()
+        self._win_frames = 0
+        self._win_lat_ms = []     # 캡처 → 결과 기록 지연 (ms)
+        self._win_stale = 0       # max_age 초과로 버린 프레임
+        self._win_skipped = 0     # 추론 중 덮어써져 보지 못한 프레임
+        self._win_throttled = 0   # 타깃 FPS 초과로 건너뛴 프레임
+        self._win_idle = 0        # 듀티 사이클 IDLE로 추론 없이 전파한 프레임
+
+        self.detector = Detector(
+            model_path, labels_path,
+            allowed_class_ids=allowed_class_ids,
+            use_npu=use_npu,
+            delegate_lib=delegate_lib,
+            cpu_threads=cpu_threads,
+            conf_thr=conf_thr,
+            tile_cfg=tile_cfg,
+            roi_model=rcfg.get('MODEL') if self.roi_enabled else None,
+            name=name,
+        )
+        _p(self.name, f"init accel={self.detector.accel}, threads={cpu_threads}, target_fps={(1.0/self.target_period) if self.target_period>0 else 0}")
 
     def run(self):
         while not self.stop_evt.is_set():
-            item = self.input_buf.read()
-
-            # === 프레임 없음 → 스트림별 백오프(time.sleep) 적용 ===
+            # === 새 프레임 도착까지 대기 (이미 본 seq는 다시 추론하지 않음) ===
+            entry = self.input_buf.read_newer(self._last_seq, timeout=0.1)
+            if entry is None:
+                self._heartbeat()
+                continue
+            seq, t_cap, item = entry
+            if self._last_seq and seq > self._last_seq + 1:
+                self._win_skipped += seq - self._last_seq - 1
+            self._last_seq = seq
             if not item:
-                if self.target_period > 0:
-                    idle = max(0.001, min(0.25 * self.target_period, 0.010))
-                    time.sleep(idle)
-                else:
-                    time.sleep(0.005)
+                continue
+
+            # === 마감 검사: 캡처 후 max_age가 지난 프레임은 추론하지 않고 버림 ===
+            if self.max_age > 0 and time.monotonic() - t_cap > self.max_age:
+                self._win_stale += 1
                 self._heartbeat()
                 continue
+            # === 타깃 FPS: 프레임 도착 간격 기준 크레딧 (처리 후 슬립 없음) ===
+            if not self.limiter.admit(t_cap):
+                self._win_throttled += 1
+                continue
 
-            frame, ts = item
-            scores, boxes_xyxy, classes = self._infer_once(frame)
+            frame, ts = item[0], item[1]
+            meta = item[2] if len(item) > 2 and item[2] else {}
+            view = meta.get('view')
 
             # 1) 원본 프레임 복사 (GUI/송신 단계에서 오버레이 처리)
             vis = frame.copy()
@@ -434,27 +772,110 @@ class TFLiteWorker(threading.Thread):
             # 2) 표시용 해상도(TARGET_W x TARGET_H)로 리사이즈
             # vis = cv2.resize(vis, self.target_res, interpolation=cv2.INTER_AREA)
 
-            # 3) 검출 결과를 bbox 리스트로 변환 (x, y, w, h, confidence)
-            detections = []
-            if len(boxes_xyxy) > 0:
-                for i, box in enumerate(boxes_xyxy):
-                    x1, y1, x2, y2 = box
-                    w, h = x2 - x1, y2 - y1
-                    conf = scores[i] if i < len(scores) else 0.0
-                    cls = classes[i] if i < len(classes) else 0
-                    detections.append((float(x1), float(y1), float(w), float(h), float(conf), int(cls)))
-
-            # 출력 버퍼로 전송 (vis, ts, detections)
-            self.output_buf.write((vis, ts, detections))
+            # 3) 키프레임이면 추론 후 트랙 연계, 아니면 트랙 bbox 전파
+            #    (듀티 사이클 IDLE 구간은 키프레임 판정 없이 전파)
+            if self._duty_idle(t_cap):
+                detections = self.tracker.predict()
+            else:
+                ir_hotspots, ir_size, ir_view = self._latest_ir_hotspots()
+                if self._force_key or self.keyframes.need_keyframe(frame, ir_hotspots):
+                    self._force_key = False
+                    self._last_infer = t_cap
+                    result = self._detect(
+                        frame, ir_hotspots, ir_size, model_rgb=meta.get('model_rgb'),
+                        view=view, ir_view=ir_view)
+                    detections = self.tracker.update(detections_xywh(*result))
+                else:
+                    detections = self.tracker.predict()
+
+            # 출력 버퍼로 전송 (vis, ts, detections[, meta]), 캡처 시각은 그대로 전달
+            # vis는 센서 방향, detections는 뷰 좌표 (표시/전송 단계에서 vis에 뷰 변환 적용)
+            if view is not None:
+                self.output_buf.write((vis, ts, detections, {'view': view}), t_cap=t_cap)
+            else:
+                self.output_buf.write((vis, ts, detections), t_cap=t_cap)
+            self._win_lat_ms.append((time.monotonic() - t_cap) * 1000.0)
+            self._win_frames += 1
             self._heartbeat()
 
-            # === 타깃 FPS 페이싱: 루프 주기가 target_period보다 빠르면 남은 시간만큼 쉼 ===
-            if self.target_period > 0:
-                now = time.perf_counter()
-                elapsed = now - self._last_tick
-                if elapsed < self.target_period:
-                    time.sleep(self.target_period - elapsed)
-                self._last_tick = time.perf_counter()
+    def set_duty(self, idle_period=None):
+        """
+        추론 듀티 사이클 설정 (IR 거버너가 호출)
+        idle_period: None이면 전체 속도, 초 단위면 그 간격으로만 추론 (inf = 추론 중지).
+        전체 속도로 돌아오면 다음 프레임은 바로 키프레임으로 추론한다.
+        """
+        if idle_period is None and self._idle_period is not None:
+            self._force_key = True
+        self._idle_period = idle_period
+
+    def _duty_idle(self, t_cap):
+        """IDLE 듀티에서 이번 프레임 추론을 건너뛸지 (건너뛰면 True)"""
+        period = self._idle_period
+        if period is None:
+            return False
+        if period == float('inf') or (self._last_infer is not None and t_cap - self._last_infer < period):
+            self._win_idle += 1
+            return True
+        return False
+
+    def _latest_ir_hotspots(self):
+        """
+        최신 IR 항목의 (hotspots, (ir_w, ir_h), ir_view) 반환 (필요 없거나 없으면 모두 None)
+
+        hotspot과 크기는 센서 방향, ir_view는 IR 뷰 변환 (없으면 None)
+        """
+        if self.ir_buf is None or (self.keyframes.interval <= 1 and not self.roi_enabled):
+            return None, None, None
+        ir_item = self.ir_buf.latest()
+        if ir_item and len(ir_item) > 3 and ir_item[0] is not None:
+            h, w = ir_item[0].shape[:2]
+            return ir_item[3], (w, h), item_view(ir_item, IR_META)
+        return None, None, None
+
+    def _roi_size(self):
+        size = self.roi_cfg.get('SIZE')
+        if size:
+            return int(size[0]), int(size[1])
+        return self.detector.roi_input_size
+
+    def _detect(self, frame, ir_hotspots=None, ir_size=None, model_rgb=None, view=None, ir_view=None):
+        """
+        키프레임 추론. ROI 모드가 아니면 detector.infer (전체 프레임 letterbox 1회 또는 타일).
+        ROI 모드에서는 hotspot 주변 윈도우를 원본 해상도로 추론하고
+        전체 프레임은 FULL_INTERVAL 주기로만 추론한 뒤 클래스별 NMS로 병합.
+
+        반환 bbox는 뷰 좌표. ROI 모드는 윈도우를 뷰 좌표로 자르므로 뷰 방향 프레임을 한 번 만든다.
+        """
+        if not self.roi_enabled:
+            return self.detector.infer(frame, model_rgb=model_rgb, view=view)
+        if view is not None:
+            frame = view.render(frame)
+            model_rgb, view = None, None
+
+        h0, w0 = frame.shape[:2]
+        rois = []
+        if ir_hotspots is not None and len(ir_hotspots) and ir_size:
+            coord_params = self.coord_state.get()[0] if self.coord_state else None
+            pts = hotspots_to_frame(ir_hotspots, ir_size, (w0, h0), coord_params, ir_view=ir_view)
+            rois = hotspot_rois(
+                pts, (w0, h0), self._roi_size(),
+                pad=int(self.roi_cfg['PAD']), max_rois=int(self.roi_cfg['MAX_ROIS']),
+            )
+
+        full_interval = max(1, int(self.roi_cfg['FULL_INTERVAL']))
+        full = not rois or self._since_full is None or self._since_full + 1 >= full_interval
+        parts = []
+        if full:
+            parts.append(self.detector.infer(frame, model_rgb=model_rgb))
+            self._since_full = 0
+        else:
+            self._since_full += 1
+        for x0, y0, x1, y1 in rois:
+            s, b, c = self.detector.infer_window(frame[y0:y1, x0:x1])
+            parts.append((s, offset_boxes(b, x0, y0), c))
+        self._win_roi += len(rois)
+
+        return merge_detections(parts, (w0, h0))
 
     def _heartbeat(self):
         if LOG_EVERY_SEC <= 0:
@@ -468,29 +889,29 @@ class TFLiteWorker(threading.Thread):
             self._win_frames = 0
 
             # EMA 값들
-            et = self._ema_total_ms if self._ema_total_ms is not None else 0.0
-            ei = self._ema_invoke_ms if self._ema_invoke_ms is not None else 0.0
+            det = self.detector
+            et = det.ema_total_ms if det.ema_total_ms is not None else 0.0
+            ei = det.ema_invoke_ms if det.ema_invoke_ms is not None else 0.0
 
             tgt = (1.0/self.target_period) if self.target_period>0 else 0
-            det = getattr(self, "_win_det", 0)
-            det_raw = getattr(self, "_win_det_raw", 0)
-            _p(self.name, f"{self.accel} | FPS={fps:5.2f} (target={tgt}) | "
-                          f"total={et:6.1f} ms | invoke={ei:6.1f} ms | det={det} raw={det_raw}")
+            win = det.pop_counts()
+            n_key, n_prop = self.keyframes.pop_counts()
+            if self._win_lat_ms:
+                p50, p90, p99 = np.percentile(self._win_lat_ms, (50, 90, 99))
+                lat = f"lat p50={p50:.1f} p90={p90:.1f} p99={p99:.1f} ms"
+            else:
+                lat = "lat -"
+            _p(self.name, f"{det.accel} | FPS={fps:5.2f} (target={tgt}) | "
+                          f"total={et:6.1f} ms | invoke={ei:6.1f} ms | det={win['det']} raw={win['raw']} | "
+                          f"key={n_key} prop={n_prop} roi={self._win_roi} tiles={win['tiles']} "
+                          f"hw_pre={win['hw_pre']} | {lat} | stale={self._win_stale} "
+                          f"skip={self._win_skipped} throttle={self._win_throttled} | "
+                          f"duty={'full' if self._idle_period is None else 'idle'} idle={self._win_idle}")
+            self._win_roi = 0
+            self._win_idle = 0
+            self._win_lat_ms = []
+            self._win_stale = self._win_skipped = self._win_throttled = 0
             self._last_beat = now
-            self._win_det = 0
-            self._win_det_raw = 0
-
-    def _update_stats(self, invoke_ms, total_ms, det_count=0, raw_count=0):
-        # 윈도우 프레임 카운트
-        self._win_frames += 1
-        # EMA 업데이트
-        a = self._ema_alpha
-        def ema(prev, x):
-            return x if prev is None else (a * x + (1.0 - a) * prev)
-        self._ema_total_ms = ema(self._ema_total_ms, total_ms)
-        self._ema_invoke_ms = ema(self._ema_invoke_ms, invoke_ms)
-        self._win_det = getattr(self, "_win_det", 0) + det_count
-        self._win_det_raw = getattr(self, "_win_det_raw", 0) + raw_count
 
     def stop(self):
         self.stop_evt.set()
@@ -3,6 +3,8 @@ import logging
 import cv2
 import numpy as np
 
+from core.view_transform import IR_META, RGB_META, item_view, render_frame
+
 
 logger = logging.getLogger(__name__)
 
@@ -14,11 +16,12 @@ def _extract_frame(item):
     return frame
 
 
-def display_loop(d_rgb, d_ir, d_rgb_det, window_name="Vision AI Display",
+def display_loop(d_rgb, d_ir, d_fusion, window_name="Vision AI Display",
                  target_res=None, refresh_interval=0.03):
     """
     로컬 HDMI 출력용 디스플레이 루프.
-    - RGB 검출 프레임을 우선 표시하고, IR 프레임이 있으면 오른쪽에 함께 배치
+    - 융합 결과(주석이 그려진 검출 프레임)를 우선 표시하고, 없으면 RGB 원본
+    - IR 프레임이 있으면 오른쪽에 함께 배치
     - 'q' / ESC / 창 닫기로 종료
     """
     try:
@@ -28,11 +31,18 @@ def display_loop(d_rgb, d_ir, d_rgb_det, window_name="Vision AI Display",
         return
 
     while True:
-        rgb_item = d_rgb_det.read() or d_rgb.read()
-        ir_item = d_ir.read()
-
-        rgb_frame = _extract_frame(rgb_item)
-        ir_frame = _extract_frame(ir_item)
+        fusion_item = d_fusion.latest() if d_fusion else None
+        # 융합 결과가 있으면 그 결과가 사용한 IR (검출 주석과 같은 IR 프레임)
+        ir_item = fusion_item.ir_item if fusion_item is not None else d_ir.latest()
+
+        # 뷰 변환(회전/반전)은 출력 해상도로 줄인 뒤 적용
+        out_size = (int(target_res[0]), int(target_res[1])) if target_res else None
+        if fusion_item is not None:
+            rgb_frame = fusion_item.render(out_size)
+        else:
+            rgb_item = d_rgb.latest()
+            rgb_frame = render_frame(_extract_frame(rgb_item), item_view(rgb_item, RGB_META), out_size)
+        ir_frame = render_frame(_extract_frame(ir_item), item_view(ir_item, IR_META))
 
         if rgb_frame is None and ir_frame is None:
             time.sleep(refresh_interval)
@@ -3,10 +3,10 @@ import subprocess
 import sys
 from pathlib import Path
 from collections import deque
-from datetime import datetime
 import time
 import glob
 import os
+import threading
 
 from PyQt6.QtWidgets import (
     QApplication,
@@ -29,14 +29,14 @@ from PyQt6.QtWidgets import (
     QTabWidget,
     QFileDialog,
 )
-from PyQt6.QtCore import QTimer, Qt, QObject, pyqtSignal, QSize
+from PyQt6.QtCore import QTimer, Qt, QObject, QThread, pyqtSignal, QSize
 from PyQt6.QtGui import QImage, QPixmap
 
-import numpy as np
 import cv2
 
-from core.coord_mapper import CoordMapper
-from core.fire_fusion import FireFusion, apply_vis_mode
+from core.util import ts_to_epoch_ms
+from core.view_transform import IR_META, RGB_META, item_view, view_size
+from gui.overlay import OverlayCompositor, display_size, fit_frame
 
 logger = logging.getLogger(__name__)
 
@@ -45,25 +45,179 @@ try:
 except ImportError:
     RollingPlot = None
 
-def _cv_to_qpixmap(frame):
-    if frame is None:
-        return None
-    if frame.ndim == 2:
-        frame = np.stack([frame] * 3, axis=-1)
-    frame_rgb = frame[:, :, ::-1].copy()
-    h, w, ch = frame_rgb.shape
-    bytes_per_line = ch * w
-    qimg = QImage(frame_rgb.data, w, h, bytes_per_line, QImage.Format.Format_RGB888)
-    return QPixmap.fromImage(qimg)
+def _cv_to_qimage(frame):
+    """연속 BGR uint8 배열을 채널 교환 복사 없이 감싸는 QImage (frame이 살아 있는 동안만 유효)"""
+    h, w = frame.shape[:2]
+    return QImage(frame.data, w, h, frame.strides[0], QImage.Format.Format_BGR888)
 
 
-def _ts_to_epoch_ms(ts):
-    if not ts:
-        return None
-    try:
-        return datetime.strptime(ts, "%y%m%d%H%M%S%f").timestamp() * 1000.0
-    except Exception:
+class PanelRenderer:
+    """
+    프리뷰 라벨 하나의 표시 담당 (UI 스레드)
+
+    렌더 워커가 라벨의 디바이스 픽셀 크기에 맞춰 만든 QImage를 받아 픽스맵만 교체한다.
+    """
+
+    def __init__(self, label):
+        self.label = label
+
+    def target_size(self):
+        dpr = self.label.devicePixelRatioF()
+        size = self.label.size()
+        return (max(1, int(size.width() * dpr)), max(1, int(size.height() * dpr))), dpr
+
+    def apply(self, qimage, dpr):
+        pix = QPixmap.fromImage(qimage)
+        pix.setDevicePixelRatio(dpr)
+        self.label.setPixmap(pix)
+
+
+class RenderWorker(QObject):
+    """
+    프레임 준비 전담 워커 (QThread에서 실행)
+
+    버퍼 읽기, 오버레이 합성, 축소까지 처리하고 (융합/주석은 FusionService 결과 사용)
+    바뀐 패널의 QImage만 frame_ready 시그널로 보낸다. UI 스레드는 픽스맵 교체만 한다.
+    UI가 이전 결과를 아직 반영하지 않았으면 이번 틱은 건너뛴다 (큐 적체 방지).
+    IR 패널과 검출/IR 동기 상태는 FusionService 결과가 융합에 쓴 IR 항목을 따른다 (다시 짝짓지 않음).
+    """
+
+    frame_ready = pyqtSignal(object)
+
+    def __init__(self, buffers, overlay_compositor, interval_ms=50):
+        super().__init__()
+        self.buffers = buffers
+        self.overlay_compositor = overlay_compositor
+        self.interval_ms = interval_ms
+        self.timer = None
+        self._lock = threading.Lock()
+        self._targets = {}
+        self._coord_params = {}
+        self._keys = {}
+        self._inflight = threading.Event()
+        self._emit_ms = deque(maxlen=60)
+        self._latency_ms = deque(maxlen=60)
+
+    def set_view(self, targets, coord_params):
+        """UI 스레드에서 패널 크기/좌표 보정값 전달"""
+        with self._lock:
+            self._targets = dict(targets)
+            self._coord_params = dict(coord_params or {})
+
+    def ack(self):
+        """UI가 결과를 반영했음을 알림"""
+        self._inflight.clear()
+
+    def start(self):
+        self.timer = QTimer()
+        self.timer.timeout.connect(self.tick)
+        self.timer.start(self.interval_ms)
+
+    def stats(self):
+        """(렌더 fps, 평균 준비 지연 ms)"""
+        fps = _calc_fps(list(self._emit_ms))
+        lat = sum(self._latency_ms) / len(self._latency_ms) if self._latency_ms else 0.0
+        return fps, lat
+
+    def _panel_image(self, name, frame, key, targets, images, view=None, render=None):
+        """
+        키/표시 크기가 바뀐 패널만 축소 후 QImage로 (데이터를 소유하도록 copy)
+
+        view: 센서 방향 프레임의 뷰 변환. render(disp_size)가 주어지면 그 결과를 표시한다.
+        """
+        if frame is None or name not in targets:
+            return
+        target, dpr = targets[name]
+        cache_key = (key, frame.shape, target, view)
+        if self._keys.get(name) == cache_key:
+            return
+        if render is not None:
+            img = fit_frame(render(display_size(view_size(frame, view), target, upscale=True)), target)
+        else:
+            img = fit_frame(frame, target, view)
+        images[name] = (_cv_to_qimage(img).copy(), dpr)
+        self._keys[name] = cache_key
+
+    def tick(self):
+        if self._inflight.is_set():
+            return
+        t0 = time.perf_counter()
+        with self._lock:
+            targets = dict(self._targets)
+            coord_params = dict(self._coord_params)
+        if not targets:
+            return
+
+        fusion_item = self.buffers['fusion'].latest()
+        rgb_item = self.buffers['rgb'].latest()
+        # 융합 결과가 있으면 그 결과가 사용한 IR (검출 주석과 같은 IR 프레임)
+        ir_item = fusion_item.ir_item if fusion_item is not None else self.buffers['ir'].latest()
+        det_ts = fusion_item.det_ts if fusion_item else None
+        rgb_frame = rgb_item[0] if rgb_item else None
+        rgb_ts = rgb_item[1] if rgb_item else None
+        rgb_view = item_view(rgb_item, RGB_META)
+        ir_frame = ir_item[0] if ir_item else None
+        ir_ts = ir_item[1] if ir_item else None
+        ir_view = item_view(ir_item, IR_META)
+        params_key = repr(sorted(coord_params.items()))
+
+        images = {}
+        self._panel_image('rgb', rgb_frame, rgb_ts, targets, images, view=rgb_view)
+        self._panel_image('ir', ir_frame, ir_ts, targets, images, view=ir_view)
+
+        if 'overlay' in targets:
+            overlay_frame = self.overlay_compositor.compose(
+                rgb_frame, ir_frame, coord_params,
+                out_size=targets['overlay'][0], rgb_key=rgb_ts, ir_key=ir_ts,
+                rgb_view=rgb_view, ir_view=ir_view,
+            )
+            self._panel_image('overlay', overlay_frame, (rgb_ts, ir_ts, params_key), targets, images)
+
+        # 융합/주석은 FusionService가 한 번만 수행한 결과를 그대로 표시
+        if fusion_item is not None:
+            self._panel_image('det', fusion_item.frame, fusion_item.seq, targets, images,
+                              view=fusion_item.view, render=fusion_item.render)
+
+        ts_key = (det_ts, rgb_ts, ir_ts)
+        if not images and self._keys.get('ts') == ts_key:
+            return
+        self._keys['ts'] = ts_key
+
+        ir_meta = ir_item[2] if ir_item and len(ir_item) > 2 else None
+        ir_max = ir_min = None
+        if ir_meta and isinstance(ir_meta, dict):
+            ir_max = ir_meta.get('temp_corrected', ir_meta.get('temp_raw'))
+            ir_min = ir_meta.get('min_temp', None)
+        result = {
+            'images': images,
+            'det_ts': det_ts,
+            'rgb_ts': rgb_ts,
+            'ir_ts': ir_ts,
+            't_det': ts_to_epoch_ms(det_ts),
+            't_rgb': ts_to_epoch_ms(rgb_ts),
+            't_ir': ts_to_epoch_ms(ir_ts),
+            # SYNC 사용 시에만 확정된 쌍의 시차 (아니면 최신 IR과의 차이로 WARN 표시)
+            'sync_diff_ms': fusion_item.sync_diff_ms if fusion_item and fusion_item.sync_stats else None,
+            'sync_stats': (fusion_item.sync_stats if fusion_item else None) or {},
+            'det_count': len(fusion_item.detections) if fusion_item else 0,
+            'det_shape': _view_shape(fusion_item.frame, fusion_item.view) if fusion_item else None,
+            'rgb_shape': _view_shape(rgb_frame, rgb_view),
+            'ir_shape': _view_shape(ir_frame, ir_view),
+            'ir_min': ir_min,
+            'ir_max': ir_max,
+        }
+        self._latency_ms.append((time.perf_counter() - t0) * 1000.0)
+        self._emit_ms.append(time.time() * 1000.0)
+        self._inflight.set()
+        self.frame_ready.emit(result)
+
+
+def _view_shape(frame, view):
+    """표시 방향 shape (h, w[, c])"""
+    if frame is None:
         return None
+    w, h = view_size(frame, view)
+    return (h, w) + tuple(frame.shape[2:])
 
 
 def _calc_fps(history_ms):
@@ -93,58 +247,6 @@ def _overlay_text(frame, lines, margin=6, line_height=None, color=(255, 255, 255
     return out
 
 
-def build_overlay(rgb_frame, ir_frame, params):
-    if rgb_frame is None or ir_frame is None:
-        return None
-    if rgb_frame.size == 0 or ir_frame.size == 0:
-        return None
-    # 채널 정규화
-    if rgb_frame.ndim == 2:
-        rgb_frame = cv2.cvtColor(rgb_frame, cv2.COLOR_GRAY2BGR)
-    elif rgb_frame.shape[2] == 4:
-        rgb_frame = cv2.cvtColor(rgb_frame, cv2.COLOR_BGRA2BGR)
-    if ir_frame.ndim == 2:
-        ir_frame = cv2.cvtColor(ir_frame, cv2.COLOR_GRAY2BGR)
-    elif ir_frame.shape[2] == 4:
-        ir_frame = cv2.cvtColor(ir_frame, cv2.COLOR_BGRA2BGR)
-
-    rgb_h, rgb_w = rgb_frame.shape[:2]
-    ir_h, ir_w = ir_frame.shape[:2]
-    mapper = CoordMapper(
-        ir_size=(ir_w, ir_h),
-        rgb_size=(rgb_w, rgb_h),
-        offset_x=params.get('offset_x', 0.0),
-        offset_y=params.get('offset_y', 0.0),
-        scale=params.get('scale'),
-    )
-    scale = mapper.scale
-    target_w = max(1, int(ir_w * scale))
-    target_h = max(1, int(ir_h * scale))
-    ir_resized = cv2.resize(ir_frame, (target_w, target_h), interpolation=cv2.INTER_LINEAR)
-    overlay = rgb_frame.copy()
-    x = int(mapper.base_offset_x + mapper.offset_x)
-    y = int(mapper.base_offset_y + mapper.offset_y)
-
-    x0 = max(0, x)
-    y0 = max(0, y)
-    x1 = min(rgb_w, x + target_w)
-    y1 = min(rgb_h, y + target_h)
-
-    if x0 >= x1 or y0 >= y1:
-        return overlay
-
-    ir_x0 = x0 - x
-    ir_y0 = y0 - y
-    ir_x1 = ir_x0 + (x1 - x0)
-    ir_y1 = ir_y0 + (y1 - y0)
-
-    alpha = 0.4
-    roi_rgb = overlay[y0:y1, x0:x1]
-    roi_ir = ir_resized[ir_y0:ir_y1, ir_x0:ir_x1]
-    cv2.addWeighted(roi_ir, alpha, roi_rgb, 1 - alpha, 0, dst=roi_rgb)
-    return overlay
-
-
 def _paths_to_text(value):
     if isinstance(value, (list, tuple)):
         return ";".join(str(v) for v in value)
@@ -210,6 +312,10 @@ class LogSignaller(QObject):
     message = pyqtSignal(str)
 
 
+class CalibSignaller(QObject):
+    done = pyqtSignal(object)
+
+
 class QtLogHandler(logging.Handler):
     def __init__(self):
         super().__init__()
@@ -238,14 +344,7 @@ class MainWindow(QMainWindow):
         self._last_det_ts = None
         self._coord_auto_set = False
         coord_params = self.controller.get_coord_cfg() if self.controller else {'offset_x': 0.0, 'offset_y': 0.0, 'scale': 1.0}
-        target_res = getattr(self.config, "TARGET_RES", (960, 540))
-        self.fire_fusion = FireFusion(
-            ir_size=(160, 120),
-            rgb_size=tuple(target_res),
-            offset_x=0,
-            offset_y=0,
-            scale=None,
-        )
+        self.overlay_compositor = OverlayCompositor(alpha=0.4)
 
         rgb_input_cfg, ir_input_cfg = (self.controller.get_input_cfg() if self.controller else ({}, {}))
 
@@ -459,6 +558,29 @@ class MainWindow(QMainWindow):
         scale_group.setLayout(scale_form)
         coord_layout.addWidget(scale_group)
 
+        # 자동 캘리브레이션 그룹 (라이브 RGB/IR 버퍼의 단일 열원 대응점)
+        calib_group = QGroupBox("Auto Calibrate")
+        calib_form = QGridLayout()
+        _compact_layout(calib_form, margins=(8, 6, 8, 6), h_spacing=6, v_spacing=6)
+        self.calib_pairs_spin = QSpinBox()
+        self.calib_pairs_spin.setRange(10, 5000)
+        self.calib_pairs_spin.setValue(300)
+        self.calib_timeout_spin = QDoubleSpinBox()
+        self.calib_timeout_spin.setSuffix(" s")
+        self.calib_timeout_spin.setRange(5.0, 600.0)
+        self.calib_timeout_spin.setValue(60.0)
+        calib_form.addWidget(QLabel("Frame Pairs"), 0, 0)
+        calib_form.addWidget(self.calib_pairs_spin, 0, 1, 1, 3)
+        calib_form.addWidget(QLabel("Timeout"), 1, 0)
+        calib_form.addWidget(self.calib_timeout_spin, 1, 1, 1, 3)
+        self.auto_calib_btn = QPushButton("Auto Calibrate")
+        self.auto_calib_btn.clicked.connect(self.start_auto_calibration)
+        calib_form.addWidget(self.auto_calib_btn, 2, 1, 1, 2)
+        calib_group.setLayout(calib_form)
+        coord_layout.addWidget(calib_group)
+        self.calib_signaller = CalibSignaller()
+        self.calib_signaller.done.connect(self._on_auto_calibrated)
+
         # Apply 버튼
         self.apply_coord_btn = QPushButton("Apply Coord")
         self.apply_coord_btn.clicked.connect(self.apply_coord_settings)
@@ -658,6 +780,20 @@ class MainWindow(QMainWindow):
 
         self.setCentralWidget(main_widget)
 
+        self.panels = {
+            'rgb': PanelRenderer(self.rgb_label),
+            'det': PanelRenderer(self.det_label),
+            'ir': PanelRenderer(self.ir_label),
+            'overlay': PanelRenderer(self.overlay_label),
+        }
+        # 프레임 준비(융합/오버레이/축소)는 렌더 스레드에서, UI 스레드는 픽스맵 교체만
+        self.render_thread = QThread(self)
+        self.render_worker = RenderWorker(self.buffers, self.overlay_compositor)
+        self.render_worker.moveToThread(self.render_thread)
+        self.render_thread.started.connect(self.render_worker.start)
+        self.render_worker.frame_ready.connect(self._apply_render)
+        self.render_thread.start()
+
         self.timer = QTimer(self)
         self.timer.timeout.connect(self.update_frames)
         self.timer.start(50)
@@ -855,9 +991,11 @@ class MainWindow(QMainWindow):
             self.append_log(f"RGB inference apply failed: {e}")
 
     def on_vis_mode_change(self, text):
-        """시각화 모드 변경 시 내부 상태와 환경변수를 동기화"""
+        """시각화 모드 변경 시 내부 상태와 환경변수를 동기화하고 융합 스테이지에 적용"""
         self.fusion_vis_mode = (text or "test").lower()
         os.environ["FUSION_VIS_MODE"] = self.fusion_vis_mode
+        if self.controller:
+            self.controller.set_vis_mode(self.fusion_vis_mode)
 
     def browse_model(self):
         start_dir = str(Path(self.model_edit.text()).parent) if self.model_edit.text() else str(Path.cwd())
@@ -900,6 +1038,32 @@ class MainWindow(QMainWindow):
         self.append_log(f"Scale nudged to {new_scale:.3f}")
         self.apply_coord_settings()
 
+    def start_auto_calibration(self):
+        if not self.controller:
+            self.append_log("Controller unavailable")
+            return
+        started = self.controller.start_auto_calibration(
+            n_pairs=self.calib_pairs_spin.value(),
+            timeout_s=self.calib_timeout_spin.value(),
+            on_done=self.calib_signaller.done.emit,
+        )
+        if not started:
+            self.append_log("Auto calibration already running")
+            return
+        self.auto_calib_btn.setEnabled(False)
+        self.append_log("Auto calibration started (show a single hot source to both cameras)")
+
+    def _on_auto_calibrated(self, result):
+        self.auto_calib_btn.setEnabled(True)
+        if result is None:
+            self.append_log("Auto calibration failed (not enough correspondences)")
+            return
+        self._sync_coord_ui()
+        self.append_log(
+            f"Auto calibration ({result['model']}): inliers={result['inliers']}/{result['n']} "
+            f"rmse={result['rmse']:.2f}px"
+        )
+
     def _sync_coord_ui(self):
         """컨트롤러에 저장된 좌표/스케일을 UI에 반영 (가시성 확보용)"""
         if not self.controller:
@@ -922,52 +1086,59 @@ class MainWindow(QMainWindow):
             self.scale_spin.blockSignals(False)
 
     def closeEvent(self, event):
+        self.timer.stop()
+        self.render_thread.quit()
+        self.render_thread.wait(2000)
         if self.capture_process:
             self.stop_capture()
         if self.controller and self.controller.sender_running():
             self.controller.stop_sender()
         if self.controller:
+            self.controller.stop_fusion()
+            self.controller.stop_governor()
             self.controller.stop_sources()
         if self.log_handler:
             logging.getLogger().removeHandler(self.log_handler)
         super().closeEvent(event)
 
     def update_frames(self):
-        det_item = self.buffers['rgb_det'].read()
-        rgb_item = self.buffers['rgb'].read()
-        ir_item = self.buffers['ir'].read()
-
-        det_frame = det_item[0] if det_item else None
-        det_meta = det_item[2] if det_item and len(det_item) > 2 else None
-        det_count = len(det_meta) if det_meta else 0
-        det_ts_str = det_item[1] if det_item else None
-        ir_meta = ir_item[2] if ir_item and len(ir_item) > 2 else None
-        ir_hotspots = ir_item[3] if ir_item and len(ir_item) > 3 else []
-        ir_max = None
-        ir_min = None
-        if ir_meta and isinstance(ir_meta, dict):
-            ir_max = ir_meta.get('temp_corrected', ir_meta.get('temp_raw'))
-            ir_min = ir_meta.get('min_temp', None)
-        rgb_frame = rgb_item[0] if rgb_item else None
-        ir_frame = ir_item[0] if ir_item else None
-        t_det = _ts_to_epoch_ms(det_ts_str) if det_ts_str else None
-        t_rgb = _ts_to_epoch_ms(rgb_item[1]) if rgb_item else None
-        t_ir = _ts_to_epoch_ms(ir_item[1]) if ir_item else None
+        """UI 타이머: 렌더 워커에 표시 조건 전달 + 좌표 UI 동기화 (프레임 처리는 워커에서)"""
+        targets = {name: panel.target_size() for name, panel in self.panels.items()}
+        coord_params = self.controller.get_coord_cfg() if self.controller else {}
+        self.render_worker.set_view(targets, coord_params)
+        self._sync_coord_ui()
+
+    def _apply_render(self, result):
+        """렌더 워커 결과 반영 (UI 스레드: 픽스맵 교체 + 라벨 텍스트)"""
+        try:
+            self._apply_render_result(result)
+        finally:
+            self.render_worker.ack()
+
+    def _apply_render_result(self, result):
+        for name, (qimage, dpr) in result['images'].items():
+            self.panels[name].apply(qimage, dpr)
+
+        det_ts_str = result['det_ts']
+        det_count = result['det_count']
+        t_det, t_rgb, t_ir = result['t_det'], result['t_rgb'], result['t_ir']
+        rgb_shape, ir_shape, det_shape = result['rgb_shape'], result['ir_shape'], result['det_shape']
+        ir_min, ir_max = result['ir_min'], result['ir_max']
 
-        if det_item and det_ts_str != self._last_det_ts:
+        if det_ts_str and det_ts_str != self._last_det_ts:
             self._last_det_ts = det_ts_str
             self.det_ts_history.append(time.time() * 1000.0)
-        if t_rgb:
+        if t_rgb and (not self.rgb_ts_history or self.rgb_ts_history[-1] != t_rgb):
             self.rgb_ts_history.append(t_rgb)
-        if t_ir:
+        if t_ir and (not self.ir_ts_history or self.ir_ts_history[-1] != t_ir):
             self.ir_ts_history.append(t_ir)
 
         # 초기 scale이 None인 경우 프레임 크기로 자동 계산해 한 번만 UI/컨트롤러에 반영
-        if self.controller and not self._coord_auto_set and rgb_frame is not None and ir_frame is not None:
+        if self.controller and not self._coord_auto_set and rgb_shape is not None and ir_shape is not None:
             coord = self.controller.get_coord_cfg()
             if coord.get('scale') is None:
                 try:
-                    auto_scale = min(rgb_frame.shape[1] / ir_frame.shape[1], rgb_frame.shape[0] / ir_frame.shape[0])
+                    auto_scale = min(rgb_shape[1] / ir_shape[1], rgb_shape[0] / ir_shape[0])
                     if auto_scale > 0:
                         updated = dict(coord, scale=auto_scale)
                         self.controller.set_coord_cfg(updated)
@@ -979,76 +1150,61 @@ class MainWindow(QMainWindow):
                 except Exception:
                     pass
 
-        self._sync_coord_ui()
-
-        vis_mode = getattr(self, "fusion_vis_mode", "test")
-        # Fusion annotations will be drawn later (after mode filtering) on this base frame.
-        annotated_det = det_frame.copy() if det_frame is not None else None
-
-        if rgb_frame is not None:
-            pix = _cv_to_qpixmap(rgb_frame)
-            if pix:
-                self.rgb_label.setPixmap(pix.scaled(
-                    self.rgb_label.size(), Qt.AspectRatioMode.KeepAspectRatio,
-                    Qt.TransformationMode.SmoothTransformation))
+        model_name = getattr(self.config, "MODEL", "-") if self.config else "-"
+        if rgb_shape is not None:
             rgb_dev = "-"
             if self.controller:
                 rgb_cfg, _ = self.controller.get_input_cfg()
                 rgb_dev = rgb_cfg.get('DEVICE', "-")
-            model_name = getattr(self.config, "MODEL", "-") if self.config else "-"
             self.rgb_info.setText(
-                f"RGB {rgb_frame.shape[1]}x{rgb_frame.shape[0]} | fps~{_calc_fps(self.rgb_ts_history):.1f} | dev={rgb_dev} | model={model_name}"
+                f"RGB {rgb_shape[1]}x{rgb_shape[0]} | fps~{_calc_fps(self.rgb_ts_history):.1f} | dev={rgb_dev} | model={model_name}"
             )
-        if annotated_det is not None:
-            pix = _cv_to_qpixmap(annotated_det)
-            if pix:
-                self.det_label.setPixmap(pix.scaled(
-                    self.det_label.size(), Qt.AspectRatioMode.KeepAspectRatio,
-                    Qt.TransformationMode.SmoothTransformation))
-            model_name = getattr(self.config, "MODEL", "-") if self.config else "-"
-            self.det_info.setText(
-                f"Det {annotated_det.shape[1]}x{annotated_det.shape[0]} | det={det_count} | model={model_name}"
-            )
-        if ir_frame is not None:
-            pix = _cv_to_qpixmap(ir_frame)
-            if pix:
-                self.ir_label.setPixmap(pix.scaled(
-                    self.ir_label.size(), Qt.AspectRatioMode.KeepAspectRatio,
-                    Qt.TransformationMode.SmoothTransformation))
+        if ir_shape is not None:
             ir_dev = "-"
             if self.controller:
                 _, ir_cfg = self.controller.get_input_cfg()
                 ir_dev = ir_cfg.get('DEVICE', "-")
             self.ir_info.setText(
-                f"IR {ir_frame.shape[1]}x{ir_frame.shape[0]} | fps~{_calc_fps(self.ir_ts_history):.1f} | dev={ir_dev}"
+                f"IR {ir_shape[1]}x{ir_shape[0]} | fps~{_calc_fps(self.ir_ts_history):.1f} | dev={ir_dev}"
                 + (f" | min={ir_min:.1f}C" if ir_min is not None else "")
                 + (f" | max={ir_max:.1f}C" if ir_max is not None else "")
             )
+        if det_shape is not None and 'det' in result['images']:
+            self.det_info.setText(
+                f"Det {det_shape[1]}x{det_shape[0]} | det={det_count} | model={model_name}"
+            )
+        if 'overlay' in result['images']:
+            coord = self.controller.get_coord_cfg() if self.controller else {}
+            self.overlay_info.setText(
+                f"Overlay offset=({coord.get('offset_x',0):.1f},{coord.get('offset_y',0):.1f}) scale={coord.get('scale','auto')}"
+            )
 
-        status = []
-        if det_item:
-            status.append(f"Det ts: {det_item[1]} (det={det_count})")
-        if rgb_item:
-            status.append(f"RGB ts: {rgb_item[1]}")
-        if ir_item:
-            status.append(f"IR ts: {ir_item[1]}")
         sender_state = "Sender: ON" if self.controller and self.controller.sender_running() else "Sender: OFF"
-        display_state = ""
         det_fps = _calc_fps(self.det_ts_history)
         rgb_fps = _calc_fps(self.rgb_ts_history)
         ir_fps = _calc_fps(self.ir_ts_history)
+        render_fps, render_ms = self.render_worker.stats()
         max_diff = self.sync_cfg.get('MAX_DIFF_MS', 120)
-        if t_det and t_ir:
-            diff = abs(t_det - t_ir)
-            sync_state = f"SYNC: {'OK' if diff <= max_diff else f'WARN ({diff:.0f}ms)'}"
+        sync_diff = result.get('sync_diff_ms')
+        sync_stats = result.get('sync_stats') or {}
+        if sync_diff is not None:
+            sync_state = f"SYNC: OK ({abs(sync_diff):.0f}ms)"
+        elif t_det and t_ir:
+            sync_state = f"SYNC: WARN ({abs(t_det - t_ir):.0f}ms)"
         else:
             sync_state = "SYNC: N/A"
         # 상태 라벨: 3줄 고정 포맷으로 높이 변동 방지
-        line1 = f"{sender_state} | {sync_state} | MaxDiff={max_diff}ms"
-        line2 = f"Det {det_fps:.1f} FPS | IR {ir_fps:.1f} FPS | RGB {rgb_fps:.1f} FPS"
-        ts_det = det_item[1] if det_item else "-"
-        ts_rgb = rgb_item[1] if rgb_item else "-"
-        ts_ir = ir_item[1] if ir_item else "-"
+        line1 = (
+            f"{sender_state} | {sync_state} | MaxDiff={max_diff}ms"
+            f" | pairs={sync_stats.get('matched', 0)} drop={sync_stats.get('dropped', 0)}"
+        )
+        line2 = (
+            f"Det {det_fps:.1f} FPS | IR {ir_fps:.1f} FPS | RGB {rgb_fps:.1f} FPS"
+            f" | Render {render_fps:.1f} FPS {render_ms:.1f}ms"
+        )
+        ts_det = det_ts_str or "-"
+        ts_rgb = result['rgb_ts'] or "-"
+        ts_ir = result['ir_ts'] or "-"
         line3 = f"TS det={ts_det} | rgb={ts_rgb} | ir={ts_ir}"
         self.status_label.setText("\n".join([line1, line2, line3]))
         if self.det_plot:
@@ -1058,67 +1214,6 @@ class MainWindow(QMainWindow):
         if self.ir_plot:
             self.ir_plot.update_value(ir_fps)
 
-        base_rgb_for_overlay = rgb_frame
-        overlay_frame = build_overlay(base_rgb_for_overlay, ir_frame, self.controller.get_coord_cfg() if self.controller else {})
-        if overlay_frame is not None:
-            pix = _cv_to_qpixmap(overlay_frame)
-            if pix:
-                self.overlay_label.setPixmap(pix.scaled(
-                    self.overlay_label.size(), Qt.AspectRatioMode.KeepAspectRatio,
-                    Qt.TransformationMode.SmoothTransformation))
-            coord = self.controller.get_coord_cfg() if self.controller else {}
-            self.overlay_info.setText(
-                f"Overlay offset=({coord.get('offset_x',0):.1f},{coord.get('offset_y',0):.1f}) scale={coord.get('scale','auto')}"
-            )
-
-        # Fusion (IR + EO) overlay with color-coded boxes on det frame
-        fusion_info = "-"
-        if det_meta and annotated_det is not None:
-            if self.controller:
-                params = self.controller.get_coord_cfg()
-                self.fire_fusion.coord_mapper = CoordMapper(
-                    ir_size=(160, 120),
-                    rgb_size=tuple(getattr(self.config, "TARGET_RES", (960, 540))),
-                    offset_x=params.get('offset_x', 0.0),
-                    offset_y=params.get('offset_y', 0.0),
-                    scale=params.get('scale'),
-                )
-            if not isinstance(ir_hotspots, list):
-                ir_hotspots = []
-            eo_bboxes = [d for d in det_meta if len(d) >= 6]
-            fusion = self.fire_fusion.fuse(ir_hotspots, eo_bboxes)
-            anns_in = fusion.get('eo_annotations', [])
-            anns_out = apply_vis_mode(anns_in, vis_mode)
-            logger.debug("[GUI] vis_mode=%s anns_in=%d anns_out=%d ir_hotspot=%d", vis_mode, len(anns_in), len(anns_out), len(ir_hotspots))
-            fusion['eo_annotations'] = anns_out
-            fusion_info = f"{fusion['status']} | conf={fusion['confidence']:.2f} | ir_hotspot={len(ir_hotspots)} | eo={len(eo_bboxes)}"
-            for ann in fusion.get('eo_annotations', []):
-                bbox = ann.get('bbox', [])
-                if len(bbox) < 4:
-                    continue
-                x, y, w, h = bbox
-                color = ann.get('color', (0, 0, 255))
-                x0, y0 = int(x), int(y)
-                x1, y1 = int(x + w), int(y + h)
-                cv2.rectangle(annotated_det, (x0, y0), (x1, y1), color, 3)
-                label = ann.get('label', "")
-                if label:
-                    text_y = max(0, y0 - 6)
-                    cv2.putText(annotated_det, label, (x0, text_y), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 0), 3, cv2.LINE_AA)
-                    cv2.putText(annotated_det, label, (x0, text_y), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 1, cv2.LINE_AA)
-
-        # Det view 업데이트는 vis_mode 적용 후 그린 annotated_det을 사용
-        if annotated_det is not None:
-            pix = _cv_to_qpixmap(annotated_det)
-            if pix:
-                self.det_label.setPixmap(pix.scaled(
-                    self.det_label.size(), Qt.AspectRatioMode.KeepAspectRatio,
-                    Qt.TransformationMode.SmoothTransformation))
-            model_name = getattr(self.config, "MODEL", "-") if self.config else "-"
-            self.det_info.setText(
-                f"Det {annotated_det.shape[1]}x{annotated_det.shape[0]} | det={det_count} | model={model_name}"
-            )
-
 
 def run_gui(buffers, camera_state, controller):
     app = QApplication([])
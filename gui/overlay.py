@@ -0,0 +1,170 @@
+"""
+IR-RGB 오버레이 합성 (Qt 비의존)
+
+GUI 타이머(50ms)마다 오버레이를 새로 만들지 않도록
+- CoordMapper(remap 격자 포함)는 (IR 크기, 출력 크기, COORD 파라미터)로 캐시
+- IR 투영 레이어는 IR 프레임 시퀀스(ts)가 바뀔 때만 다시 계산
+- RGB는 원본(1080p)이 아닌 표시 해상도로 미리 할당한 캔버스에 축소 후 합성
+
+fit_frame은 패널 표시용으로 프레임을 라벨 크기에 맞게 먼저 줄인다.
+센서 방향 프레임의 뷰 변환(회전/반전)은 표시 해상도로 줄인 뒤에 적용하고,
+IR 뷰 변환은 CoordMapper remap 격자에 합쳐 IR 프레임을 회전하지 않는다.
+"""
+
+import cv2
+import numpy as np
+
+from core.coord_mapper import CoordMapper
+from core.view_transform import view_size
+
+
+# (IR 크기, RGB 크기, COORD 파라미터) → CoordMapper 캐시
+_MAPPER_CACHE = {}
+_MAPPER_CACHE_MAX = 8
+
+
+def cached_mapper(ir_size, rgb_size, params, ir_view=None):
+    """파라미터/프레임 크기/IR 뷰 변환이 같으면 이전 CoordMapper를 재사용"""
+    params = params or {}
+    key = (tuple(ir_size), tuple(rgb_size), repr(sorted(params.items())), ir_view)
+    mapper = _MAPPER_CACHE.get(key)
+    if mapper is None:
+        if len(_MAPPER_CACHE) >= _MAPPER_CACHE_MAX:
+            _MAPPER_CACHE.clear()
+        mapper = CoordMapper.from_params(tuple(ir_size), tuple(rgb_size), params, ir_view=ir_view)
+        _MAPPER_CACHE[key] = mapper
+    return mapper
+
+
+def _to_bgr(frame):
+    if frame.ndim == 2:
+        return cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+    if frame.shape[2] == 4:
+        return cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
+    return frame
+
+
+def display_size(frame_size, out_size, upscale=False):
+    """비율을 유지하며 out_size 안에 들어가는 크기 (upscale=False면 확대하지 않음)"""
+    w, h = frame_size
+    if not out_size or out_size[0] <= 0 or out_size[1] <= 0:
+        return w, h
+    k = min(out_size[0] / w, out_size[1] / h)
+    if not upscale:
+        k = min(k, 1.0)
+    return max(1, int(round(w * k))), max(1, int(round(h * k)))
+
+
+def fit_frame(frame, out_size, view=None):
+    """
+    표시 영역에 맞춰 OpenCV로 먼저 리사이즈한 연속 BGR uint8 프레임
+
+    축소는 INTER_AREA, 확대(IR 160x120 등)는 INTER_LINEAR. 크기가 같으면 복사하지 않는다.
+    view(센서 방향 프레임의 뷰 변환)가 있으면 표시 크기로 줄인 뒤 회전/반전한다.
+    """
+    frame = _to_bgr(frame)
+    size = view_size(frame, view)
+    disp = display_size(size, out_size, upscale=True)
+    if view is not None:
+        frame = view.render(frame, disp)
+    elif disp != size:
+        interp = cv2.INTER_AREA if disp[0] < size[0] else cv2.INTER_LINEAR
+        frame = cv2.resize(frame, disp, interpolation=interp)
+    return np.ascontiguousarray(frame)
+
+
+class OverlayCompositor:
+    """
+    RGB 위에 투영된 IR을 알파 합성하는 캐시형 합성기
+
+    compose()가 반환하는 배열은 내부 캔버스이므로 다음 호출 전까지만 유효하다
+    (QImage/QPixmap 변환처럼 바로 복사해 쓰는 용도).
+    """
+
+    def __init__(self, alpha=0.4):
+        self.alpha = float(alpha)
+        self._canvas = None
+        self._layer = None          # (ir_pre, mask, roi)
+        self._layer_key = None
+        self._blend = None
+        self._out_key = None
+        self.stats = {'layer_builds': 0, 'rgb_resizes': 0, 'reuses': 0}
+
+    def _params_for(self, params, rgb_size):
+        """원본 RGB 픽셀 기준 파라미터를 표시 해상도에서도 쓰도록 ref_size 지정"""
+        params = dict(params or {})
+        if not params.get('ref_size'):
+            params['ref_size'] = [int(rgb_size[0]), int(rgb_size[1])]
+        return params
+
+    def _build_layer(self, ir_frame, params, disp, ir_view=None):
+        ir_frame = _to_bgr(ir_frame)
+        ir_size = (ir_frame.shape[1], ir_frame.shape[0])
+        mapper = cached_mapper(ir_size, disp, params, ir_view)
+        warped, mask, roi = mapper.warp_ir(ir_frame)
+        self.stats['layer_builds'] += 1
+        if warped is None:
+            return None
+        # 합성식 out = rgb * (1 - a) + ir * a 중 IR 항(+반올림 0.5)을 미리 계산
+        ir_pre = warped.astype(np.float32) * self.alpha + 0.5
+        return ir_pre, mask, roi
+
+    def compose(self, rgb_frame, ir_frame, params, out_size=None, rgb_key=None, ir_key=None,
+                rgb_view=None, ir_view=None):
+        """
+        표시 해상도 오버레이 생성
+
+        Args:
+            rgb_frame: BGR 프레임 (원본 해상도)
+            ir_frame: IR 컬러맵 프레임
+            params: COORD 파라미터 dict (원본 RGB 픽셀 기준)
+            out_size: 표시 영역 (width, height), None이면 원본 해상도
+            rgb_key / ir_key: 프레임 시퀀스 키 (ts 등). 같으면 이전 결과 재사용
+            rgb_view / ir_view: 센서 방향 프레임의 뷰 변환 (합성 결과는 RGB 뷰 방향)
+
+        Returns:
+            np.ndarray or None
+        """
+        if rgb_frame is None or ir_frame is None or rgb_frame.size == 0 or ir_frame.size == 0:
+            return None
+        rgb_size = view_size(rgb_frame, rgb_view)
+        disp = display_size(rgb_size, out_size)
+        params = self._params_for(params, rgb_size)
+        p_key = repr(sorted(params.items()))
+
+        rgb_key = rgb_key if rgb_key is not None else id(rgb_frame)
+        ir_key = ir_key if ir_key is not None else id(ir_frame)
+        layer_key = (ir_key, ir_frame.shape, disp, p_key, ir_view)
+        out_key = (rgb_key, rgb_size, rgb_view, layer_key)
+        if out_key == self._out_key and self._canvas is not None:
+            self.stats['reuses'] += 1
+            return self._canvas
+
+        if self._canvas is None or self._canvas.shape[:2] != (disp[1], disp[0]):
+            self._canvas = np.empty((disp[1], disp[0], 3), dtype=np.uint8)
+        if layer_key != self._layer_key:
+            self._layer = self._build_layer(ir_frame, params, disp, ir_view)
+            self._layer_key = layer_key
+
+        # 캔버스에는 이전 합성 결과가 남아 있으므로 RGB부터 다시 깐다
+        rgb = _to_bgr(rgb_frame)
+        if rgb_view is not None:
+            np.copyto(self._canvas, rgb_view.render(rgb, disp))
+        elif disp == rgb_size:
+            np.copyto(self._canvas, rgb)
+        else:
+            cv2.resize(rgb, disp, dst=self._canvas, interpolation=cv2.INTER_AREA)
+        self.stats['rgb_resizes'] += 1
+
+        if self._layer is not None:
+            ir_pre, mask, roi = self._layer
+            x0, y0, x1, y1 = roi
+            view = self._canvas[y0:y1, x0:x1]
+            if self._blend is None or self._blend.shape != ir_pre.shape:
+                self._blend = np.empty(ir_pre.shape, dtype=np.float32)
+            np.multiply(view, 1.0 - self.alpha, out=self._blend, casting='unsafe')
+            self._blend += ir_pre
+            np.copyto(view, self._blend, where=mask[..., None], casting='unsafe')
+
+        self._out_key = out_key
+        return self._canvas
@@ -1,3 +1,4 @@
+import argparse
 import base64
 import json
 import os
@@ -9,10 +10,15 @@ import zlib
 import cv2
 import numpy as np
 
+from core.records import unpack_records
+from core.video_stream import STREAM_MODES, VideoStreamReader
+
 REQUIRED_IMAGES = {
     "rgb_det": ("data_b64", "shape", "dtype"),
     "ir": ("data_b64", "shape", "dtype"),
 }
+# 영상 스트림 모드의 rgb_det 엔트리 (픽셀은 두 번째 소켓으로 수신)
+STREAM_IMAGE_KEYS = ("video_seq", "shape", "dtype")
 
 # ===== 저장 경로 설정 =====
 SAVE_DIR_RGB = "save/visible"
@@ -69,6 +75,20 @@ def _maybe_decode_annots(entry):
     return []
 
 
+def _draw_hotspots(frame, ir_entry):
+    """IR 엔트리의 hotspot 레코드(뷰 방향 픽셀)를 프레임에 표시"""
+    if frame is None or not isinstance(ir_entry, dict):
+        return frame
+    hot = unpack_records(ir_entry.get("hotspots"))
+    if hot is None or not len(hot):
+        return frame
+    if not frame.flags.writeable:
+        frame = frame.copy()
+    for x, y in np.column_stack([hot["x"], hot["y"]]).round().astype(int):
+        cv2.drawMarker(frame, (int(x), int(y)), (0, 255, 0), cv2.MARKER_CROSS, 8, 1)
+    return frame
+
+
 def _draw_max_temp_text(frame, ir_entry):
     """IR 프레임에 최고/최저 온도 정보를 오버레이"""
     if frame is None or not isinstance(ir_entry, dict):
@@ -233,11 +253,25 @@ def save_frames(rgb_frame, ir_frame, timestamp):
             print(f"[SAVED] IR → {ir_file}")
 
 
-def receive_and_display(host="0.0.0.0", port=9999):
+def _valid_entry(name, entry):
+    required = STREAM_IMAGE_KEYS if isinstance(entry, dict) and "video_seq" in entry else REQUIRED_IMAGES[name]
+    return isinstance(entry, dict) and all(k in entry for k in required)
+
+
+def receive_and_display(host="0.0.0.0", port=9999, stream="jpeg", stream_port=None):
+    """
+    stream이 h264/h265면 stream_port(기본 port + 1)에서 영상 스트림을 받아
+    패킷의 video_seq로 rgb_det 프레임을 찾는다 (JPEG 엔트리는 그대로 디코딩)
+    """
     receiver = ImageReceiver(host, port)
 
     if not receiver.start_server():
         return
+    video = None
+    if stream != "jpeg":
+        video = VideoStreamReader(stream_port or port + 1, codec=stream, host=host)
+        video.start()
+        print(f"[Receiver] {stream} stream listening on {host}:{video.port}")
     if not receiver.wait_for_client():
         receiver.close()
         return
@@ -257,6 +291,7 @@ def receive_and_display(host="0.0.0.0", port=9999):
     rgb_scale = 1.0
     ir_rot = 0
     rgb_rot = 0
+    warned_no_stream = False
 
     try:
         while True:
@@ -281,23 +316,41 @@ def receive_and_display(host="0.0.0.0", port=9999):
                 print("[Receiver] Invalid packet: images missing")
                 continue
             # 필수 이미지 스키마 체크
-            if any(
-                name in images and not all(k in images[name] for k in REQUIRED_IMAGES[name])
-                for name in REQUIRED_IMAGES
-            ):
+            if any(name in images and not _valid_entry(name, images[name]) for name in REQUIRED_IMAGES):
                 print("[Receiver] Invalid image schema, skipping packet")
                 continue
 
+            # 화재 상태 전이 이벤트 (전이가 있을 때만 포함됨)
+            for ev in packet.get("fire_events") or []:
+                temp = ev.get("temp")
+                temp_str = f"{temp:.1f}C" if temp is not None else "-"
+                dur = ev.get("duration")
+                dur_str = f" duration={dur:.1f}s" if dur is not None else ""
+                print(
+                    f"[FIRE] {ev.get('event')} region={ev.get('region_id')} "
+                    f"status={ev.get('status')} temp={temp_str}{dur_str}"
+                )
+
             ir_display = None
             rgb_det_display = None
             ir_entry = images.get("ir") if isinstance(images.get("ir"), dict) else None
 
             t_decode_start = time.perf_counter()
             if "ir" in images:
-                ir_display = _decode_image(images.get("ir"))
+                ir_display = _draw_hotspots(_decode_image(images.get("ir")), ir_entry)
             if "rgb_det" in images:
                 rgb_det_info = images.get("rgb_det")
-                rgb_det_display = _decode_image(rgb_det_info)
+                if "video_seq" in rgb_det_info:
+                    if video is not None and video.available:
+                        rgb_det_display = video.get(int(rgb_det_info["video_seq"]), fps=rgb_det_info.get("video_fps"))
+                    elif not warned_no_stream:
+                        # 영상 스트림 패킷인데 디코더가 없음: 프레임 없이 메타데이터만 표시
+                        warned_no_stream = True
+                        print(f"[Receiver] rgb_det arrives as {rgb_det_info.get('stream', 'video')} stream "
+                              "but no decoder is running; start with --stream "
+                              f"{rgb_det_info.get('stream', 'h264')} (or set SERVER.STREAM.MODE: jpeg)")
+                else:
+                    rgb_det_display = _decode_image(rgb_det_info)
             t_decode_end = time.perf_counter()
             decode_times.append((t_decode_end - t_decode_start) * 1000)
 
@@ -425,6 +478,8 @@ def receive_and_display(host="0.0.0.0", port=9999):
         print(f"[Receiver] Error: {e}")
     finally:
         cv2.destroyAllWindows()
+        if video is not None:
+            video.stop()
         receiver.close()
         elapsed = time.time() - start_time
         if elapsed > 0:
@@ -432,4 +487,11 @@ def receive_and_display(host="0.0.0.0", port=9999):
 
 
 if __name__ == "__main__":
-    receive_and_display(host="0.0.0.0", port=9999)
+    parser = argparse.ArgumentParser(description="PyroVision receiver")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=9999)
+    parser.add_argument("--stream", choices=STREAM_MODES, default="jpeg",
+                        help="sender SERVER.STREAM.MODE와 같게 (h264/h265는 GStreamer 필요)")
+    parser.add_argument("--stream-port", type=int, help="영상 소켓 포트 (기본 port + 1)")
+    args = parser.parse_args()
+    receive_and_display(host=args.host, port=args.port, stream=args.stream, stream_port=args.stream_port)
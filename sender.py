@@ -9,10 +9,12 @@ import logging
 import json
 import zlib
 import base64
-import os
-from datetime import datetime
+import queue
 
-from core.fire_fusion import FireFusion, draw_fire_annotations, apply_vis_mode
+from core.jpeg_encoder import create_jpeg_encoder
+from core.records import hotspot_records, pack_records
+from core.video_stream import VideoStreamWriter
+from core.view_transform import IR_META, RGB_META, item_view, render_frame
 from core.state import (
     LabelScaleState,
     DEFAULT_LABEL_SCALE,
@@ -27,6 +29,8 @@ REQUIRED_IMAGES = {
     "rgb_det": ("data_b64", "shape", "dtype"),
     "ir": ("data_b64", "shape", "dtype"),
 }
+# 영상 스트림 모드의 rgb_det는 픽셀 대신 video_seq만 싣는다
+STREAM_IMAGE_KEYS = ("video_seq", "shape", "dtype")
 
 
 class ImageSender:
@@ -190,32 +194,61 @@ class ImageSender:
             return self._label_scale
 
 
-def _ts_to_epoch_ms(ts):
-    if not ts:
-        return None
-    try:
-        return datetime.strptime(ts, "%y%m%d%H%M%S%f").timestamp() * 1000.0
-    except Exception:
-        return None
+def _view_max_temp(info, view):
+    """최고/최저 온도 좌표(센서 픽셀)를 전송 IR 프레임(뷰 방향) 좌표로 변환"""
+    if view is None or not isinstance(info, dict) or 'x' not in info or 'y' not in info:
+        return info
+    x, y = view.map_pixels([(info['x'], info['y'])])[0]
+    return dict(info, x=int(round(x)), y=int(round(y)))
+
+
+def _view_hotspots(hotspots, view):
+    """hotspot 좌표(센서 픽셀)를 전송 IR 프레임(뷰 방향) 좌표로 변환 (구조화 배열 그대로)"""
+    hot = hotspot_records(hotspots)
+    if view is None or not len(hot):
+        return hot
+    hot = hot.copy()
+    xy = view.map_pixels(np.column_stack([hot['x'], hot['y']]))
+    hot['x'] = xy[:, 0]
+    hot['y'] = xy[:, 1]
+    return hot
 
 
-def send_images(d_rgb, d_ir, d16_ir, d_rgb_det, host='localhost', port=5000,
-                jpeg_quality=70, resize_factor=1, sync_cfg=None, stop_event=None,
-                coord_state=None, label_state=None):
+def _scale_dets(dets, k):
+    """검출 bbox를 전송 프레임 크기 비율 k로 스케일 (1이면 그대로)"""
+    if k == 1.0 or not len(dets):
+        return dets
+    dets = dets.copy()
+    for name in ('x', 'y', 'w', 'h'):
+        dets[name] *= k
+    return dets
+
+
+def send_images(d_rgb, d_ir, d16_ir, d_fusion, host='localhost', port=5000,
+                jpeg_quality=70, resize_factor=1, stop_event=None,
+                label_state=None, event_queue=None, jpeg_backend='auto', stream_cfg=None):
     """
     이미지 버퍼를 읽어서 TCP 소켓으로 전송 (JSON+zlib+base64)
     - 최신 프레임만 전송하여 적체를 방지
+    - 검출(rgb_det.detections)/hotspot(ir.hotspots)은 구조화 배열의 little-endian 바이트를
+      그대로 싣는다 (core.records.pack_records, 검출 수와 무관하게 엔트리 1개)
     - 연결이 끊기면 지수 백오프로 재연결 시도
+    - 융합/주석/화재 상태와 검출-IR 짝짓기(SYNC)는 FusionService가 담당하고, 여기서는 결과와
+      결과가 사용한 IR/RAW16 항목을 전송
     
     Args:
         d_rgb: RGB 카메라 버퍼
         d_ir: IR 8bit 버퍼
         d16_ir: IR 16bit 버퍼
-        d_rgb_det: RGB 검출 결과 버퍼
+        d_fusion: FusionService 결과 버퍼 (FusionResult)
         host: 서버 호스트
         port: 서버 포트
         jpeg_quality: JPEG 압축 품질 (0-100, 낮을수록 빠름)
         resize_factor: 전송 전 리사이즈 비율 (2=1/2, 3=1/3, 1=원본)
+        event_queue: FusionService.subscribe_events() 큐 (상태 전이 이벤트, 유실 없이 전송)
+        jpeg_backend: JPEG 인코더 백엔드 (auto/opencv/turbojpeg/gstreamer, core/jpeg_encoder.py)
+        stream_cfg: core.video_stream.stream_config(SERVER) 결과. MODE가 h264/h265면 rgb_det를
+            두 번째 소켓의 영상 스트림으로 보내고 패킷에는 video_seq만 싣는다 (실패 시 JPEG)
     """
     label_state = label_state or LabelScaleState(DEFAULT_LABEL_SCALE)
     sender = ImageSender(host, port, label_state=label_state)
@@ -234,22 +267,24 @@ def send_images(d_rgb, d_ir, d16_ir, d_rgb_det, host='localhost', port=5000,
         logger.error("Failed to connect after retries. Sender exiting.")
         return
     
-    # Fire Fusion 초기화 (IR 160x120 → RGB 960x540)
-    def build_fusion(params):
-        return FireFusion(
-            ir_size=(160, 120),
-            rgb_size=(960, 540),
-            offset_x=params.get('offset_x', 0.0),
-            offset_y=params.get('offset_y', 0.0),
-            scale=params.get('scale'),
+    # JPEG 백엔드는 시작 시 한 번 측정해 선택
+    jpeg = create_jpeg_encoder(jpeg_backend, quality=jpeg_quality)
+    video = None
+    last_video_seq = None
+    if stream_cfg and stream_cfg.get('MODE', 'jpeg') != 'jpeg':
+        video = VideoStreamWriter(
+            host, stream_cfg['PORT'],
+            codec=stream_cfg['MODE'],
+            fps=stream_cfg['FPS'],
+            bitrate_kbps=stream_cfg['BITRATE_KBPS'],
+            gop=stream_cfg['GOP'],
+            retry_sec=stream_cfg['RETRY_SEC'],
         )
 
-    coord_params = {'offset_x': 0.0, 'offset_y': 0.0, 'scale': None}
-    coord_version = -1
-    if coord_state:
-        coord_params, coord_version = coord_state.get()
-
-    fire_fusion = build_fusion(coord_params)
+    # 전송 실패 시 다음 패킷에 다시 싣기 위해 보관하는 상태 전이 이벤트
+    pending_events = []
+    fusion_seq = 0
+    fusion_item = None
     
     frame_count = 0
     ir_frame_count = 0
@@ -257,9 +292,6 @@ def send_images(d_rgb, d_ir, d16_ir, d_rgb_det, host='localhost', port=5000,
     start_time = time.time()
     last_print_time = start_time
 
-    sync_enabled = bool(sync_cfg and sync_cfg.get('ENABLED'))
-    sync_max_diff = (sync_cfg or {}).get('MAX_DIFF_MS', 120)
-    
     # 중복 전송 방지용 (마지막 전송한 프레임의 타임스탬프)
     last_sent_timestamps = {
         'rgb': None,
@@ -268,9 +300,6 @@ def send_images(d_rgb, d_ir, d16_ir, d_rgb_det, host='localhost', port=5000,
         'rgb_det': None
     }
     
-    # 마지막 IR hotspots (fusion용)
-    last_ir_hotspots = []
-    
     # 성능 측정용
     send_times = []
     
@@ -279,6 +308,8 @@ def send_images(d_rgb, d_ir, d16_ir, d_rgb_det, host='localhost', port=5000,
 
     def _valid_image_entry(name, entry):
         required = REQUIRED_IMAGES.get(name, ())
+        if entry is not None and 'video_seq' in entry:
+            required = STREAM_IMAGE_KEYS
         return entry is not None and all(k in entry for k in required)
 
     def _calc_packet_size_bytes(obj) -> int:
@@ -290,7 +321,6 @@ def send_images(d_rgb, d_ir, d16_ir, d_rgb_det, host='localhost', port=5000,
     backoff_base = 0.5   # 초, 재연결 초기 대기
     backoff_max = 5.0    # 초, 재연결 최대 대기
     backoff_attempts = 0
-    vis_mode = os.getenv("FUSION_VIS_MODE", "test").lower()
 
     def _backoff_sleep():
         nonlocal backoff_attempts
@@ -316,23 +346,29 @@ def send_images(d_rgb, d_ir, d16_ir, d_rgb_det, host='localhost', port=5000,
             # Receiver로부터 제어 명령 확인
             sender.check_control_command()
 
-            if coord_state:
-                params, version = coord_state.get()
-                if version != coord_version:
-                    coord_version = version
-                    coord_params = params
-                    fire_fusion = build_fusion(coord_params)
-                    logger.info("FireFusion calibration updated: %s", coord_params)
-            
             timestamp = time.time()
-            vis_mode = os.getenv("FUSION_VIS_MODE", vis_mode).lower()
             
-            # 각 버퍼에서 데이터 읽기
-            rgb_item = d_rgb.read(timeout=0.05) if d_rgb else None
-            ir_item = d_ir.read(timeout=0.05) if d_ir else None
-            ir16_item = d16_ir.read(timeout=0.05) if d16_ir else None
-            rgb_det_item = d_rgb_det.read(timeout=0.05) if d_rgb_det else None
+            # 각 버퍼에서 데이터 읽기 (비파괴: 다른 소비자와 경쟁하지 않음, 새 융합 결과만 기다림)
+            rgb_item = d_rgb.latest() if d_rgb else None
+            ir_item = d_ir.latest() if d_ir else None
+            ir16_item = d16_ir.latest() if d16_ir else None
+            if d_fusion is not None:
+                entry = d_fusion.read_newer(fusion_seq, timeout=0.05)
+                if entry is not None:
+                    fusion_seq, _, fusion_item = entry
+            if event_queue is not None:
+                while True:
+                    try:
+                        pending_events.append(event_queue.get_nowait())
+                    except queue.Empty:
+                        break
             
+            # 융합 결과가 있으면 그 결과가 사용한 IR/RAW16을 보낸다 (다시 짝짓지 않음:
+            # IR 영상/hotspot/최고 온도가 융합 상태·주석과 같은 IR 프레임)
+            if fusion_item is not None:
+                ir_item = fusion_item.ir_item
+                ir16_item = fusion_item.ir16_item
+
             # ===== 독립적 타임스탬프 체크 =====
             ir_updated = False
             rgb_det_updated = False
@@ -344,15 +380,16 @@ def send_images(d_rgb, d_ir, d16_ir, d_rgb_det, host='localhost', port=5000,
                     ir_updated = True
                     last_sent_timestamps['ir'] = current_ir_ts
             
-            # RGB_DET 업데이트 체크
-            if rgb_det_item and len(rgb_det_item) > 1 and rgb_det_item[0] is not None:
-                current_rgb_det_ts = rgb_det_item[1]
-                if current_rgb_det_ts != last_sent_timestamps['rgb_det']:
-                    rgb_det_updated = True
-                    last_sent_timestamps['rgb_det'] = current_rgb_det_ts
+            # RGB_DET(융합 결과) 업데이트 체크: 같은 검출 프레임이라도 IR로 주석이 바뀌면 새 결과
+            fusion_updated = False
+            if fusion_item is not None and fusion_item.frame is not None:
+                if fusion_item.seq != last_sent_timestamps['rgb_det']:
+                    fusion_updated = True
+                    rgb_det_updated = fusion_item.det_updated
+                    last_sent_timestamps['rgb_det'] = fusion_item.seq
             
-            # 둘 다 업데이트 없으면 스킵
-            if not ir_updated and not rgb_det_updated:
+            # 새 프레임/결과/이벤트가 없으면 스킵
+            if not ir_updated and not fusion_updated and not pending_events:
                 time.sleep(0.005)
                 continue
             
@@ -367,16 +404,14 @@ def send_images(d_rgb, d_ir, d16_ir, d_rgb_det, host='localhost', port=5000,
             with sender.control_lock:
                 is_saving = sender.saving_mode
             
-            encode_param = [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality]
-            
             # ===== IR 프레임 (항상 최신 프레임 포함) =====
             if ir_item and ir_item[0] is not None:
-                ir_frame = ir_item[0]
+                # 회전/반전은 전송 직전에만 적용 (160x120이라 비용이 작음)
+                ir_view = item_view(ir_item, IR_META)
+                ir_frame = render_frame(ir_item[0], ir_view)
                 # 최고 온도 정보 추출 (ir_item[2]에 저장됨)
                 max_temp_info = ir_item[2] if len(ir_item) > 2 else None
-                # IR hotspots 추출 (ir_item[3]에 저장됨)
-                if len(ir_item) > 3:
-                    last_ir_hotspots = ir_item[3]
+                max_temp_info = _view_max_temp(max_temp_info, ir_view)
                 tau_val = None
                 if isinstance(max_temp_info, dict) and 'tau' in max_temp_info:
                     tau_val = max_temp_info['tau']
@@ -390,13 +425,15 @@ def send_images(d_rgb, d_ir, d16_ir, d_rgb_det, host='localhost', port=5000,
                     'updated': ir_updated,  # 업데이트 여부 표시
                     'max_temp': max_temp_info,  # 최고 온도 정보 (x, y, temp_raw, temp_corrected)
                     'tau': tau_val,             # 사용된 대기 투과율 (표시용)
+                    # hotspot HOTSPOT_DTYPE 레코드 (뷰 방향 픽셀 좌표)
+                    'hotspots': pack_records(_view_hotspots(ir_item[3] if len(ir_item) > 3 else None, ir_view)),
                 }
                 if ir_updated:
                     ir_frame_count += 1
                 
                 # IR 16bit (저장 모드일 때만)
                 if is_saving and ir16_item and ir16_item[0] is not None:
-                    ir16_frame = ir16_item[0]
+                    ir16_frame = render_frame(ir16_item[0], item_view(ir16_item, IR_META))
                     packet['images']['ir16'] = {
                         'data_b64': _b64(ir16_frame.tobytes()),
                         'compressed': False,
@@ -405,114 +442,66 @@ def send_images(d_rgb, d_ir, d16_ir, d_rgb_det, host='localhost', port=5000,
                         'timestamp': ir16_item[1] if len(ir16_item) > 1 else 0
                     }
             
-            # ===== RGB Detection 프레임 (항상 최신 프레임 포함) =====
-            fusion_result = None
-            if rgb_det_item and rgb_det_item[0] is not None:
-                rgb_det_frame = rgb_det_item[0].copy()  # 복사본 사용
-                
-                # detection 결과 추출 (rgb_det_item[2]에 저장됨)
-                eo_detections = []
-                if len(rgb_det_item) > 2 and rgb_det_item[2]:
-                    # fire(class_id=1)만 필터링
-                    for det in rgb_det_item[2]:
-                        if len(det) > 5 and det[5] == 1:  # class_id == 1 (fire)
-                            eo_detections.append(det[:5])  # (x, y, w, h, conf)
-                
-                # ===== Fire Fusion (IR 게이트키퍼) =====
-                fusion_result = fire_fusion.fuse(last_ir_hotspots, eo_detections)
-                
-                # 융합 결과에 따라 bbox 다시 그리기 (색상 구분)
-                if fusion_result and fusion_result.get('eo_annotations'):
-                    anns = apply_vis_mode(fusion_result['eo_annotations'], vis_mode)
-                    logger.debug(
-                        "[Sender] vis_mode=%s anns_in=%d anns_out=%d ir_hotspot=%d",
-                        vis_mode, len(fusion_result['eo_annotations']), len(anns), len(last_ir_hotspots)
-                    )
-                    fusion_result['eo_annotations'] = anns
-                    if anns:
-                        if label_state:
-                            current_label_scale = label_state.get()
-                        else:
-                            current_label_scale = sender.get_label_scale()
-                        thickness_scale = current_label_scale / DEFAULT_LABEL_SCALE if DEFAULT_LABEL_SCALE else 1.0
-                        rgb_det_frame = draw_fire_annotations(
-                            rgb_det_frame,
-                            anns,
-                            font_scale=current_label_scale,
-                            thickness_scale=thickness_scale,
-                        )
-                
-                # 리사이즈
+            # ===== RGB Detection 프레임 (FusionService가 주석을 그린 최신 결과) =====
+            if fusion_item is not None and fusion_item.frame is not None:
+                # 리사이즈 + 뷰 변환(회전/반전)을 전송 해상도에서 한 번에
+                out_size = None
                 if resize_factor > 1:
-                    h, w = rgb_det_frame.shape[:2]
-                    rgb_det_frame = cv2.resize(rgb_det_frame, (w//resize_factor, h//resize_factor),
-                                               interpolation=cv2.INTER_LINEAR)
+                    w, h = fusion_item.size
+                    out_size = (w // resize_factor, h // resize_factor)
+                rgb_det_frame = fusion_item.render(out_size)
 
-                # JPEG 압축
-                _, encoded = cv2.imencode('.jpg', rgb_det_frame, encode_param)
-                packet['images']['rgb_det'] = {
-                    'data_b64': _b64(encoded.tobytes()),
-                    'compressed': True,
+                entry = {
                     'shape': rgb_det_frame.shape,
                     'dtype': str(rgb_det_frame.dtype),
-                    'timestamp': rgb_det_item[1] if len(rgb_det_item) > 1 else 0,
+                    'timestamp': fusion_item.det_ts or 0,
                     'resized': resize_factor > 1,
-                    'updated': rgb_det_updated  # 업데이트 여부 표시
+                    'updated': rgb_det_updated,  # 업데이트 여부 표시
+                    # 검출 DET_DTYPE 레코드 (전송 프레임 픽셀 좌표)
+                    'detections': pack_records(_scale_dets(
+                        fusion_item.detections, rgb_det_frame.shape[1] / float(fusion_item.size[0]))),
                 }
+                # 영상 스트림: 새 융합 결과만 인코더에 넣고, 패킷은 video_seq로 프레임을 가리킨다
+                # (소켓이 끊겼으면 이전 video_seq는 무효: 재연결 전까지 JPEG)
+                if video is not None:
+                    if last_video_seq is not None and not video.check():
+                        last_video_seq = None
+                    if fusion_updated or last_video_seq is None:
+                        last_video_seq = video.write(rgb_det_frame)
+                    if last_video_seq is not None:
+                        entry['stream'] = video.codec
+                        entry['video_seq'] = last_video_seq
+                        entry['video_fps'] = video.fps
+                if 'video_seq' not in entry:
+                    # JPEG 압축
+                    entry['data_b64'] = _b64(jpeg.encode(rgb_det_frame, jpeg_quality))
+                    entry['compressed'] = True
+                packet['images']['rgb_det'] = entry
                 if rgb_det_updated:
                     rgb_frame_count += 1
             
-            # 동기화 검사
-            if sync_enabled:
-                if ir_item and rgb_det_item:
-                    t_ir = _ts_to_epoch_ms(ir_item[1])
-                    t_rgb = _ts_to_epoch_ms(rgb_det_item[1])
-                    if t_ir and t_rgb:
-                        diff_ms = abs(t_ir - t_rgb)
-                        if diff_ms > sync_max_diff:
-                            logger.debug("Sync skip: diff=%.1fms (max=%s)", diff_ms, sync_max_diff)
-                            time.sleep(0.005)
-                            continue
-                else:
-                    time.sleep(0.005)
-                    continue
+            # ===== 화재 상태 전이 이벤트 (전이가 있을 때만 포함) =====
+            if pending_events:
+                packet['fire_events'] = list(pending_events)
 
-            # ===== Fusion 결과를 패킷에 추가 =====
-            if fusion_result:
-                anns = fusion_result.get('eo_annotations') or []
-                # JSON 직렬화 안전하게 색상 튜플을 리스트로 변환
-                anns_json = []
-                for ann in anns:
-                    ann_copy = dict(ann)
-                    color = ann_copy.get('color')
-                    if color is not None:
-                        ann_copy['color'] = list(color)
-                    anns_json.append(ann_copy)
-                packet['fire_fusion'] = {
-                    'fire_detected': fusion_result.get('fire_detected', False),
-                    'confidence': fusion_result.get('confidence', 0.0),
-                    'status': fusion_result.get('status', 'NO_FIRE'),
-                    'confirmed_count': fusion_result.get('confirmed_count', 0),
-                    'ir_only_count': fusion_result.get('ir_only_count', 0),
-                    'eo_annotations': anns_json,
+            # RGB 원본 (저장 모드일 때만)
+            if is_saving and rgb_item and rgb_item[0] is not None:
+                rgb_view = item_view(rgb_item, RGB_META)
+                rgb_frame = rgb_item[0]
+                if resize_factor > 1:
+                    h, w = rgb_frame.shape[:2]
+                    rgb_frame = cv2.resize(rgb_frame, (w//resize_factor, h//resize_factor), 
+                                          interpolation=cv2.INTER_LINEAR)
+                rgb_frame = render_frame(rgb_frame, rgb_view)
+                encoded = jpeg.encode(rgb_frame, jpeg_quality)
+                packet['images']['rgb'] = {
+                    'data_b64': _b64(encoded),
+                    'compressed': True,
+                    'shape': rgb_frame.shape,
+                    'dtype': str(rgb_frame.dtype),
+                    'timestamp': rgb_item[1] if len(rgb_item) > 1 else 0,
+                    'resized': resize_factor > 1
                 }
-                
-                # RGB 원본 (저장 모드일 때만)
-                if is_saving and rgb_item and rgb_item[0] is not None:
-                    rgb_frame = rgb_item[0]
-                    if resize_factor > 1:
-                        h, w = rgb_frame.shape[:2]
-                        rgb_frame = cv2.resize(rgb_frame, (w//resize_factor, h//resize_factor), 
-                                              interpolation=cv2.INTER_LINEAR)
-                    _, encoded = cv2.imencode('.jpg', rgb_frame, encode_param)
-                    packet['images']['rgb'] = {
-                        'data_b64': _b64(encoded.tobytes()),
-                        'compressed': True,
-                        'shape': rgb_frame.shape,
-                        'dtype': str(rgb_frame.dtype),
-                        'timestamp': rgb_item[1] if len(rgb_item) > 1 else 0,
-                        'resized': resize_factor > 1
-                    }
             
             # 패킷 검증: 필수 이미지 엔트리에 data/shape/dtype 없으면 전송하지 않음
             if any(
@@ -528,6 +517,8 @@ def send_images(d_rgb, d_ir, d16_ir, d_rgb_det, host='localhost', port=5000,
             if sender.send_frame_data(packet):
                 send_times.append((time.perf_counter() - send_start) * 1000)
                 frame_count += 1
+                if 'fire_events' in packet:
+                    del pending_events[:len(packet['fire_events'])]
                 
                 # FPS 출력 (1초마다)
                 current_time = time.time()
@@ -545,9 +536,14 @@ def send_images(d_rgb, d_ir, d16_ir, d_rgb_det, host='localhost', port=5000,
                     mode_str = "SAVING" if is_saving else "DISPLAY"
                     image_keys = list(packet['images'].keys())
                     logger.info(
-                        "[Sender] Packets:%d IR:%.1ffps RGB:%.1ffps Mode:%s Images:%s Size:%.1fKB Send:%.2fms",
-                        frame_count, ir_fps, rgb_fps, mode_str, image_keys, packet_size_kb, avg_send
+                        "[Sender] Packets:%d IR:%.1ffps RGB:%.1ffps Mode:%s Images:%s Size:%.1fKB Send:%.2fms JPEG(%s):%.2fms",
+                        frame_count, ir_fps, rgb_fps, mode_str, image_keys, packet_size_kb, avg_send,
+                        jpeg.name, jpeg.avg_ms()
                     )
+                    if fusion_item is not None and fusion_item.sync_stats is not None:
+                        logger.info("[Sender] Sync %s", fusion_item.sync_stats)
+                    if video is not None and video.is_open:
+                        logger.info("[Sender] Video %s(%s) seq=%d", video.codec, video.encoder, video.seq)
                     
                     last_print_time = current_time
                     send_times.clear()
@@ -564,6 +560,9 @@ def send_images(d_rgb, d_ir, d16_ir, d_rgb_det, host='localhost', port=5000,
         logger.exception("Sender error: %s", e)
     finally:
         sender.close()
+        jpeg.close()
+        if video is not None:
+            video.close()
         elapsed = time.time() - start_time
         if elapsed > 0:
             logger.info(
@@ -0,0 +1,31 @@
+import threading
+import time
+
+from core.buffer import DoubleBuffer
+
+
+def test_read_newer_skips_seen_frames_and_keeps_capture_time():
+    buf = DoubleBuffer()
+    assert buf.read_newer(0) is None and buf.latest() is None
+
+    buf.write("a", t_cap=1.0)
+    buf.write("b", t_cap=2.0)
+    seq, t_cap, item = buf.read_newer(0)
+    # 추론 중 덮어써진 프레임은 건너뛰고 최신 항목만 받는다
+    assert (seq, t_cap, item) == (2, 2.0, "b")
+    assert buf.read_newer(seq) is None
+    # 비파괴: 기존 read() 소비자는 그대로 최신 값을 본다
+    assert buf.read() == "b"
+    assert buf.latest() == "b" and buf.read_newer(0)[0] == 2
+
+
+def test_read_newer_wakes_on_write_and_times_out():
+    buf = DoubleBuffer()
+    start = time.monotonic()
+    assert buf.read_newer(0, timeout=0.05) is None
+    assert time.monotonic() - start >= 0.04
+
+    threading.Timer(0.02, buf.write, args=("x",)).start()
+    entry = buf.read_newer(0, timeout=1.0)
+    assert entry is not None and entry[2] == "x"
+    assert time.monotonic() - entry[1] < 0.5
@@ -0,0 +1,70 @@
+import numpy as np
+import yaml
+
+from core.calibration import extract_correspondences, solve, update_coord_text
+from core.coord_mapper import CoordMapper
+
+
+IR_SIZE = (160, 120)
+RGB_SIZE = (960, 540)
+
+
+def _synthetic_pairs(mapper, points):
+    for ix, iy in points:
+        ir = np.full((IR_SIZE[1], IR_SIZE[0], 3), 40, dtype=np.uint8)
+        ir[iy - 1:iy + 2, ix - 1:ix + 2] = 255
+        rgb = np.full((RGB_SIZE[1], RGB_SIZE[0], 3), 60, dtype=np.uint8)
+        rx, ry = mapper.ir_to_rgb(ix, iy)
+        rx, ry = int(round(rx)), int(round(ry))
+        rgb[ry - 6:ry + 7, rx - 6:rx + 7] = (200, 230, 255)
+        yield rgb, ir, None
+
+
+def test_solve_recovers_scale_offset_from_frames():
+    truth = CoordMapper(IR_SIZE, RGB_SIZE, offset_x=12.0, offset_y=-9.0, scale=4.2)
+    points = [(x, y) for x in (20, 60, 100, 140) for y in (20, 60, 100)]
+
+    corr, ir_size, rgb_size, n = extract_correspondences(_synthetic_pairs(truth, points), workers=2)
+    assert n == len(points) and len(corr) == len(points)
+    # 가짜 대응점(반사광 등)은 RANSAC이 걸러낸다
+    corr = np.vstack([corr, [[30, 30, 900, 20], [130, 90, 10, 500]]])
+
+    result = solve(corr, ir_size, rgb_size)
+    assert result['inliers'] == len(points)
+    mapper = CoordMapper.from_params(IR_SIZE, RGB_SIZE, result['params'])
+    for x, y in [(0, 0), (80, 60), (159, 119)]:
+        assert np.allclose(mapper.ir_to_rgb(x, y), truth.ir_to_rgb(x, y), atol=2.0)
+
+
+def test_solve_homography_model():
+    h = np.array([[5.8, 0.2, 30.0], [-0.1, 6.0, 10.0], [0.0002, 0.0001, 1.0]])
+    truth = CoordMapper(IR_SIZE, RGB_SIZE, homography=h)
+    ir = np.array([(x, y) for x in range(10, 160, 30) for y in range(10, 120, 25)], dtype=np.float64)
+    corr = np.hstack([ir, truth.ir_to_rgb_many(ir)])
+
+    result = solve(corr, IR_SIZE, RGB_SIZE, {'MODEL': 'homography'})
+    assert result['model'] == 'homography'
+    assert result['rmse'] < 1e-3
+    mapper = CoordMapper.from_params(IR_SIZE, (1920, 1080), result['params'])
+    assert np.allclose(mapper.ir_to_rgb_many(ir), corr[:, 2:] * 2.0, atol=1e-3)
+
+
+def test_update_coord_text_keeps_comments_and_sections():
+    text = (
+        "COORD:\n"
+        "  OFFSET_X: 0.0\n"
+        "  OFFSET_Y: 0.0\n"
+        "  SCALE: null\n"
+        "  HOMOGRAPHY: null      # 3x3\n"
+        "STATE:\n"
+        "  FIRE: {}\n"
+    )
+    params = {'offset_x': 3.5, 'offset_y': -2.0, 'scale': 4.25,
+              'homography': None, 'ref_size': [960, 540]}
+    out = update_coord_text(text, params)
+
+    assert "  HOMOGRAPHY: null      # 3x3\n" in out
+    data = yaml.safe_load(out)
+    assert data['COORD'] == {'OFFSET_X': 3.5, 'OFFSET_Y': -2.0, 'SCALE': 4.25,
+                             'HOMOGRAPHY': None, 'REF_SIZE': [960, 540]}
+    assert data['STATE'] == {'FIRE': {}}
@@ -0,0 +1,61 @@
+import numpy as np
+
+from core.coord_mapper import CoordMapper
+
+
+H = [[5.8, 0.15, 20.0], [-0.1, 6.1, 15.0], [0.0001, 0.00005, 1.0]]
+
+
+def test_affine_batch_matches_scalar():
+    mapper = CoordMapper((160, 120), (960, 540), offset_x=3.0, offset_y=-7.0, scale=4.2)
+    pts = [(0, 0), (10.5, 20.25), (159, 119)]
+
+    out = mapper.ir_to_rgb_many(pts)
+    assert np.allclose(out, [mapper.ir_to_rgb(x, y) for x, y in pts])
+    back = mapper.rgb_to_ir_many(out)
+    assert np.allclose(back, pts)
+
+
+def test_homography_round_trip_and_boxes():
+    mapper = CoordMapper.from_params((160, 120), (960, 540), {'homography': H})
+    assert not mapper.is_affine
+
+    pts = np.array([(5.0, 5.0), (80.0, 60.0), (150.0, 110.0)])
+    rgb = mapper.ir_to_rgb_many(pts)
+    assert np.allclose(mapper.rgb_to_ir_many(rgb), pts)
+    assert np.allclose(mapper.ir_to_rgb(80.0, 60.0), rgb[1])
+
+    # xywh bbox는 네 꼭짓점의 외접 사각형으로 변환
+    x0, y0 = rgb[0]
+    x1, y1 = rgb[1]
+    box = mapper.rgb_to_ir_many([(x0, y0, x1 - x0, y1 - y0)])
+    assert box.shape == (1, 4)
+    assert box[0, 0] <= 5.0 + 1e-6 and box[0, 1] <= 5.0 + 1e-6
+    assert box[0, 0] + box[0, 2] >= 80.0 - 1e-6
+
+
+def test_from_params_ref_size_scales_to_frame():
+    params = {'offset_x': 10.0, 'offset_y': 4.0, 'homography': H, 'ref_size': [960, 540]}
+    ref = CoordMapper.from_params((160, 120), (960, 540), params)
+    full = CoordMapper.from_params((160, 120), (1920, 1080), params)
+
+    pts = [(20.0, 30.0), (140.0, 100.0)]
+    assert np.allclose(full.ir_to_rgb_many(pts), ref.ir_to_rgb_many(pts) * 2.0)
+
+
+def test_warp_ir_places_pixels_by_mapping():
+    mapper = CoordMapper((16, 12), (96, 72), scale=4.0)
+    ir = np.zeros((12, 16, 3), dtype=np.uint8)
+    ir[6, 8] = 255
+
+    warped, mask, roi = mapper.warp_ir(ir)
+    x0, y0, x1, y1 = roi
+    assert warped.shape[:2] == (y1 - y0, x1 - x0) == mask.shape
+    # IR (8, 6) 픽셀은 RGB 좌표 ir_to_rgb(8, 6) 위치에 투영
+    rx, ry = mapper.ir_to_rgb(8, 6)
+    assert warped[int(round(ry)) - y0, int(round(rx)) - x0].max() == 255
+    assert mapper.remap_grid() is mapper.remap_grid()
+
+    mapper.adjust_offset(4, 0)
+    _, _, roi2 = mapper.warp_ir(ir)
+    assert roi2[0] == x0 + 4
@@ -0,0 +1,72 @@
+import csv
+
+import cv2
+import numpy as np
+import pytest
+
+from core.det_eval import DetectionEvaluator, average_precision, load_yolo_labels, match_predictions
+from detector.infer import plan_units, read_unit
+
+
+def test_match_predictions_greedy_by_score_and_class():
+    gt = np.array([[0, 0, 10, 10], [20, 20, 30, 30]], float)
+    pred = np.array([[0, 0, 10, 10], [1, 1, 10, 10], [20, 20, 30, 30]], float)
+    tp = match_predictions(pred, [0.9, 0.95, 0.8], [0, 0, 1], gt, [0, 0], iou_thrs=(0.5, 0.85))
+    # 점수가 높은 두 번째 검출이 먼저 짝을 차지하고, 클래스가 다른 검출은 매칭되지 않는다
+    assert tp[:, 0].tolist() == [False, True, False]
+    # 임계값마다 따로 매칭: 0.85에서는 IoU 0.81인 검출이 빠지고 정확한 검출이 짝이 된다
+    assert tp[:, 1].tolist() == [True, False, False]
+
+
+def test_average_precision_interpolates_all_points():
+    assert average_precision([True, False, True], [0.9, 0.8, 0.7], 2) == pytest.approx(0.5 + 0.5 * 2 / 3)
+    assert average_precision([], [], 3) == 0.0
+    assert average_precision([True], [0.5], 0) is None
+
+
+def test_evaluator_summary():
+    ev = DetectionEvaluator(classes={0})
+    ev.add([[0, 0, 10, 10]], [0.9], [0], [[0, 0, 10, 10]], [0])
+    ev.add([[50, 50, 60, 60], [0, 0, 5, 5]], [0.8, 0.6], [0, 2], [[0, 0, 10, 10]], [0])
+    res = ev.summary()
+    assert (res['frames'], res['n_gt'], res['n_pred']) == (2, 2, 2)
+    assert res['precision'] == 0.5 and res['recall'] == 0.5
+    assert res['map50'] == pytest.approx(0.5) and res['map'] == pytest.approx(0.5)
+
+
+def test_missing_label_file_counts_false_positives(tmp_path):
+    (tmp_path / "a.txt").write_text("0 0.5 0.5 0.5 0.5\n")
+    assert load_yolo_labels(str(tmp_path), "b", (20, 20)) is None
+    ev = DetectionEvaluator()
+    for name, pred in (("a", [[5, 5, 15, 15]]), ("b", [[0, 0, 8, 8]])):
+        gt = load_yolo_labels(str(tmp_path), name, (20, 20), missing_empty=True)
+        ev.add(pred, [0.9], [0], gt[0], gt[1])
+    res = ev.summary()
+    # 라벨 없는 프레임의 검출은 오검출
+    assert (res['frames'], res['n_gt'], res['n_pred']) == (2, 1, 2)
+    assert res['precision'] == 0.5 and res['recall'] == 1.0
+
+
+def test_plan_units_splits_sources(tmp_path):
+    imgs = tmp_path / "imgs"
+    imgs.mkdir()
+    for i in range(3):
+        cv2.imwrite(str(imgs / f"im{i}.png"), np.zeros((8, 8, 3), np.uint8))
+    sess = tmp_path / "sess"
+    sess.mkdir()
+    writer = cv2.VideoWriter(str(sess / "rgb.mp4"), cv2.VideoWriter_fourcc(*"mp4v"), 10, (32, 32))
+    if not writer.isOpened():
+        pytest.skip("mp4v encoder not available")
+    for i in range(5):
+        writer.write(np.full((32, 32, 3), i * 40, np.uint8))
+    writer.release()
+    with open(sess / "metadata.csv", "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["index", "rgb_ts", "ir_ts", "diff_ms", "ir_raw"])
+        w.writerows([i, f"ts{i}", "", 0, ""] for i in range(5))
+
+    units, total = plan_units([str(imgs), str(sess)], chunk=2)
+    assert total == 8
+    assert [len(u.get('paths') or u['names']) for u in units] == [2, 1, 2, 2, 1]
+    names = [item[0] for u in units for item in read_unit(u)]
+    assert names == ["im0", "im1", "im2", "ts0", "ts1", "ts2", "ts3", "ts4"]
@@ -0,0 +1,115 @@
+import numpy as np
+import pytest
+
+from core.view_transform import ViewTransform
+
+# TFLite 런타임(tflite_runtime 또는 tensorflow)이 없으면 모듈 import 자체가 불가
+tflite_mod = pytest.importorskip("detector.tflite")
+
+IN_SIZE = 32
+
+
+class StubInterpreter:
+    """
+    TFLite Interpreter 대역: 입력에서 밝은(>0.5) 영역의 bbox를 YOLOv8 출력 (B, 1, 4+nc)으로 낸다
+
+    shape_signature[0] == -1 이므로 Detector(batch_size=B)가 배치를 재할당한다.
+    """
+
+    instances = []
+
+    def __init__(self, model_path=None, experimental_delegates=None, num_threads=1):
+        self.batch = 1
+        self.x = None
+        self.invokes = 0
+        StubInterpreter.instances.append(self)
+
+    def resize_tensor_input(self, index, shape):
+        self.batch = int(shape[0])
+
+    def allocate_tensors(self):
+        pass
+
+    def get_input_details(self):
+        return [{"index": 0, "shape": np.array([self.batch, IN_SIZE, IN_SIZE, 3]),
+                 "shape_signature": np.array([-1, IN_SIZE, IN_SIZE, 3]),
+                 "dtype": np.float32, "quantization": (0.0, 0)}]
+
+    def get_output_details(self):
+        return [{"index": 1, "quantization": (0.0, 0)}]
+
+    def set_tensor(self, index, x):
+        self.x = np.array(x, copy=True)
+
+    def invoke(self):
+        self.invokes += 1
+
+    def get_tensor(self, index):
+        out = np.zeros((self.batch, 1, 5), np.float32)
+        for k in range(self.batch):
+            ys, xs = np.nonzero(self.x[k, ..., 0] > 0.5)
+            if xs.size:
+                x0, y0, x1, y1 = xs.min(), ys.min(), xs.max() + 1, ys.max() + 1
+                out[k, 0] = [(x0 + x1) / 2, (y0 + y1) / 2, x1 - x0, y1 - y0, 0.9]
+        return out
+
+
+@pytest.fixture
+def make_detector(monkeypatch):
+    monkeypatch.setattr(tflite_mod.tflite, "Interpreter", StubInterpreter, raising=False)
+    StubInterpreter.instances = []
+
+    def make(batch_size=None):
+        return tflite_mod.Detector("stub.tflite", ["fire"], use_npu=False, batch_size=batch_size)
+    return make
+
+
+def _frame(box, size=(96, 64)):
+    """size=(w, h) 회색 프레임에 흰 사각형 box=(x0, y0, x1, y1)"""
+    img = np.full((size[1], size[0], 3), 40, np.uint8)
+    x0, y0, x1, y1 = box
+    img[y0:y1, x0:x1] = 255
+    return img
+
+
+BOXES = [(6, 6, 30, 24), (48, 30, 90, 60), (24, 12, 60, 48), (0, 0, 12, 12), (60, 3, 93, 21)]
+
+
+def _assert_same(results, expected):
+    assert len(results) == len(expected)
+    for (s, b, c), (es, eb, ec) in zip(results, expected):
+        assert np.allclose(s, es) and np.allclose(b, eb) and np.array_equal(c, ec)
+
+
+@pytest.mark.parametrize("batch_size", [None, 2])
+def test_infer_many_matches_per_frame_infer_in_input_order(make_detector, batch_size):
+    det = make_detector(batch_size)
+    itp = StubInterpreter.instances[0]
+    assert det.batch == (batch_size or 1)
+    frames = [_frame(b) for b in BOXES]
+
+    results = det.infer_many(frames)
+    # 배치 2 → 5장은 invoke 3회 (마지막 묶음은 1장), 단일 배치는 프레임마다 1회
+    assert itp.invokes == (3 if batch_size else len(frames))
+    _assert_same(results, [det.infer(f) for f in frames])
+    for (scores, boxes, _), box in zip(results, BOXES):
+        assert len(scores) == 1
+        # 입력 32px ↔ 원본 96px (gain 1/3): 한 입력 픽셀 이내
+        assert np.allclose(boxes[0], box, atol=3.5)
+
+
+@pytest.mark.parametrize("rotate,flip_h", [(90, False), (270, True), (180, False)])
+def test_view_unletterbox_matches_prerotated_frame(make_detector, rotate, flip_h):
+    det = make_detector()
+    frame = _frame((9, 6, 42, 27))
+    view = ViewTransform(rotate, flip_h, False, (96, 64))
+
+    s, boxes, c = det.infer(frame, view=view)
+    es, eboxes, ec = det.infer(view.render(frame))
+    assert len(s) == len(es) == 1 and np.array_equal(c, ec)
+    assert np.allclose(boxes, eboxes, atol=1e-3)
+    assert np.allclose(boxes, view.map_xyxy([(9, 6, 42, 27)]), atol=3.5)
+
+    # infer_many의 뷰 목록도 같은 좌표계
+    _assert_same(det.infer_many([frame, frame], views=[view, None]),
+                 [(s, boxes, c), det.infer(frame)])
@@ -0,0 +1,70 @@
+import time
+
+import numpy as np
+
+from core.buffer import DoubleBuffer
+from core.duty_governor import ACTIVE, IDLE, DutyGovernor, ir_heat
+
+
+class _Worker:
+    def __init__(self):
+        self.calls = []
+
+    def set_duty(self, idle_period=None):
+        self.calls.append(idle_period)
+
+
+def _ir(max_temp, hotspots=()):
+    return (np.zeros((2, 2), np.uint8), "ts", {'temp_corrected': max_temp}, list(hotspots))
+
+
+CFG = {'ENABLED': True, 'IDLE_FPS': 2.0, 'HOT_TEMP': 60.0, 'COOL_TEMP': 50.0, 'HOLD_SEC': 3.0}
+
+
+def test_ir_heat_uses_hotspot_peak():
+    assert ir_heat(None) == (0, None)
+    assert ir_heat(_ir(30.0, [(1, 1, 80.0, 79.0)])) == (1, 80.0)
+
+
+def test_governor_hysteresis_and_hold():
+    worker = _Worker()
+    gov = DutyGovernor(DoubleBuffer(), lambda: worker, CFG)
+
+    assert gov.observe(_ir(25.0), now=0.0) == IDLE
+    assert worker.calls == [0.5]
+    # 열원 등장: 같은 IR 프레임에서 바로 전체 속도
+    assert gov.observe(_ir(25.0, [(3, 4, 70.0, 69.0)]), now=1.0) == ACTIVE
+    assert worker.calls[-1] is None
+    # HOT_TEMP 아래지만 COOL_TEMP 이상이면 유지
+    assert gov.observe(_ir(55.0), now=10.0) == ACTIVE
+    # 식은 뒤에도 HOLD_SEC 동안 유지, 이후 IDLE
+    assert gov.observe(_ir(30.0), now=12.0) == ACTIVE
+    assert gov.observe(_ir(30.0), now=13.5) == IDLE
+    # IDLE에서 COOL~HOT 사이 온도로는 깨어나지 않는다
+    assert gov.observe(_ir(55.0), now=14.0) == IDLE
+    assert worker.calls == [0.5, None, 0.5]
+    assert gov.snapshot()['transitions'] == 3
+
+
+def test_governor_thread_ramps_on_ir_frame_and_restores_on_stop():
+    worker = _Worker()
+    buf = DoubleBuffer()
+    gov = DutyGovernor(buf, lambda: worker, dict(CFG, IDLE_FPS=0))
+    gov.start()
+    try:
+        buf.write(_ir(20.0))
+        deadline = time.monotonic() + 1.0
+        while not worker.calls and time.monotonic() < deadline:
+            time.sleep(0.005)
+        assert worker.calls == [float('inf')]
+
+        buf.write(_ir(20.0, [(1, 1, 90.0, 89.0)]))
+        deadline = time.monotonic() + 1.0
+        while gov.snapshot()['ramp_ms'] is None and time.monotonic() < deadline:
+            time.sleep(0.005)
+        assert worker.calls[-1] is None
+        assert gov.snapshot()['ramp_ms'] < 200
+    finally:
+        gov.stop()
+        gov.join(timeout=1.0)
+    assert not gov.is_alive()
@@ -51,3 +51,81 @@ def test_fire_fusion_matches_ir_with_eo_bbox():
     assert res["status"] == FIRE_CONFIRMED
     assert res["confirmed_count"] == 1
     assert res["ir_only_count"] == 0
+
+
+def _legacy_fuse(mapper, ir_hotspots, eo_fire_bboxes):
+    """벡터화 이전 FireFusion.fuse의 중첩 루프 구현 (parity 기준)"""
+    from core.coord_mapper import point_in_bbox
+    from core.fire_fusion import (
+        CONFIDENCE_HIGH, CONFIDENCE_MEDIUM, COLOR_CONFIRMED, COLOR_FILTERED, FIRE_FILTERED,
+    )
+
+    confirmed, ir_only, matched_idx = [], [], set()
+    for hotspot in ir_hotspots:
+        ir_x, ir_y = hotspot[0], hotspot[1]
+        temp = hotspot[2] if len(hotspot) > 2 else 0
+        rgb_x, rgb_y = mapper.ir_to_rgb(ir_x, ir_y)
+        matched = False
+        for i, eo_bbox in enumerate(eo_fire_bboxes):
+            bbox = eo_bbox[:4]
+            if point_in_bbox(rgb_x, rgb_y, bbox):
+                confirmed.append({'ir_pos': (ir_x, ir_y), 'rgb_pos': (rgb_x, rgb_y), 'temp': temp,
+                                  'eo_bbox': bbox, 'eo_conf': eo_bbox[4],
+                                  'confidence': CONFIDENCE_HIGH, 'status': FIRE_CONFIRMED})
+                matched_idx.add(i)
+                matched = True
+                break
+        if not matched:
+            ir_only.append({'ir_pos': (ir_x, ir_y), 'rgb_pos': (rgb_x, rgb_y), 'temp': temp,
+                            'confidence': CONFIDENCE_MEDIUM, 'status': FIRE_IR_ONLY})
+    if not confirmed and eo_fire_bboxes:
+        ref = max(ir_hotspots, key=lambda h: h[2])
+        rgb_ref = mapper.ir_to_rgb(ref[0], ref[1])
+        for i, eo_bbox in enumerate(eo_fire_bboxes):
+            confirmed.append({'ir_pos': (ref[0], ref[1]), 'rgb_pos': rgb_ref, 'temp': ref[2],
+                              'eo_bbox': eo_bbox[:4], 'eo_conf': eo_bbox[4],
+                              'confidence': CONFIDENCE_HIGH, 'status': FIRE_CONFIRMED})
+            matched_idx.add(i)
+    anns = []
+    for i, eo_bbox in enumerate(eo_fire_bboxes):
+        bbox, conf = eo_bbox[:4], eo_bbox[4]
+        if i in matched_idx:
+            temp = next(cf['temp'] for cf in confirmed if cf['eo_bbox'] == bbox)
+            anns.append({'bbox': bbox, 'color': COLOR_CONFIRMED,
+                         'label': f'FIRE ({temp:.0f}C, {conf:.0%})', 'status': FIRE_CONFIRMED})
+        else:
+            anns.append({'bbox': bbox, 'color': COLOR_FILTERED,
+                         'label': f'FILTERED ({conf:.0%})', 'status': FIRE_FILTERED})
+    return confirmed, ir_only, anns
+
+
+def test_fire_fusion_matches_legacy_loop():
+    import random
+
+    rng = random.Random(1234)
+    fusion = FireFusion(ir_size=(160, 120), rgb_size=(960, 540), offset_x=7.5, offset_y=-3.0)
+    mapper = fusion.coord_mapper
+    for _ in range(200):
+        hotspots = [
+            (rng.randrange(160), rng.randrange(120), rng.uniform(20, 400), rng.uniform(20, 400))
+            for _ in range(rng.randrange(0, 30))
+        ]
+        boxes = []
+        for _ in range(rng.randrange(0, 8)):
+            if hotspots and rng.random() < 0.5:
+                # hotspot 좌표가 bbox 경계에 정확히 걸리는 경우도 포함
+                hx, hy = mapper.ir_to_rgb(*rng.choice(hotspots)[:2])
+                boxes.append((hx, hy, rng.uniform(5, 80), rng.uniform(5, 80), rng.random()))
+            else:
+                boxes.append((rng.uniform(0, 900), rng.uniform(0, 500),
+                              rng.uniform(5, 200), rng.uniform(5, 200), rng.random()))
+
+        res = fusion.fuse(hotspots, boxes)
+        if not hotspots:
+            assert res["status"] == NO_FIRE
+            continue
+        confirmed, ir_only, anns = _legacy_fuse(mapper, hotspots, boxes)
+        assert res["details"] == confirmed + ir_only
+        assert res["eo_annotations"] == anns
+        assert res["confirmed_count"] == len(confirmed)
+        assert res["ir_only_count"] == len(ir_only)
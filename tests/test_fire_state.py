@@ -0,0 +1,65 @@
+from core.fire_fusion import FireFusion
+from core.fire_state import (
+    FireStateTracker,
+    RingCounter,
+    FIRE_EVENT_ACTIVE,
+    FIRE_EVENT_INACTIVE,
+)
+
+
+def _confirmed_scene(fusion):
+    ir_hotspots = [(80, 60, 120.0, 118.0)]
+    rgb_x, rgb_y = fusion.coord_mapper.ir_to_rgb(80, 60)
+    eo_bbox = (rgb_x - 20, rgb_y - 20, 40, 40, 0.9)
+    return ir_hotspots, [eo_bbox]
+
+
+def test_ring_counter_keeps_window_sum():
+    ring = RingCounter(3)
+    for v in (1, 1, 0, 1, 0):
+        ring.push(v)
+
+    assert ring.count == 3
+    assert ring.total == 1
+    assert abs(ring.ratio() - 1 / 3) < 1e-9
+
+
+def test_fire_state_debounces_flicker_into_single_events():
+    fusion = FireFusion(ir_size=(160, 120), rgb_size=(960, 540))
+    tracker = FireStateTracker(window=10, threshold=50, active_dur=1.0,
+                               inactive_dur=1.0, min_dur=2.0)
+    hotspots, bboxes = _confirmed_scene(fusion)
+
+    events = []
+    t = 0.0
+    # 10fps로 3초간 2프레임 중 1프레임만 검출 (깜빡임)
+    for i in range(30):
+        res = fusion.fuse(hotspots, bboxes) if i % 2 == 0 else fusion.fuse([], [])
+        events += tracker.update(res, now=t)
+        t += 0.1
+
+    assert [e['event'] for e in events] == [FIRE_EVENT_ACTIVE]
+    assert events[0]['temp'] == 120.0
+
+    # 화재 소멸 후 INACTIVE 한 번만 발생
+    for _ in range(30):
+        events += tracker.update(fusion.fuse([], []), now=t)
+        t += 0.1
+
+    assert [e['event'] for e in events] == [FIRE_EVENT_ACTIVE, FIRE_EVENT_INACTIVE]
+    assert events[1]['region_id'] == events[0]['region_id']
+    assert events[1]['duration'] >= 2.0
+    assert tracker.active_regions() == []
+
+
+def test_fire_state_det_mode_controls_ir_only():
+    fusion = FireFusion(ir_size=(160, 120), rgb_size=(960, 540))
+    ir_only = fusion.fuse([(10, 10, 100.0, 98.0)], [])
+
+    strict = FireStateTracker(window=5, active_dur=0.0, det_mode=1)
+    loose = FireStateTracker(window=5, active_dur=0.0, det_mode=2)
+
+    assert strict.update(ir_only, now=0.0) == []
+    events = loose.update(ir_only, now=0.0)
+    assert len(events) == 1
+    assert events[0]['event'] == FIRE_EVENT_ACTIVE
@@ -0,0 +1,87 @@
+from datetime import datetime
+
+import pytest
+
+from core.frame_sync import FrameSynchronizer
+from core.util import ts_to_epoch_ms
+
+
+def _ts(ms):
+    """250101120000 기준 ms → 카메라 ts 문자열 (소수부 2자리)"""
+    sec, ms = divmod(ms, 1000)
+    minute, sec = divmod(sec, 60)
+    return f"25010112{minute:02d}{sec:02d}{ms // 10:02d}"
+
+
+def _item(ms):
+    return (None, _ts(ms))
+
+
+@pytest.mark.parametrize("ts", ["25010112000012", "251019235959999999", "250101120000", "250301000000"])
+def test_ts_to_epoch_ms_matches_strptime(ts):
+    ref = datetime.strptime(ts, "%y%m%d%H%M%S%f").timestamp() * 1000.0
+    assert ts_to_epoch_ms(ts) == pytest.approx(ref)
+
+
+def test_ts_to_epoch_ms_rejects_invalid():
+    assert ts_to_epoch_ms(None) is None
+    assert ts_to_epoch_ms("") is None
+    assert ts_to_epoch_ms("2501011200ab") is None
+
+
+def test_nearest_waits_for_later_partner_and_drops_unmatched():
+    sync = FrameSynchronizer(('rgb', 'ir'), max_diff_ms=40)
+    sync.push('ir', _item(0))
+    sync.push('rgb', _item(30))
+    # 30ms 이후 IR이 더 가까울 수 있으므로 아직 확정하지 않는다
+    assert sync.poll() is None
+
+    sync.push('ir', _item(50))
+    pair = sync.poll()
+    assert pair.ts == {'rgb': _ts(30), 'ir': _ts(50)} and pair.diff_ms['ir'] == pytest.approx(-20)
+
+    # 300ms 프레임은 허용 오차 안에 IR이 없고, IR이 이미 그 너머로 진행했으므로 버린다
+    sync.push('rgb', _item(300))
+    sync.push('ir', _item(400))
+    assert sync.poll() is None
+    assert sync.counters['matched'] == 1 and sync.counters['dropped'] == 1
+
+    # 이미 매칭이 끝난 시각보다 늦게 도착한 기준 프레임
+    sync.push('rgb', _item(20))
+    assert sync.counters['stale'] == 1
+
+
+def test_exclusive_pairs_are_deterministic():
+    def run(order):
+        sync = FrameSynchronizer(('rgb', 'ir'), max_diff_ms=40, exclusive=True)
+        for name, ms in order:
+            sync.push(name, _item(ms))
+        out = []
+        while (pair := sync.poll()) is not None:
+            out.append((pair.ts['rgb'], pair.ts['ir']))
+        return out
+
+    rgb = [('rgb', ms) for ms in range(0, 400, 33)]
+    ir = [('ir', ms) for ms in range(10, 400, 110)]
+    a = run(rgb + ir)
+    b = run(sorted(rgb + ir, key=lambda x: x[1]))
+    assert a == b
+    # IR 프레임은 한 번만 쓰인다
+    assert len({p[1] for p in a}) == len(a) == 4
+
+
+def test_previous_and_interpolate_policies():
+    prev = FrameSynchronizer(('det', 'ir'), max_diff_ms=120, policy='previous')
+    prev.push('ir', _item(0))
+    prev.push('ir', _item(100))
+    prev.push('det', _item(90))
+    assert prev.poll().ts['ir'] == _ts(0)
+
+    interp = FrameSynchronizer(('det', 'ir'), max_diff_ms=120, policy='interpolate')
+    interp.push('ir', _item(0))
+    interp.push('ir', _item(100))
+    interp.push('det', _item(30))
+    pair = interp.poll()
+    before, after, w = pair.interp['ir']
+    assert pair.ts['ir'] == _ts(0) and before[1] == _ts(0) and after[1] == _ts(100)
+    assert w == pytest.approx(0.3)
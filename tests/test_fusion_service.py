@@ -0,0 +1,125 @@
+import time
+
+import numpy as np
+
+from core.buffer import DoubleBuffer
+from core.fire_fusion import FIRE_CLASS_ID
+from core.fusion_service import FusionService
+
+
+FIRE_CFG = {'WINDOW': 1, 'THRESHOLD': 0.5, 'CONFIDENCE': 0.0,
+            'ACTIVE_DUR': 0.0, 'MIN_DUR': 0.0, 'INACTIVE_DUR': 0.0}
+
+
+def _det_item(ts, fire=True):
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    dets = [(200, 160, 120, 120, 0.9, FIRE_CLASS_ID, 1)] if fire else []
+    return frame, ts, dets
+
+
+def _ir_item(ts):
+    frame = np.zeros((120, 160, 3), dtype=np.uint8)
+    # 검출 bbox 중심 (260, 220) → IR 좌표 (65, 55)
+    return frame, ts, {}, [(65, 55, 180.0, 9000)]
+
+
+def _service(**kw):
+    return FusionService(DoubleBuffer(), DoubleBuffer(), DoubleBuffer(), fire_state_cfg=FIRE_CFG, **kw)
+
+
+def test_process_fuses_each_pair_once():
+    svc = _service()
+    det = _det_item("250101120000000000")
+    ir = _ir_item("250101120000010000")
+
+    first = svc.process(det, ir)
+    assert first is not None and first.seq == 1 and first.det_updated
+    assert first.fusion['eo_annotations']
+    # 주석은 복사본에 그려 원본 검출 프레임은 그대로
+    assert first.frame is not det[0] and first.frame.any() and not det[0].any()
+
+    assert svc.process(det, ir) is None
+    # IR만 새로 들어오면 다시 융합하되 상태 추적은 누적하지 않는다
+    again = svc.process(det, _ir_item("250101120000020000"))
+    assert again.seq == 2 and not again.det_updated and again.events == []
+    # 표시 모드가 바뀌면 같은 쌍이어도 다시 그린다
+    assert svc.process(det, _ir_item("250101120000020000"), vis_mode="temp") is not None
+
+
+def test_events_fan_out_to_every_subscriber():
+    svc = _service()
+    q1, q2 = svc.subscribe_events(), svc.subscribe_events()
+
+    result = svc.process(_det_item("250101120000000000"), _ir_item("250101120000000000"))
+    assert result.events
+    svc._publish_events(result.events)
+    assert q1.qsize() == q2.qsize() == len(result.events)
+    assert q1.get_nowait() == q2.get_nowait() == result.events[0]
+
+    svc.unsubscribe_events(q2)
+    svc._publish_events(result.events)
+    assert q2.empty() and not q1.empty()
+
+
+def test_rotated_detection_is_rendered_on_output():
+    from core.view_transform import ViewTransform
+
+    svc = _service()
+    frame, ts, dets = _det_item("250101120000000000")
+    view = ViewTransform(90, src_size=(640, 480))
+    result = svc.process((frame, ts, dets, {'view': view}), _ir_item("250101120000000000"))
+    # 방향이 있으면 융합 단계는 원본을 그대로 두고 출력 시 회전 후 주석을 그린다
+    assert result.view is view and result.frame is frame
+    assert result.size == (480, 640)
+    out = result.render((240, 320))
+    assert out.shape == (320, 240, 3) and out.any()
+
+
+def test_run_subscribes_without_draining_inputs(monkeypatch):
+    monkeypatch.setenv("FUSION_VIS_MODE", "TEMP")
+    det_buf, ir_buf, out_buf = DoubleBuffer(), DoubleBuffer(), DoubleBuffer()
+    svc = FusionService(det_buf, ir_buf, out_buf, fire_state_cfg=FIRE_CFG, poll_timeout=0.02)
+    monkeypatch.setenv("FUSION_VIS_MODE", "test")
+    assert svc.vis_mode == "temp"   # 시작 시 한 번만 해석
+
+    ir = _ir_item("250101120000000000")
+    ir_buf.write(ir)
+    det_buf.write(_det_item("250101120000000000"))
+    svc.start()
+    try:
+        entry = out_buf.read_newer(0, timeout=1.0)
+        assert entry is not None and entry[2].vis_mode == "temp"
+        # 다른 소비자의 read()는 그대로 최신 IR을 받는다
+        assert ir_buf.read(timeout=0.01) is ir
+        svc.set_vis_mode("test")
+        entry = out_buf.read_newer(entry[0], timeout=1.0)
+        assert entry is not None and entry[2].vis_mode == "test"
+    finally:
+        svc.stop()
+        svc.join(timeout=1.0)
+    assert not svc.is_alive()
+
+
+def test_sync_pairs_detection_with_nearest_ir_and_carries_it():
+    det_buf, ir_buf, ir16_buf, out_buf = DoubleBuffer(), DoubleBuffer(), DoubleBuffer(), DoubleBuffer()
+    svc = FusionService(det_buf, ir_buf, out_buf, fire_state_cfg=FIRE_CFG, poll_timeout=0.01,
+                        sync_cfg={'ENABLED': True, 'MAX_DIFF_MS': 120}, ir16_buf=ir16_buf)
+    ir_a, ir_b = _ir_item("250101120000000000"), _ir_item("250101120000100000")
+    raw_a = (np.zeros((120, 160), np.uint16), ir_a[1], {}, ir_a[3])
+    svc.start()
+    try:
+        ir16_buf.write(raw_a)
+        ir_buf.write(ir_a)
+        time.sleep(0.05)
+        det_buf.write(_det_item("250101120000040000"))
+        time.sleep(0.05)
+        # IR B(+100ms)가 들어와야 IR A(-40ms)가 더 가깝다고 확정된다
+        assert out_buf.read_newer(0, timeout=0.05) is None
+        ir_buf.write(ir_b)
+        entry = out_buf.read_newer(0, timeout=1.0)
+    finally:
+        svc.stop()
+        svc.join(timeout=1.0)
+    result = entry[2]
+    assert result.ir_ts == ir_a[1] and result.ir_item is ir_a and result.ir16_item is raw_a
+    assert result.sync_diff_ms == 40.0 and result.sync_stats['matched'] == 1
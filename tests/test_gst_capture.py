@@ -0,0 +1,34 @@
+from camera.gst_capture import (
+    SW_CONVERTER, converter_elements, decode_pipeline, letterbox_size, opencv_pipeline, tee_pipeline,
+)
+
+
+def test_letterbox_size_keeps_aspect():
+    assert letterbox_size((1920, 1080), (800, 800)) == (800, 450)
+    assert letterbox_size((1080, 1920), (640, 640)) == (360, 640)
+
+
+def test_converter_order():
+    assert converter_elements('auto') == ('imxvideoconvert_g2d', SW_CONVERTER)
+    assert converter_elements(False) == (SW_CONVERTER,)
+    assert SW_CONVERTER not in converter_elements(True)
+
+
+def test_pipelines_bound_latency_and_add_model_branch():
+    p = opencv_pipeline("/dev/video0", (1920, 1080), 15, 'imxvideoconvert_g2d')
+    assert "imxvideoconvert_g2d" in p and p.endswith("appsink drop=true max-buffers=1 sync=false")
+
+    single = tee_pipeline("/dev/video0", (1920, 1080), 15)
+    assert "name=model" not in single
+    tee = tee_pipeline("/dev/video0", (1920, 1080), 15, 'imxvideoconvert_g2d', model_size=(800, 800))
+    assert "appsink name=model" in tee and "format=RGBx,width=800,height=450" in tee
+    assert tee.count("drop=true max-buffers=1") == 2
+    # 소프트웨어 경로는 videoscale이 모델 크기로 줄인다
+    sw = tee_pipeline("/dev/video0", (1920, 1080), 15, model_size=(800, 800))
+    assert "videoconvert ! videoscale ! video/x-raw,format=RGBx,width=800,height=450" in sw
+
+
+def test_decode_pipeline_keeps_every_frame():
+    p = decode_pipeline("/data/a b.mp4", 'imxvideoconvert_g2d')
+    assert p.startswith('filesrc location="/data/a b.mp4" ! decodebin ! imxvideoconvert_g2d')
+    assert "drop=true" not in p and p.endswith("format=BGR ! appsink max-buffers=2 sync=false")
@@ -0,0 +1,37 @@
+import cv2
+import numpy as np
+import pytest
+
+from core.jpeg_encoder import OpenCVJpegEncoder, create_jpeg_encoder
+
+
+def _frame():
+    frame = np.zeros((120, 160, 3), dtype=np.uint8)
+    frame[:, :80] = (0, 0, 255)
+    return frame
+
+
+def test_opencv_encoder_roundtrip_and_stats():
+    enc = OpenCVJpegEncoder()
+    data = enc.encode(_frame(), quality=90)
+    assert data[:2] == b'\xff\xd8'
+    img = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+    assert img.shape == (120, 160, 3) and img[60, 20, 2] > 200
+    assert enc.count == 1 and enc.avg_ms() > 0.0
+
+
+def test_auto_probe_returns_working_encoder():
+    enc = create_jpeg_encoder('auto', probe_size=(320, 240))
+    assert enc.count == 0
+    assert enc.encode(_frame())[:2] == b'\xff\xd8'
+    enc.close()
+
+
+def test_unavailable_backend_falls_back_to_opencv(monkeypatch):
+    import core.jpeg_encoder as mod
+
+    monkeypatch.setattr(mod, 'TurboJPEG', None)
+    enc = create_jpeg_encoder('turbojpeg', probe_size=(64, 48))
+    assert enc.name == 'opencv'
+    with pytest.raises(ValueError):
+        create_jpeg_encoder('nvjpeg')
@@ -0,0 +1,60 @@
+import cv2
+import numpy as np
+
+from core.coord_mapper import CoordMapper
+from gui.overlay import OverlayCompositor, fit_frame
+
+
+def _reference_overlay(rgb, ir, params, alpha=0.4):
+    """표시 해상도로 줄인 RGB 위에 같은 매핑으로 IR을 addWeighted"""
+    mapper = CoordMapper.from_params((ir.shape[1], ir.shape[0]), (rgb.shape[1], rgb.shape[0]), params)
+    warped, mask, (x0, y0, x1, y1) = mapper.warp_ir(ir)
+    out = rgb.copy()
+    view = out[y0:y1, x0:x1]
+    blended = cv2.addWeighted(warped, alpha, view, 1 - alpha, 0)
+    view[mask] = blended[mask]
+    return out
+
+
+def test_compose_matches_reference_at_display_size():
+    rng = np.random.default_rng(0)
+    rgb = rng.integers(0, 255, (540, 960, 3), dtype=np.uint8)
+    ir = rng.integers(0, 255, (120, 160, 3), dtype=np.uint8)
+    params = {'offset_x': 20.0, 'offset_y': -10.0, 'scale': 4.0}
+
+    comp = OverlayCompositor(alpha=0.4)
+    out = comp.compose(rgb, ir, params, out_size=(480, 400))
+    assert out.shape == (270, 480, 3)
+
+    small = cv2.resize(rgb, (480, 270), interpolation=cv2.INTER_AREA)
+    ref = _reference_overlay(small, ir, dict(params, ref_size=[960, 540]))
+    assert np.abs(out.astype(int) - ref.astype(int)).max() <= 1
+
+
+def test_compose_reuses_cached_layer_and_canvas():
+    rgb = np.full((540, 960, 3), 100, dtype=np.uint8)
+    ir = np.full((120, 160, 3), 200, dtype=np.uint8)
+    comp = OverlayCompositor()
+
+    first = comp.compose(rgb, ir, {}, out_size=(480, 270), rgb_key='r1', ir_key='i1')
+    again = comp.compose(rgb, ir, {}, out_size=(480, 270), rgb_key='r1', ir_key='i1')
+    assert again is first
+    assert comp.stats == {'layer_builds': 1, 'rgb_resizes': 1, 'reuses': 1}
+
+    # 새 RGB 프레임이면 IR 레이어는 재사용하고 캔버스만 다시 합성
+    comp.compose(rgb, ir, {}, out_size=(480, 270), rgb_key='r2', ir_key='i1')
+    assert comp.stats['layer_builds'] == 1 and comp.stats['rgb_resizes'] == 2
+
+    comp.compose(rgb, ir, {'offset_x': 5.0}, out_size=(480, 270), rgb_key='r2', ir_key='i1')
+    assert comp.stats['layer_builds'] == 2
+
+
+def test_fit_frame_resizes_before_display():
+    rgb = np.zeros((1080, 1920, 3), dtype=np.uint8)
+    out = fit_frame(rgb, (640, 480))
+    assert out.shape == (360, 640, 3) and out.flags['C_CONTIGUOUS']
+
+    # 작은 IR 프레임은 라벨 크기까지 확대, 흑백은 BGR로
+    ir = np.zeros((120, 160), dtype=np.uint8)
+    assert fit_frame(ir, (320, 320)).shape == (240, 320, 3)
+    assert fit_frame(rgb, (1920, 1080)) is rgb
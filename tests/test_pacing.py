@@ -0,0 +1,57 @@
+import time
+
+import pytest
+
+from camera.mock_source import MockThermalCamera
+from core.pacing import RateLimiter, SourceStats
+
+
+def _arrivals(period, n, jitter=0.0):
+    return [i * period + (jitter if i % 2 else -jitter) for i in range(n)]
+
+
+def test_limiter_passes_every_frame_when_unlimited_and_tracks_cadence():
+    limiter = RateLimiter(0)
+    assert all(limiter.admit(t) for t in _arrivals(1 / 15, 30))
+    assert limiter.cadence == pytest.approx(1 / 15, rel=1e-3)
+
+
+def test_limiter_no_beat_drops_when_cap_matches_device_rate():
+    # 66ms 상한 + 66.7ms 장치 주기(지터 ±5ms): 기존 슬립 방식은 주기적으로 프레임을 놓쳤다
+    limiter = RateLimiter(interval=0.066)
+    assert all(limiter.admit(t) for t in _arrivals(1 / 15, 60, jitter=0.005))
+
+
+def test_limiter_decimates_faster_device():
+    limiter = RateLimiter(max_fps=15)
+    passed = sum(limiter.admit(t) for t in _arrivals(1 / 30, 60))
+    assert passed == 30
+
+
+def test_wait_paces_by_deadline_not_after_work():
+    limiter = RateLimiter(interval=0.02)
+    start = time.monotonic()
+    for _ in range(10):
+        limiter.wait()
+        time.sleep(0.01)  # 프레임 처리 시간은 간격에 더해지지 않는다
+    assert time.monotonic() - start < 0.02 * 10 + 0.05
+
+
+def test_source_stats_reports_frame_age():
+    lines = []
+    stats = SourceStats("Test", log_every=0.5, log=lines.append)
+    assert stats.record(10.0, now=10.004) == pytest.approx(4.0)
+    stats.drop()
+    snap = stats.snapshot()
+    assert snap['age_max_ms'] == pytest.approx(4.0) and snap['dropped'] == 1
+
+    stats.record(time.monotonic() - 0.01, cadence=0.1, now=time.monotonic() + 1.0)
+    assert lines and lines[0].startswith("[Test] fps=") and "cadence=100.0ms" in lines[0]
+
+
+def test_mock_thermal_blocks_like_device():
+    cam = MockThermalCamera(size=(16, 12), frame_interval=0.02)
+    start = time.monotonic()
+    for _ in range(5):
+        assert cam.capture() is not None
+    assert 0.07 <= time.monotonic() - start < 0.5
@@ -0,0 +1,59 @@
+import json
+
+import numpy as np
+
+from camera.ircam import detect_fire
+from core.fire_fusion import FireFusion, FIRE_CONFIRMED, eo_fire_boxes
+from core.records import (
+    DET_DTYPE, HOTSPOT_DTYPE, NO_TRACK, det_records, dets_from_xyxy, hotspot_records,
+    pack_records, unpack_records,
+)
+from core.tracker import IoUTracker
+
+
+def test_decode_to_tracker_stays_structured():
+    dets = dets_from_xyxy([0.9, 0.4], np.array([[10, 20, 50, 80], [100, 100, 120, 130]]), [1, 0])
+    assert dets.dtype == DET_DTYPE
+    assert dets[0].tolist() == (10.0, 20.0, 40.0, 60.0, 0.9, 1, NO_TRACK)
+
+    tracker = IoUTracker()
+    tracked = tracker.update(dets)
+    assert tracked.dtype == DET_DTYPE and (tracked['track_id'] > 0).all()
+    predicted = tracker.predict()
+    assert predicted.dtype == DET_DTYPE
+    np.testing.assert_array_equal(predicted['track_id'], tracked['track_id'])
+
+    # 레코드는 기존 튜플처럼 인덱싱/언패킹된다
+    x, y, w, h, conf, cls, track_id = tracked[0]
+    assert (x, cls) == (10.0, 1) and tracked[0][6] == track_id
+    assert len(tracker.update(det_records(None))) == 0
+
+
+def test_fusion_accepts_records_from_ir_and_detector():
+    raw = np.full((120, 160), int((25 + 273.15) * 100), np.uint16)
+    raw[52:56, 72:76] = int((300 + 273.15) * 100)
+    _, _, hotspots = detect_fire(raw, 80)
+    assert hotspots.dtype == HOTSPOT_DTYPE and len(hotspots) == 1
+
+    fusion = FireFusion(ir_size=(160, 120), rgb_size=(960, 540))
+    rx, ry = fusion.coord_mapper.ir_to_rgb(hotspots['x'][0], hotspots['y'][0])
+    dets = dets_from_xyxy([0.8, 0.7], [[rx - 30, ry - 30, rx + 30, ry + 30], [0, 0, 20, 20]], [1, 0])
+    dets['track_id'] = [5, 6]
+    boxes = eo_fire_boxes(dets)
+    assert len(boxes) == 1 and boxes['track_id'][0] == 5
+
+    res = fusion.fuse(hotspots, boxes)
+    assert res['status'] == FIRE_CONFIRMED and res['details'][0]['track_id'] == 5
+    assert len(detect_fire(np.full((120, 160), 29815, np.uint16), 80)[2]) == 0
+
+
+def test_wire_blob_is_little_endian_and_round_trips():
+    hot = hotspot_records([(3, 4, 120.5, 118.0), (7, 9, 60.0, 59.5)])
+    entry = json.loads(json.dumps(pack_records(hot)))
+    assert entry['count'] == 2 and all(fmt.startswith('<') for _, fmt in entry['fields'])
+
+    back = unpack_records(entry)
+    np.testing.assert_array_equal(back, hot)
+    assert back.dtype.names == HOTSPOT_DTYPE.names
+    assert unpack_records(dict(entry, count=3)) is None
+    assert len(unpack_records(pack_records(det_records([])))) == 0
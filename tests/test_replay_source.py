@@ -0,0 +1,131 @@
+import csv
+import threading
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from camera.replay_source import ReplayRGBCamera, ReplaySession, ReplayThermalCamera, replay_session
+from core.buffer import DoubleBuffer
+from core.util import epoch_ms_to_ts, ts_to_epoch_ms
+
+
+# RGB 100ms 간격 4장, IR 은 각 RGB보다 30ms 늦게 (마지막 행은 이전 IR 재사용)
+RGB_TS = ["240101120000" + f"{v:02d}" for v in (0, 10, 20, 30)]
+IR_TS = ["240101120000" + f"{v:02d}" for v in (3, 13, 23, 23)]
+
+
+def _make_session(root):
+    (root / "ir16").mkdir()
+    writer = cv2.VideoWriter(str(root / "rgb.mp4"), cv2.VideoWriter_fourcc(*"mp4v"), 10, (64, 48))
+    if not writer.isOpened():
+        pytest.skip("mp4v writer unavailable")
+    for i in range(len(RGB_TS)):
+        writer.write(np.full((48, 64, 3), 40 * (i + 1), np.uint8))
+    writer.release()
+
+    with open(root / "metadata.csv", "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["index", "rgb_ts", "ir_ts", "diff_ms", "ir_raw"])
+        for i, (rgb_ts, ir_ts) in enumerate(zip(RGB_TS, IR_TS)):
+            raw_path = f"ir16/{ir_ts}.npy"
+            if not (root / raw_path).exists():
+                np.save(root / raw_path, np.full((12, 16), 29000 + i, np.uint16))
+            w.writerow([i, rgb_ts, ir_ts, 30.0, raw_path])
+    return str(root)
+
+
+def _drain(session, total):
+    """RGB/IR 스트림을 각자 스레드로 돌려 내보낸 순서대로 (stream, ts, frame) 목록"""
+    rgb = ReplayRGBCamera(session, DoubleBuffer())
+    ir = ReplayThermalCamera(session)
+    out = []
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def run(name, capture):
+        while not stop.is_set():
+            item = capture()
+            if item is None:
+                continue
+            with lock:
+                out.append((name,) + item)
+                if len(out) >= total:
+                    stop.set()
+
+    def rgb_capture():
+        frame, ts = rgb.capture()
+        return None if frame is None else (ts, frame)
+
+    def ir_capture():
+        raw16 = ir.capture()
+        return None if raw16 is None else (ir.frame_ts, raw16)
+
+    threads = [threading.Thread(target=run, args=a, daemon=True)
+               for a in (("rgb", rgb_capture), ("ir", ir_capture))]
+    for t in threads:
+        t.start()
+    stop.wait(5.0)
+    stop.set()
+    rgb.stop_event.set()
+    ir.cleanup()
+    for t in threads:
+        t.join(timeout=1.0)
+    return out[:total]
+
+
+def test_replay_keeps_session_order_and_raw16(tmp_path):
+    session = ReplaySession(_make_session(tmp_path), speed=0)
+    out = _drain(session, 7)
+
+    assert [(s, ts) for s, ts, _ in out] == [
+        ("rgb", RGB_TS[0]), ("ir", IR_TS[0]),
+        ("rgb", RGB_TS[1]), ("ir", IR_TS[1]),
+        ("rgb", RGB_TS[2]), ("ir", IR_TS[2]),
+        ("rgb", RGB_TS[3]),
+    ]
+    raws = [f for s, _, f in out if s == "ir"]
+    assert [int(r[0, 0]) for r in raws] == [29000, 29001, 29002]
+    assert all(r.dtype == np.uint16 for r in raws)
+
+
+def test_replay_loop_rebases_timestamps(tmp_path):
+    session = ReplaySession(_make_session(tmp_path), speed=0, loop=True)
+    out = _drain(session, 14)
+    rgb_ts = [ts for s, ts, _ in out if s == "rgb"]
+
+    assert rgb_ts[:4] == RGB_TS
+    t = [ts_to_epoch_ms(ts) for ts in rgb_ts]
+    assert all(b > a for a, b in zip(t, t[1:]))
+    assert rgb_ts[4] == epoch_ms_to_ts(ts_to_epoch_ms(RGB_TS[0]) + session.span_ms)
+
+
+def test_replay_speed_follows_session_timing(tmp_path):
+    session = ReplaySession(_make_session(tmp_path), speed=2.0)
+    start = time.monotonic()
+    out = _drain(session, 7)
+    elapsed = time.monotonic() - start
+
+    # 세션 길이 300ms / 2배속 = 150ms
+    assert len(out) == 7
+    assert 0.12 <= elapsed < 1.0
+
+
+def test_replay_restart_builds_new_session_with_new_speed(tmp_path):
+    cfg = {'MODE': 'replay', 'SESSION': _make_session(tmp_path), 'SPEED': 0}
+    first = replay_session(cfg, 'rgb')
+    assert replay_session(cfg, 'ir') is first      # 같이 만든 RGB/IR은 같은 시계
+    assert len(_drain(first, 7)) == 7
+
+    # 재시작: 이미 등록된 스트림 → 새 SPEED, 새 벽시계 기준의 새 세션
+    second = replay_session(dict(cfg, SPEED=1.0), 'rgb')
+    assert second is not first and second.speed == 1.0 and second._wall0 is None
+    assert replay_session(dict(cfg, SPEED=1.0), 'ir') is second
+    start = time.monotonic()
+    out = _drain(second, 7)
+    elapsed = time.monotonic() - start
+
+    # 세션 길이 300ms를 실시간으로 다시 처음부터
+    assert [ts for s, ts, _ in out[:2]] == [RGB_TS[0], IR_TS[0]]
+    assert 0.25 <= elapsed < 2.0
@@ -0,0 +1,32 @@
+import numpy as np
+
+from core.coord_mapper import CoordMapper
+from core.roi import hotspot_rois, hotspots_to_frame, offset_boxes
+
+
+def test_hotspots_to_frame_uses_frame_size():
+    hotspots = [(10, 10, 50.0, 48.0), (80, 60, 120.0, 118.0)]
+    pts = hotspots_to_frame(hotspots, (160, 120), (1920, 1080), {'offset_x': 4.0, 'offset_y': -2.0})
+
+    mapper = CoordMapper((160, 120), (1920, 1080), offset_x=4.0, offset_y=-2.0)
+    # 가장 뜨거운 hotspot이 먼저
+    assert np.allclose(pts[0], mapper.ir_to_rgb(80, 60))
+    assert np.allclose(pts[1], mapper.ir_to_rgb(10, 10))
+
+
+def test_hotspot_rois_merge_and_clip():
+    pts = [(960, 540), (980, 560), (10, 10), (1900, 1070)]
+    rois = hotspot_rois(pts, (1920, 1080), (320, 320), pad=32, max_rois=4)
+
+    # 가까운 두 점은 하나의 ROI로 합쳐지고, 모서리 ROI는 프레임 안으로 이동
+    assert len(rois) == 3
+    assert rois[0] == (800, 380, 1120, 700)
+    assert rois[1] == (0, 0, 320, 320)
+    assert rois[2] == (1600, 760, 1920, 1080)
+    for x0, y0, x1, y1 in rois:
+        assert (x1 - x0, y1 - y0) == (320, 320)
+
+
+def test_offset_boxes_moves_to_frame_coords():
+    boxes = offset_boxes([[1, 2, 3, 4]], 100, 200)
+    assert boxes.tolist() == [[101, 202, 103, 204]]
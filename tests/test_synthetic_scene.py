@@ -0,0 +1,66 @@
+import numpy as np
+
+from camera.ircam import detect_fire
+from camera.mock_source import MockRGBCamera, MockThermalCamera
+from camera.synthetic_scene import KELVIN, SyntheticScene
+from core.buffer import DoubleBuffer
+from core.coord_mapper import CoordMapper
+from core.fire_fusion import FIRE_CONFIRMED, FireFusion
+
+
+RGB_SIZE = (640, 360)
+IR_SIZE = (160, 120)
+COORD = {'offset_x': 12.0, 'offset_y': -6.0}
+
+
+def _eo_boxes(boxes):
+    return [(x1, y1, x2 - x1, y2 - y1, 0.9) for x1, y1, x2, y2 in boxes]
+
+
+def test_scene_ir_peak_maps_onto_rgb_flame():
+    scene = SyntheticScene(fires=1, hot=0, frames=8, seed=3, ir_size=IR_SIZE, coord=COORD)
+    rgb = scene.render_rgb(RGB_SIZE)
+    ir = scene.render_ir(IR_SIZE)
+    mapper = CoordMapper.from_params(IR_SIZE, RGB_SIZE, COORD)
+
+    for i in (0, 5):
+        assert ir[i].dtype == np.uint16 and ir[i].shape == (120, 160)
+        assert ir[i].max() / 100.0 - KELVIN > 350
+        y, x = np.unravel_index(ir[i].argmax(), ir[i].shape)
+        px, py = mapper.ir_to_rgb(x + 0.5, y + 0.5)
+        # 불꽃 중심(밝은 노랑)이 IR 최고 온도 지점의 RGB 위치에 있다
+        bright = rgb[i][:, :, 2].astype(int) + rgb[i][:, :, 1] > 450
+        ys, xs = np.nonzero(bright)
+        assert abs(xs.mean() - px) < 6 and abs(ys.mean() - py) < 6
+
+
+def test_scene_fires_confirm_and_hot_objects_stay_ir_only():
+    scene = SyntheticScene(fires=2, hot=1, frames=12, seed=1, ir_size=IR_SIZE, coord=COORD)
+    ir = scene.render_ir(IR_SIZE)
+    fusion = FireFusion.from_params(IR_SIZE, RGB_SIZE, COORD)
+
+    for i in range(0, 12, 4):
+        _, _, hotspots = detect_fire(ir[i], 80)
+        boxes = scene.fire_boxes(i, RGB_SIZE)
+        result = fusion.fuse(hotspots, _eo_boxes(boxes))
+        assert result['status'] == FIRE_CONFIRMED
+        matched = {tuple(d['eo_bbox']) for d in result['details'] if d.get('status') == FIRE_CONFIRMED}
+        assert len(matched) == 2
+
+    # 정답 bbox가 없으면 (EO 미검출) 고온만으로는 확정되지 않는다
+    result = fusion.fuse(detect_fire(ir[0], 80)[2], [])
+    assert result['confirmed_count'] == 0 and result['ir_only_count'] > 0
+
+
+def test_mock_sources_play_same_scene_frame():
+    cfg = {'FIRES': 1, 'HOT': 1, 'FRAMES': 6, 'FPS': 60, 'IR_RES': list(IR_SIZE), 'COORD': COORD}
+    rgb_cam = MockRGBCamera({'RES': list(RGB_SIZE), 'SLEEP': 0}, DoubleBuffer(),
+                            scene=SyntheticScene.from_config(cfg))
+    ir_cam = MockThermalCamera(size=IR_SIZE, scene=SyntheticScene.from_config(cfg))
+
+    assert ir_cam.oriented
+    i = rgb_cam.scene.index(123.45)
+    assert i == ir_cam.scene.index(123.45)
+    np.testing.assert_array_equal(ir_cam._frames[i], SyntheticScene.from_config(cfg).render_ir(IR_SIZE)[i])
+    frame, ts = rgb_cam.capture()
+    assert frame.shape == (360, 640, 3) and ts
@@ -0,0 +1,26 @@
+from core.tiling import TileScheduler, tile_grid
+
+
+def test_tile_grid_covers_frame_with_overlap():
+    tiles = tile_grid((1920, 1080), (800, 800), overlap=0.2)
+
+    # 가로 3장, 세로 2장 (마지막 타일은 프레임 끝에 맞춤)
+    assert len(tiles) == 6
+    assert tiles[0] == (0, 0, 800, 800)
+    assert tiles[-1] == (1120, 280, 1920, 1080)
+    for x0, y0, x1, y1 in tiles:
+        assert (x1 - x0, y1 - y0) == (800, 800)
+        assert 0 <= x0 and x1 <= 1920 and 0 <= y0 and y1 <= 1080
+
+
+def test_tile_grid_small_frame_single_tile():
+    assert tile_grid((640, 360), (800, 800)) == [(0, 0, 640, 360)]
+
+
+def test_tile_scheduler_round_robin():
+    sched = TileScheduler(5, per_frame=2)
+    assert sched.cycle_frames == 3
+    seen = [sched.next() for _ in range(3)]
+    assert seen == [[0, 1], [2, 3], [4, 0]]
+
+    assert TileScheduler(4).next() == [0, 1, 2, 3]
@@ -0,0 +1,61 @@
+import numpy as np
+
+from core.coord_mapper import bbox_iou, bbox_iou_matrix
+from core.fire_fusion import FireFusion, eo_fire_boxes, FIRE_CONFIRMED
+from core.tracker import IoUTracker, KeyframeScheduler
+
+
+def test_bbox_iou_matrix_matches_scalar():
+    rng = np.random.default_rng(7)
+    a = rng.uniform(0, 100, size=(6, 4))
+    b = rng.uniform(0, 100, size=(5, 4))
+    mat = bbox_iou_matrix(a, b)
+
+    for i in range(len(a)):
+        for j in range(len(b)):
+            assert abs(mat[i, j] - bbox_iou(a[i], b[j])) < 1e-9
+
+
+def test_tracker_keeps_ids_and_propagates():
+    tracker = IoUTracker(iou_thr=0.3)
+    first = tracker.update([(100, 100, 50, 50, 0.9, 1), (400, 100, 50, 50, 0.8, 1)])
+    ids = [d[6] for d in first]
+    assert len(set(ids)) == 2
+
+    # 같은 박스가 조금 이동하고 순서가 바뀌어도 id 유지
+    second = tracker.update([(410, 100, 50, 50, 0.8, 1), (110, 100, 50, 50, 0.9, 1)])
+    assert [d[6] for d in second] == [ids[1], ids[0]]
+
+    # 비키프레임: 프레임당 +10px 속도로 전파
+    propagated = {d[6]: d for d in tracker.predict()}
+    assert propagated[ids[0]][0] > 110
+
+    # 다른 클래스는 같은 위치라도 새 트랙
+    third = tracker.update([(120, 100, 50, 50, 0.9, 0)])
+    assert third[0][6] not in ids
+
+
+def test_keyframe_scheduler_interval_and_motion():
+    sched = KeyframeScheduler(interval=3, motion_thr=10.0, ir_delta=0)
+    still = np.zeros((90, 160, 3), np.uint8)
+    flags = [sched.need_keyframe(still) for _ in range(6)]
+    assert flags == [True, False, False, True, False, False]
+
+    moved = np.full((90, 160, 3), 200, np.uint8)
+    assert sched.need_keyframe(moved) is True
+
+
+def test_fusion_carries_track_id():
+    fusion = FireFusion(ir_size=(160, 120), rgb_size=(960, 540))
+    rgb_x, rgb_y = fusion.coord_mapper.ir_to_rgb(80, 60)
+    dets = [
+        (rgb_x - 20, rgb_y - 20, 40, 40, 0.9, 1, 7),
+        (0, 0, 10, 10, 0.5, 0, 8),     # fire 클래스 아님
+    ]
+    boxes = eo_fire_boxes(dets)
+    assert boxes.tolist() == [(rgb_x - 20, rgb_y - 20, 40, 40, 0.9, 7)]
+
+    res = fusion.fuse([(80, 60, 120.0, 118.0)], boxes)
+    assert res['status'] == FIRE_CONFIRMED
+    assert res['details'][0]['track_id'] == 7
+    assert res['eo_annotations'][0]['track_id'] == 7
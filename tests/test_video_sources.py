@@ -1,9 +1,12 @@
 from pathlib import Path
 
+import cv2
+import numpy as np
 import pytest
 
 from camera.rgb_video import VideoRGBCamera
 from camera.purethermal.video_thermal import VideoThermalCamera
+from camera.video_reader import PrefetchReader
 from core.buffer import DoubleBuffer
 
 
@@ -42,3 +45,40 @@ def test_video_thermal_camera_converts_to_raw16():
         assert frame.dtype.kind == "u"
     finally:
         cam.cleanup()
+
+
+def _write_video(path, values, size=(64, 48)):
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), 10, size)
+    if not writer.isOpened():
+        pytest.skip("mp4v writer unavailable")
+    for v in values:
+        writer.write(np.full((size[1], size[0], 3), v, np.uint8))
+    writer.release()
+    return str(path)
+
+
+def test_prefetch_reader_plays_playlist_in_order(tmp_path):
+    paths = [_write_video(tmp_path / "a.mp4", (40, 80, 120)), _write_video(tmp_path / "b.mp4", (160, 200))]
+    reader = PrefetchReader(paths, loop=False, depth=2, hw_decode=False)
+    try:
+        seen = []
+        while True:
+            ok, frame = reader.read()
+            if not ok:
+                break
+            seen.append((reader.path_idx, int(frame.mean())))
+        assert [idx for idx, _ in seen] == [0, 0, 0, 1, 1]
+        assert all(abs(v - e) <= 3 for (_, v), e in zip(seen, (40, 80, 120, 160, 200)))
+        assert reader.read() == (False, None)
+    finally:
+        reader.release()
+
+
+def test_video_thermal_camera_loops_with_prefetch(tmp_path):
+    path = _write_video(tmp_path / "ir.mp4", (50, 100))
+    cam = VideoThermalCamera(path, loop=True, target_size=(16, 12), hw_decode=False, prefetch=2)
+    try:
+        frames = [cam.capture() for _ in range(5)]
+        assert all(f is not None and f.shape == (12, 16) and f.dtype == np.uint16 for f in frames)
+    finally:
+        cam.cleanup()
@@ -0,0 +1,60 @@
+import socket
+
+import numpy as np
+import pytest
+
+from core.video_stream import (
+    VideoStreamWriter, _socket_alive, decoder_pipeline, encoder_pipeline, match_frame, stream_config,
+)
+
+
+def test_stream_config_defaults_and_port():
+    cfg = stream_config({'PORT': 9999})
+    assert cfg['MODE'] == 'jpeg' and cfg['PORT'] == 10000
+
+    cfg = stream_config({'PORT': 9999, 'STREAM': {'MODE': 'H265', 'PORT': 7000, 'BITRATE_KBPS': 800}})
+    assert cfg['MODE'] == 'h265' and cfg['PORT'] == 7000 and cfg['BITRATE_KBPS'] == 800 and cfg['GOP'] == 30
+
+    with pytest.raises(ValueError):
+        stream_config({'STREAM': {'MODE': 'vp9'}})
+
+
+def test_pipelines_use_matching_parser():
+    enc = encoder_pipeline('h265', "x265enc", "fakesink")
+    assert enc.startswith("appsrc ") and "h265parse" in enc and "mpegtsmux" in enc
+    dec = decoder_pipeline('h264', 10000)
+    assert "tcpserversrc host=0.0.0.0 port=10000" in dec and "avdec_h264" in dec and dec.endswith("sync=false")
+
+
+def test_match_frame_uses_pts_across_dropped_frames():
+    # 15fps, seq 2 프레임이 디코딩되지 않음: 디코딩 순번 2는 seq 3 프레임
+    entries = [(0, 0.0, "f0"), (1, 66.7, "f1"), (2, 200.0, "f3")]
+    assert match_frame(entries, 3, fps=15) == "f3"
+    assert match_frame(entries, 2, fps=15) is None
+    # PTS가 없으면 디코딩 순번
+    assert match_frame([(0, None, "a"), (1, None, "b")], 1, fps=15) == "b"
+
+
+class _Writer:
+    def __init__(self):
+        self.frames = 0
+
+    def write(self, frame):
+        self.frames += 1
+
+    def release(self):
+        pass
+
+
+def test_writer_detects_lost_socket_and_resets_seq():
+    local, remote = socket.socketpair()
+    writer = VideoStreamWriter("127.0.0.1", 1, retry_sec=60.0)
+    writer._writer, writer._sock, writer.size, writer.seq = _Writer(), local, (4, 2), 7
+    frame = np.zeros((2, 4, 3), np.uint8)
+
+    assert _socket_alive(local) and writer.write(frame) == 7
+    remote.close()
+    assert not _socket_alive(local)
+    # 끊기면 닫고 재시도 간격 동안 JPEG (None), 다시 열면 seq 0부터
+    assert writer.write(frame) is None
+    assert not writer.is_open and writer.reconnects == 1 and writer._sock is None
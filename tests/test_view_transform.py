@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from core.coord_mapper import CoordMapper
+from core.roi import hotspots_to_frame
+from core.view_transform import ViewTransform, item_view, render_frame
+
+ORIENTATIONS = [(r, fh, fv) for r in (0, 90, 180, 270) for fh in (False, True) for fv in (False, True)]
+
+
+@pytest.mark.parametrize("rotate,flip_h,flip_v", ORIENTATIONS)
+def test_point_mapping_matches_rendered_image(rotate, flip_h, flip_v):
+    view = ViewTransform(rotate, flip_h, flip_v, (6, 4))
+    img = np.zeros((4, 6), np.uint8)
+    img[1, 2] = 255
+    out = view.render(img)
+    assert out.shape[::-1] == view.out_size
+    y, x = np.argwhere(out == 255)[0]
+    # 픽셀 (2, 1)의 중심은 연속 좌표 (2.5, 1.5)
+    assert tuple(view.map_points([(2.5, 1.5)])[0]) == (x + 0.5, y + 0.5)
+    assert tuple(view.map_pixels([(2, 1)])[0]) == (x, y)
+    assert np.allclose(view.unmap_points(view.map_points([(2.5, 1.5)])), [(2.5, 1.5)])
+
+
+def test_render_resizes_before_rotating():
+    view = ViewTransform(90, src_size=(1920, 1080))
+    frame = np.zeros((1080, 1920, 3), np.uint8)
+    out = view.render(frame, out_size=(270, 480))
+    assert out.shape == (480, 270, 3)
+    assert render_frame(frame, None, (960, 540)).shape == (540, 960, 3)
+    assert item_view((frame, "ts", {'view': view}), 2) is view and item_view((frame, "ts"), 2) is None
+
+
+@pytest.mark.parametrize("rotate,flip_h", [(90, False), (180, True), (270, False)])
+def test_coord_mapper_folds_ir_view(rotate, flip_h):
+    view = ViewTransform(rotate, flip_h, False, (160, 120))
+    params = {'offset_x': 3.0, 'offset_y': -2.0}
+    folded = CoordMapper.from_params((160, 120), (1080, 1920), params, ir_view=view)
+    ref = CoordMapper.from_params(view.out_size, (1080, 1920), params)
+
+    pts = np.array([(10.5, 20.5), (100.0, 7.0)])
+    rgb = folded.ir_to_rgb_many(pts)
+    assert np.allclose(rgb, ref.ir_to_rgb_many(view.map_points(pts)))
+    assert np.allclose(folded.rgb_to_ir_many(rgb), pts)
+
+    # 센서 방향 IR을 바로 투영한 결과 == 회전한 IR을 투영한 결과
+    ir = np.random.default_rng(0).integers(0, 255, (120, 160, 3), dtype=np.uint8)
+    w1, m1, roi1 = folded.warp_ir(ir)
+    w2, m2, roi2 = ref.warp_ir(view.render(ir))
+    assert roi1 == roi2 and (m1 == m2).all() and (w1 == w2).all()
+
+
+def test_hotspot_pixels_follow_map_pixels_under_rotation():
+    view = ViewTransform(180, False, False, (160, 120))
+    params = {'offset_x': 3.0, 'offset_y': -2.0}
+    folded = CoordMapper.from_params((160, 120), (960, 540), params, ir_view=view)
+    ref = CoordMapper.from_params(view.out_size, (960, 540), params)
+
+    # hotspot은 픽셀 인덱스: (20, 10) → 회전 프레임의 (139, 109) (송신 hotspot과 같은 위치)
+    assert np.allclose(view.map_pixels([(20, 10)]), [(139, 109)])
+    hotspots = [(20, 10, 120.0, 118.0)]
+    rgb = folded.ir_to_rgb_many([(20, 10)], pixels=True)
+    assert np.allclose(rgb, ref.ir_to_rgb_many([(139, 109)]))
+    assert np.allclose(hotspots_to_frame(hotspots, (160, 120), (960, 540), params, ir_view=view), rgb)
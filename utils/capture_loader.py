@@ -9,6 +9,7 @@ class CaptureLoader:
     캡처 세션 재사용 유틸리티.
     - metadata.csv를 읽어 RGB/IR 비디오와 RAW16 npy를 순서대로 반환
     - yield: dict(index, rgb_ts, ir_ts, diff_ms, rgb_frame, ir_frame, ir_raw)
+    - rgb_frames()/ir_raw_frames(): 스트림별 독립 순회 (세션 재생 입력용)
     """
 
     def __init__(self, root_dir: str):
@@ -55,6 +56,36 @@ class CaptureLoader:
                 "ir_raw": ir_raw,
             }
 
+    def rgb_frames(self):
+        """rgb.mp4를 별도 VideoCapture로 처음부터 읽어 (rgb_ts, frame) 생성"""
+        cap = cv2.VideoCapture(self.rgb_path)
+        try:
+            for row in self.meta_rows:
+                ok, frame = cap.read()
+                if not ok:
+                    break
+                yield row["rgb_ts"], frame
+        finally:
+            cap.release()
+
+    def ir_rows(self):
+        """RAW16이 저장된 IR 프레임 (ir_ts, raw 경로) - ir_ts 중복 제거, 기록 순서"""
+        seen = set()
+        rows = []
+        for row in self.meta_rows:
+            ir_ts, raw_path = row["ir_ts"], row.get("ir_raw", "")
+            if not raw_path or ir_ts in seen:
+                continue
+            seen.add(ir_ts)
+            rows.append((ir_ts, os.path.join(self.root_dir, raw_path)))
+        return rows
+
+    def ir_raw_frames(self):
+        """(ir_ts, raw16) 생성 (파일이 없는 프레임은 건너뜀)"""
+        for ir_ts, np_path in self.ir_rows():
+            if os.path.exists(np_path):
+                yield ir_ts, np.load(np_path)
+
     def release(self):
         if self.rgb_cap:
             self.rgb_cap.release()